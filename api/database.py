@@ -1,9 +1,15 @@
 # api/database.py
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
+from pathlib import Path
+import hashlib
+import inspect
 import os
 
 import config
+from api.services.malls import MALL_NAME_RENAMES, seed_malls
+from api.services.price_intervals import CREATE_PRODUCTS_BY_SNAPSHOT_VIEW_SQL
+from api.services.request_metrics import TimedQueuePool, instrument_engine
 
 IS_RAILWAY = (
     os.getenv("RAILWAY_ENVIRONMENT") is not None
@@ -48,9 +54,14 @@ DATABASE_URL = (
     f"@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
 )
 
-engine = create_engine(DATABASE_URL, pool_recycle=3600)
+# 요청별 SQL 수/시간과 풀 체크아웃 대기를 /metrics 로 내보낸다 (api/services/request_metrics.py).
+engine = create_engine(DATABASE_URL, pool_recycle=3600, poolclass=TimedQueuePool)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# true 면 스키마 지문이 같아도 init_db 의 DDL/정규화를 전부 다시 돈다.
+INIT_DB_FORCE = os.getenv("INIT_DB_FORCE", "false").lower() == "true"
+
 
 def _safe_alter(conn, ddl_sql: str):
     """컬럼/인덱스가 이미 있으면 에러 무시"""
@@ -138,19 +149,18 @@ def _merge_monthly_metrics_seller_rename(conn, old_name: str, new_name: str) ->
 def _normalize_mall_names(conn):
     """
     과거 판매처명을 표준명으로 치환한다.
-    - products.mall_name
+    - products.mall_name / price_intervals.mall_name
     - monthly_seller_metrics.seller_name_std
     """
-    mappings = [
-        ("글루어트", "글루코핏"),
-        ("무화당", "닥다몰"),
-    ]
-
-    for old_name, new_name in mappings:
+    for old_name, new_name in MALL_NAME_RENAMES.items():
         conn.execute(
             text("UPDATE products SET mall_name = :new_name WHERE mall_name = :old_name"),
             {"new_name": new_name, "old_name": old_name},
         )
+        conn.execute(
+            text("UPDATE price_intervals SET mall_name = :new_name WHERE mall_name = :old_name"),
+            {"new_name": new_name, "old_name": old_name},
+        )
         _merge_monthly_metrics_seller_rename(conn, old_name, new_name)
         conn.execute(
             text(
@@ -162,8 +172,40 @@ def _normalize_mall_names(conn):
         )
 
 
-def init_db():
-    """데이터베이스 테이블/컬럼이 없으면 자동으로 생성/추가"""
+def _schema_fingerprint() -> str:
+    """
+    init_db 가 적용하는 스키마의 지문.
+    DDL·판매처명 치환표·시드를 정의하는 모듈 소스가 그대로면 같은 값이다.
+    """
+    digest = hashlib.sha256()
+    for fn in (init_db, seed_malls):
+        digest.update(Path(inspect.getsourcefile(fn)).read_bytes())
+    digest.update(CREATE_PRODUCTS_BY_SNAPSHOT_VIEW_SQL.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _applied_schema_fingerprint(conn) -> str | None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_meta (
+                name VARCHAR(64) PRIMARY KEY,
+                value VARCHAR(64) NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """
+        )
+    )
+    return conn.execute(text("SELECT value FROM schema_meta WHERE name = 'init_db'")).scalar()
+
+
+def init_db(*, force: bool = False):
+    """
+    데이터베이스 테이블/컬럼이 없으면 자동으로 생성/추가.
+
+    API 기동(lifespan)마다 불리므로, 마지막으로 적용한 스키마 지문(schema_meta)이 지금 코드와 같으면
+    DDL 과 판매처명 정규화 UPDATE 를 건너뛴다 (쿼리 2개). force=True / INIT_DB_FORCE=true 면 항상 전부 실행.
+    """
 
     create_products_sql = text(
         """
@@ -185,11 +227,17 @@ def init_db():
             snapshot_at DATETIME NULL,
             calc_valid TINYINT(1) DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            observed_at DATETIME AS (COALESCE(snapshot_at, created_at)) STORED,
+            mall_id INT NULL,
             INDEX idx_unit_price (unit_price),
             INDEX idx_created_at (created_at),
             INDEX idx_channel (channel),
             INDEX idx_snapshot_at (snapshot_at),
-            INDEX idx_snapshot_id (snapshot_id)
+            INDEX idx_snapshot_id (snapshot_id),
+            INDEX idx_observed_at (observed_at),
+            INDEX idx_channel_observed (channel, observed_at),
+            INDEX idx_mall_observed (mall_name, observed_at),
+            INDEX idx_mall_id_observed (mall_id, observed_at)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """
     )
@@ -296,14 +344,250 @@ def init_db():
         """
     )
 
+    create_malls_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS malls (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            std_name VARCHAR(255) NOT NULL,
+            public_name VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_std_name (std_name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    create_mall_aliases_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS mall_aliases (
+            alias VARCHAR(255) NOT NULL PRIMARY KEY,
+            mall_id INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_mall_id (mall_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    create_snapshots_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            snapshot_id VARCHAR(40) NOT NULL,
+            market VARCHAR(100) NOT NULL,
+            channel VARCHAR(50) NOT NULL,
+
+            started_at DATETIME NOT NULL,
+            finished_at DATETIME NULL,
+            row_count INT NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'completed',
+            seq INT NOT NULL AUTO_INCREMENT,
+
+            PRIMARY KEY (snapshot_id, market, channel),
+            UNIQUE KEY uq_seq (seq),
+            INDEX idx_status_market_started (status, market, started_at),
+            INDEX idx_status_channel_started (status, channel, started_at),
+            INDEX idx_status_started (status, started_at),
+            INDEX idx_status_finished (status, finished_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    create_mall_daily_price_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS mall_daily_price (
+            price_date DATE NOT NULL,
+            mall_name_std VARCHAR(255) NOT NULL,
+            mall_id INT NULL,
+            channel VARCHAR(50) NOT NULL,
+
+            min_price INT NULL,
+            max_price INT NULL,
+            last_price INT NULL,
+            last_observed_at DATETIME NULL,
+            last_product_id BIGINT NULL,
+            row_count INT NOT NULL DEFAULT 0,
+
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+            PRIMARY KEY (mall_name_std, channel, price_date),
+            INDEX idx_date_channel (price_date, channel),
+            INDEX idx_mall_id_channel_date (mall_id, channel, price_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    # 월간 셀러 지표 증분 상태 (api/services/monthly_state.py)
+    create_monthly_seller_state_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_seller_state (
+            month CHAR(7) NOT NULL,
+            channel VARCHAR(50) NOT NULL,
+            threshold_price INT NOT NULL,
+            seller_name_std VARCHAR(255) NOT NULL,
+
+            state JSON NOT NULL,
+            last_ts DATETIME NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+            PRIMARY KEY (month, channel, threshold_price, seller_name_std)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    create_monthly_state_meta_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_state_meta (
+            month CHAR(7) NOT NULL,
+            channel VARCHAR(50) NOT NULL,
+            threshold_price INT NOT NULL,
+
+            status VARCHAR(20) NOT NULL DEFAULT 'stale',
+            last_snapshot_id VARCHAR(40) NULL,
+            last_ts DATETIME NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+            PRIMARY KEY (month, channel, threshold_price)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    # 응답 캐시 무효화용 변경 세대 (api/services/response_cache.py)
+    create_cache_generation_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS cache_generation (
+            name VARCHAR(50) NOT NULL PRIMARY KEY,
+            generation BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    # 링크별 확정 수량 (api/services/link_overrides.py)
+    create_link_quantity_overrides_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS link_quantity_overrides (
+            link_key_hash CHAR(64) NOT NULL PRIMARY KEY,
+            link_key TEXT NOT NULL,
+            quantity INT NOT NULL,
+            source_product_id BIGINT NULL,
+            confirmed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    # 변경분만 저장하는 가격 구간 (api/services/price_intervals.py, PRODUCTS_STORAGE_MODE=intervals)
+    create_price_listings_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS price_listings (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            listing_key_hash CHAR(64) NOT NULL,
+            channel VARCHAR(50) NOT NULL,
+            market VARCHAR(100) NOT NULL,
+            keyword VARCHAR(255),
+            product_name TEXT,
+            link TEXT,
+            image_url TEXT,
+            current_interval_id INT NULL,
+            first_seen_at DATETIME NOT NULL,
+            last_seen_at DATETIME NOT NULL,
+
+            UNIQUE KEY uq_listing_key_hash (listing_key_hash),
+            INDEX idx_channel_market (channel, market),
+            INDEX idx_current_interval (current_interval_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    create_price_intervals_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS price_intervals (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            listing_id INT NOT NULL,
+            unit_price INT,
+            quantity INT,
+            total_price INT,
+            mall_name VARCHAR(255),
+            mall_id INT NULL,
+            calc_method VARCHAR(50),
+            calc_valid TINYINT(1) DEFAULT 1,
+            card_image_path TEXT,
+
+            valid_from DATETIME NOT NULL,
+            valid_to DATETIME NOT NULL,
+            first_snapshot_id VARCHAR(40) NOT NULL,
+            last_seen_snapshot_id VARCHAR(40) NOT NULL,
+
+            INDEX idx_listing_valid (listing_id, valid_from),
+            INDEX idx_valid_range (valid_to, valid_from),
+            INDEX idx_mall_id_valid (mall_id, valid_to),
+            INDEX idx_mall_name (mall_name),
+            INDEX idx_first_snapshot (first_snapshot_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    # 적재 시점 가격 이상 판정 (api/services/price_anomalies.py)
+    create_price_anomalies_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS price_anomalies (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            mall_key VARCHAR(255) NOT NULL,
+            channel VARCHAR(50) NOT NULL,
+            ts DATETIME NOT NULL,
+            min_price INT NOT NULL,
+            baseline DOUBLE NULL,
+            residual DOUBLE NULL,
+            modified_z DOUBLE NULL,
+            kind VARCHAR(20) NOT NULL,
+            snapshot_id VARCHAR(40) NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+            UNIQUE KEY uq_mall_channel_ts (mall_key, channel, ts)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
+    create_price_anomaly_state_sql = text(
+        """
+        CREATE TABLE IF NOT EXISTS price_anomaly_state (
+            mall_key VARCHAR(255) NOT NULL,
+            channel VARCHAR(50) NOT NULL,
+
+            status VARCHAR(20) NOT NULL DEFAULT 'stale',
+            window_days INT NOT NULL,
+            last_snapshot_id VARCHAR(40) NULL,
+            last_ts DATETIME NULL,
+            points MEDIUMTEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+            PRIMARY KEY (mall_key, channel)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    )
+
     try:
+        fingerprint = _schema_fingerprint()
         with engine.connect() as conn:
+            if not (force or INIT_DB_FORCE) and _applied_schema_fingerprint(conn) == fingerprint:
+                conn.commit()
+                print(f"✅ Database schema up to date ({fingerprint}), init_db skipped")
+                return
             conn.execute(create_products_sql)
             conn.execute(create_monthly_metrics_sql)
             conn.execute(create_dashboard_memos_sql)
             conn.execute(create_monthly_reports_sql)
             conn.execute(create_alert_settings_sql)
             conn.execute(create_alert_delivery_logs_sql)
+            conn.execute(create_mall_daily_price_sql)
+            conn.execute(create_snapshots_sql)
+            conn.execute(create_malls_sql)
+            conn.execute(create_mall_aliases_sql)
+            conn.execute(create_cache_generation_sql)
+            conn.execute(create_monthly_seller_state_sql)
+            conn.execute(create_monthly_state_meta_sql)
+            conn.execute(create_link_quantity_overrides_sql)
+            conn.execute(create_price_listings_sql)
+            conn.execute(create_price_intervals_sql)
+            conn.execute(create_price_anomalies_sql)
+            conn.execute(create_price_anomaly_state_sql)
 
             _safe_alter(conn, "ALTER TABLE products ADD COLUMN snapshot_id VARCHAR(40) NULL")
             _safe_alter(conn, "ALTER TABLE products ADD COLUMN snapshot_at DATETIME NULL")
@@ -312,12 +596,44 @@ def init_db():
             _safe_alter(conn, "ALTER TABLE products ADD COLUMN market VARCHAR(100) NULL")
             _safe_alter(conn, "CREATE INDEX idx_snapshot_at ON products(snapshot_at)")
             _safe_alter(conn, "CREATE INDEX idx_snapshot_id ON products(snapshot_id)")
+            # 조회 시각 = COALESCE(snapshot_at, created_at). 식 그대로 WHERE 에 쓰면 인덱스를 못 타므로
+            # STORED 생성 컬럼으로 두고 범위 조건/정렬은 모두 observed_at 으로 건다.
+            _safe_alter(
+                conn,
+                "ALTER TABLE products ADD COLUMN observed_at DATETIME "
+                "AS (COALESCE(snapshot_at, created_at)) STORED",
+            )
+            _safe_alter(conn, "CREATE INDEX idx_observed_at ON products(observed_at)")
+            _safe_alter(conn, "CREATE INDEX idx_channel_observed ON products(channel, observed_at)")
+            _safe_alter(conn, "CREATE INDEX idx_mall_observed ON products(mall_name, observed_at)")
+            _safe_alter(conn, "ALTER TABLE products ADD COLUMN mall_id INT NULL")
+            _safe_alter(conn, "CREATE INDEX idx_mall_id_observed ON products(mall_id, observed_at)")
+            _safe_alter(conn, "ALTER TABLE mall_daily_price ADD COLUMN mall_id INT NULL AFTER mall_name_std")
+            _safe_alter(
+                conn,
+                "CREATE INDEX idx_mall_id_channel_date ON mall_daily_price(mall_id, channel, price_date)",
+            )
+            # 응답 캐시 데이터 버전(COUNT(*), MAX(finished_at))을 인덱스만으로 읽는다
+            _safe_alter(conn, "CREATE INDEX idx_status_finished ON snapshots(status, finished_at)")
             _safe_alter(conn, "ALTER TABLE dashboard_memos ADD COLUMN image_path TEXT NULL")
             _safe_alter(conn, "ALTER TABLE dashboard_memos ADD COLUMN image_paths JSON NULL")
+            # products_by_snapshot 뷰의 행 id(구간 id × 2^24 + seq)를 담는 컬럼
+            _safe_alter(conn, "ALTER TABLE snapshots ADD COLUMN seq INT NOT NULL AUTO_INCREMENT UNIQUE")
+            _safe_alter(conn, "ALTER TABLE mall_daily_price MODIFY COLUMN last_product_id BIGINT NULL")
+            _safe_alter(conn, "ALTER TABLE link_quantity_overrides MODIFY COLUMN source_product_id BIGINT NULL")
+            conn.execute(text(CREATE_PRODUCTS_BY_SNAPSHOT_VIEW_SQL))
 
             _normalize_mall_names(conn)
+            seed_malls(conn)
+            conn.execute(
+                text(
+                    "INSERT INTO schema_meta (name, value) VALUES ('init_db', :value) "
+                    "ON DUPLICATE KEY UPDATE value = VALUES(value)"
+                ),
+                {"value": fingerprint},
+            )
             conn.commit()
 
-        print("✅ Database initialized successfully (products + memos + reports + alerts tables)")
+        print("✅ Database initialized successfully (products + memos + reports + alerts + rollup tables)")
     except Exception as e:
         print(f"⚠️ Warning: Could not initialize database tables: {e}")
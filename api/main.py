@@ -1,4 +1,5 @@
 # api/main.py
+import threading
 from contextlib import asynccontextmanager
 
 from fastapi import BackgroundTasks, Depends, FastAPI
@@ -8,12 +9,16 @@ from api import scheduler
 from api.auth_dashboard import require_dashboard_auth
 from api.database import init_db  # 테이블 자동 생성
 from api.routers import alerts, auth_dashboard, health, memos, products, reports
+from api.services.price_analytics import warm_price_insights_pool
+from api.services.request_metrics import RequestMetricsMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
     scheduler.start()
+    # 배치 인사이트 프로세스 풀을 미리 띄운다 (시작을 막지 않도록 백그라운드). statsmodels 예측 엔진만 풀을 쓴다.
+    threading.Thread(target=warm_price_insights_pool, name="insights-pool-warmup", daemon=True).start()
     yield
     scheduler.stop()
 
@@ -41,6 +46,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 라우트별 지연 / SQL 수·행 수 / 풀 대기 → GET /metrics (Prometheus)
+app.add_middleware(RequestMetricsMiddleware)
 
 @app.post(
     "/crawl/trigger",
@@ -2,9 +2,13 @@
 from datetime import datetime
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
 
+import config
 from api.database import engine
+from api.services.request_metrics import render_prometheus
+from api.services.response_cache import response_cache_stats
 
 router = APIRouter()
 
@@ -26,23 +30,30 @@ def health_db():
     try:
         with engine.connect() as conn:
             products_rows = int(
-                conn.execute(text("SELECT COUNT(*) FROM products")).scalar() or 0
+                conn.execute(text(f"SELECT COUNT(*) FROM {config.PRODUCTS_SOURCE}")).scalar() or 0
             )
             with_snapshot = int(
                 conn.execute(
                     text(
-                        "SELECT COUNT(*) FROM products WHERE snapshot_id IS NOT NULL"
+                        f"SELECT COUNT(*) FROM {config.PRODUCTS_SOURCE} WHERE snapshot_id IS NOT NULL"
                     )
                 ).scalar()
                 or 0
             )
+            registered_snapshots = int(
+                conn.execute(text("SELECT COUNT(DISTINCT snapshot_id) FROM snapshots")).scalar()
+                or 0
+            )
         return {
             "db_reachable": True,
+            "storage_mode": config.PRODUCTS_STORAGE_MODE,
             "products_rows": products_rows,
             "rows_with_snapshot_id": with_snapshot,
+            "registered_snapshots": registered_snapshots,
             "hint": (
                 "products_rows=0 이면 크롤 데이터가 없거나 다른 DB를 보고 있음. "
-                "latest API는 snapshot_id가 있는 최신 스냅샷이 필요함."
+                "latest API는 snapshot_id가 있는 최신 스냅샷이 필요함. "
+                "registered_snapshots=0 이면 python -m scripts.backfill_snapshots 실행."
             ),
         }
     except Exception as e:
@@ -50,9 +61,22 @@ def health_db():
             "db_reachable": False,
             "products_rows": None,
             "rows_with_snapshot_id": None,
+            "registered_snapshots": None,
             "error": str(e)[:500],
             "hint": (
                 "MySQL이 떠 있는지, api/database.py(비 Railway) 기본 localhost·계정 또는 "
                 "MYSQLHOST/MYSQLUSER/MYSQLPASSWORD/MYSQLDATABASE 환경변수를 확인."
             ),
         }
+
+
+@router.get("/health/cache")
+def health_cache():
+    """대시보드 응답 캐시 적중/미스 카운터 (이 워커 프로세스 기준)."""
+    return response_cache_stats()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """라우트별 지연·SQL 수·반환 행 수, 커넥션 풀 대기 (Prometheus 텍스트 형식, 이 워커 프로세스 기준)."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -18,7 +18,7 @@ from api.schemas import (
     DashboardMemoListVendor,
     DashboardMemoOut,
 )
-from api.services.s3_storage import extract_object_key, generate_presigned_url, is_s3_enabled, upload_bytes
+from api.services.s3_storage import is_s3_enabled, to_display_image_url, upload_bytes
 
 router = APIRouter(prefix="/memos", tags=["memos"])
 
@@ -41,17 +41,7 @@ def get_db():
 
 
 def _to_display_image_url(value: str | None) -> str | None:
-    raw = (value or "").strip()
-    if not raw:
-        return None
-
-    if is_s3_enabled():
-        key = extract_object_key(raw)
-        if key:
-            signed = generate_presigned_url(key, expires_in=3600)
-            if signed:
-                return signed
-    return raw
+    return to_display_image_url(value)
 
 
 def _parse_json_paths(raw) -> list[str]:
@@ -3,21 +3,46 @@ from fastapi import APIRouter, Query, Depends, HTTPException, BackgroundTasks, B
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from api.database import SessionLocal
+from api.database import SessionLocal, engine
 from api.schemas import (
+    MallPriceInsightsBatchResponse,
     MallPriceInsightsResponse,
     PriceAnomalyItem,
     PriceForecastBlock,
     ProductListResponse,
 )
-from api.services.price_analytics import build_mall_price_insights, fetch_mall_min_price_series
+from api.services.link_overrides import upsert_link_override
+from api.services.malls import mall_directory, mall_id_filter_sql
+from api.services.monthly_state import mark_monthly_state_stale
+from api.services.price_anomalies import fetch_stored_anomalies, mark_price_anomalies_stale
+from api.services.price_intervals import intervals_storage_enabled, row_ids_filter_sql, split_row_id
+from api.services.mall_daily_price import (
+    fetch_channel_mall_names,
+    fetch_mall_daily_trends,
+    fetch_tracked_mall_summary,
+    refresh_mall_daily_price_dates,
+)
+from api.services.raw_export import (
+    EXPORT_FORMATS,
+    RawExportStream,
+    header_labels,
+    iter_csv,
+    iter_parquet,
+    is_parquet_available,
+    iter_xlsx,
+)
+from api.services.price_analytics import (
+    build_mall_price_insights,
+    build_price_insights_batch,
+    fetch_all_mall_min_price_series,
+    fetch_mall_min_price_series,
+)
+from api.services.response_cache import bump_generation, cached_response
+from api.services.snapshots import latest_snapshot, snapshot_filter_sql
+from collections import Counter
 from datetime import datetime, timedelta
-import io
-
-import pandas as pd
 from zoneinfo import ZoneInfo
 import threading
-import os
 import uuid
 import config
 
@@ -30,25 +55,23 @@ _crawl_last_finished_at_kst = None
 _crawl_last_error = None
 
 try:
-    from api.services.card_renderer import render_card_png
+    from api.services.card_renderer import render_cards_batch
     _card_renderer_import_error = None
 except Exception as e:
-    render_card_png = None
+    render_cards_batch = None
     _card_renderer_import_error = e
 
 try:
     from api.services.s3_storage import (
         is_s3_enabled,
         upload_bytes,
-        generate_presigned_url,
-        extract_object_key,
+        to_display_image_url,
     )
     _s3_storage_import_error = None
 except Exception as e:
     is_s3_enabled = None
     upload_bytes = None
-    generate_presigned_url = None
-    extract_object_key = None
+    to_display_image_url = None
     _s3_storage_import_error = e
 
 
@@ -86,46 +109,51 @@ def get_db():
         db.close()
 
 
+def _refresh_daily_rollup(db: Session, dates) -> None:
+    """products 행을 고치거나 지운 뒤 해당 일자의 mall_daily_price를 다시 맞춘다."""
+    try:
+        cursor = db.connection().connection.cursor()
+        try:
+            refresh_mall_daily_price_dates(cursor, dates)
+        finally:
+            cursor.close()
+    except Exception as e:
+        # 롤업은 파생 데이터이므로 실패해도 원본 변경은 유지한다. (backfill 스크립트로 복구)
+        print(f"⚠️ mall_daily_price refresh failed: {e}")
+
+
+def _affected_rows(db: Session, product_ids: list[int]) -> list:
+    """
+    수정/삭제로 바뀌는 행의 (일자, observed_at, mall_name).
+    intervals 모드는 행이 속한 구간 전체가 바뀌므로 그 구간의 모든 스냅샷 행을 돌려준다.
+    """
+    if intervals_storage_enabled():
+        interval_ids = sorted({split_row_id(pid)[0] for pid in product_ids})
+        return db.execute(
+            text(
+                f"SELECT DATE(created_at), observed_at, mall_name FROM {config.PRODUCTS_SOURCE} "
+                "WHERE interval_id IN :interval_ids"
+            ),
+            {"interval_ids": tuple(interval_ids)},
+        ).fetchall()
+    where_sql, params = row_ids_filter_sql(product_ids)
+    return db.execute(
+        text(f"SELECT DISTINCT DATE(created_at), observed_at, mall_name FROM products WHERE {where_sql}"),
+        params,
+    ).fetchall()
+
+
 def _to_display_image_url(value: str | None) -> str | None:
     """
-    S3 private 객체는 presigned URL로 바꿔서 내려준다.
+    S3 private 객체는 presigned URL로 바꿔서 내려준다. (client / URL 캐시는 s3_storage 공용)
     외부 이미지 URL(네이버 썸네일 등)은 원본 유지.
     """
-    raw = (value or "").strip()
-    if not raw:
-        return None
-
-    if (
-        _s3_storage_import_error is None
-        and is_s3_enabled is not None
-        and generate_presigned_url is not None
-        and extract_object_key is not None
-        and is_s3_enabled()
-    ):
-        key = extract_object_key(raw)
-        if key:
-            signed = generate_presigned_url(key, expires_in=3600)
-            if signed:
-                return signed
-    return raw
+    if _s3_storage_import_error is not None or to_display_image_url is None:
+        return (value or "").strip() or None
+    return to_display_image_url(value)
 
 
-_MALL_NAME_DB_TO_PUBLIC = {
-    "랜식": "랜식(글핏몰)",
-    "글핏몰": "랜식(글핏몰)",
-    "글루코핏": "랜식(글핏몰)",
-    "글루어트": "랜식(글핏몰)",
-    "닥터다이어리": "닥터다이어리(닥다몰)",
-    "닥다몰": "닥터다이어리(닥다몰)",
-    "무화당": "닥터다이어리(무화당)",
-}
-_MALL_NAME_PUBLIC_TO_DB_CANDIDATES = {
-    "랜식(글핏몰)": ("랜식", "글핏몰", "글루코핏", "글루어트"),
-    "닥터다이어리(닥다몰)": ("닥다몰", "닥터다이어리"),
-    "닥터다이어리(무화당)": ("무화당",),
-}
-
-# 대시보드/채널 그래프에 고정 노출하는 주요 5개 (표준 표기명 = SQL CASE 결과와 동일)
+# 대시보드/채널 그래프에 고정 노출하는 주요 5개 (표준 표기명 = malls.std_name)
 _MAJOR_CHART_MALLS_PUBLIC = [
     "닥터다이어리(닥다몰)",
     "랜식(글핏몰)",
@@ -136,10 +164,12 @@ _MAJOR_CHART_MALLS_PUBLIC = [
 
 
 def _to_public_mall_name(name: str | None) -> str:
-    raw = (name or "").strip()
-    if not raw:
-        return ""
-    return _MALL_NAME_DB_TO_PUBLIC.get(raw, raw)
+    return mall_directory().public_name(name)
+
+
+def _to_std_mall_name(name: str | None) -> str:
+    """별칭 / 구명칭 -> malls 표준명 (mall_id_filter_sql 입력)."""
+    return mall_directory().std_name(name)
 
 
 def _to_db_mall_name(name: str | None) -> str:
@@ -147,35 +177,15 @@ def _to_db_mall_name(name: str | None) -> str:
     if not raw:
         return ""
     # 공개 표준명이 들어오면 DB 후보군의 대표 키로 변환한다.
-    candidates = _MALL_NAME_PUBLIC_TO_DB_CANDIDATES.get(raw)
+    candidates = mall_directory().aliases(raw)
     if candidates:
         return candidates[0]
     return raw
 
 
-def _mall_name_candidates(name: str | None) -> tuple[str, ...]:
-    """
-    DB에 구명칭/신명칭이 혼재해도 조회되도록 후보 목록을 만든다.
-    예) 글루코핏 -> (글루코핏, 글루어트)
-    """
-    public_name = _to_public_mall_name(name)
-    values = [public_name, (name or "").strip()]
-    for candidate in _MALL_NAME_PUBLIC_TO_DB_CANDIDATES.get(public_name, ()):
-        values.append(candidate)
-    # 빈 문자열 제거 + 순서 유지 dedupe
-    result = []
-    seen = set()
-    for v in values:
-        if not v or v in seen:
-            continue
-        seen.add(v)
-        result.append(v)
-    return tuple(result)
-
-
 def _trends_mall_in_list(raw_names: list[str]) -> list[str]:
     """
-    tracked-malls/trends의 WHERE 절은 표준화 CASE 결과와 비교한다.
+    tracked-malls/trends의 WHERE 절은 malls 표준명(-> mall_id)과 비교한다.
     mall_list에 DB 원시 mall_name(예: 닥다몰)을 넣으면 표준명(닥터다이어리(닥다몰))과
     매칭되지 않아 해당 판매처 데이터가 통째로 빠진다. 항상 공개 표준명으로 변환한다.
     """
@@ -189,25 +199,90 @@ def _trends_mall_in_list(raw_names: list[str]) -> list[str]:
     return out
 
 
-def _mall_name_std_sql(column_name: str) -> str:
+def _export_raw_query(day_start: datetime, day_end: datetime, ch: str) -> tuple[str, dict]:
     """
-    SQL에서 판매처명을 표준명으로 통합하기 위한 CASE 식.
+    /export/raw 원본 조회 SQL.
+    observed_at 범위 조건이라 idx_observed_at / idx_channel_observed 범위 스캔으로 풀린다.
     """
-    return (
-        f"CASE TRIM({column_name}) "
-        "WHEN '랜식' THEN '랜식(글핏몰)' "
-        "WHEN '글핏몰' THEN '랜식(글핏몰)' "
-        "WHEN '글루코핏' THEN '랜식(글핏몰)' "
-        "WHEN '글루어트' THEN '랜식(글핏몰)' "
-        "WHEN '닥터다이어리' THEN '닥터다이어리(닥다몰)' "
-        "WHEN '닥다몰' THEN '닥터다이어리(닥다몰)' "
-        "WHEN '무화당' THEN '닥터다이어리(무화당)' "
-        f"ELSE TRIM({column_name}) END"
-    )
+    channel_where = ""
+    params = {"day_start": day_start, "day_end": day_end}
+    if ch != "all":
+        if ch == "naver":
+            channel_where = " AND (channel = :channel OR channel IS NULL OR TRIM(channel) = '')"
+        else:
+            channel_where = " AND channel = :channel"
+        params["channel"] = ch
+    sql = f"""
+        SELECT
+            id,
+            keyword,
+            product_name,
+            unit_price,
+            quantity,
+            total_price,
+            mall_name,
+            calc_method,
+            link,
+            image_url,
+            card_image_path,
+            channel,
+            market,
+            snapshot_id,
+            snapshot_at,
+            calc_valid,
+            created_at
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE observed_at >= :day_start
+          AND observed_at < :day_end
+          {channel_where}
+        ORDER BY observed_at DESC, id DESC
+    """
+    return sql, params
+
+
+def _mall_timeline_query(mall_filter: tuple[str, dict], days: int, channel: str | None) -> tuple[str, dict]:
+    """
+    /mall/timeline 조회 SQL. (mall_id, observed_at) 인덱스 범위 스캔.
+    mall_filter 는 mall_id_filter_sql(db, 표준명, column="p.mall_id") 결과.
+    """
+    mall_sql, mall_params = mall_filter
+    channel_filter_sql = ""
+    params = {**mall_params, "days": days}
+    if channel:
+        channel_filter_sql = (
+            " AND (p.channel = :channel "
+            "OR (:channel = 'naver' AND (p.channel IS NULL OR TRIM(p.channel) = '')))"
+        )
+        params["channel"] = channel
+    sql = f"""
+        SELECT
+            p.product_name,
+            p.id,
+            p.unit_price,
+            p.quantity,
+            p.total_price,
+            p.link,
+            p.image_url,
+            p.card_image_path,
+            p.calc_method,
+            p.observed_at AS ts,
+            p.snapshot_id
+        FROM {config.PRODUCTS_SOURCE} p
+        WHERE {mall_sql}
+          AND p.observed_at >= DATE_SUB(NOW(), INTERVAL :days DAY)
+          {channel_filter_sql}
+        ORDER BY p.observed_at DESC
+    """
+    return sql, params
 
 
 @router.get("/latest", response_model=ProductListResponse)
 def get_latest_products(db: Session = Depends(get_db)):
+    """최신 스냅샷 기준 상품 리스트 (스냅샷 버전 캐시)"""
+    return cached_response(db, "products/latest", {}, lambda: _latest_products(db))
+
+
+def _latest_products(db: Session):
     """
     최신 스냅샷 기준 상품 리스트
     - snapshot_at이 있으면 snapshot_at을 기준으로 최신 스냅샷을 잡고,
@@ -216,38 +291,27 @@ def get_latest_products(db: Session = Depends(get_db)):
       단, 쇼핑 API의 '네이버(최저가비교)' 집계 행은 스마트스토어 직접 행과 다른 가격을
       담을 수 있으므로 제외 규칙에서 항상 포함한다.
 
+    최신 스냅샷 id는 snapshots 레지스트리에서 마켓별로 찾는다 (커밋 완료된 실행만).
     과거 데이터에 snapshot_id가 없으면(전부 NULL) 최신 수집 시각 한 점으로 묶어 폴백한다.
     """
     try:
-        snap_cnt = int(
-            db.execute(
-                text("SELECT COUNT(*) FROM products WHERE snapshot_id IS NOT NULL")
-            ).scalar()
-            or 0
-        )
-
-        if snap_cnt > 0:
-            rows = db.execute(text("""
-                WITH latest_naver AS (
-                    SELECT snapshot_id
-                    FROM products
-                    WHERE snapshot_id IS NOT NULL
-                      AND market != '쿠팡'
-                    ORDER BY snapshot_id DESC
-                    LIMIT 1
-                ),
-                latest_coupang_brand AS (
-                    SELECT snapshot_id
-                    FROM products
-                    WHERE snapshot_id IS NOT NULL
-                      AND market = '쿠팡'
-                    ORDER BY snapshot_id DESC
-                    LIMIT 1
-                ),
-                coupang_brand_keys AS (
+        latest_naver = latest_snapshot(db, exclude_market="쿠팡")
+        latest_coupang = latest_snapshot(db, market="쿠팡")
+        naver_sid = (latest_naver or {}).get("snapshot_id")
+        coupang_sid = (latest_coupang or {}).get("snapshot_id")
+        # 두 스냅샷 행의 observed_at 하한 (월 파티션 pruning 용). 하나라도 모르면 하한 없이 찾는다.
+        bounds = [s.get("observed_from") for s in (latest_naver, latest_coupang) if s and s.get("snapshot_id")]
+        observed_from = min(bounds) if bounds and all(bounds) else None
+        cte_observed_sql = "AND observed_at >= :observed_from" if observed_from else ""
+        observed_sql = "AND p.observed_at >= :observed_from" if observed_from else ""
+
+        if naver_sid or coupang_sid:
+            rows = db.execute(text(f"""
+                WITH coupang_brand_keys AS (
                     SELECT product_name, quantity
-                    FROM products
-                    WHERE snapshot_id = (SELECT snapshot_id FROM latest_coupang_brand)
+                    FROM {config.PRODUCTS_SOURCE}
+                    WHERE snapshot_id = :coupang_sid
+                      {cte_observed_sql}
                 )
                 SELECT
                     p.id,
@@ -256,12 +320,12 @@ def get_latest_products(db: Session = Depends(get_db)):
                     p.image_url AS image_url,
                     card_image_path,
                     p.channel, market,
-                    COALESCE(p.snapshot_at, p.created_at) AS snapshot_time
-                FROM products p
-                WHERE (
-                    p.snapshot_id = (SELECT snapshot_id FROM latest_coupang_brand)
+                    p.observed_at AS snapshot_time
+                FROM {config.PRODUCTS_SOURCE} p
+                WHERE ((
+                    p.snapshot_id = :coupang_sid
                 ) OR (
-                    p.snapshot_id = (SELECT snapshot_id FROM latest_naver)
+                    p.snapshot_id = :naver_sid
                     AND (
                         TRIM(p.mall_name) IN ('최저가비교', '네이버')
                         OR NOT EXISTS (
@@ -270,14 +334,19 @@ def get_latest_products(db: Session = Depends(get_db)):
                               AND cb.quantity = p.quantity
                         )
                     )
-                )
+                ))
+                  {observed_sql}
                 ORDER BY unit_price ASC
-            """)).mappings().all()
+            """), {
+                "naver_sid": naver_sid,
+                "coupang_sid": coupang_sid,
+                "observed_from": observed_from,
+            }).mappings().all()
         else:
             # snapshot_id 없는 구 DB / 로컬 덤프: 가장 최근 수집 시각의 행만 반환
-            rows = db.execute(text("""
+            rows = db.execute(text(f"""
                 WITH latest_ts AS (
-                    SELECT MAX(COALESCE(snapshot_at, created_at)) AS ts FROM products
+                    SELECT MAX(observed_at) AS ts FROM {config.PRODUCTS_SOURCE}
                 )
                 SELECT
                     p.id,
@@ -286,11 +355,11 @@ def get_latest_products(db: Session = Depends(get_db)):
                     p.image_url AS image_url,
                     card_image_path,
                     p.channel, market,
-                    COALESCE(p.snapshot_at, p.created_at) AS snapshot_time
-                FROM products p
+                    p.observed_at AS snapshot_time
+                FROM {config.PRODUCTS_SOURCE} p
                 CROSS JOIN latest_ts lt
                 WHERE lt.ts IS NOT NULL
-                  AND COALESCE(p.snapshot_at, p.created_at) = lt.ts
+                  AND p.observed_at = lt.ts
                 ORDER BY unit_price ASC
             """)).mappings().all()
 
@@ -320,6 +389,11 @@ def get_latest_products(db: Session = Depends(get_db)):
 
 @router.get("/today", response_model=ProductListResponse)
 def get_today_products(db: Session = Depends(get_db)):
+    """KST 기준 오늘 누적 크롤링 상품 전체 (스냅샷 버전 캐시, 키에 날짜 포함)"""
+    return cached_response(db, "products/today", {}, lambda: _today_products(db))
+
+
+def _today_products(db: Session):
     """
     KST 기준 오늘(00:00~24:00) 누적 크롤링 상품 전체
     """
@@ -332,7 +406,7 @@ def get_today_products(db: Session = Depends(get_db)):
         day_start = day_start_kst.replace(tzinfo=None)
         day_end = day_end_kst.replace(tzinfo=None)
 
-        rows = db.execute(text("""
+        rows = db.execute(text(f"""
             SELECT
                 p.id,
                 keyword, product_name, unit_price, quantity, total_price,
@@ -340,11 +414,11 @@ def get_today_products(db: Session = Depends(get_db)):
                 p.image_url AS image_url,
                 card_image_path,
                 channel, market,
-                COALESCE(p.snapshot_at, p.created_at) AS snapshot_time
-            FROM products p
-            WHERE COALESCE(p.snapshot_at, p.created_at) >= :day_start
-              AND COALESCE(p.snapshot_at, p.created_at) < :day_end
-            ORDER BY COALESCE(p.snapshot_at, p.created_at) DESC, unit_price ASC, id DESC
+                p.observed_at AS snapshot_time
+            FROM {config.PRODUCTS_SOURCE} p
+            WHERE p.observed_at >= :day_start
+              AND p.observed_at < :day_end
+            ORDER BY p.observed_at DESC, unit_price ASC, id DESC
         """), {"day_start": day_start, "day_end": day_end}).mappings().all()
 
         data = []
@@ -376,13 +450,14 @@ def export_raw_products_excel(
     end_date: str | None = Query(None, description="종료 일자 (YYYY-MM-DD, KST, 포함)"),
     channel: str = Query("all", description="채널 필터 (all, naver, coupang, others)"),
     header_kr: bool = Query(True, description="엑셀 헤더 한글 라벨 변환 여부"),
-    db: Session = Depends(get_db),
+    export_format: str = Query("xlsx", alias="format", description="파일 형식 (xlsx, csv, parquet)"),
 ):
     """
-    지정한 KST 기간에 DB에 쌓인 products 원본 행을 엑셀(.xlsx)로 내려준다.
+    지정한 KST 기간에 DB에 쌓인 products 원본 행을 엑셀(.xlsx) / CSV / Parquet 으로 내려준다.
     - date: 단일 일자
     - start_date/end_date: 기간 (end_date 포함)
-    시각 기준은 COALESCE(snapshot_at, created_at) (오늘 목록 / 리포트와 동일).
+    - format: xlsx(기본) | csv | parquet. 서버 사이드 커서로 chunk씩 스트리밍해 기간과 무관하게 메모리가 일정하다.
+    시각 기준은 observed_at = COALESCE(snapshot_at, created_at) (오늘 목록 / 리포트와 동일).
     """
     def _parse_ymd(value: str, name: str) -> datetime:
         v = (value or "").strip()
@@ -415,93 +490,42 @@ def export_raw_products_excel(
     if ch not in allowed_channels:
         raise HTTPException(status_code=400, detail="channel must be one of: all, naver, coupang, others")
 
-    channel_where = ""
-    params = {"day_start": day_start, "day_end": day_end}
-    if ch != "all":
-        if ch == "naver":
-            channel_where = " AND (channel = :channel OR channel IS NULL OR TRIM(channel) = '')"
-        else:
-            channel_where = " AND channel = :channel"
-        params["channel"] = ch
+    export_sql, params = _export_raw_query(day_start, day_end, ch)
 
-    header_map_kr = {
-        "id": "ID",
-        "keyword": "키워드",
-        "product_name": "상품명",
-        "unit_price": "단가",
-        "quantity": "수량",
-        "total_price": "판매가",
-        "mall_name": "판매처",
-        "calc_method": "산출방식",
-        "link": "상품링크",
-        "image_url": "원본이미지URL",
-        "card_image_path": "카드이미지경로",
-        "channel": "채널",
-        "market": "마켓",
-        "snapshot_id": "스냅샷ID",
-        "snapshot_at": "스냅샷시각",
-        "calc_valid": "계산유효",
-        "created_at": "생성시각",
-    }
+    fmt = (export_format or "xlsx").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be one of: xlsx, csv, parquet")
+    if fmt == "parquet" and not is_parquet_available():
+        raise HTTPException(status_code=400, detail="parquet export is not available (pyarrow not installed)")
 
     try:
-        rows = (
-            db.execute(
-                text(
-                    f"""
-                    SELECT
-                        id,
-                        keyword,
-                        product_name,
-                        unit_price,
-                        quantity,
-                        total_price,
-                        mall_name,
-                        calc_method,
-                        link,
-                        image_url,
-                        card_image_path,
-                        channel,
-                        market,
-                        snapshot_id,
-                        snapshot_at,
-                        calc_valid,
-                        created_at
-                    FROM products
-                    WHERE COALESCE(snapshot_at, created_at) >= :day_start
-                      AND COALESCE(snapshot_at, created_at) < :day_end
-                      {channel_where}
-                    ORDER BY COALESCE(snapshot_at, created_at) DESC, id DESC
-                    """
-                ),
-                params,
-            )
-            .mappings()
-            .all()
-        )
-        df = pd.DataFrame([dict(r) for r in rows])
-        if header_kr and not df.empty:
-            df = df.rename(columns=header_map_kr)
-        buf = io.BytesIO()
-        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="products")
-        buf.seek(0)
-        start_str = start_kst.strftime("%Y-%m-%d")
-        end_str = end_kst.strftime("%Y-%m-%d")
-        filename = f"raw_{ch}_{start_str}_{end_str}_v1.xlsx"
-        return StreamingResponse(
-            buf,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-            },
-        )
+        # 서버 사이드 커서로 chunk씩 읽어 바로 내보낸다. 요청 세션과 별도 연결이라 응답이 끝날 때 반납된다.
+        stream = RawExportStream(engine, export_sql, params)
     except Exception as e:
         import traceback
 
         print(f"Error in export_raw_products_excel: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Export error: {str(e)}") from e
 
+    headers = header_labels(stream.columns, header_kr)
+    if fmt == "csv":
+        body = iter_csv(headers, stream.chunks())
+    elif fmt == "parquet":
+        body = iter_parquet(stream.columns, headers, stream.chunks())
+    else:
+        body = iter_xlsx(headers, stream.chunks())
+
+    start_str = start_kst.strftime("%Y-%m-%d")
+    end_str = end_kst.strftime("%Y-%m-%d")
+    filename = f"raw_{ch}_{start_str}_{end_str}_v1.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
+
 
 @router.get("/lowest")
 def get_lowest_products(
@@ -509,9 +533,9 @@ def get_lowest_products(
     db: Session = Depends(get_db)
 ):
     try:
-        rows = db.execute(text("""
+        rows = db.execute(text(f"""
             SELECT product_name, unit_price, mall_name, link
-            FROM products
+            FROM {config.PRODUCTS_SOURCE}
             ORDER BY unit_price ASC
             LIMIT :limit
         """), {"limit": limit}).mappings().all()
@@ -540,7 +564,7 @@ def get_mall_statistics(db: Session = Depends(get_db)):
     - 상품 수, 최저가, 평균가, 최근 등장 횟수
     """
     try:
-        rows = db.execute(text("""
+        rows = db.execute(text(f"""
             SELECT 
                 mall_name,
                 COUNT(*) as total_count,
@@ -548,7 +572,7 @@ def get_mall_statistics(db: Session = Depends(get_db)):
                 MAX(unit_price) as max_price,
                 ROUND(AVG(unit_price)) as avg_price,
                 COUNT(DISTINCT DATE(created_at)) as days_appeared
-            FROM products
+            FROM {config.PRODUCTS_SOURCE}
             GROUP BY mall_name
             ORDER BY total_count DESC
             LIMIT 50
@@ -576,34 +600,30 @@ def get_top_malls(
     limit: int = Query(10, ge=1, le=30),
     db: Session = Depends(get_db)
 ):
+    """주요 판매처 TOP N (스냅샷 버전 캐시)"""
+    return cached_response(db, "products/malls/top", {"limit": limit}, lambda: _top_malls(db, limit))
+
+
+def _top_malls(db: Session, limit: int):
     """
     주요 판매처 TOP N (최근 크롤링 기준, 최저가 순)
     - snapshot_at이 있으면 snapshot_at 기준 최신 스냅샷,
     - 없으면 created_at 기준 최신 스냅샷
     """
     try:
-        rows = db.execute(text("""
-            WITH latest AS (
-                SELECT snapshot_id, COALESCE(snapshot_at, created_at) AS snapshot_time
-                FROM products
-                ORDER BY COALESCE(snapshot_at, created_at) DESC, id DESC
-                LIMIT 1
-            )
+        latest_where, latest_params = snapshot_filter_sql(latest_snapshot(db))
+        rows = db.execute(text(f"""
             SELECT 
                 mall_name,
                 MIN(unit_price) as lowest_price,
                 COUNT(*) as product_count,
                 ROUND(AVG(unit_price)) as avg_price
-            FROM products p
-            CROSS JOIN latest l
-            WHERE (
-                (l.snapshot_id IS NOT NULL AND p.snapshot_id = l.snapshot_id)
-                OR (l.snapshot_id IS NULL AND COALESCE(p.snapshot_at, p.created_at) = l.snapshot_time)
-            )
+            FROM {config.PRODUCTS_SOURCE} p
+            WHERE {latest_where}
             GROUP BY mall_name
             ORDER BY lowest_price ASC
             LIMIT :limit
-        """), {"limit": limit}).mappings().all()
+        """), {"limit": limit, **latest_params}).mappings().all()
 
         data = []
         for r in rows:
@@ -643,35 +663,32 @@ def get_products_below_target(
     target_price: int = Query(None, description="기준가 (미지정시 설정값 사용)"),
     db: Session = Depends(get_db)
 ):
+    """기준가 이하 상품 목록 (스냅샷 버전 캐시)"""
+    price = target_price or config.TARGET_PRICE
+    return cached_response(
+        db, "products/below-target", {"target_price": price}, lambda: _products_below_target(db, price)
+    )
+
+
+def _products_below_target(db: Session, price: int):
     """
     기준가 이하 상품 목록 (최신 크롤링 기준)
     - 메인 대시보드에서 저렴한 상품 전체 표시용
     """
-    price = target_price or config.TARGET_PRICE
-
     try:
-        rows = db.execute(text("""
-            WITH latest AS (
-                SELECT snapshot_id, COALESCE(snapshot_at, created_at) AS snapshot_time
-                FROM products
-                ORDER BY COALESCE(snapshot_at, created_at) DESC, id DESC
-                LIMIT 1
-            )
+        latest_where, latest_params = snapshot_filter_sql(latest_snapshot(db))
+        rows = db.execute(text(f"""
             SELECT 
                 product_name, unit_price, quantity, total_price,
                 mall_name, calc_method, link,
                 COALESCE(card_image_path, image_url) AS image_url,
                 card_image_path,
-                COALESCE(p.snapshot_at, p.created_at) AS snapshot_time
-            FROM products p
-            CROSS JOIN latest l
-            WHERE (
-                (l.snapshot_id IS NOT NULL AND p.snapshot_id = l.snapshot_id)
-                OR (l.snapshot_id IS NULL AND COALESCE(p.snapshot_at, p.created_at) = l.snapshot_time)
-            )
+                p.observed_at AS snapshot_time
+            FROM {config.PRODUCTS_SOURCE} p
+            WHERE {latest_where}
               AND unit_price <= :target_price
             ORDER BY unit_price ASC
-        """), {"target_price": price}).mappings().all()
+        """), {"target_price": price, **latest_params}).mappings().all()
 
         snapshot_time = _to_kst(rows[0]["snapshot_time"]) if rows else None
 
@@ -699,6 +716,16 @@ def get_tracked_malls_summary(
     channel: str = Query(None, description="채널 필터 (naver, coupang, others)"),
     db: Session = Depends(get_db)
 ):
+    """주요 판매처 요약 (스냅샷 버전 캐시)"""
+    return cached_response(
+        db,
+        "products/tracked-malls/summary",
+        {"malls": malls, "channel": channel},
+        lambda: _tracked_malls_summary(db, malls, channel),
+    )
+
+
+def _tracked_malls_summary(db: Session, malls: str | None, channel: str | None):
     """
     주요 판매처 요약 (카드 표시용)
     - 현재 단가, 최근 7일 변동폭, 기준가 이하 횟수
@@ -706,22 +733,12 @@ def get_tracked_malls_summary(
     """
     # 채널 필터 SQL 조건 생성
     channel_filter_sql = ""
-    channel_filter_sql_plain = ""
-    channel_where_plain = ""
     channel_params = {}
     if channel:
         channel_filter_sql = (
             " AND (p.channel = :channel "
             "OR (:channel = 'naver' AND (p.channel IS NULL OR TRIM(p.channel) = '')))"
         )
-        channel_filter_sql_plain = (
-            " AND (channel = :channel "
-            "OR (:channel = 'naver' AND (channel IS NULL OR TRIM(channel) = '')))"
-        )
-        channel_where_plain = (
-            "WHERE (channel = :channel "
-            "OR (:channel = 'naver' AND (channel IS NULL OR TRIM(channel) = '')))"
-        )
         channel_params["channel"] = channel
 
     if malls:
@@ -730,93 +747,47 @@ def get_tracked_malls_summary(
         mall_list = [_to_db_mall_name(m) for m in config.TRACKED_MALLS]
     elif channel == "naver":
         # 네이버 채널은 전체 기간에 한 번이라도 등장한 판매처를 모두 노출한다.
-        mall_name_std_expr = _mall_name_std_sql("mall_name")
-        all_naver_malls = db.execute(text(f"""
-            SELECT {mall_name_std_expr} AS mall_name
-            FROM products
-            WHERE channel = :channel
-               OR channel IS NULL
-               OR TRIM(channel) = ''
-            GROUP BY {mall_name_std_expr}
-            ORDER BY COUNT(*) DESC, MIN(unit_price) ASC
-        """), {"channel": channel}).fetchall()
-        mall_list = [row[0] for row in all_naver_malls]
+        mall_list = fetch_channel_mall_names(db, channel=channel)
     else:
+        latest_where, latest_params = snapshot_filter_sql(latest_snapshot(db, channel=channel))
         top_malls = db.execute(text(f"""
-            WITH latest AS (
-                SELECT snapshot_id, COALESCE(snapshot_at, created_at) AS snapshot_time
-                FROM products
-                {channel_where_plain if channel else ""}
-                ORDER BY COALESCE(snapshot_at, created_at) DESC, id DESC
-                LIMIT 1
-            )
             SELECT mall_name
-            FROM products p
-            CROSS JOIN latest l
-            WHERE (
-                (l.snapshot_id IS NOT NULL AND p.snapshot_id = l.snapshot_id)
-                OR (l.snapshot_id IS NULL AND COALESCE(p.snapshot_at, p.created_at) = l.snapshot_time)
-            )
+            FROM {config.PRODUCTS_SOURCE} p
+            WHERE {latest_where}
             {channel_filter_sql}
             GROUP BY mall_name
             ORDER BY MIN(unit_price) ASC
             LIMIT 10
-        """), {**channel_params}).fetchall()
+        """), {**channel_params, **latest_params}).fetchall()
         mall_list = [row[0] for row in top_malls]
 
     if not mall_list:
         return {"target_price": config.TARGET_PRICE, "data": []}
 
     try:
+        # 판매처별 3쿼리(N+1) 대신 mall_daily_price 롤업을 한 번에 읽는다.
+        summary_by_mall = fetch_tracked_mall_summary(
+            db,
+            mall_names_std=_trends_mall_in_list(mall_list),
+            channel=channel,
+            target_price=config.TARGET_PRICE,
+            days=7,
+        )
         results = []
         for mall_name in mall_list:
-            mall_name_list = _mall_name_candidates(mall_name)
-            # 최신 스냅샷이 아닌 "해당 판매처의 최신 수집값"을 현재가로 사용한다.
-            current = db.execute(text(f"""
-                SELECT p.unit_price as current_price
-                FROM products p
-                WHERE p.mall_name IN :mall_name_list
-                  {channel_filter_sql}
-                ORDER BY COALESCE(p.snapshot_at, p.created_at) DESC, p.id DESC
-                LIMIT 1
-            """), {"mall_name_list": mall_name_list, **channel_params}).fetchone()
-
-            current_price = current[0] if current and current[0] else None
-
-            week_stats = db.execute(text(f"""
-                SELECT
-                    MIN(unit_price) as min_price,
-                    MAX(unit_price) as max_price
-                FROM (
-                    SELECT MIN(unit_price) as unit_price, DATE(created_at) as date
-                    FROM products p
-                    WHERE mall_name IN :mall_name_list
-                      AND created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-                      {channel_filter_sql}
-                    GROUP BY DATE(created_at)
-                ) daily_prices
-            """), {"mall_name_list": mall_name_list, **channel_params}).fetchone()
-
-            min_7d = week_stats[0] if week_stats and week_stats[0] else current_price
-            max_7d = week_stats[1] if week_stats and week_stats[1] else current_price
+            stats = summary_by_mall.get(_to_public_mall_name(mall_name)) or {}
+            current_price = stats.get("current_price") or None
+            min_7d = stats.get("min_price") or current_price
+            max_7d = stats.get("max_price") or current_price
             change_7d = (max_7d - min_7d) if min_7d and max_7d else 0
 
-            below_count = db.execute(text(f"""
-                SELECT COUNT(DISTINCT DATE(created_at)) as count
-                FROM products p
-                WHERE mall_name IN :mall_name_list
-                  AND unit_price <= :target_price
-                  AND created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-                  {channel_filter_sql}
-            """), {"mall_name_list": mall_name_list, "target_price": config.TARGET_PRICE, **channel_params}).fetchone()
-
             results.append({
                 "mall_name": _to_public_mall_name(mall_name),
                 "current_price": current_price,
                 "min_price_7d": min_7d,
                 "max_price_7d": max_7d,
                 "change_7d": change_7d,
-                "below_target_count": below_count[0] if below_count else 0
+                "below_target_count": int(stats.get("below_days") or 0),
             })
 
         public_malls = []
@@ -845,29 +816,29 @@ def get_tracked_malls_trends(
     channel: str = Query(None, description="채널 필터 (naver, coupang, others)"),
     db: Session = Depends(get_db)
 ):
+    """주요 판매처 일별 가격 추이 (스냅샷 버전 캐시)"""
+    return cached_response(
+        db,
+        "products/tracked-malls/trends",
+        {"malls": malls, "days": days, "channel": channel},
+        lambda: _tracked_malls_trends(db, malls, days, channel),
+    )
+
+
+def _tracked_malls_trends(db: Session, malls: str | None, days: int, channel: str | None):
     """
     주요 판매처 일별 가격 추이 (그래프용)
     - 각 판매처의 일별 최저가
     - channel 파라미터로 특정 채널의 판매처만 조회 가능
     """
     # 채널 필터 SQL 조건 생성
-    channel_filter_sql = ""
     channel_filter_sql_plain = ""
-    channel_where_plain = ""
     channel_params = {}
     if channel:
-        channel_filter_sql = (
-            " AND (channel = :channel "
-            "OR (:channel = 'naver' AND (channel IS NULL OR TRIM(channel) = '')))"
-        )
         channel_filter_sql_plain = (
             " AND (p.channel = :channel "
             "OR (:channel = 'naver' AND (p.channel IS NULL OR TRIM(p.channel) = '')))"
         )
-        channel_where_plain = (
-            "WHERE (channel = :channel "
-            "OR (:channel = 'naver' AND (channel IS NULL OR TRIM(channel) = '')))"
-        )
         channel_params["channel"] = channel
 
     if malls:
@@ -875,26 +846,16 @@ def get_tracked_malls_trends(
     elif config.TRACKED_MALLS and not channel:
         mall_list = [_to_db_mall_name(m) for m in config.TRACKED_MALLS]
     else:
+        latest_where, latest_params = snapshot_filter_sql(latest_snapshot(db, channel=channel))
         top_malls = db.execute(text(f"""
-            WITH latest AS (
-                SELECT snapshot_id, COALESCE(snapshot_at, created_at) AS snapshot_time
-                FROM products
-                {channel_where_plain if channel else ""}
-                ORDER BY COALESCE(snapshot_at, created_at) DESC, id DESC
-                LIMIT 1
-            )
             SELECT mall_name
-            FROM products p
-            CROSS JOIN latest l
-            WHERE (
-                (l.snapshot_id IS NOT NULL AND p.snapshot_id = l.snapshot_id)
-                OR (l.snapshot_id IS NULL AND COALESCE(p.snapshot_at, p.created_at) = l.snapshot_time)
-            )
+            FROM {config.PRODUCTS_SOURCE} p
+            WHERE {latest_where}
             {channel_filter_sql_plain if channel else ""}
             GROUP BY mall_name
             ORDER BY MIN(unit_price) ASC
             LIMIT 10
-        """), {**channel_params}).fetchall()
+        """), {**channel_params, **latest_params}).fetchall()
         mall_list = [row[0] for row in top_malls]
 
     try:
@@ -906,20 +867,12 @@ def get_tracked_malls_trends(
         if not mall_list_pub:
             return {"days": days, "malls": [], "data": []}
 
-        mall_name_std_expr = _mall_name_std_sql("mall_name")
-
-        rows = db.execute(text(f"""
-            SELECT
-                DATE(created_at) as date,
-                {mall_name_std_expr} as mall_name,
-                MIN(unit_price) as price
-            FROM products
-            WHERE {mall_name_std_expr} IN :mall_list
-              AND created_at >= DATE_SUB(NOW(), INTERVAL :days DAY)
-              {channel_filter_sql}
-            GROUP BY DATE(created_at), {mall_name_std_expr}
-            ORDER BY date ASC
-        """), {"mall_list": tuple(mall_list_pub), "days": days, **channel_params}).fetchall()
+        rows = fetch_mall_daily_trends(
+            db,
+            mall_names_std=mall_list_pub,
+            channel=channel,
+            days=days,
+        )
 
         date_data = {}
         for row in rows:
@@ -959,34 +912,9 @@ def get_mall_timeline(
     - 스냅샷(또는 시간대)별 최저가 상품 정보
     """
     try:
-        db_mall_name_list = _mall_name_candidates(mall_name)
-        channel_filter_sql = ""
-        params = {"mall_name_list": db_mall_name_list, "days": days}
-        if channel:
-            channel_filter_sql = (
-                " AND (p.channel = :channel "
-                "OR (:channel = 'naver' AND (p.channel IS NULL OR TRIM(p.channel) = '')))"
-            )
-            params["channel"] = channel
-        rows = db.execute(text(f"""
-            SELECT
-                p.product_name,
-                p.id,
-                p.unit_price,
-                p.quantity,
-                p.total_price,
-                p.link,
-                p.image_url,
-                p.card_image_path,
-                p.calc_method,
-                COALESCE(p.snapshot_at, p.created_at) AS ts,
-                p.snapshot_id
-            FROM products p
-            WHERE p.mall_name IN :mall_name_list
-              AND COALESCE(p.snapshot_at, p.created_at) >= DATE_SUB(NOW(), INTERVAL :days DAY)
-              {channel_filter_sql}
-            ORDER BY COALESCE(p.snapshot_at, p.created_at) DESC
-        """), params).fetchall()
+        mall_filter = mall_id_filter_sql(db, [_to_std_mall_name(mall_name)], column="p.mall_id")
+        timeline_sql, params = _mall_timeline_query(mall_filter, days, channel)
+        rows = db.execute(text(timeline_sql), params).fetchall()
 
         # 모든 크롤링 상품을 개별 항목으로 반환
         timeline_items = []
@@ -1035,30 +963,99 @@ def get_mall_price_insights(
     판매처별 스냅샷 최저가 시계열에 대한 분석 레이어.
 
     - 이상 탐지: 지연 롤링 중앙값 대비 잔차의 MAD 기반 modified z-score
-      (급락 sharp_drop / 급등 sharp_rise).
+      (급락 sharp_drop / 급등 sharp_rise). 스냅샷 적재 때 판정해 둔 price_anomalies 를 읽고,
+      상태가 없는 판매처·채널만 조회 구간에서 계산한다. 어느 쪽인지는 algorithm.anomaly_source
+      (ingest: 관측마다 적재 창 anomaly_window_days 일로 판정 / query_window: 조회 구간으로 판정).
     - 단기 예측: 최근 관측 구간 OLS 선형 추세 1스텝 외삽 + 잔차 기반 대략 구간.
     """
     try:
         mall_key = _to_public_mall_name(mall_name)
-        db_mall_name_list = _mall_name_candidates(mall_name)
         df = fetch_mall_min_price_series(
-            db, mall_name_list=db_mall_name_list, days=days, channel=channel
+            db, mall_names_std=[_to_std_mall_name(mall_name)], days=days, channel=channel
         )
-        core = build_mall_price_insights(df)
-        fc = core.get("forecast")
-        forecast_block = PriceForecastBlock(**fc) if fc else None
-        return MallPriceInsightsResponse(
-            mall_name=mall_key,
+        stored = fetch_stored_anomalies(db, mall_keys=[mall_key], channel=channel, days=days)
+        core = build_mall_price_insights(df, stored.get(mall_key))
+        return _mall_price_insights_response(mall_key, days, channel, core)
+    except Exception as e:
+        import traceback
+        print(f"Error in get_mall_price_insights: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+def _mall_price_insights_response(
+    mall_key: str, days: int, channel: str | None, core: dict
+) -> MallPriceInsightsResponse:
+    fc = core.get("forecast")
+    return MallPriceInsightsResponse(
+        mall_name=mall_key,
+        days=days,
+        channel=channel,
+        observation_count=core["observation_count"],
+        anomalies=[PriceAnomalyItem(**a) for a in core["anomalies"]],
+        forecast=PriceForecastBlock(**fc) if fc else None,
+        algorithm=core["algorithm"],
+    )
+
+
+@router.get("/price-insights/batch", response_model=MallPriceInsightsBatchResponse)
+def get_price_insights_batch(
+    days: int = Query(30, ge=1, le=90, description="조회 기간 (일)"),
+    channel: str = Query(None, description="채널 필터 (naver, coupang, others)"),
+    malls: str = Query(None, description="판매처 목록 (쉼표 구분, 미지정시 기간 내 전체 판매처)"),
+    db: Session = Depends(get_db),
+):
+    """
+    판매처 카드 전체의 가격 인사이트를 한 번에 (mall/price-insights 를 판매처마다 부르던 것 대체).
+    시계열은 GROUP BY 한 번으로 읽는다. PRICE_FORECAST_ENGINE=statsmodels(기본)면 Holt 적합 / 이상 탐지를
+    프로세스 풀에서 판매처별로 나눠 돌고, numpy 면 전 판매처 Holt 적합을 한 번에 하고 요청 스레드에서 조립한다
+    (풀을 쓰지 않는다).
+    결과는 스냅샷 버전 캐시라 다음 수집(또는 수동 수정) 전까지 재계산하지 않는다.
+    이상치는 적재 시점 판정이 준비된 판매처만 그것을 쓰고 나머지는 조회 구간으로 계산하므로 한 응답에
+    두 출처가 섞일 수 있다. 판매처별 출처는 data[].algorithm.anomaly_source, 출처별 판매처 수는 anomaly_sources.
+    """
+    return cached_response(
+        db,
+        "products/price-insights/batch",
+        {"days": days, "channel": channel, "malls": malls},
+        lambda: _price_insights_batch(db, days, channel, malls),
+    )
+
+
+def _price_insights_batch(db: Session, days: int, channel: str | None, malls: str | None):
+    try:
+        mall_names_std = None
+        wanted = None
+        if malls:
+            requested = [m.strip() for m in malls.split(",") if m.strip()]
+            wanted = [_to_public_mall_name(m) for m in requested]
+            mall_names_std = list(dict.fromkeys(_to_std_mall_name(m) for m in requested))
+
+        series = fetch_all_mall_min_price_series(
+            db,
             days=days,
             channel=channel,
-            observation_count=core["observation_count"],
-            anomalies=[PriceAnomalyItem(**a) for a in core["anomalies"]],
-            forecast=forecast_block,
-            algorithm=core["algorithm"],
+            mall_key=_to_public_mall_name,
+            mall_names_std=mall_names_std,
+            ensure_keys=wanted,
+        )
+        stored = fetch_stored_anomalies(db, mall_keys=list(series), channel=channel, days=days)
+        insights = build_price_insights_batch(series, stored_anomalies=stored)
+
+        # 요청한 판매처는 관측이 없어도 빈 결과로 돌려준다 (카드 순서 유지). 전체 조회는 관측 많은 순.
+        order = (
+            list(dict.fromkeys(wanted))
+            if wanted is not None
+            else sorted(series, key=lambda k: (-len(series[k]), k))
+        )
+        data = [_mall_price_insights_response(k, days, channel, insights[k]) for k in order]
+        sources = Counter(item.algorithm.get("anomaly_source", "none") for item in data)
+
+        return MallPriceInsightsBatchResponse(
+            days=days, channel=channel, count=len(data), anomaly_sources=dict(sources), data=data
         )
     except Exception as e:
         import traceback
-        print(f"Error in get_mall_price_insights: {traceback.format_exc()}")
+        print(f"Error in get_price_insights_batch: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
@@ -1104,20 +1101,21 @@ def generate_card_image(
     """
     if not config.ENABLE_CARD_RENDER:
         raise HTTPException(status_code=400, detail="ENABLE_CARD_RENDER is false")
-    if _card_renderer_import_error is not None or render_card_png is None:
+    if _card_renderer_import_error is not None or render_cards_batch is None:
         raise HTTPException(status_code=500, detail=f"Card renderer unavailable: {_card_renderer_import_error}")
     if _s3_storage_import_error is not None or is_s3_enabled is None or upload_bytes is None:
         raise HTTPException(status_code=500, detail=f"S3 storage unavailable: {_s3_storage_import_error}")
     if not is_s3_enabled():
         raise HTTPException(status_code=400, detail="S3 is not enabled")
 
-    row = db.execute(text("""
+    pid_sql, pid_params = row_ids_filter_sql([product_id])
+    row = db.execute(text(f"""
         SELECT id, keyword, product_name, unit_price, quantity, total_price,
                mall_name, calc_method, link, image_url, card_image_path, snapshot_id
-        FROM products
-        WHERE id = :pid
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE {pid_sql}
         LIMIT 1
-    """), {"pid": product_id}).mappings().first()
+    """), pid_params).mappings().first()
 
     if not row:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -1148,13 +1146,8 @@ def generate_card_image(
     object_key = f"{bucket_prefix}/products/manual/{snapshot_part}/{product_id}_{uuid.uuid4().hex[:8]}.png"
 
     try:
-        local_png_path = render_card_png(
-            product=product,
-            out_dir=os.path.join("product_cards", "manual", snapshot_part),
-            captured_at=captured_at,
-        )
-        with open(local_png_path, "rb") as f:
-            content = f.read()
+        # 프로세스 공용 브라우저로 렌더 (요청마다 Chromium 을 띄우지 않는다)
+        content = render_cards_batch([product], captured_at=captured_at)[0]
         _ = upload_bytes(content=content, object_key=object_key, content_type="image/png")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Card generation failed: {e}")
@@ -1163,7 +1156,22 @@ def generate_card_image(
     display_url = _to_display_image_url(stored_value) or stored_value
 
     link = (row["link"] or "").strip() if row.get("link") else ""
-    if link:
+    if intervals_storage_enabled():
+        # 카드는 구간(같은 가격/수량) 단위로 저장한다.
+        if link:
+            db.execute(
+                text(
+                    "UPDATE price_intervals i JOIN price_listings l ON l.id = i.listing_id "
+                    "SET i.card_image_path = :value WHERE l.link = :link"
+                ),
+                {"value": stored_value, "link": link},
+            )
+        else:
+            db.execute(
+                text("UPDATE price_intervals SET card_image_path = :value WHERE id = :interval_id"),
+                {"value": stored_value, "interval_id": split_row_id(product_id)[0]},
+            )
+    elif link:
         db.execute(
             text("UPDATE products SET card_image_path = :value WHERE link = :link"),
             {"value": stored_value, "link": link},
@@ -1173,6 +1181,7 @@ def generate_card_image(
             text("UPDATE products SET card_image_path = :value WHERE id = :pid"),
             {"value": stored_value, "pid": product_id},
         )
+    bump_generation(db)
     db.commit()
 
     return {
@@ -1191,15 +1200,17 @@ def manual_confirm_quantity(
 ):
     """
     수동확인 대상의 수량을 확정하여 단가를 재계산한다.
+    intervals 모드는 행이 속한 가격 구간 전체(같은 가격으로 연속 관측된 스냅샷들)에 적용된다.
     """
+    pid_sql, pid_params = row_ids_filter_sql([product_id])
     row = db.execute(
-        text("""
-            SELECT id, total_price
-            FROM products
-            WHERE id = :pid
+        text(f"""
+            SELECT id, total_price, link, mall_name
+            FROM {config.PRODUCTS_SOURCE}
+            WHERE {pid_sql}
             LIMIT 1
         """),
-        {"pid": product_id},
+        pid_params,
     ).mappings().first()
 
     if not row:
@@ -1208,9 +1219,14 @@ def manual_confirm_quantity(
     total_price = int(row["total_price"] or 0)
     new_unit_price = total_price // quantity if quantity > 0 else total_price
 
+    affected = _affected_rows(db, [product_id])
+    if intervals_storage_enabled():
+        target_table, target_id = "price_intervals", split_row_id(product_id)[0]
+    else:
+        target_table, target_id = "products", product_id
     db.execute(
-        text("""
-            UPDATE products
+        text(f"""
+            UPDATE {target_table}
             SET quantity = :quantity,
                 unit_price = :unit_price,
                 calc_method = :calc_method,
@@ -1221,9 +1237,15 @@ def manual_confirm_quantity(
             "quantity": quantity,
             "unit_price": new_unit_price,
             "calc_method": "수동확인(완료)",
-            "pid": product_id,
+            "pid": target_id,
         },
     )
+    # 다음 크롤부터 같은 링크는 제목 파싱 대신 이 수량을 쓴다 (같은 커밋).
+    upsert_link_override(db, link=row["link"], quantity=quantity, product_id=product_id)
+    _refresh_daily_rollup(db, sorted({r[0] for r in affected}))
+    mark_monthly_state_stale(db, [r[1] for r in affected])
+    mark_price_anomalies_stale(db, [row["mall_name"]])
+    bump_generation(db)
     db.commit()
 
     return {
@@ -1242,6 +1264,7 @@ def delete_products(
 ):
     """
     선택한 상품 행을 DB에서 삭제한다. (메인 대시보드 일괄 삭제용)
+    intervals 모드는 행이 속한 가격 구간 전체를 지운다 (deleted_count 는 사라진 스냅샷 행 수).
     """
     ids = [int(x) for x in (product_ids or []) if int(x) > 0]
     # 순서 유지 dedupe
@@ -1259,12 +1282,31 @@ def delete_products(
         raise HTTPException(status_code=400, detail="Too many ids. Max 500 per request")
 
     try:
-        result = db.execute(
-            text("DELETE FROM products WHERE id IN :id_list"),
-            {"id_list": tuple(deduped_ids)},
-        )
+        affected = _affected_rows(db, deduped_ids)
+        affected_dates = sorted({r[0] for r in affected})
+        if intervals_storage_enabled():
+            interval_ids = tuple(sorted({split_row_id(pid)[0] for pid in deduped_ids}))
+            db.execute(
+                text("DELETE FROM price_intervals WHERE id IN :interval_ids"),
+                {"interval_ids": interval_ids},
+            )
+            # 다음 크롤은 이 리스팅에 새 구간을 연다.
+            db.execute(
+                text("UPDATE price_listings SET current_interval_id = NULL WHERE current_interval_id IN :interval_ids"),
+                {"interval_ids": interval_ids},
+            )
+            deleted_count = len(affected)
+        else:
+            result = db.execute(
+                text("DELETE FROM products WHERE id IN :id_list"),
+                {"id_list": tuple(deduped_ids)},
+            )
+            deleted_count = int(result.rowcount or 0)
+        _refresh_daily_rollup(db, affected_dates)
+        mark_monthly_state_stale(db, [r[1] for r in affected])
+        mark_price_anomalies_stale(db, [r[2] for r in affected])
+        bump_generation(db)
         db.commit()
-        deleted_count = int(result.rowcount or 0)
         return {
             "deleted": True,
             "deleted_count": deleted_count,
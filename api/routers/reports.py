@@ -9,6 +9,7 @@ from api.database import SessionLocal
 from api.schemas import DateRangeReportResponse, MonthlyReportResponse
 from api.services.monthly_report_builder import build_monthly_report, render_markdown
 from api.services.range_report_builder import build_range_report, render_range_markdown
+from api.services.response_cache import cached_response
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -92,6 +93,27 @@ def _validate_date_range(start_date: str, end_date: str) -> None:
         raise HTTPException(400, "Maximum date range is 90 days")
 
 
+def _cached_range_report(db: Session, start_date: str, end_date: str, threshold_price: int, channel: str):
+    """기간 리포트는 같은 스냅샷 버전이면 /range 와 /range/markdown 이 같은 계산 결과를 공유한다."""
+    return cached_response(
+        db,
+        "reports/range",
+        {
+            "start_date": start_date,
+            "end_date": end_date,
+            "threshold_price": threshold_price,
+            "channel": channel,
+        },
+        lambda: build_range_report(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            threshold_price=threshold_price,
+            channel=channel,
+        ),
+    )
+
+
 @router.get("/range", response_model=DateRangeReportResponse)
 def get_range_report(
     start_date: str = Query(..., description="Start date (YYYY-MM-DD, inclusive)"),
@@ -101,13 +123,7 @@ def get_range_report(
     db: Session = Depends(get_db),
 ):
     _validate_date_range(start_date, end_date)
-    report = build_range_report(
-        db,
-        start_date=start_date,
-        end_date=end_date,
-        threshold_price=threshold_price,
-        channel=channel,
-    )
+    report = _cached_range_report(db, start_date, end_date, threshold_price, channel)
     return report
 
 
@@ -120,13 +136,7 @@ def get_range_report_markdown(
     db: Session = Depends(get_db),
 ):
     _validate_date_range(start_date, end_date)
-    report = build_range_report(
-        db,
-        start_date=start_date,
-        end_date=end_date,
-        threshold_price=threshold_price,
-        channel=channel,
-    )
+    report = _cached_range_report(db, start_date, end_date, threshold_price, channel)
     return {
         "start_date": start_date,
         "end_date": end_date,
@@ -162,6 +162,15 @@ class MallPriceInsightsResponse(BaseModel):
     algorithm: Dict[str, Any]
 
 
+class MallPriceInsightsBatchResponse(BaseModel):
+    days: int
+    channel: Optional[str] = None
+    count: int
+    # 판매처마다 이상치 출처가 다를 수 있다 (data[].algorithm.anomaly_source 별 판매처 수)
+    anomaly_sources: Dict[str, int] = {}
+    data: List[MallPriceInsightsResponse]
+
+
 # ── Dashboard memos (업체별 / 공용 계보) ───────────────────────────────
 
 class DashboardMemoCreateGlobal(BaseModel):
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import html
+import importlib.util
 import os
 import subprocess
 import sys
+import threading
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
-from playwright.async_api import async_playwright
+# playwright 는 import 만 0.2초가 걸려 API 기동을 늦춘다. 설치 여부만 여기서 확인하고(미설치면 ImportError 로
+# 라우터의 가용성 체크가 그대로 동작) 실제 import 는 브라우저를 띄울 때 한다.
+if importlib.util.find_spec("playwright") is None:
+    raise ImportError("No module named 'playwright'")
+
+KST = ZoneInfo("Asia/Seoul")
 
 
 def _safe_text(value: object) -> str:
@@ -180,16 +190,27 @@ def _build_card_html(product: dict, captured_at: datetime) -> str:
 """
 
 
+CARD_VIEWPORT = {"width": 1000, "height": 560}
+CARD_RENDER_CONCURRENCY = int(os.getenv("CARD_RENDER_CONCURRENCY", "4"))
+# 마지막 렌더 후 이 시간(초) 동안 요청이 없으면 브라우저를 닫는다. API 프로세스 메모리 보호용.
+CARD_RENDER_IDLE_CLOSE_SEC = int(os.getenv("CARD_RENDER_IDLE_CLOSE_SEC", "300"))
+_SETTLE_MS = 300
+_SET_CONTENT_TIMEOUT_MS = 15000
+
+
 async def _render_card_png_async(*, html_text: str, out_dir: str) -> str:
+    """브라우저를 카드마다 새로 띄우는 단건 렌더 (벤치마크 기준선용)."""
     os.makedirs(out_dir, exist_ok=True)
     out_path = str(Path(out_dir) / f"{uuid.uuid4()}.png")
 
+    from playwright.async_api import async_playwright
+
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page(viewport={"width": 1000, "height": 560})
+        page = await browser.new_page(viewport=CARD_VIEWPORT)
         # Avoid long hangs on external image/network requests in constrained runtimes.
-        await page.set_content(html_text, wait_until="domcontentloaded", timeout=15000)
-        await page.wait_for_timeout(300)
+        await page.set_content(html_text, wait_until="domcontentloaded", timeout=_SET_CONTENT_TIMEOUT_MS)
+        await page.wait_for_timeout(_SETTLE_MS)
         await page.screenshot(path=out_path, full_page=False)
         await browser.close()
 
@@ -220,14 +241,216 @@ def _install_playwright_chromium() -> None:
         raise last_error
 
 
-def render_card_png(*, product: dict, out_dir: str, captured_at: datetime) -> str:
-    html_text = _build_card_html(product, captured_at)
-    try:
-        return asyncio.run(_render_card_png_async(html_text=html_text, out_dir=out_dir))
-    except Exception as first_error:
-        # In some environments Chromium is missing on first deploy; install once and retry.
-        _install_playwright_chromium()
+class CardRenderer:
+    """
+    Chromium 하나를 띄워 두고 페이지 풀로 카드를 동시에 렌더한다.
+
+    전용 스레드의 이벤트 루프에서 playwright를 돌리므로 동기 코드(크롤러, FastAPI sync 핸들러,
+    스크립트) 어디서든 render_html_batch / render_cards_batch 를 그대로 호출할 수 있다.
+    브라우저가 죽었거나 유휴 시간이 지나 닫혔으면 다음 배치에서 다시 띄운다.
+    """
+
+    def __init__(self, *, concurrency: int = CARD_RENDER_CONCURRENCY, idle_close_sec: int = CARD_RENDER_IDLE_CLOSE_SEC):
+        self._concurrency = max(1, concurrency)
+        self._idle_close_sec = idle_close_sec
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="card-renderer", daemon=True)
+        self._thread.start()
+        self._playwright = None
+        self._browser = None
+        self._pages: asyncio.Queue | None = None
+        self._broken = False  # 깨진 페이지를 새 페이지로 못 바꿨다 → 다음 배치에서 브라우저를 다시 띄운다
+        self._start_lock: asyncio.Lock | None = None
+        self._last_used = time.monotonic()
+        self._installed_once = False
+        self._closed = False
+        asyncio.run_coroutine_threadsafe(self._init_async_state(), self._loop).result()
+
+    async def _init_async_state(self) -> None:
+        self._start_lock = asyncio.Lock()
+        if self._idle_close_sec > 0:
+            self._loop.create_task(self._idle_reaper())
+
+    async def _launch(self) -> None:
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=True)
+        except Exception as launch_error:
+            if self._installed_once:
+                raise
+            # In some environments Chromium is missing on first deploy; install once and retry.
+            self._installed_once = True
+            try:
+                await asyncio.to_thread(_install_playwright_chromium)
+            except Exception:
+                # 설치도 안 되면 원래 launch 오류를 올린다 (호출자가 BrowserType.launch 로 판별).
+                raise launch_error
+            self._browser = await self._playwright.chromium.launch(headless=True)
+        self._pages = asyncio.Queue()
+        for _ in range(self._concurrency):
+            self._pages.put_nowait(await self._browser.new_page(viewport=CARD_VIEWPORT))
+
+    async def _ensure_browser(self) -> None:
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected() and not self._broken:
+                return
+            await self._close_browser()
+            await self._launch()
+            self._broken = False
+
+    async def _close_browser(self) -> None:
+        browser, self._browser, self._pages = self._browser, None, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _idle_reaper(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(min(30, self._idle_close_sec))
+            if self._browser is None or self._pages is None:
+                continue
+            idle = time.monotonic() - self._last_used
+            # 모든 페이지가 풀에 돌아와 있을 때만(렌더 중이 아닐 때) 닫는다.
+            if idle >= self._idle_close_sec and self._pages.qsize() == self._concurrency:
+                async with self._start_lock:
+                    await self._close_browser()
+
+    async def _render_one(self, html_text: str, viewport: dict | None, settle_ms: int) -> bytes:
+        pages = self._pages
+        page = await pages.get()
+        try:
+            if viewport and viewport != CARD_VIEWPORT:
+                await page.set_viewport_size(viewport)
+            await page.set_content(html_text, wait_until="domcontentloaded", timeout=_SET_CONTENT_TIMEOUT_MS)
+            await page.wait_for_timeout(settle_ms)
+            png = await page.screenshot(full_page=False)
+            if viewport and viewport != CARD_VIEWPORT:
+                await page.set_viewport_size(CARD_VIEWPORT)
+        except BaseException:
+            # 크래시 / set_content 타임아웃 / 뷰포트 복구 실패한 페이지는 풀에 돌려놓지 않는다.
+            await self._replace_page(pages, page)
+            raise
+        pages.put_nowait(page)
+        return png
+
+    async def _replace_page(self, pages: asyncio.Queue, page) -> None:
+        """실패한 페이지를 닫고 새 페이지로 풀 자리를 채운다."""
+        try:
+            await page.close()
+        except Exception:
+            pass
+        if pages is not self._pages or self._browser is None:
+            return  # 그새 브라우저를 다시 띄웠다: 예전 풀은 버려졌다
+        try:
+            pages.put_nowait(await self._browser.new_page(viewport=CARD_VIEWPORT))
+        except Exception:
+            # 브라우저가 응답하지 않는다. 자리는 닫힌 페이지로 채워 이번 배치의 남은 렌더가 풀을 기다리다 멈추지 않고
+            # 바로 실패하게 하고, 다음 배치의 _ensure_browser 가 브라우저째 다시 띄운다.
+            self._broken = True
+            pages.put_nowait(page)
+
+    async def _render_batch(self, html_list, viewport, settle_ms, return_exceptions):
+        self._last_used = time.monotonic()
+        await self._ensure_browser()
         try:
-            return asyncio.run(_render_card_png_async(html_text=html_text, out_dir=out_dir))
+            return await asyncio.gather(
+                *(self._render_one(h, viewport, settle_ms) for h in html_list),
+                return_exceptions=return_exceptions,
+            )
+        finally:
+            self._last_used = time.monotonic()
+
+    def render_html_batch(
+        self,
+        html_list: list[str],
+        *,
+        viewport: dict | None = None,
+        settle_ms: int = _SETTLE_MS,
+        return_exceptions: bool = False,
+    ) -> list:
+        """HTML 목록을 같은 순서의 PNG bytes 목록으로. return_exceptions=True면 실패 칸에 예외 객체."""
+        if self._closed:
+            raise RuntimeError("CardRenderer is closed")
+        if not html_list:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self._render_batch(list(html_list), viewport, settle_ms, return_exceptions),
+            self._loop,
+        )
+        return future.result()
+
+    def render_cards_batch(
+        self,
+        products: list[dict],
+        *,
+        captured_at: datetime | None = None,
+        return_exceptions: bool = False,
+    ) -> list:
+        captured = captured_at or datetime.now(KST)
+        return self.render_html_batch(
+            [_build_card_html(p, captured) for p in products],
+            return_exceptions=return_exceptions,
+        )
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        async def _shutdown():
+            await self._close_browser()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result(timeout=30)
         except Exception:
-            raise first_error
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_renderer: CardRenderer | None = None
+_renderer_lock = threading.Lock()
+
+
+def get_card_renderer() -> CardRenderer:
+    """프로세스 공용 렌더러 (최초 호출 시 생성)."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = CardRenderer()
+                atexit.register(_renderer.close)
+    return _renderer
+
+
+def render_cards_batch(
+    products: list[dict],
+    *,
+    captured_at: datetime | None = None,
+    return_exceptions: bool = False,
+) -> list:
+    """
+    상품 dict 목록 -> 같은 순서의 카드 PNG bytes 목록.
+    공용 브라우저 / 페이지 풀(CARD_RENDER_CONCURRENCY)에서 동시에 렌더한다.
+    """
+    return get_card_renderer().render_cards_batch(
+        products, captured_at=captured_at, return_exceptions=return_exceptions
+    )
+
+
+def render_card_png(*, product: dict, out_dir: str, captured_at: datetime) -> str:
+    """단건 호환 API: 공용 렌더러로 그려 out_dir 에 PNG 파일을 쓰고 경로를 돌려준다."""
+    png = render_cards_batch([product], captured_at=captured_at)[0]
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = str(Path(out_dir) / f"{uuid.uuid4()}.png")
+    with open(out_path, "wb") as f:
+        f.write(png)
+    return out_path
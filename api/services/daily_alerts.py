@@ -8,9 +8,8 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from html import escape
 from io import BytesIO
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from PIL import Image, ImageDraw, ImageFont
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -18,6 +17,9 @@ import config
 from api.database import SessionLocal
 from api.services.range_report_builder import build_range_report
 
+if TYPE_CHECKING:
+    from PIL import ImageDraw, ImageFont
+
 KST = timezone(timedelta(hours=9))
 
 
@@ -230,6 +232,8 @@ def _build_email_body(
 
 
 def _load_image_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    from PIL import ImageFont
+
     env_path = os.getenv("ALERT_REPORT_FONT_PATH", "").strip()
     candidates = [
         env_path,
@@ -408,6 +412,8 @@ def _build_report_image_png(
         # 브라우저 렌더 실패 시 기존 Pillow 렌더로 폴백.
         pass
 
+    from PIL import Image, ImageDraw
+
     summary = report.get("summary") or {}
     below = report.get("below_threshold_list") or []
     top5 = summary.get("top5_lowest") or []
@@ -0,0 +1,140 @@
+"""
+링크별 확정 수량 (link_quantity_overrides).
+
+대시보드 /products/manual-confirm 이 수량을 확정하면 같은 트랜잭션에서 정규화 링크 키
+(title_parser.canonical_product_link_key) 단위로 한 행을 upsert 한다. 크롤러는 이번 실행에서 만난
+링크의 키만 PK 로 조회한다. (예전: 매 실행 products 전체에서 calc_method LIKE '수동확인(완료)%' 를
+id 역순으로 읽고 Python 에서 링크를 하나씩 정규화)
+
+- PK 는 link_key_hash = SHA-256(정규화 링크 키). 링크는 TEXT 라 그대로 키로 쓰지 않는다.
+- 같은 키를 다시 확정하면 마지막 확정값으로 덮어쓴다.
+- /delete 로 행을 지워도 확정값은 남는다. 수량은 링크(상품 구성)의 성질이라 다음 수집에도 유효하다.
+- 도입 전 이력은 `python -m scripts.backfill_link_overrides` 로 한 번 옮긴다. 이미 있는 키(도입 후
+  대시보드에서 확정한 값)는 건드리지 않는다. 옮긴 뒤 schema_meta 에 완료를 기록하고, 크롤러는 그 기록이
+  생기기 전까지는 테이블 대신 products 이력(confirmed_qty_from_history)을 읽는다.
+
+크롤러 / backfill SQL 은 pyformat(%(name)s) 파라미터라 pymysql / mysql.connector 커서 모두에서 실행된다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from api.services.title_parser import canonical_product_link_key
+
+_LOOKUP_CHUNK = 500
+BACKFILL_META_NAME = "link_overrides_backfill"
+
+_UPSERT_SQL = """
+INSERT INTO link_quantity_overrides (link_key_hash, link_key, quantity, source_product_id)
+VALUES (:key_hash, :link_key, :quantity, :product_id)
+ON DUPLICATE KEY UPDATE
+    link_key = VALUES(link_key),
+    quantity = VALUES(quantity),
+    source_product_id = VALUES(source_product_id),
+    confirmed_at = CURRENT_TIMESTAMP
+"""
+
+
+def link_key_hash(link_key: str) -> str:
+    return hashlib.sha256(link_key.encode("utf-8")).hexdigest()
+
+
+def upsert_link_override(db: Session, *, link: Optional[str], quantity: int, product_id: int) -> bool:
+    """manual-confirm 트랜잭션 안에서 호출. 링크가 없거나 수량이 0 이하면 기록하지 않는다. 커밋은 호출자가 한다."""
+    key = canonical_product_link_key((link or "").strip())
+    if not key or quantity <= 0:
+        return False
+    db.execute(
+        text(_UPSERT_SQL),
+        {"key_hash": link_key_hash(key), "link_key": key, "quantity": quantity, "product_id": product_id},
+    )
+    return True
+
+
+def fetch_link_overrides(cursor, links: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    {정규화 링크 키: 확정 수량}. links 를 주면 그 링크들의 키만 PK 로 조회하고,
+    None 이면 테이블 전체(확정 이력 수만큼, products 크기와 무관)를 읽는다.
+    """
+    if links is None:
+        cursor.execute("SELECT link_key, quantity FROM link_quantity_overrides WHERE quantity > 0")
+        return {key: int(qty) for key, qty in cursor.fetchall()}
+
+    hashes = sorted({link_key_hash(k) for k in (canonical_product_link_key((l or "").strip()) for l in links) if k})
+    out: Dict[str, int] = {}
+    for i in range(0, len(hashes), _LOOKUP_CHUNK):
+        chunk = hashes[i:i + _LOOKUP_CHUNK]
+        placeholders = ", ".join(f"%(h{j})s" for j in range(len(chunk)))
+        cursor.execute(
+            f"""
+            SELECT link_key, quantity FROM link_quantity_overrides
+            WHERE link_key_hash IN ({placeholders}) AND quantity > 0
+            """,
+            {f"h{j}": h for j, h in enumerate(chunk)},
+        )
+        out.update((key, int(qty)) for key, qty in cursor.fetchall())
+    return out
+
+
+def confirmed_qty_from_history(cursor, table: str = "products") -> Dict[str, int]:
+    """도입 전 방식: products 의 수동확정 이력 전체에서 키별 가장 최근 id 의 수량 (backfill / 테이블 없을 때 폴백)."""
+    cursor.execute(
+        f"""
+        SELECT link, quantity FROM {table}
+        WHERE calc_method LIKE %(method)s
+          AND link IS NOT NULL AND TRIM(link) <> ''
+        ORDER BY id DESC
+        """,
+        {"method": "수동확인(완료)%"},
+    )
+    out: Dict[str, int] = {}
+    for link, qty in cursor.fetchall():
+        if not link:
+            continue
+        key = canonical_product_link_key(link)
+        if not key or key in out:
+            continue
+        q = int(qty or 0)
+        if q > 0:
+            out[key] = q
+    return out
+
+
+def overrides_backfilled(cursor) -> bool:
+    """도입 전 이력을 link_quantity_overrides 로 옮겼는지 (schema_meta). 옮기기 전에는 테이블이 있어도 비어 있다."""
+    cursor.execute("SELECT value FROM schema_meta WHERE name = %(name)s", {"name": BACKFILL_META_NAME})
+    return bool(cursor.fetchall())
+
+
+def backfill_link_overrides(cursor, table: str = "products") -> tuple[int, int]:
+    """
+    이력 → link_quantity_overrides (기존 키 유지) 후 schema_meta 에 완료를 기록한다.
+    반환: (이력 키 수, 새로 넣은 행 수). 커밋은 호출자가 한다.
+    """
+    confirmed = confirmed_qty_from_history(cursor, table)
+    inserted = 0
+    items = sorted(confirmed.items())
+    for i in range(0, len(items), _LOOKUP_CHUNK):
+        chunk = items[i:i + _LOOKUP_CHUNK]
+        cursor.executemany(
+            """
+            INSERT IGNORE INTO link_quantity_overrides (link_key_hash, link_key, quantity)
+            VALUES (%(key_hash)s, %(link_key)s, %(quantity)s)
+            """,
+            [{"key_hash": link_key_hash(k), "link_key": k, "quantity": q} for k, q in chunk],
+        )
+        inserted += max(cursor.rowcount or 0, 0)
+    cursor.execute(
+        """
+        INSERT INTO schema_meta (name, value) VALUES (%(name)s, %(value)s)
+        ON DUPLICATE KEY UPDATE value = VALUES(value)
+        """,
+        {"name": BACKFILL_META_NAME, "value": datetime.now().isoformat(timespec="seconds")},
+    )
+    return len(confirmed), inserted
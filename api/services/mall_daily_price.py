@@ -0,0 +1,248 @@
+"""
+판매처 × 채널 × 일자 단위 가격 롤업(mall_daily_price).
+
+- 크롤러가 save_to_db 직후 해당 스냅샷이 속한 일자만 다시 집계한다.
+- /tracked-malls/summary, /tracked-malls/trends 는 원본 products 대신 이 테이블만 읽는다.
+- 일자 키는 기존 엔드포인트와 같은 DATE(created_at), 판매처 키는 malls.id(mall_id)와 표준명이다.
+  mall_id 가 아직 없는 행(backfill_mall_ids 전)은 mall_aliases 로 풀고, 그래도 없으면
+  TRIM(mall_name)을 표준명으로 쓴다.
+- 기준가 이하 여부는 "그날 최저가 <= 기준가"와 동치이므로 min_price로 판정한다.
+  (TARGET_PRICE가 바뀌어도 재집계가 필요 없다.)
+
+집계 SQL은 pyformat(%(name)s) 파라미터를 쓰므로 pymysql / mysql.connector
+어느 DB-API 커서로도 그대로 실행할 수 있다.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import config
+from api.services.malls import mall_id_filter_sql
+
+
+# 채널 NULL/공백 행은 기존 API와 같이 naver로 본다.
+_CHANNEL_STD_SQL = "COALESCE(NULLIF(TRIM(p.channel), ''), 'naver')"
+
+_DELETE_DAYS_SQL = """
+DELETE FROM mall_daily_price
+WHERE price_date >= %(start_date)s
+  AND price_date <= %(end_date)s
+"""
+
+_INSERT_DAYS_SQL = f"""
+INSERT INTO mall_daily_price (
+    price_date, mall_name_std, mall_id, channel,
+    min_price, max_price, last_price,
+    last_observed_at, last_product_id, row_count
+)
+SELECT
+    x.price_date,
+    x.mall_name_std,
+    MAX(x.mall_id),
+    x.channel,
+    MIN(x.unit_price),
+    MAX(x.unit_price),
+    MAX(CASE WHEN x.rn = 1 THEN x.unit_price END),
+    MAX(CASE WHEN x.rn = 1 THEN x.ts END),
+    MAX(CASE WHEN x.rn = 1 THEN x.id END),
+    COUNT(*)
+FROM (
+    SELECT
+        DATE(p.created_at) AS price_date,
+        COALESCE(m.std_name, TRIM(p.mall_name), '') AS mall_name_std,
+        COALESCE(p.mall_id, a.mall_id) AS mall_id,
+        {_CHANNEL_STD_SQL} AS channel,
+        p.unit_price,
+        p.id,
+        p.observed_at AS ts,
+        ROW_NUMBER() OVER (
+            PARTITION BY DATE(p.created_at), COALESCE(m.std_name, TRIM(p.mall_name), ''), {_CHANNEL_STD_SQL}
+            ORDER BY p.observed_at DESC, p.id DESC
+        ) AS rn
+    FROM {config.PRODUCTS_SOURCE} p
+    LEFT JOIN mall_aliases a ON p.mall_id IS NULL AND a.alias = TRIM(p.mall_name)
+    LEFT JOIN malls m ON m.id = COALESCE(p.mall_id, a.mall_id)
+    WHERE p.created_at >= %(start_ts)s
+      AND p.created_at < %(end_ts)s
+) x
+GROUP BY x.price_date, x.mall_name_std, x.channel
+"""
+
+
+def refresh_mall_daily_price(cursor, *, start_date: date, end_date: date) -> int:
+    """
+    [start_date, end_date] 일자 롤업을 products 원본에서 다시 만든다.
+    cursor는 DB-API 커서(pymysql / mysql.connector). 커밋은 호출자가 한다.
+    idx_created_at 범위 스캔이므로 비용은 해당 일자 행 수에만 비례한다.
+    """
+    if end_date < start_date:
+        return 0
+    start_ts = datetime.combine(start_date, datetime.min.time())
+    end_ts = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    cursor.execute(
+        _DELETE_DAYS_SQL,
+        {"start_date": start_date, "end_date": end_date},
+    )
+    cursor.execute(
+        _INSERT_DAYS_SQL,
+        {
+            "start_ts": start_ts.strftime("%Y-%m-%d %H:%M:%S"),
+            "end_ts": end_ts.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+    )
+    return int(cursor.rowcount or 0)
+
+
+def refresh_mall_daily_price_for_snapshot(cursor, snapshot_id: str) -> int:
+    """방금 저장한 스냅샷 행이 걸친 일자(보통 하루)만 재집계한다."""
+    cursor.execute(
+        "SELECT MIN(DATE(created_at)), MAX(DATE(created_at)) "
+        f"FROM {config.PRODUCTS_SOURCE} WHERE snapshot_id = %(snapshot_id)s",
+        {"snapshot_id": snapshot_id},
+    )
+    rows = cursor.fetchall()
+    row = rows[0] if rows else None
+    if not row or row[0] is None:
+        return 0
+    return refresh_mall_daily_price(cursor, start_date=row[0], end_date=row[1])
+
+
+def refresh_mall_daily_price_dates(cursor, dates: Iterable[date]) -> int:
+    """수동확정/삭제처럼 흩어진 일자를 하루씩 재집계한다."""
+    total = 0
+    for d in sorted({d for d in dates if d is not None}):
+        total += refresh_mall_daily_price(cursor, start_date=d, end_date=d)
+    return total
+
+
+def _channel_filter(channel: str | None) -> tuple[str, dict[str, Any]]:
+    if not channel:
+        return "", {}
+    return " AND channel = :channel", {"channel": channel}
+
+
+def fetch_tracked_mall_summary(
+    db: Session,
+    *,
+    mall_names_std: list[str],
+    channel: str | None,
+    target_price: int,
+    days: int = 7,
+) -> dict[str, dict[str, Any]]:
+    """
+    표준 판매처명별 현재가 / 최근 N일 일별 최저가의 min·max / 기준가 이하 일수.
+    반환: {mall_name_std: {current_price, min_price, max_price, below_days}}
+    """
+    if not mall_names_std:
+        return {}
+    mall_sql, mall_params = mall_id_filter_sql(db, mall_names_std)
+    ch_sql, ch_params = _channel_filter(channel)
+    rows = db.execute(
+        text(
+            f"""
+            WITH r AS (
+                SELECT mall_id, mall_name_std, price_date, min_price,
+                       last_price, last_observed_at, last_product_id
+                FROM mall_daily_price
+                WHERE {mall_sql}
+                  {ch_sql}
+            ),
+            latest AS (
+                SELECT
+                    mall_id,
+                    mall_name_std,
+                    last_price,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY mall_id
+                        ORDER BY last_observed_at DESC, last_product_id DESC
+                    ) AS rn
+                FROM r
+            ),
+            daily AS (
+                SELECT mall_id, price_date, MIN(min_price) AS day_min
+                FROM r
+                WHERE price_date >= DATE(DATE_SUB(NOW(), INTERVAL :days DAY))
+                GROUP BY mall_id, price_date
+            ),
+            recent AS (
+                SELECT
+                    mall_id,
+                    MIN(day_min) AS min_price,
+                    MAX(day_min) AS max_price,
+                    SUM(CASE WHEN day_min <= :target_price THEN 1 ELSE 0 END) AS below_days
+                FROM daily
+                GROUP BY mall_id
+            )
+            SELECT
+                l.mall_name_std,
+                l.last_price AS current_price,
+                w.min_price,
+                w.max_price,
+                COALESCE(w.below_days, 0) AS below_days
+            FROM latest l
+            LEFT JOIN recent w ON w.mall_id = l.mall_id
+            WHERE l.rn = 1
+            """
+        ),
+        {
+            **mall_params,
+            "days": days,
+            "target_price": target_price,
+            **ch_params,
+        },
+    ).mappings().all()
+    return {r["mall_name_std"]: dict(r) for r in rows}
+
+
+def fetch_mall_daily_trends(
+    db: Session,
+    *,
+    mall_names_std: list[str],
+    channel: str | None,
+    days: int,
+) -> list:
+    """(date, mall_name_std, 일 최저가) 목록. 날짜 오름차순."""
+    if not mall_names_std:
+        return []
+    mall_sql, mall_params = mall_id_filter_sql(db, mall_names_std)
+    ch_sql, ch_params = _channel_filter(channel)
+    return db.execute(
+        text(
+            f"""
+            SELECT
+                price_date AS date,
+                MAX(mall_name_std) AS mall_name,
+                MIN(min_price) AS price
+            FROM mall_daily_price
+            WHERE {mall_sql}
+              AND price_date >= DATE(DATE_SUB(NOW(), INTERVAL :days DAY))
+              {ch_sql}
+            GROUP BY price_date, mall_id
+            ORDER BY price_date ASC
+            """
+        ),
+        {**mall_params, "days": days, **ch_params},
+    ).fetchall()
+
+
+def fetch_channel_mall_names(db: Session, *, channel: str) -> list[str]:
+    """채널에 한 번이라도 등장한 표준 판매처명 (등장 횟수 내림차순)."""
+    rows = db.execute(
+        text(
+            """
+            SELECT MAX(mall_name_std)
+            FROM mall_daily_price
+            WHERE channel = :channel
+              AND mall_id IS NOT NULL
+            GROUP BY mall_id
+            ORDER BY SUM(row_count) DESC, MIN(min_price) ASC
+            """
+        ),
+        {"channel": channel},
+    ).fetchall()
+    return [r[0] for r in rows]
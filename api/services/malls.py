@@ -0,0 +1,206 @@
+"""
+판매처(mall) 차원 테이블.
+
+- malls: id, std_name(집계 키, 대시보드 표준명), public_name(표시명)
+- mall_aliases: 원본 mall_name(TRIM) -> mall_id
+- 크롤러는 저장 시 한 번 resolve_mall_ids()로 별칭을 풀어 products.mall_id 에 넣는다.
+  GROUP BY / IN 필터는 정수 mall_id 로 하고, 별칭 추가는 mall_aliases INSERT 한 줄이면 된다.
+  (예전처럼 products 전체 UPDATE 나 SQL CASE 를 고칠 필요가 없다.)
+
+코드에 남는 별칭 정의는 아래 시드 상수 하나뿐이다. API 프로세스는 시드 + DB 별칭을 합친
+MallDirectory 를 메모리에 두고 주기적으로 다시 읽는다.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from sqlalchemy import text
+
+# 수집 단계 표기 정정 (구명칭 -> 현재 판매처명). products.mall_name 에 저장되는 값 자체를 바꾼다.
+MALL_NAME_RENAMES = {
+    "글루어트": "글루코핏",
+    "무화당": "닥다몰",
+}
+
+# 표준명 -> 원본 별칭 (첫 번째 별칭이 DB 대표 키). 시드 이후 별칭은 mall_aliases 에 추가한다.
+SEED_MALL_ALIASES = {
+    "랜식(글핏몰)": ("랜식", "글핏몰", "글루코핏", "글루어트"),
+    "닥터다이어리(닥다몰)": ("닥다몰", "닥터다이어리"),
+    "닥터다이어리(무화당)": ("무화당",),
+}
+
+_DIRECTORY_TTL_SEC = 300
+
+
+def normalize_mall_name(value: str | None) -> str:
+    """수집 원본 판매처명 정리 (TRIM + 구명칭 정정)."""
+    raw = (value or "").strip()
+    if not raw:
+        return raw
+    return MALL_NAME_RENAMES.get(raw, raw)
+
+
+@dataclass
+class MallDirectory:
+    """별칭 <-> 표준명 조회용 메모리 사전."""
+
+    alias_to_std: dict[str, str] = field(default_factory=dict)
+    std_to_aliases: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    std_to_public: dict[str, str] = field(default_factory=dict)
+
+    def add(self, std_name: str, alias: str, public_name: str | None = None) -> None:
+        if not std_name or not alias:
+            return
+        self.alias_to_std.setdefault(alias, std_name)
+        aliases = self.std_to_aliases.get(std_name, ())
+        if alias not in aliases:
+            self.std_to_aliases[std_name] = aliases + (alias,)
+        if public_name:
+            self.std_to_public[std_name] = public_name
+        else:
+            self.std_to_public.setdefault(std_name, std_name)
+
+    def std_name(self, name: str | None) -> str:
+        raw = (name or "").strip()
+        if not raw:
+            return ""
+        return self.alias_to_std.get(raw, raw)
+
+    def public_name(self, name: str | None) -> str:
+        std = self.std_name(name)
+        return self.std_to_public.get(std, std)
+
+    def aliases(self, std_name: str) -> tuple[str, ...]:
+        return self.std_to_aliases.get(std_name, ())
+
+
+def _seed_directory() -> MallDirectory:
+    d = MallDirectory()
+    for std_name, aliases in SEED_MALL_ALIASES.items():
+        for alias in aliases:
+            d.add(std_name, alias)
+    return d
+
+
+_directory = _seed_directory()
+_directory_loaded_at = 0.0
+_directory_lock = threading.Lock()
+
+
+def load_mall_directory(conn) -> MallDirectory:
+    """malls / mall_aliases 전체를 읽어 사전을 만든다 (시드가 먼저, DB 추가분이 뒤)."""
+    d = _seed_directory()
+    rows = conn.execute(
+        text(
+            """
+            SELECT m.std_name, m.public_name, a.alias
+            FROM mall_aliases a
+            JOIN malls m ON m.id = a.mall_id
+            ORDER BY m.id, a.alias
+            """
+        )
+    ).fetchall()
+    for std_name, public_name, alias in rows:
+        d.add(std_name, alias, public_name)
+    return d
+
+
+def mall_directory() -> MallDirectory:
+    """
+    캐시된 판매처 사전. TTL 이 지나면 DB에서 다시 읽고, 실패하면 기존 사전을 유지한다.
+    """
+    global _directory, _directory_loaded_at
+    now = time.monotonic()
+    if now - _directory_loaded_at < _DIRECTORY_TTL_SEC:
+        return _directory
+    with _directory_lock:
+        if now - _directory_loaded_at < _DIRECTORY_TTL_SEC:
+            return _directory
+        try:
+            from api.database import engine
+
+            with engine.connect() as conn:
+                _directory = load_mall_directory(conn)
+        except Exception as e:
+            print(f"⚠️ mall directory reload failed (keeping previous): {e}")
+        _directory_loaded_at = now
+    return _directory
+
+
+def seed_malls(conn) -> None:
+    """init_db 용: 시드 표준명/별칭을 넣는다. 이미 있으면 무시한다."""
+    for std_name, aliases in SEED_MALL_ALIASES.items():
+        conn.execute(
+            text("INSERT IGNORE INTO malls (std_name, public_name) VALUES (:std, :std)"),
+            {"std": std_name},
+        )
+        for alias in (std_name,) + tuple(aliases):
+            conn.execute(
+                text(
+                    """
+                    INSERT IGNORE INTO mall_aliases (alias, mall_id)
+                    SELECT :alias, id FROM malls WHERE std_name = :std
+                    """
+                ),
+                {"alias": alias, "std": std_name},
+            )
+
+
+def resolve_mall_ids(cursor, names: Iterable[str | None]) -> dict[str, int]:
+    """
+    원본 판매처명 목록 -> {mall_name: mall_id}. 처음 보는 이름은 malls / mall_aliases 에 등록한다.
+    cursor는 DB-API 커서(pymysql / mysql.connector). 커밋은 호출자가 한다.
+    """
+    wanted = sorted({(n or "").strip() for n in names if (n or "").strip()})
+    if not wanted:
+        return {}
+
+    def _select(aliases: list[str]) -> dict[str, int]:
+        placeholders = ", ".join(f"%(a{i})s" for i in range(len(aliases)))
+        cursor.execute(
+            f"SELECT alias, mall_id FROM mall_aliases WHERE alias IN ({placeholders})",
+            {f"a{i}": a for i, a in enumerate(aliases)},
+        )
+        return {alias: int(mall_id) for alias, mall_id in cursor.fetchall()}
+
+    found = _select(wanted)
+    missing = [n for n in wanted if n not in found]
+    if missing:
+        seed_std = _seed_directory()
+        for name in missing:
+            std_name = seed_std.std_name(name)
+            cursor.execute(
+                "INSERT IGNORE INTO malls (std_name, public_name) VALUES (%(std)s, %(std)s)",
+                {"std": std_name},
+            )
+            cursor.execute(
+                "INSERT IGNORE INTO mall_aliases (alias, mall_id) "
+                "SELECT %(alias)s, id FROM malls WHERE std_name = %(std)s",
+                {"alias": name, "std": std_name},
+            )
+        found.update(_select(missing))
+    return found
+
+
+def mall_ids_for_std_names(db, std_names: Iterable[str]) -> dict[str, int]:
+    """표준명 목록 -> {std_name: mall_id} (uq_std_name 조회)."""
+    names = tuple(dict.fromkeys(n for n in std_names if n))
+    if not names:
+        return {}
+    rows = db.execute(
+        text("SELECT std_name, id FROM malls WHERE std_name IN :names"),
+        {"names": names},
+    ).fetchall()
+    return {r[0]: int(r[1]) for r in rows}
+
+
+def mall_id_filter_sql(db, std_names: Iterable[str], column: str = "mall_id") -> tuple[str, dict[str, Any]]:
+    """표준명 목록을 정수 mall_id IN 조건으로 바꾼다. 매칭이 없으면 항상 거짓."""
+    ids = tuple(sorted(set(mall_ids_for_std_names(db, std_names).values())))
+    if not ids:
+        return "1 = 0", {}
+    return f"{column} IN :mall_ids", {"mall_ids": ids}
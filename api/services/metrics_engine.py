@@ -0,0 +1,409 @@
+"""Columnar (NumPy) engine for the seller metrics in monthly_metrics and range_metrics.
+
+The python engines walk every row in a dict loop (one dict per row, per-bucket dict updates).
+Here a window becomes a handful of integer column arrays and every step is an array op:
+
+- strings / timestamps / snapshot buckets are factorized once into integer codes
+  (rows of one snapshot share observed_at, so only the distinct values are formatted)
+- per-(seller, bucket) minimums are one lexsort + "first row of each group"
+- below-threshold streaks / dip->recover are run-length computations over the per-seller,
+  time-ordered flag vector (shift within seller, cumsum of run starts, bincount)
+- the price histogram behind p05/p95 is a group count over (seller, price)
+
+Results are the same SellerMonthState objects / report dicts the python engines produce
+(same values, same tie-breaks, plain python int / datetime), so callers and the persisted
+monthly state do not care which engine ran. SELLER_METRICS_ENGINE=python forces the loop
+engine. `python scripts/bench_seller_metrics.py` times both and asserts equal output.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SELLER_METRICS_ENGINE = os.getenv("SELLER_METRICS_ENGINE", "numpy").strip().lower()
+
+
+def use_columnar_engine() -> bool:
+    """False only with SELLER_METRICS_ENGINE=python (the loop engines stay as the reference)."""
+    return SELLER_METRICS_ENGINE != "python"
+
+
+def _object_array(values) -> np.ndarray:
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _columns(columns: Sequence[str], rows: Sequence[Any], names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Object arrays for `names` from tuple / Row / dict records."""
+    if isinstance(rows[0], dict):
+        return {n: _object_array([r.get(n) for r in rows]) for n in names}
+    idx = {c: i for i, c in enumerate(columns)}
+    return {n: _object_array([r[idx[n]] for r in rows]) for n in names}
+
+
+def _null(value: Any) -> Any:
+    # pd.factorize reports a missing value as NaN; the loop engines see None
+    return None if value is None or value != value else value
+
+
+def _factorize(values: np.ndarray) -> Tuple[np.ndarray, List[Any]]:
+    """Integer codes in first-seen order (pandas hash table; object values keep python equality)."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes.astype(np.int64, copy=False), [_null(u) for u in uniques]
+
+
+def _normalized_codes(values: np.ndarray, normalize) -> Tuple[np.ndarray, List[Any]]:
+    """Factorize, apply `normalize` to the distinct values only, then merge equal results."""
+    codes, uniques = _factorize(values)
+    table: Dict[Any, int] = {}
+    remap = np.fromiter((table.setdefault(normalize(u), len(table)) for u in uniques), dtype=np.int64, count=len(uniques))
+    return remap[codes], list(table)
+
+
+def _ranks(uniques: List[Any]) -> np.ndarray:
+    """Sort rank of each distinct value."""
+    ranks = np.empty(len(uniques), dtype=np.int64)
+    ranks[sorted(range(len(uniques)), key=uniques.__getitem__)] = np.arange(len(uniques))
+    return ranks
+
+
+def _group_starts(*keys: np.ndarray) -> np.ndarray:
+    """For arrays already sorted by keys: True at the first row of every key group."""
+    n = len(keys[0])
+    starts = np.ones(n, dtype=bool)
+    if n > 1:
+        change = np.zeros(n - 1, dtype=bool)
+        for k in keys:
+            change |= k[1:] != k[:-1]
+        starts[1:] = change
+    return starts
+
+
+def _pair_codes(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Codes of (a, b) pairs in first-seen order."""
+    return _factorize(a * (int(b.max()) + 1) + b)[0] if len(a) else a
+
+
+def _seller_name(mall_name: Any) -> str:
+    return (mall_name or "").strip() or "(unknown)"
+
+
+def _valid(calc_valid: np.ndarray) -> np.ndarray:
+    # same rule as the loop engines: int(calc_valid or 1) != 1 is invalid (NULL / 0 count as valid)
+    cv = calc_valid.astype(float)
+    return np.isnan(cv) | (cv == 0) | (np.trunc(cv) == 1)
+
+
+def _bucket_codes(snapshot_ids: np.ndarray, snapshot_ats: np.ndarray, created_ats: np.ndarray) -> np.ndarray:
+    """_snapshot_bucket() per row; the hour string is formatted once per distinct timestamp."""
+    from api.services.range_metrics import _snapshot_bucket
+
+    buckets = snapshot_ids.copy()
+    missing = np.flatnonzero(~snapshot_ids.astype(bool))
+    if len(missing):
+        fallback = np.where(snapshot_ats[missing].astype(bool), snapshot_ats[missing], created_ats[missing])
+        ts_code, ts_values = _factorize(fallback)
+        hours = _object_array([_snapshot_bucket(None, ts, ts) for ts in ts_values])
+        buckets[missing] = hours[ts_code]
+    return _factorize(buckets)[0]
+
+
+def _run_length_streaks(seller_codes: np.ndarray, below: np.ndarray, n_sellers: int):
+    """
+    Per-seller run-length stats over time-ordered below flags (rows grouped by seller).
+    Returns arrays indexed by seller code: runs_ge2, dip_recover, last_run_len, last_flag.
+    """
+    same_prev = np.zeros(len(below), dtype=bool)
+    same_prev[1:] = seller_codes[1:] == seller_codes[:-1]
+    prev_below = np.zeros(len(below), dtype=bool)
+    prev_below[1:] = below[:-1]
+    prev_below &= same_prev
+
+    dip_recover = np.bincount(seller_codes[prev_below & ~below], minlength=n_sellers)
+
+    starts = below & ~prev_below
+    run_id = np.cumsum(starts) - 1
+    run_len = np.bincount(run_id[below], minlength=int(starts.sum()))
+    runs_ge2 = np.bincount(seller_codes[starts][run_len >= 2], minlength=n_sellers)
+
+    last_idx = np.flatnonzero(np.append(seller_codes[1:] != seller_codes[:-1], True))
+    last_flag = np.zeros(n_sellers, dtype=bool)
+    last_run_len = np.zeros(n_sellers, dtype=np.int64)
+    last_flag[seller_codes[last_idx]] = below[last_idx]
+    trailing = last_idx[below[last_idx]]
+    last_run_len[seller_codes[trailing]] = run_len[run_id[trailing]]
+    return runs_ge2, dip_recover, last_run_len, last_flag
+
+
+# ── monthly_metrics ────────────────────────────────────────────────
+_MONTHLY_COLUMNS = (
+    "id", "mall_name", "unit_price", "link", "calc_method", "channel", "ts",
+    "snapshot_id", "snapshot_at", "created_at", "calc_valid",
+)
+
+
+def _ints(values: np.ndarray) -> np.ndarray:
+    """int(value or 0) per element."""
+    out = values.copy()
+    out[~values.astype(bool)] = 0
+    return out.astype(np.int64)
+
+
+def monthly_states(columns: Sequence[str], rows: Sequence[Any], *, threshold_price: int):
+    """Columnar seller_month_states(): {seller: SellerMonthState}."""
+    from api.services.monthly_metrics import SellerMonthState
+
+    if not rows:
+        return {}
+    c = _columns(columns, rows, _MONTHLY_COLUMNS)
+    seller_all, seller_names = _normalized_codes(c["mall_name"], _seller_name)
+    states = {name: SellerMonthState() for name in seller_names}
+
+    # row meta over every row (invalid ones included): calc_method counts, channel set
+    method_code, methods = _normalized_codes(c["calc_method"], lambda m: (m or "").strip())
+    keys, counts = np.unique(seller_all * len(methods) + method_code, return_counts=True)
+    for k, cnt in zip(keys.tolist(), counts.tolist()):
+        states[seller_names[k // len(methods)]].calc_method_stats[methods[k % len(methods)]] = cnt
+    channel_code, channels = _factorize(c["channel"])
+    for k in np.unique(seller_all * len(channels) + channel_code).tolist():
+        if channels[k % len(channels)]:
+            states[seller_names[k // len(channels)]].channels.add(channels[k % len(channels)])
+
+    valid = _valid(c["calc_valid"])
+    if not valid.any():
+        return states
+    seller_code = seller_all[valid]
+    ts_code, ts_values = _factorize(c["ts"][valid])
+    ts_rank = _ranks(ts_values)[ts_code]
+    price = c["unit_price"][valid].astype(np.int64)
+    row_id = _ints(c["id"][valid])
+    link = c["link"][valid]
+    bucket = _bucket_codes(c["snapshot_id"][valid], c["snapshot_at"][valid], c["created_at"][valid])
+    n_sellers = len(seller_names)
+
+    # earliest valid (ts, id) per seller
+    order = np.lexsort((row_id, ts_rank, seller_code))
+    for i in order[_group_starts(seller_code[order])].tolist():
+        states[seller_names[seller_code[i]]].first_key = (ts_values[ts_code[i]], int(row_id[i]))
+
+    # one observation per (seller, bucket): the lowest (unit_price, ts, id) row ...
+    order = np.lexsort((row_id, ts_rank, price, bucket, seller_code))
+    obs = order[_group_starts(seller_code[order], bucket[order])]
+    # ... then each seller's observations in (ts, id) order
+    obs = obs[np.lexsort((row_id[obs], ts_rank[obs], seller_code[obs]))]
+    o_seller, o_price, o_ts = seller_code[obs], price[obs], ts_rank[obs]
+    below = o_price <= threshold_price
+
+    runs_ge2, dip_recover, last_run_len, last_flag = _run_length_streaks(o_seller, below, n_sellers)
+    observations = np.bincount(o_seller, minlength=n_sellers)
+    below_count = np.bincount(o_seller[below], minlength=n_sellers)
+
+    for code in np.flatnonzero(observations).tolist():
+        st = states[seller_names[code]]
+        st.observations = int(observations[code])
+        st.below_count = int(below_count[code])
+        st.dip_recover = int(dip_recover[code])
+        st.prev_below = bool(last_flag[code])
+        st.streak = int(last_run_len[code])
+        st.sustained_closed = int(runs_ge2[code]) - (1 if st.streak >= 2 else 0)
+    for i in obs[np.append(o_seller[1:] != o_seller[:-1], True)].tolist():
+        states[seller_names[seller_code[i]]].last_ts = ts_values[ts_code[i]]
+
+    # min (unit_price, ts), first in observation order on ties
+    m = np.lexsort((row_id[obs], o_ts, o_price, o_seller))
+    for i in obs[m][_group_starts(o_seller[m])].tolist():
+        st = states[seller_names[seller_code[i]]]
+        st.min_price, st.min_time, st.min_link = int(price[i]), ts_values[ts_code[i]], link[i]
+
+    # latest below-threshold observation, first in observation order on equal ts
+    b = obs[below]
+    m = np.lexsort((row_id[b], -ts_rank[b], seller_code[b]))
+    for i in b[m][_group_starts(seller_code[b][m])].tolist():
+        st = states[seller_names[seller_code[i]]]
+        st.last_below_time, st.last_below_link = ts_values[ts_code[i]], link[i]
+
+    # price histogram: count per (seller, price)
+    m = np.lexsort((o_price, o_seller))
+    hs, hp = o_seller[m], o_price[m]
+    starts = np.flatnonzero(_group_starts(hs, hp))
+    counts = np.diff(np.append(starts, len(hs)))
+    for s, p, cnt in zip(hs[starts].tolist(), hp[starts].tolist(), counts.tolist()):
+        states[seller_names[s]].price_hist[p] = cnt
+    return states
+
+
+# ── range_metrics ──────────────────────────────────────────────────
+class RangeFrame:
+    """Valid rows of a report window as column arrays (row index into `rows` kept in `pos`)."""
+
+    def __init__(self, columns: Sequence[str], rows: Sequence[Any], *, channel: str):
+        from api.services.range_metrics import _split_ts
+
+        self.columns = list(columns)
+        self.rows = rows
+        c = _columns(columns, rows, (
+            "mall_name", "unit_price", "channel", "ts", "snapshot_id", "snapshot_at", "created_at", "calc_valid",
+        ))
+        valid = _valid(c["calc_valid"])
+        self.pos = np.flatnonzero(valid)
+        # codes in first-seen order among valid rows == the loop engine's dict insertion order
+        self.seller, self.seller_names = _normalized_codes(c["mall_name"][valid], _seller_name)
+        self.price = c["unit_price"][valid].astype(np.int64)
+        self.ts_code, self.ts_values = _factorize(c["ts"][valid])
+        self.ts_rank = _ranks(self.ts_values)[self.ts_code]
+        self.ts_parts = [_split_ts(ts) for ts in self.ts_values]
+        row_channel = c["channel"][valid]
+        self.platform = np.where(row_channel.astype(bool), row_channel, channel)
+        self.snapshot_id = c["snapshot_id"][valid]
+        self.snapshot_at = c["snapshot_at"][valid]
+        self.created_at = c["created_at"][valid]
+
+    def __len__(self) -> int:
+        return len(self.pos)
+
+
+def range_sections(
+    columns: Sequence[str],
+    rows: Sequence[Any],
+    *,
+    threshold_price: int,
+    channel: str,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Columnar compute_range_sections: (summary, below_list, chart_data for the below sellers or all)."""
+    f = RangeFrame(columns, rows, channel=channel)
+    below_list = range_below_detail(f, threshold_price=threshold_price)
+    seller_names = [item["seller_name"] for item in below_list]
+    return range_summary(f, threshold_price), below_list, range_chart(f, seller_names or None)
+
+
+def _range_seller_stats(f: RangeFrame, threshold_price: int) -> List[Dict[str, Any]]:
+    """Sellers with at least one below-threshold bucket, in first-seen order."""
+    # (seller, bucket) pairs in first-seen order == bucket dict insertion order per seller
+    pair = _pair_codes(f.seller, _bucket_codes(f.snapshot_id, f.snapshot_at, f.created_at))
+    scan = np.arange(len(f))
+
+    # per bucket: lowest price, first scanned on ties
+    order = np.lexsort((scan, f.price, pair))
+    mins = order[_group_starts(pair[order])]
+    below_count = np.bincount(f.seller[mins][f.price[mins] <= threshold_price], minlength=len(f.seller_names))
+
+    # per seller: min (unit_price, ts) over its buckets, bucket order on ties
+    order = mins[np.lexsort((pair[mins], f.ts_rank[mins], f.price[mins], f.seller[mins]))]
+    stats = []
+    for i in order[_group_starts(f.seller[order])].tolist():
+        code = int(f.seller[i])
+        if below_count[code] > 0:
+            stats.append({
+                "seller_name": f.seller_names[code],
+                "below_count": int(below_count[code]),
+                "min_unit_price": int(f.price[i]),
+                "min_time": f.ts_values[f.ts_code[i]],
+                "platform": f.platform[i],
+            })
+    return stats
+
+
+def range_summary(f: RangeFrame, threshold_price: int) -> Dict[str, Any]:
+    stats = _range_seller_stats(f, threshold_price) if len(f) else []
+    stats.sort(key=lambda x: x["min_unit_price"])
+    top5 = stats[:5]
+    g = stats[0] if stats else None
+    return {
+        "below_threshold_seller_count": len(stats),
+        "top5_lowest": [
+            {
+                "seller_name": s["seller_name"],
+                "min_unit_price": s["min_unit_price"],
+                "min_time": s["min_time"],
+                "platform": s.get("platform", ""),
+            }
+            for s in top5
+        ],
+        "global_min_seller": g["seller_name"] if g else None,
+        "global_min_price": g["min_unit_price"] if g else None,
+        "global_min_time": g["min_time"] if g else None,
+    }
+
+
+def range_below_detail(f: RangeFrame, *, threshold_price: int) -> List[Dict[str, Any]]:
+    if not len(f):
+        return []
+    has_below = np.zeros(len(f.seller_names), dtype=bool)
+    has_below[f.seller[f.price <= threshold_price]] = True
+    sel = np.flatnonzero(has_below[f.seller])
+    if not len(sel):
+        return []
+    # per seller: all observations ordered by (time, unit_price), scan order on ties
+    sel = sel[np.lexsort((sel, f.price[sel], f.ts_rank[sel], f.seller[sel]))]
+
+    idx = {c: i for i, c in enumerate(f.columns)}
+    (i_total, i_qty, i_ts, i_link, i_image, i_name, i_method, i_card) = (
+        idx[c] for c in (
+            "total_price", "quantity", "ts", "link", "image_url", "product_name", "calc_method", "card_image_path",
+        )
+    )
+    rows, names = f.rows, f.seller_names
+    by_seller: Dict[str, List[Dict[str, Any]]] = {}
+    for p, code, platform, price in zip(
+        f.pos[sel].tolist(), f.seller[sel].tolist(), f.platform[sel].tolist(), f.price[sel].tolist(),
+    ):
+        r = rows[p]
+        name = names[code]
+        by_seller.setdefault(name, []).append({
+            "seller_name": name,
+            "platform": platform,
+            "unit_price": price,
+            "total_price": int(r[i_total] or 0),
+            "quantity": int(r[i_qty] or 0),
+            "time": r[i_ts],
+            "link": r[i_link],
+            "image_url": r[i_image],
+            "product_name": r[i_name],
+            "calc_method": r[i_method],
+            "card_image_path": r[i_card],
+        })
+
+    result = []
+    for snapshots in by_seller.values():
+        min_item = min(snapshots, key=lambda x: (x["unit_price"], x["time"]))
+        result.append({**min_item, "snapshots": snapshots})
+    result.sort(key=lambda x: (x["unit_price"], x["time"]))
+    return result
+
+
+def range_chart(f: RangeFrame, seller_names: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    keep = np.arange(len(f))
+    if seller_names:
+        wanted = set(seller_names)
+        wanted_code = np.fromiter((n in wanted for n in f.seller_names), dtype=bool, count=len(f.seller_names))
+        keep = keep[wanted_code[f.seller]]
+    if not len(keep):
+        return {}
+
+    parts = f.ts_parts
+    dates = _object_array([d for d, _ in parts])
+    hours = _object_array([t[:2] for _, t in parts])
+    ts_code = f.ts_code[keep]
+    sid = f.snapshot_id[keep]
+    slot_key = dates[ts_code] + "_" + np.where(sid.astype(bool), sid, hours[ts_code])
+    seller = f.seller[keep]
+    price = f.price[keep]
+    # (seller, slot) pairs in first-seen order == slot dict insertion order per seller
+    slot = _pair_codes(seller, _factorize(slot_key)[0])
+
+    # per slot: lowest price, first scanned on ties
+    order = np.lexsort((keep, price, slot))
+    points = order[_group_starts(slot[order])]
+    # per seller: by (date, time) strings, slot order on ties
+    dt_code, dt_values = _factorize(_object_array([parts[t] for t in ts_code[points].tolist()]))
+    dt_rank = _ranks(dt_values)[dt_code]
+    points = points[np.lexsort((slot[points], dt_rank, seller[points]))]
+
+    result: Dict[str, List[Dict[str, Any]]] = {}
+    for code, t, p in zip(seller[points].tolist(), ts_code[points].tolist(), price[points].tolist()):
+        date_str, time_str = parts[t]
+        result.setdefault(f.seller_names[code], []).append({"date": date_str, "time": time_str, "min_price": p})
+    return result
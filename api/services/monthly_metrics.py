@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import json
 from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+import config
+
 
 def _month_range(month: str) -> Tuple[str, str]:
     """Return [start, end) as ISO dates for MySQL."""
@@ -30,19 +33,23 @@ def _snapshot_bucket(snapshot_id: Optional[str], snapshot_at: Optional[datetime]
     return ts.strftime("%Y-%m-%d %H")
 
 
-def compute_monthly_seller_metrics(
-    db: Session,
-    *,
-    month: str,
-    threshold_price: int,
-    channel: str = "naver",
-) -> List[Dict[str, Any]]:
-    """Compute seller metrics for a given month.
+# id is only used as a deterministic tie-break (scan order of the observed_at indexes).
+MONTHLY_ROW_COLUMNS = """
+            id,
+            mall_name,
+            unit_price,
+            link,
+            calc_method,
+            channel,
+            observed_at AS ts,
+            snapshot_id,
+            snapshot_at,
+            created_at,
+            COALESCE(calc_valid, 1) AS calc_valid"""
 
-    Returns a list of dicts (ready for JSON + DB upsert).
-    """
-    start, end = _month_range(month)
 
+def _monthly_rows_query(start: str, end: str, channel: str) -> Tuple[str, Dict[str, Any]]:
+    """Month window SQL; resolved by the (channel, observed_at) / observed_at indexes."""
     if channel == "all":
         channel_filter = ""
         params = {"start": start, "end": end}
@@ -50,138 +57,262 @@ def compute_monthly_seller_metrics(
         channel_filter = "AND channel = :channel"
         params = {"start": start, "end": end, "channel": channel}
 
-    rows = db.execute(
-        text(
-            f"""
-            SELECT
-                mall_name,
-                unit_price,
-                link,
-                calc_method,
-                channel,
-                COALESCE(snapshot_at, created_at) AS ts,
-                snapshot_id,
-                snapshot_at,
-                created_at,
-                COALESCE(calc_valid, 1) AS calc_valid
-            FROM products
-            WHERE COALESCE(snapshot_at, created_at) >= :start
-              AND COALESCE(snapshot_at, created_at) < :end
-              {channel_filter}
-            """
-        ),
-        params,
-    ).mappings().all()
+    sql = f"""
+        SELECT{MONTHLY_ROW_COLUMNS}
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE observed_at >= :start
+          AND observed_at < :end
+          {channel_filter}
+    """
+    return sql, params
+
+
+def _percentile(sorted_vals: List[int], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * p
+    f = int(k)
+    c = min(f + 1, len(sorted_vals) - 1)
+    if f == c:
+        return float(sorted_vals[f])
+    return sorted_vals[f] + (sorted_vals[c] - sorted_vals[f]) * (k - f)
+
+
+def _dt(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+@dataclass
+class SellerMonthState:
+    """Mergeable per-seller month state.
+
+    Observations (one min price per snapshot bucket) must be added in time order; the
+    streak / dip-recover counters are a running scan over that sequence. The price
+    histogram is exact (a seller has at most a few hundred buckets a month), so the
+    p05/p95 derived from it equal the full-recompute values.
+    """
+
+    observations: int = 0
+    below_count: int = 0
+    min_price: Optional[int] = None
+    min_time: Optional[datetime] = None
+    min_link: Optional[str] = None
+    last_below_time: Optional[datetime] = None
+    last_below_link: Optional[str] = None
+    price_hist: Dict[int, int] = field(default_factory=dict)
+    calc_method_stats: Dict[str, int] = field(default_factory=dict)
+    channels: set = field(default_factory=set)
+    streak: int = 0
+    prev_below: Optional[bool] = None
+    sustained_closed: int = 0
+    dip_recover: int = 0
+    last_ts: Optional[datetime] = None
+    # earliest valid row (ts, id) -> stable report order between sellers with equal sort keys
+    first_key: Optional[Tuple[datetime, int]] = None
+
+    def add_observation(self, price: int, ts: datetime, link: Optional[str], threshold_price: int) -> None:
+        self.observations += 1
+        self.price_hist[price] = self.price_hist.get(price, 0) + 1
+        if self.min_price is None or (price, ts) < (self.min_price, self.min_time):
+            self.min_price, self.min_time, self.min_link = price, ts, link
+
+        is_below = price <= threshold_price
+        if is_below:
+            self.below_count += 1
+            if self.last_below_time is None or ts > self.last_below_time:
+                self.last_below_time, self.last_below_link = ts, link
+            self.streak += 1
+        else:
+            if self.streak >= 2:
+                self.sustained_closed += 1
+            if self.prev_below is True:
+                self.dip_recover += 1
+            self.streak = 0
+        self.prev_below = is_below
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def add_row_meta(self, calc_method: str, channel: Optional[str]) -> None:
+        self.calc_method_stats[calc_method] = self.calc_method_stats.get(calc_method, 0) + 1
+        if channel:
+            self.channels.add(channel)
+
+    def note_first(self, key: Tuple[datetime, int]) -> None:
+        if self.first_key is None or key < self.first_key:
+            self.first_key = key
+
+    def to_metric(self, *, month: str, threshold_price: int, channel: str, seller: str) -> Dict[str, Any]:
+        prices: List[int] = []
+        for price in sorted(self.price_hist):
+            prices.extend([price] * self.price_hist[price])
+        p05 = _percentile(prices, 0.05)
+        p95 = _percentile(prices, 0.95)
+        observations = self.observations
+        return {
+            "month": month,
+            "threshold_price": threshold_price,
+            "channel": "/".join(sorted(self.channels or {channel})),
+            "seller_name_std": seller,
+            "observations": observations,
+            "below_threshold_count": self.below_count,
+            "below_ratio": round(self.below_count / observations if observations else 0.0, 4),
+            "min_unit_price": self.min_price,
+            "min_time": self.min_time,
+            "last_below_time": self.last_below_time,
+            "volatility": round(float(p95 - p05), 2),
+            "representative_links": {
+                "min_case": self.min_link,
+                "last_below": self.last_below_link,
+            },
+            "calc_method_stats": dict(self.calc_method_stats),
+            "dip_recover_count": self.dip_recover,
+            "sustained_below_count": self.sustained_closed + (1 if self.streak >= 2 else 0),
+            "cross_platform_mismatch": None,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "observations": self.observations,
+                "below_count": self.below_count,
+                "min_price": self.min_price,
+                "min_time": self.min_time.isoformat() if self.min_time else None,
+                "min_link": self.min_link,
+                "last_below_time": self.last_below_time.isoformat() if self.last_below_time else None,
+                "last_below_link": self.last_below_link,
+                "price_hist": {str(k): v for k, v in self.price_hist.items()},
+                "calc_method_stats": self.calc_method_stats,
+                "channels": sorted(self.channels),
+                "streak": self.streak,
+                "prev_below": self.prev_below,
+                "sustained_closed": self.sustained_closed,
+                "dip_recover": self.dip_recover,
+                "last_ts": self.last_ts.isoformat() if self.last_ts else None,
+                "first_key": [self.first_key[0].isoformat(), self.first_key[1]] if self.first_key else None,
+            },
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "SellerMonthState":
+        d = json.loads(raw) if isinstance(raw, (str, bytes, bytearray)) else dict(raw)
+        first_key = d.get("first_key")
+        return cls(
+            observations=int(d.get("observations") or 0),
+            below_count=int(d.get("below_count") or 0),
+            min_price=d.get("min_price"),
+            min_time=_dt(d.get("min_time")),
+            min_link=d.get("min_link"),
+            last_below_time=_dt(d.get("last_below_time")),
+            last_below_link=d.get("last_below_link"),
+            price_hist={int(k): int(v) for k, v in (d.get("price_hist") or {}).items()},
+            calc_method_stats={k: int(v) for k, v in (d.get("calc_method_stats") or {}).items()},
+            channels=set(d.get("channels") or []),
+            streak=int(d.get("streak") or 0),
+            prev_below=d.get("prev_below"),
+            sustained_closed=int(d.get("sustained_closed") or 0),
+            dip_recover=int(d.get("dip_recover") or 0),
+            last_ts=_dt(d.get("last_ts")),
+            first_key=(_dt(first_key[0]), int(first_key[1])) if first_key else None,
+        )
+
+
+def seller_month_states(rows, *, threshold_price: int) -> Dict[str, SellerMonthState]:
+    """Fold product rows (dict-like, MONTHLY_ROW_COLUMNS) into per-seller states.
 
+    Within a snapshot bucket the lowest (unit_price, ts, id) row is the observation; buckets
+    are then added per seller in time order.
+    """
     by_seller_bucket: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
-    calc_method_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-    seller_channels: Dict[str, set] = defaultdict(set)
+    states: Dict[str, SellerMonthState] = defaultdict(SellerMonthState)
 
     for r in rows:
         seller = (r["mall_name"] or "").strip() or "(unknown)"
         ts = r["ts"]
-        bucket = _snapshot_bucket(r.get("snapshot_id"), r.get("snapshot_at"), r.get("created_at"))
-        calc_method_counts[seller][(r.get("calc_method") or "").strip()] += 1
-        if r.get("channel"):
-            seller_channels[seller].add(r["channel"])
+        state = states[seller]
+        state.add_row_meta((r.get("calc_method") or "").strip(), r.get("channel"))
 
         if int(r.get("calc_valid") or 1) != 1:
             continue
 
+        row_key = (ts, int(r.get("id") or 0))
+        state.note_first(row_key)
+        bucket = _snapshot_bucket(r.get("snapshot_id"), r.get("snapshot_at"), r.get("created_at"))
+        price = int(r["unit_price"])
         cur = by_seller_bucket[seller].get(bucket)
-        if (cur is None) or (r["unit_price"] < cur["unit_price"]):
+        if cur is None or (price, row_key) < (cur["unit_price"], cur["row_key"]):
             by_seller_bucket[seller][bucket] = {
-                "unit_price": int(r["unit_price"]),
+                "unit_price": price,
                 "ts": ts,
                 "link": r.get("link"),
+                "row_key": row_key,
             }
 
-    results: List[Dict[str, Any]] = []
-
     for seller, bucket_map in by_seller_bucket.items():
-        bucket_items = list(bucket_map.values())
-        observations = len(bucket_items)
-        if observations == 0:
-            continue
+        state = states[seller]
+        for item in sorted(bucket_map.values(), key=lambda x: x["row_key"]):
+            state.add_observation(item["unit_price"], item["ts"], item["link"], threshold_price)
+    return dict(states)
 
-        prices = sorted([x["unit_price"] for x in bucket_items])
-        below_items = [x for x in bucket_items if x["unit_price"] <= threshold_price]
-        below_cnt = len(below_items)
-        below_ratio = below_cnt / observations if observations else 0.0
-
-        min_item = min(bucket_items, key=lambda x: (x["unit_price"], x["ts"]))
-        min_price = min_item["unit_price"]
-        min_time = min_item["ts"]
-
-        last_below_time = None
-        last_below_item = None
-        if below_items:
-            last_below_item = max(below_items, key=lambda x: x["ts"])
-            last_below_time = last_below_item["ts"]
-
-        def _percentile(sorted_vals: List[int], p: float) -> float:
-            if not sorted_vals:
-                return 0.0
-            k = (len(sorted_vals) - 1) * p
-            f = int(k)
-            c = min(f + 1, len(sorted_vals) - 1)
-            if f == c:
-                return float(sorted_vals[f])
-            return sorted_vals[f] + (sorted_vals[c] - sorted_vals[f]) * (k - f)
-
-        p05 = _percentile(prices, 0.05)
-        p95 = _percentile(prices, 0.95)
-        volatility = float(p95 - p05)
-
-        sorted_by_time = sorted(bucket_items, key=lambda x: x["ts"])
-        sustained = 0
-        cur_streak = 0
-        dip_recover = 0
-        prev_below = None
-        for item in sorted_by_time:
-            is_below = item["unit_price"] <= threshold_price
-            if is_below:
-                cur_streak += 1
-            else:
-                if cur_streak >= 2:
-                    sustained += 1
-                if prev_below is True:
-                    dip_recover += 1
-                cur_streak = 0
-            prev_below = is_below
-        if cur_streak >= 2:
-            sustained += 1
-
-        rep_links = {
-            "min_case": min_item.get("link"),
-            "last_below": (last_below_item or {}).get("link"),
-        }
-
-        results.append(
-            {
-                "month": month,
-                "threshold_price": threshold_price,
-                "channel": "/".join(sorted(seller_channels.get(seller, {channel}))),
-                "seller_name_std": seller,
-                "observations": observations,
-                "below_threshold_count": below_cnt,
-                "below_ratio": round(below_ratio, 4),
-                "min_unit_price": min_price,
-                "min_time": min_time,
-                "last_below_time": last_below_time,
-                "volatility": round(volatility, 2),
-                "representative_links": rep_links,
-                "calc_method_stats": dict(calc_method_counts.get(seller, {})),
-                "dip_recover_count": dip_recover,
-                "sustained_below_count": sustained,
-                "cross_platform_mismatch": None,
-            }
-        )
 
+def metrics_from_states(
+    states: Dict[str, SellerMonthState],
+    *,
+    month: str,
+    threshold_price: int,
+    channel: str,
+) -> List[Dict[str, Any]]:
+    ordered = sorted(
+        ((seller, st) for seller, st in states.items() if st.observations > 0),
+        key=lambda x: x[1].first_key,
+    )
+    results = [
+        st.to_metric(month=month, threshold_price=threshold_price, channel=channel, seller=seller)
+        for seller, st in ordered
+    ]
     results.sort(key=lambda x: (-x["below_threshold_count"], x["min_unit_price"]))
     return results
 
 
+def compute_monthly_seller_metrics(
+    db: Session,
+    *,
+    month: str,
+    threshold_price: int,
+    channel: str = "naver",
+    mode: str = "auto",
+) -> List[Dict[str, Any]]:
+    """Compute seller metrics for a given month.
+
+    mode: "full" rescans the month; "state" reads the incrementally maintained
+    monthly_seller_state (raises LookupError if it is not ready); "auto" uses the state
+    when it is ready for this (month, channel, threshold) and falls back to a full rescan.
+
+    Returns a list of dicts (ready for JSON + DB upsert).
+    """
+    if mode in ("auto", "state"):
+        from api.services.monthly_state import load_ready_states
+
+        states = load_ready_states(db, month=month, channel=channel, threshold_price=threshold_price)
+        if states is not None:
+            return metrics_from_states(states, month=month, threshold_price=threshold_price, channel=channel)
+        if mode == "state":
+            raise LookupError(f"monthly state not ready: {month} {channel} {threshold_price}")
+
+    start, end = _month_range(month)
+    sql, params = _monthly_rows_query(start, end, channel)
+    result = db.execute(text(sql), params)
+    from api.services.metrics_engine import monthly_states, use_columnar_engine  # numpy/pandas, first use
+
+    if use_columnar_engine():
+        states = monthly_states(list(result.keys()), result.fetchall(), threshold_price=threshold_price)
+    else:
+        states = seller_month_states(result.mappings().all(), threshold_price=threshold_price)
+    return metrics_from_states(states, month=month, threshold_price=threshold_price, channel=channel)
+
+
 def upsert_monthly_metrics(db: Session, metrics: List[Dict[str, Any]]) -> int:
     if not metrics:
         return 0
@@ -0,0 +1,331 @@
+"""Incrementally maintained month-to-date seller state (monthly_seller_state).
+
+compute_monthly_seller_metrics used to rescan the whole month on every call. Instead the
+crawler folds each committed snapshot into a persisted SellerMonthState per
+(month, channel scope, threshold, seller), right after save_to_db:
+
+- monthly_state_meta marks a (month, channel, threshold) key as "ready" and records the last
+  folded snapshot. A key that is missing / stale, or a snapshot older than the last folded
+  one (out-of-order), triggers a one-off rebuild of that month from products.
+- /manual-confirm and /delete edit past rows, so they mark the affected months stale; the
+  report falls back to a full rescan until the next rebuild.
+- Scopes follow MONTHLY_STATE_CHANNELS (report channel values, "all" included) and the
+  threshold is config.TARGET_PRICE. Other thresholds are always computed by full rescan.
+
+Writer SQL uses pyformat (%(name)s) so it runs on pymysql / mysql.connector DB-API cursors.
+`python scripts/verify_monthly_state.py` compares the state against a full recompute.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import config
+from api.services.monthly_metrics import (
+    MONTHLY_ROW_COLUMNS,
+    SellerMonthState,
+    _month_range,
+    seller_month_states,
+)
+
+MONTHLY_STATE_CHANNELS = tuple(
+    c.strip() for c in os.getenv("MONTHLY_STATE_CHANNELS", "naver,coupang,all").split(",") if c.strip()
+)
+STATUS_READY = "ready"
+STATUS_STALE = "stale"
+
+
+def _rows_as_dicts(cursor) -> List[Dict[str, Any]]:
+    rows = cursor.fetchall()
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, r)) for r in rows]
+
+
+def _channel_sql(channel: str) -> tuple[str, Dict[str, Any]]:
+    if channel == "all":
+        return "", {}
+    return "AND channel = %(channel)s", {"channel": channel}
+
+
+def _load_meta(cursor, month: str, channel: str, threshold_price: int, *, for_update: bool = False):
+    cursor.execute(
+        f"""
+        SELECT status, last_snapshot_id, last_ts
+        FROM monthly_state_meta
+        WHERE month = %(month)s AND channel = %(channel)s AND threshold_price = %(threshold)s
+        {"FOR UPDATE" if for_update else ""}
+        """,
+        {"month": month, "channel": channel, "threshold": threshold_price},
+    )
+    rows = cursor.fetchall()
+    return rows[0] if rows else None
+
+
+def _save_states(cursor, month: str, channel: str, threshold_price: int, states: Dict[str, SellerMonthState]) -> int:
+    if not states:
+        return 0
+    cursor.executemany(
+        """
+        INSERT INTO monthly_seller_state (month, channel, threshold_price, seller_name_std, state, last_ts)
+        VALUES (%(month)s, %(channel)s, %(threshold)s, %(seller)s, %(state)s, %(last_ts)s)
+        ON DUPLICATE KEY UPDATE state = VALUES(state), last_ts = VALUES(last_ts)
+        """,
+        [
+            {
+                "month": month,
+                "channel": channel,
+                "threshold": threshold_price,
+                "seller": seller,
+                "state": st.to_json(),
+                "last_ts": st.last_ts,
+            }
+            for seller, st in states.items()
+        ],
+    )
+    return len(states)
+
+
+def _save_meta(cursor, month: str, channel: str, threshold_price: int, *, status: str, last_snapshot_id, last_ts) -> None:
+    cursor.execute(
+        """
+        INSERT INTO monthly_state_meta (month, channel, threshold_price, status, last_snapshot_id, last_ts)
+        VALUES (%(month)s, %(channel)s, %(threshold)s, %(status)s, %(sid)s, %(last_ts)s)
+        ON DUPLICATE KEY UPDATE
+            status = VALUES(status),
+            last_snapshot_id = VALUES(last_snapshot_id),
+            last_ts = VALUES(last_ts)
+        """,
+        {
+            "month": month,
+            "channel": channel,
+            "threshold": threshold_price,
+            "status": status,
+            "sid": last_snapshot_id,
+            "last_ts": last_ts,
+        },
+    )
+
+
+def month_rows(cursor, *, month: str, channel: str) -> List[Dict[str, Any]]:
+    """The same month window compute_monthly_seller_metrics scans, via a DB-API cursor."""
+    start, end = _month_range(month)
+    channel_filter, params = _channel_sql(channel)
+    cursor.execute(
+        f"""
+        SELECT{MONTHLY_ROW_COLUMNS}
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE observed_at >= %(start)s
+          AND observed_at < %(end)s
+          {channel_filter}
+        """,
+        {"start": start, "end": end, **params},
+    )
+    return _rows_as_dicts(cursor)
+
+
+def rebuild_month_state(cursor, *, month: str, channel: str, threshold_price: int) -> int:
+    """Recompute one (month, channel, threshold) key from products and mark it ready."""
+    rows = month_rows(cursor, month=month, channel=channel)
+    from api.services.metrics_engine import monthly_states, use_columnar_engine
+
+    if rows and use_columnar_engine():
+        states = monthly_states(list(rows[0].keys()), rows, threshold_price=threshold_price)
+    else:
+        states = seller_month_states(rows, threshold_price=threshold_price)
+
+    cursor.execute(
+        """
+        DELETE FROM monthly_seller_state
+        WHERE month = %(month)s AND channel = %(channel)s AND threshold_price = %(threshold)s
+        """,
+        {"month": month, "channel": channel, "threshold": threshold_price},
+    )
+    _save_states(cursor, month, channel, threshold_price, states)
+
+    last = max(rows, key=lambda r: (r["ts"], r["id"]), default=None)
+    _save_meta(
+        cursor,
+        month,
+        channel,
+        threshold_price,
+        status=STATUS_READY,
+        last_snapshot_id=(last or {}).get("snapshot_id"),
+        last_ts=(last or {}).get("ts"),
+    )
+    return len(states)
+
+
+def _load_states(cursor, month: str, channel: str, threshold_price: int, sellers: Iterable[str]) -> Dict[str, SellerMonthState]:
+    names = sorted(set(sellers))
+    if not names:
+        return {}
+    placeholders = ", ".join(f"%(s{i})s" for i in range(len(names)))
+    cursor.execute(
+        f"""
+        SELECT seller_name_std, state
+        FROM monthly_seller_state
+        WHERE month = %(month)s AND channel = %(channel)s AND threshold_price = %(threshold)s
+          AND seller_name_std IN ({placeholders})
+        """,
+        {
+            "month": month,
+            "channel": channel,
+            "threshold": threshold_price,
+            **{f"s{i}": n for i, n in enumerate(names)},
+        },
+    )
+    return {seller: SellerMonthState.from_json(raw) for seller, raw in cursor.fetchall()}
+
+
+def read_month_states(cursor, *, month: str, channel: str, threshold_price: int) -> Optional[Dict[str, SellerMonthState]]:
+    """Cursor counterpart of load_ready_states (used by the verify script inside its transaction)."""
+    meta = _load_meta(cursor, month, channel, threshold_price)
+    if meta is None or meta[0] != STATUS_READY:
+        return None
+    cursor.execute(
+        """
+        SELECT seller_name_std, state FROM monthly_seller_state
+        WHERE month = %(month)s AND channel = %(channel)s AND threshold_price = %(threshold)s
+        """,
+        {"month": month, "channel": channel, "threshold": threshold_price},
+    )
+    return {seller: SellerMonthState.from_json(raw) for seller, raw in cursor.fetchall()}
+
+
+def reset_month_state(cursor, *, month: str, channel: str, threshold_price: int) -> None:
+    """Empty, ready state for the key: subsequent fold_snapshot calls start from zero (replay)."""
+    cursor.execute(
+        """
+        DELETE FROM monthly_seller_state
+        WHERE month = %(month)s AND channel = %(channel)s AND threshold_price = %(threshold)s
+        """,
+        {"month": month, "channel": channel, "threshold": threshold_price},
+    )
+    _save_meta(cursor, month, channel, threshold_price, status=STATUS_READY, last_snapshot_id=None, last_ts=None)
+
+
+def _fold_into(state: SellerMonthState, snap: SellerMonthState, threshold_price: int) -> None:
+    """Append one snapshot's per-seller state (at most one observation) to the running state."""
+    for calc_method, cnt in snap.calc_method_stats.items():
+        state.calc_method_stats[calc_method] = state.calc_method_stats.get(calc_method, 0) + cnt
+    state.channels |= snap.channels
+    if snap.first_key is not None:
+        state.note_first(snap.first_key)
+    if snap.observations:
+        state.add_observation(snap.min_price, snap.min_time, snap.min_link, threshold_price)
+
+
+def fold_snapshot(
+    cursor,
+    snapshot_id: str,
+    *,
+    threshold_price: Optional[int] = None,
+    channels: Optional[Iterable[str]] = None,
+) -> Dict[str, str]:
+    """
+    Fold one committed snapshot into every maintained scope of its month.
+    Returns {"<month>/<channel>": "folded" | "rebuilt" | "skipped"}. The caller commits.
+    """
+    threshold = config.TARGET_PRICE if threshold_price is None else threshold_price
+    cursor.execute(
+        f"""
+        SELECT{MONTHLY_ROW_COLUMNS}
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE snapshot_id = %(sid)s
+        ORDER BY id
+        """,
+        {"sid": snapshot_id},
+    )
+    rows = _rows_as_dicts(cursor)
+    by_month: Dict[str, List[Dict[str, Any]]] = {}
+    for r in rows:
+        by_month.setdefault(r["ts"].strftime("%Y-%m"), []).append(r)
+
+    outcome: Dict[str, str] = {}
+    for month, month_rows in sorted(by_month.items()):
+        for channel in channels or MONTHLY_STATE_CHANNELS:
+            scope_rows = month_rows if channel == "all" else [r for r in month_rows if r.get("channel") == channel]
+            key = f"{month}/{channel}"
+            meta = _load_meta(cursor, month, channel, threshold, for_update=True)
+            if meta is None or meta[0] != STATUS_READY:
+                rebuild_month_state(cursor, month=month, channel=channel, threshold_price=threshold)
+                outcome[key] = "rebuilt"
+                continue
+            _, last_sid, last_ts = meta
+            if last_sid == snapshot_id or not scope_rows:
+                outcome[key] = "skipped"
+                continue
+            snap_ts = min(r["ts"] for r in scope_rows)
+            if last_ts is not None and snap_ts <= last_ts:
+                # out-of-order snapshot: the streak counters need the month in time order
+                rebuild_month_state(cursor, month=month, channel=channel, threshold_price=threshold)
+                outcome[key] = "rebuilt"
+                continue
+
+            snap_states = seller_month_states(scope_rows, threshold_price=threshold)
+            states = _load_states(cursor, month, channel, threshold, snap_states)
+            for seller, snap in snap_states.items():
+                _fold_into(states.setdefault(seller, SellerMonthState()), snap, threshold)
+            _save_states(cursor, month, channel, threshold, states)
+            _save_meta(
+                cursor,
+                month,
+                channel,
+                threshold,
+                status=STATUS_READY,
+                last_snapshot_id=snapshot_id,
+                last_ts=max(r["ts"] for r in scope_rows),
+            )
+            outcome[key] = "folded"
+    return outcome
+
+
+def load_ready_states(
+    db: Session,
+    *,
+    month: str,
+    channel: str,
+    threshold_price: int,
+) -> Optional[Dict[str, SellerMonthState]]:
+    """Persisted states for the key, or None when the key is not maintained / not ready."""
+    try:
+        meta = db.execute(
+            text(
+                """
+                SELECT status FROM monthly_state_meta
+                WHERE month = :month AND channel = :channel AND threshold_price = :threshold
+                """
+            ),
+            {"month": month, "channel": channel, "threshold": threshold_price},
+        ).first()
+    except Exception as e:
+        print(f"⚠️ monthly state lookup failed (full rescan): {e}")
+        return None
+    if meta is None or meta[0] != STATUS_READY:
+        return None
+    rows = db.execute(
+        text(
+            """
+            SELECT seller_name_std, state FROM monthly_seller_state
+            WHERE month = :month AND channel = :channel AND threshold_price = :threshold
+            """
+        ),
+        {"month": month, "channel": channel, "threshold": threshold_price},
+    ).fetchall()
+    return {seller: SellerMonthState.from_json(raw) for seller, raw in rows}
+
+
+def mark_monthly_state_stale(db: Session, observed_times: Iterable[Optional[datetime]]) -> None:
+    """Rows observed in these months were edited/deleted: stop serving their state until rebuilt."""
+    months = tuple(sorted({ts.strftime("%Y-%m") for ts in observed_times if ts is not None}))
+    if not months:
+        return
+    db.execute(
+        text("UPDATE monthly_state_meta SET status = :status WHERE month IN :months"),
+        {"status": STATUS_STALE, "months": months},
+    )
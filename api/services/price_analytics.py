@@ -2,23 +2,46 @@
 판매처별 최저가 시계열에 대한 통계 분석.
 
 - 이상치: 지연 롤링 중앙값 대비 잔차의 MAD 기반 modified z-score (Iglewicz & Hoaglin).
-- 단기 예측: statsmodels Holt 가법 지수평활(추세 가산) 1스텝; 실패·관측 부족 시 OLS 폴백.
+- 단기 예측: Holt 가법 지수평활(추세 가산) 1스텝; 실패·관측 부족 시 OLS 폴백.
+  PRICE_FORECAST_ENGINE=statsmodels(기본, 기준 구현)는 시계열마다 ExponentialSmoothing 을 돌고,
+  numpy(opt-in)는 api/services/holt_forecast.py 로 여러 시계열을 한 번에 적합한다.
+  numpy 는 statsmodels 와 다른 (RMSE 가 더 낮은) 해를 찾는 시계열에서 예측이 수 % 달라질 수 있어
+  scripts/bench_holt_forecast.py 의 전 시계열 예측 허용 오차를 통과할 때까지 기본으로 두지 않는다.
 
 스냅샷 밀도: api/scheduler.py 기본과 같이 하루 4회(06/12/18/00 KST)를 가정한다.
 롤링·적합 최대 길이는 `SNAPSHOTS_PER_DAY`를 곱해 ‘일’ 단위로 맞춘다.
+
+배치(/products/price-insights/batch): 전 판매처 시계열을 GROUP BY 한 번으로 읽고
+(fetch_all_mall_min_price_series), numpy 엔진이면 Holt 적합을 전 판매처 한 번에 한다.
+statsmodels 엔진이면 판매처별 build_mall_price_insights 를 프로세스 풀에서 나눠 돌린다
+(build_price_insights_batch). statsmodels 적합이 GIL 을 잡는 CPU 작업이라 스레드 대신 프로세스를 쓴다.
+
+이상치는 스냅샷 적재 때 판정해 둔 price_anomalies(api/services/price_anomalies.py)가 있으면 그것을 쓰고
+(stored_anomalies), 없는 판매처·채널만 detect_residual_anomalies 로 조회 구간에서 계산한다.
 """
 
 from __future__ import annotations
 
+import atexit
+import multiprocessing
 import os
+import threading
 import warnings
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Callable
 
-import numpy as np
-import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+import config
+from api.services.malls import mall_id_filter_sql
+
+# numpy/pandas 는 API 기동 시간을 늘리므로(합쳐 약 0.7초) 계산 함수 안에서 import 한다.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
 MODIFIED_Z_THRESHOLD = float(
     os.getenv("PRICE_ANALYTICS_MODIFIED_Z_THRESHOLD", "3.5")
@@ -45,6 +68,17 @@ ETS_MAX_DAYS = int(os.getenv("PRICE_ANALYTICS_ETS_MAX_DAYS", "30"))
 ETS_MIN_LEN = max(5, SNAPSHOTS_PER_DAY * ETS_MIN_DAYS)
 ETS_MAX_LEN = SNAPSHOTS_PER_DAY * ETS_MAX_DAYS
 
+# 적재 시점 이상 판정 창 (새 관측 시각 기준 최근 N일; /mall/price-insights 기본 days 와 같게)
+ANOMALY_INGEST_WINDOW_DAYS = int(os.getenv("PRICE_ANALYTICS_INGEST_WINDOW_DAYS", "30"))
+
+# 예측 엔진: statsmodels(기본, ExponentialSmoothing, 기준 구현) | numpy(opt-in, 판매처 시계열을 한 번에 격자 적합)
+PRICE_FORECAST_ENGINE = os.getenv("PRICE_FORECAST_ENGINE", "statsmodels").strip().lower()
+
+# 배치 인사이트 프로세스 수 — statsmodels 엔진일 때만 쓴다 (1 이하면 요청 스레드에서 순서대로 계산)
+PRICE_INSIGHTS_WORKERS = int(
+    os.getenv("PRICE_INSIGHTS_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
 
 def _schedule_meta() -> dict[str, Any]:
     """API algorithm 필드에 붙이는 스케줄·창 설명."""
@@ -85,32 +119,126 @@ def _channel_filter_sql(channel: str | None) -> tuple[str, dict[str, Any]]:
     return sql, {"channel": channel}
 
 
+def _mall_min_price_series_query(
+    *,
+    mall_filter: tuple[str, dict[str, Any]],
+    days: int,
+    channel: str | None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    (mall_id, observed_at) 인덱스 범위 스캔으로 풀리는 시계열 SQL.
+    mall_filter 는 malls.mall_id_filter_sql(db, 표준명, column="p.mall_id") 결과.
+    """
+    mall_sql, mall_params = mall_filter
+    ch_sql, ch_params = _channel_filter_sql(channel)
+    sql = f"""
+        SELECT
+            p.observed_at AS ts,
+            MIN(p.unit_price) AS min_price
+        FROM {config.PRODUCTS_SOURCE} p
+        WHERE {mall_sql}
+          AND p.observed_at >= DATE_SUB(NOW(), INTERVAL :days DAY)
+          {ch_sql}
+        GROUP BY p.observed_at
+        ORDER BY ts ASC
+    """
+    return sql, {**mall_params, "days": days, **ch_params}
+
+
+def _all_mall_min_price_series_query(
+    *,
+    days: int,
+    channel: str | None,
+    mall_filter: tuple[str, dict[str, Any]] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    판매처 × 스냅샷 시각별 최저 단가. observed_at 범위 스캔 한 번으로 전 판매처를 읽는다.
+    mall_filter(malls.mall_id_filter_sql 결과)를 주면 그 mall_id 들만.
+    """
+    ch_sql, ch_params = _channel_filter_sql(channel)
+    params: dict[str, Any] = {"days": days, **ch_params}
+    mall_sql = ""
+    if mall_filter is not None:
+        mall_sql = f" AND {mall_filter[0]}"
+        params.update(mall_filter[1])
+    sql = f"""
+        SELECT
+            p.mall_name,
+            p.observed_at AS ts,
+            MIN(p.unit_price) AS min_price
+        FROM {config.PRODUCTS_SOURCE} p
+        WHERE p.observed_at >= DATE_SUB(NOW(), INTERVAL :days DAY)
+          AND p.mall_name IS NOT NULL AND p.mall_name <> ''
+          AND p.unit_price IS NOT NULL
+          {mall_sql}
+          {ch_sql}
+        GROUP BY p.mall_name, p.observed_at
+    """
+    return sql, params
+
+
+def fetch_all_mall_min_price_series(
+    db: Session,
+    *,
+    days: int,
+    channel: str | None,
+    mall_key: Callable[[str], str],
+    mall_names_std: list[str] | None = None,
+    ensure_keys: list[str] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    {판매처 키: (ts, min_price) 오름차순 DataFrame}.
+    mall_key 로 DB 원시 mall_name(구명칭/별칭)을 묶는다. 같은 키·같은 시각이면 최저가를 쓴다
+    (단건 API 가 mall_id 로 묶어 MIN 하는 것과 같다).
+    mall_names_std 를 주면 그 표준명의 mall_id 만 읽는다.
+    ensure_keys 의 키는 관측이 없어도 빈 DataFrame 으로 넣는다.
+    """
+    import pandas as pd
+
+    mall_filter = None
+    if mall_names_std is not None:
+        mall_filter = mall_id_filter_sql(db, mall_names_std, column="p.mall_id")
+    sql, params = _all_mall_min_price_series_query(
+        days=days, channel=channel, mall_filter=mall_filter
+    )
+    rows = db.execute(text(sql), params).fetchall()
+    out: dict[str, pd.DataFrame] = {}
+    if rows:
+        out = _group_series(pd.DataFrame(rows, columns=["mall_name", "ts", "min_price"]), mall_key)
+    for key in ensure_keys or ():
+        if key not in out:
+            out[key] = pd.DataFrame(columns=["ts", "min_price"])
+    return out
+
+
+def _group_series(df: pd.DataFrame, mall_key: Callable[[str], str]) -> dict[str, pd.DataFrame]:
+    import pandas as pd
+
+    df["mall"] = df["mall_name"].map(mall_key)
+    df = df[df["mall"] != ""]
+    df["ts"] = pd.to_datetime(df["ts"])
+    df["min_price"] = df["min_price"].astype(int)
+    grouped = df.groupby(["mall", "ts"], sort=True)["min_price"].min().reset_index()
+    return {
+        mall: part[["ts", "min_price"]].reset_index(drop=True)
+        for mall, part in grouped.groupby("mall", sort=False)
+    }
+
+
 def fetch_mall_min_price_series(
     db: Session,
     *,
-    mall_name_list: tuple[str, ...],
+    mall_names_std: list[str],
     days: int,
     channel: str | None,
 ) -> pd.DataFrame:
-    """스냅샷 시각별 해당 판매처 최저 단가 시계열 (오름차순)."""
-    ch_sql, ch_params = _channel_filter_sql(channel)
-    rows = db.execute(
-        text(
-            f"""
-            SELECT
-                COALESCE(p.snapshot_at, p.created_at) AS ts,
-                MIN(p.unit_price) AS min_price
-            FROM products p
-            WHERE p.mall_name IN :mall_name_list
-              AND COALESCE(p.snapshot_at, p.created_at)
-                  >= DATE_SUB(NOW(), INTERVAL :days DAY)
-              {ch_sql}
-            GROUP BY COALESCE(p.snapshot_at, p.created_at)
-            ORDER BY ts ASC
-            """
-        ),
-        {"mall_name_list": mall_name_list, "days": days, **ch_params},
-    ).fetchall()
+    """스냅샷 시각별 해당 판매처(표준명 -> mall_id) 최저 단가 시계열 (오름차순)."""
+    import pandas as pd
+
+    sql, params = _mall_min_price_series_query(
+        mall_filter=mall_id_filter_sql(db, mall_names_std, column="p.mall_id"), days=days, channel=channel
+    )
+    rows = db.execute(text(sql), params).fetchall()
 
     if not rows:
         return pd.DataFrame(columns=["ts", "min_price"])
@@ -125,6 +253,8 @@ def _modified_z_scores(values: np.ndarray) -> np.ndarray:
     MAD가 0에 가까우면(잔차 대부분 동일 + 소수 튐) 중앙값 기반 z가 전부 0이 된다.
     이때 평균 절대편차 → 표준편차 순으로 스케일을 잡는다.
     """
+    import numpy as np
+
     med = np.median(values)
     mad = float(np.median(np.abs(values - med)))
     if mad < 1e-6:
@@ -141,6 +271,9 @@ def detect_residual_anomalies(df: pd.DataFrame) -> pd.DataFrame:
     baseline = lag가 있는 롤링 중앙값(가격).
     잔차에 대해 전역(해당 구간) robust z — 급락/급등 플래그.
     """
+    import numpy as np
+    import pandas as pd
+
     if df.empty:
         return pd.DataFrame(
             columns=[
@@ -214,6 +347,8 @@ def detect_residual_anomalies(df: pd.DataFrame) -> pd.DataFrame:
 
 def _forecast_ols_fallback(y: np.ndarray) -> dict[str, Any] | None:
     """데이터 부족·ETS 실패 시: 최근 구간 OLS 직선 1스텝 외삽."""
+    import numpy as np
+
     y = np.asarray(y, dtype=float)
     if len(y) < 5:
         return None
@@ -239,62 +374,119 @@ def _forecast_ols_fallback(y: np.ndarray) -> dict[str, Any] | None:
     }
 
 
-def forecast_next_min_price(y: np.ndarray) -> dict[str, Any] | None:
+def _forecast_block(
+    y_fit: np.ndarray, pred: float, rmse: float, method: str
+) -> dict[str, Any]:
+    import numpy as np
+
+    margin = 1.96 * rmse if rmse > 1e-6 else float(np.std(y_fit)) * 0.5
+    pred = max(pred, 0.0)
+    return {
+        "predicted_min_price": pred,
+        "pred_low": max(pred - margin, 0.0),
+        "pred_high": max(pred + margin, 0.0),
+        "horizon_steps": 1,
+        "method": method,
+        "window": int(len(y_fit)),
+        "rmse": rmse,
+    }
+
+
+def _forecast_statsmodels(y_fit: np.ndarray) -> dict[str, Any] | None:
+    import numpy as np
+
+    try:
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = ExponentialSmoothing(
+                y_fit,
+                trend="add",
+                seasonal=None,
+            )
+            fit = model.fit(optimized=True)
+            fc = fit.forecast(1)
+            pred = float(np.squeeze(np.asarray(fc, dtype=float)))
+            fitted = np.asarray(fit.fittedvalues, dtype=float)
+            mask = np.isfinite(fitted) & np.isfinite(y_fit)
+            if int(mask.sum()) >= 3:
+                rmse = float(
+                    np.sqrt(np.mean((y_fit[mask] - fitted[mask]) ** 2))
+                )
+            else:
+                rmse = float(np.std(y_fit))
+            return _forecast_block(
+                y_fit, pred, rmse, "statsmodels_exponential_smoothing_holt_additive"
+            )
+    except Exception:
+        return None
+
+
+def forecast_next_min_price_batch(
+    ys: list[np.ndarray],
+) -> list[dict[str, Any] | None]:
     """
-    1스텝 앞 최저가 예측.
+    시계열마다 1스텝 앞 최저가 예측.
 
-    우선 statsmodels Holt 가법 지수평활(추세 가산, 비계절).
+    Holt 가법 지수평활(추세 가산, 비계절). PRICE_FORECAST_ENGINE=numpy 면 적합 대상 시계열 전부를
+    holt_forecast.fit_holt_batch 한 번으로 맞추고, statsmodels 면 시계열마다 ExponentialSmoothing 을 돈다.
     관측이 적거나 적합 실패 시 OLS 직선 폴백.
     """
-    y = np.asarray(y, dtype=float)
-    if len(y) < 5:
-        return None
+    import numpy as np
+
+    out: list[dict[str, Any] | None] = [None] * len(ys)
+    holt: list[tuple[int, np.ndarray]] = []
+    for i, y in enumerate(ys):
+        y = np.asarray(y, dtype=float)
+        if len(y) < 5:
+            continue
+        y_fit = y[-min(len(y), ETS_MAX_LEN) :]
+        if len(y_fit) >= ETS_MIN_LEN:
+            holt.append((i, y_fit))
+        else:
+            out[i] = _forecast_ols_fallback(y)
 
-    y_fit = y[-min(len(y), ETS_MAX_LEN) :]
+    if PRICE_FORECAST_ENGINE == "statsmodels":
+        fits = [_forecast_statsmodels(y_fit) for _, y_fit in holt]
+    else:
+        from api.services.holt_forecast import fit_holt_batch
 
-    if len(y_fit) >= ETS_MIN_LEN:
-        try:
-            from statsmodels.tsa.holtwinters import ExponentialSmoothing
+        fits = [
+            _forecast_block(y_fit, f["forecast"], f["rmse"], "numpy_holt_additive_grid")
+            if np.isfinite(f["forecast"]) and np.isfinite(f["rmse"])
+            else None
+            for (_, y_fit), f in zip(holt, fit_holt_batch([y_fit for _, y_fit in holt]))
+        ]
+    for (i, _), fc in zip(holt, fits):
+        out[i] = fc if fc is not None else _forecast_ols_fallback(np.asarray(ys[i], dtype=float))
+    return out
 
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                model = ExponentialSmoothing(
-                    y_fit,
-                    trend="add",
-                    seasonal=None,
-                )
-                fit = model.fit(optimized=True)
-                fc = fit.forecast(1)
-                pred = float(np.squeeze(np.asarray(fc, dtype=float)))
-                fitted = np.asarray(fit.fittedvalues, dtype=float)
-                mask = np.isfinite(fitted) & np.isfinite(y_fit)
-                if int(mask.sum()) >= 3:
-                    rmse = float(
-                        np.sqrt(np.mean((y_fit[mask] - fitted[mask]) ** 2))
-                    )
-                else:
-                    rmse = float(np.std(y_fit))
-                margin = 1.96 * rmse if rmse > 1e-6 else float(np.std(y_fit)) * 0.5
-                pred = max(pred, 0.0)
-                return {
-                    "predicted_min_price": pred,
-                    "pred_low": max(pred - margin, 0.0),
-                    "pred_high": max(pred + margin, 0.0),
-                    "horizon_steps": 1,
-                    "method": "statsmodels_exponential_smoothing_holt_additive",
-                    "window": int(len(y_fit)),
-                    "rmse": rmse,
-                }
-        except Exception:
-            pass
-
-    return _forecast_ols_fallback(y)
+
+def forecast_next_min_price(y: np.ndarray) -> dict[str, Any] | None:
+    """1스텝 앞 최저가 예측 (단일 시계열, forecast_next_min_price_batch 참고)."""
+    return forecast_next_min_price_batch([y])[0]
+
+
+_COMPUTE = object()
 
 
 def build_mall_price_insights(
     df: pd.DataFrame,
+    stored_anomalies: list[dict[str, Any]] | None = None,
+    forecast: Any = _COMPUTE,
 ) -> dict[str, Any]:
-    """시계열 DataFrame(ts, min_price) -> 이상치 목록 + 단기 예측 + 메타."""
+    """
+    시계열 DataFrame(ts, min_price) -> 이상치 목록 + 단기 예측 + 메타.
+    stored_anomalies 가 있으면(적재 시점 판정) 이상 탐지를 다시 돌리지 않고 그대로 쓴다.
+    forecast 를 넘기면(배치에서 한 번에 적합한 결과) 예측을 다시 하지 않는다.
+
+    algorithm.anomaly_source 가 이상치 판정 출처다.
+    - ingest: 관측 시각 t 마다 [t - ANOMALY_INGEST_WINDOW_DAYS일, t] 창으로 판정해 둔 값. 롤링 길이는 그 창의
+      점 수로 판정마다 정해지므로 anomaly_effective_* 는 None 이다 (조회 구간 길이와 무관).
+    - query_window: 조회 구간 전체 시계열로 지금 계산한 값. anomaly_effective_* 는 조회 구간 점 수 기준.
+    - none: 조회 구간에 관측이 없다.
+    """
     if df.empty:
         return {
             "observation_count": 0,
@@ -305,14 +497,61 @@ def build_mall_price_insights(
                     f"lagged_rolling_median_{ROLL_BASELINE}snapshots_~{ROLL_BASELINE_DAYS}d_"
                     f"modified_z_mad_threshold_{MODIFIED_Z_THRESHOLD}"
                 ),
-                "forecast": "holt_ets_or_ols_fallback",
+                "forecast": f"holt_{PRICE_FORECAST_ENGINE}_or_ols_fallback",
+                "anomaly_source": "none",
                 **_schedule_meta(),
             },
         }
 
     x = df.sort_values("ts").reset_index(drop=True)
-    rw_eff, rmin_eff = _adaptive_rolling_params(len(x))
-    anom_df = detect_residual_anomalies(x)
+    if stored_anomalies is not None:
+        anomalies = list(stored_anomalies)
+        anomaly_meta = {
+            "anomaly": (
+                f"ingest_window_{ANOMALY_INGEST_WINDOW_DAYS}d_"
+                f"lagged_rolling_median_target_{ROLL_BASELINE}snapshots_~{ROLL_BASELINE_DAYS}d_"
+                f"effective_per_observation_"
+                f"modified_z_mad_threshold_{MODIFIED_Z_THRESHOLD}"
+            ),
+            "anomaly_source": "ingest",
+            "anomaly_window_days": ANOMALY_INGEST_WINDOW_DAYS,
+            "anomaly_effective_rolling_snapshots": None,
+            "anomaly_effective_min_periods": None,
+        }
+    else:
+        anomalies = _anomaly_items(detect_residual_anomalies(x))
+        rw_eff, rmin_eff = _adaptive_rolling_params(len(x))
+        anomaly_meta = {
+            "anomaly": (
+                f"lagged_rolling_median_target_{ROLL_BASELINE}snapshots_~{ROLL_BASELINE_DAYS}d_"
+                f"effective_{rw_eff or 0}x{rmin_eff or 0}_"
+                f"modified_z_mad_threshold_{MODIFIED_Z_THRESHOLD}"
+            ),
+            "anomaly_source": "query_window",
+            "anomaly_window_days": None,  # 조회 구간(응답의 days)
+            "anomaly_effective_rolling_snapshots": rw_eff,
+            "anomaly_effective_min_periods": rmin_eff,
+        }
+
+    fc = forecast_next_min_price(x["min_price"].to_numpy()) if forecast is _COMPUTE else forecast
+    forecast_algo = (fc or {}).get("method", "none")
+
+    return {
+        "observation_count": int(len(x)),
+        "anomalies": anomalies,
+        "forecast": fc,
+        "algorithm": {
+            **anomaly_meta,
+            "forecast": forecast_algo,
+            "reference": "modified z-score (MAD): Iglewicz & Hoaglin (1993)",
+            **_schedule_meta(),
+        },
+    }
+
+
+def _anomaly_items(anom_df: pd.DataFrame) -> list[dict[str, Any]]:
+    import pandas as pd
+
     anomalies: list[dict[str, Any]] = []
     for _, row in anom_df.iterrows():
         ts = row["ts"]
@@ -333,25 +572,110 @@ def build_mall_price_insights(
                 "kind": str(row["kind"]),
             }
         )
+    return anomalies
 
-    y = x["min_price"].to_numpy()
-    fc = forecast_next_min_price(y)
-    forecast_algo = (fc or {}).get("method", "none")
 
-    return {
-        "observation_count": int(len(x)),
-        "anomalies": anomalies,
-        "forecast": fc,
-        "algorithm": {
-            "anomaly": (
-                f"lagged_rolling_median_target_{ROLL_BASELINE}snapshots_~{ROLL_BASELINE_DAYS}d_"
-                f"effective_{rw_eff or 0}x{rmin_eff or 0}_"
-                f"modified_z_mad_threshold_{MODIFIED_Z_THRESHOLD}"
-            ),
-            "forecast": forecast_algo,
-            "reference": "modified z-score (MAD): Iglewicz & Hoaglin (1993)",
-            "anomaly_effective_rolling_snapshots": rw_eff,
-            "anomaly_effective_min_periods": rmin_eff,
-            **_schedule_meta(),
-        },
-    }
+# ── 배치: 판매처별 인사이트를 프로세스 풀에서 ─────────────────────────────
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    요청 간에 재사용하는 풀. uvicorn 은 스레드를 쓰므로 fork 대신 spawn 으로 띄운다
+    (fork 시점에 다른 스레드가 잡고 있던 락이 자식에 복사되는 문제를 피한다).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PRICE_INSIGHTS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool(*, wait: bool = False) -> None:
+    """풀을 버린다. wait=True 면 워커 프로세스가 끝날 때까지 기다린다 (벤치마크 측정 전 정리용)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+atexit.register(_reset_pool)
+
+
+def _warm_worker() -> int:
+    # 워커에서 statsmodels 까지 import 해 둔다 (spawn 워커의 첫 작업이 import 비용을 떠안지 않게).
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing  # noqa: F401
+
+    return os.getpid()
+
+
+def warm_price_insights_pool() -> None:
+    """
+    서버 시작 시 백그라운드 스레드에서 호출. 워커 프로세스를 미리 띄워 첫 배치 요청이
+    spawn + import 비용(코어당 수 초)을 내지 않게 한다. workers <= 1 이거나 numpy 예측 엔진이면
+    (풀을 쓰지 않으므로) 아무것도 하지 않는다.
+    """
+    if PRICE_INSIGHTS_WORKERS <= 1 or PRICE_FORECAST_ENGINE != "statsmodels":
+        return
+    try:
+        pool = _get_pool()
+        for f in [pool.submit(_warm_worker) for _ in range(PRICE_INSIGHTS_WORKERS)]:
+            f.result()
+    except Exception as e:
+        print(f"⚠️ price insights pool warm-up failed (will retry on first request): {e}")
+        _reset_pool()
+
+
+def _insights_from_arrays(
+    ts: np.ndarray,
+    prices: np.ndarray,
+    stored: list[dict[str, Any]] | None = None,
+    forecast: Any = _COMPUTE,
+) -> dict[str, Any]:
+    """풀 작업 단위. DataFrame 대신 배열 두 개만 넘겨 피클 비용을 줄인다."""
+    import pandas as pd
+
+    return build_mall_price_insights(
+        pd.DataFrame({"ts": ts, "min_price": prices}), stored, forecast
+    )
+
+
+def build_price_insights_batch(
+    series: dict[str, pd.DataFrame],
+    *,
+    workers: int | None = None,
+    stored_anomalies: dict[str, list[dict[str, Any]]] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    {판매처 키: build_mall_price_insights 결과}. stored_anomalies 에 있는 판매처는 저장된 적재 시점 판정을 쓴다.
+
+    numpy 예측 엔진이면 전 판매처 Holt 적합을 배열 하나로 한 번에 하고 나머지는 요청 스레드에서 조립한다.
+    statsmodels 엔진이면 판매처가 둘 이상이고 workers > 1 일 때 프로세스 풀에 나눠 맡긴다.
+    풀이 깨지면(워커 비정상 종료) 풀을 버리고 이번 요청은 순서대로 계산한다.
+    """
+    workers = PRICE_INSIGHTS_WORKERS if workers is None else workers
+    keys = list(series)
+    stored_anomalies = stored_anomalies or {}
+    arrays = [
+        (series[k]["ts"].to_numpy(), series[k]["min_price"].to_numpy(), stored_anomalies.get(k))
+        for k in keys
+    ]
+    if PRICE_FORECAST_ENGINE != "statsmodels":
+        forecasts = forecast_next_min_price_batch([a[1] for a in arrays])
+        return {k: _insights_from_arrays(*a, fc) for k, a, fc in zip(keys, arrays, forecasts)}
+    if workers <= 1 or len(keys) < 2:
+        return {k: _insights_from_arrays(*a) for k, a in zip(keys, arrays)}
+
+    try:
+        pool = _get_pool()
+        futures = [pool.submit(_insights_from_arrays, *a) for a in arrays]
+        return {k: f.result() for k, f in zip(keys, futures)}
+    except BrokenProcessPool as e:
+        print(f"⚠️ price insights process pool broken (computing inline): {e}")
+        _reset_pool()
+        return {k: _insights_from_arrays(*a) for k, a in zip(keys, arrays)}
@@ -0,0 +1,545 @@
+"""
+스냅샷 적재 시점 가격 이상 탐지 (price_anomalies + price_anomaly_state).
+
+price_analytics.detect_residual_anomalies 는 /mall/price-insights 를 열 때마다 조회 구간 전체에서
+지연 롤링 중앙값과 잔차 MAD z-score 를 다시 계산한다. 여기서는 스냅샷이 들어올 때 판매처 × 채널 범위마다
+새 관측 하나만 판정하고, 플래그된 점을 price_anomalies 에 쌓는다. API 는 그 테이블을 그대로 읽는다.
+
+- 판정 기준: 새 관측 시각 t 에서 [t - ANOMALY_INGEST_WINDOW_DAYS일, t] 시계열로 detect_residual_anomalies 를
+  돌렸을 때 마지막 점(새 관측)이 플래그되는지. "그 시점에 대시보드를 열었으면 보였을 판정"을 고정해 둔다.
+  조회할 때마다 구간 전체를 다시 보며 과거 점을 재판정하던 것과 달리, 한번 기록된 판정은 뒤 데이터로 바뀌지 않는다.
+- AnomalyStream: 창 안의 (ts, 최저가)와 순서 통계 창 두 개를 들고 다닌다.
+  가격 창(직전 roll_baseline개) → 롤링 중앙값, 잔차 창 → 잔차 중앙값과 MAD
+  (중앙값 좌우 편차가 각각 정렬된 수열이라 두 수열의 k번째 원소로 O(log n)).
+  창 앞쪽이 밀려나면 앞 roll_baseline 개 점만 기준선을 다시 잡는다 (배치도 창 시작 이전 점은 보지 않는다).
+- price_anomaly_state: 범위별 창 점 목록(JSON). 다음 스냅샷에서 불러와 순서 통계 창을 다시 세운다.
+- 상태가 없거나 stale 이거나 창 일수가 바뀌었으면 products 에서 최근
+  PRICE_ANOMALY_REBUILD_DAYS + 창 일수를 재생해 상태와 그 기간 플래그를 다시 만든다.
+  이미 더 늦은 시각까지 반영된 범위에 늦게 도착한 관측이 오면 그 범위를 stale 로 돌린다.
+- /manual-confirm, /delete 는 해당 판매처 상태를 stale 로 돌린다. 그동안 API 는 배치 계산으로 답한다.
+- 범위는 PRICE_ANOMALY_CHANNELS (API channel 값, 미지정은 "all"). 그 밖의 채널은 항상 배치 계산이다.
+
+`python scripts/backfill_price_anomalies.py --verify` 가 products 재생 결과를 배치 알고리즘과 비교한다.
+기록 SQL은 pyformat(%(name)s) 파라미터라 pymysql / mysql.connector 커서 모두에서 실행된다.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import config
+from api.services.malls import mall_directory
+from api.services.price_analytics import (
+    ANOMALY_INGEST_WINDOW_DAYS,
+    MODIFIED_Z_THRESHOLD,
+    _adaptive_rolling_params,
+)
+
+PRICE_ANOMALY_CHANNELS = tuple(
+    c.strip() for c in os.getenv("PRICE_ANOMALY_CHANNELS", "all,naver,coupang").split(",") if c.strip()
+)
+# 재구축 때 다시 기록하는 플래그 기간 (/mall/price-insights days 최대값)
+PRICE_ANOMALY_REBUILD_DAYS = int(os.getenv("PRICE_ANOMALY_REBUILD_DAYS", "90"))
+STATUS_READY = "ready"
+STATUS_STALE = "stale"
+
+SeriesKey = Tuple[str, str]  # (채널 범위, 판매처 공개명)
+
+
+def anomaly_scope(channel: Optional[str]) -> Optional[str]:
+    """API channel 값 → 저장 범위. 유지하지 않는 범위면 None (배치 계산)."""
+    scope = (channel or "").strip() or "all"
+    return scope if scope in PRICE_ANOMALY_CHANNELS else None
+
+
+def _in_scope(channel_value: Optional[str], scope: str) -> bool:
+    """price_analytics._channel_filter_sql 과 같은 규칙 (naver 는 채널 미기재 행 포함)."""
+    if scope == "all":
+        return True
+    ch = (channel_value or "").strip()
+    if scope == "naver":
+        return ch in ("", "naver")
+    return ch == scope
+
+
+def _median_sorted(s: List[float]) -> float:
+    m = len(s)
+    h = m // 2
+    if m % 2:
+        return float(s[h])
+    return (float(s[h - 1]) + float(s[h])) / 2
+
+
+def _kth_of_two(a: Callable[[int], float], la: int, b: Callable[[int], float], lb: int, k: int) -> float:
+    """오름차순 수열 a, b(접근 함수) 를 합친 수열의 k번째(0부터) 원소. 이분 탐색 O(log n)."""
+    lo, hi = max(0, k + 1 - lb), min(la, k + 1)
+    while True:
+        i = (lo + hi) // 2
+        j = k + 1 - i
+        if i < la and j > 0 and b(j - 1) > a(i):
+            lo = i + 1
+        elif i > 0 and j < lb and a(i - 1) > b(j):
+            hi = i - 1
+        else:
+            return max(a(i - 1) if i > 0 else float("-inf"), b(j - 1) if j > 0 else float("-inf"))
+
+
+class _OrderedWindow:
+    """정렬 상태를 유지하는 다중집합 (순서 통계 창). 삽입/삭제는 bisect, 중앙값은 O(1)."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Iterable[float] = ()):
+        self.values = sorted(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float) -> None:
+        bisect.insort(self.values, value)
+
+    def remove(self, value: float) -> None:
+        del self.values[bisect.bisect_left(self.values, value)]
+
+    def median(self) -> float:
+        return _median_sorted(self.values)
+
+    def mad(self, center: float) -> float:
+        """median(|v - center|). center 왼쪽 편차(뒤에서부터)와 오른쪽 편차가 각각 오름차순이다."""
+        s = self.values
+        m = len(s)
+        split = bisect.bisect_left(s, center)
+
+        def left(i: int) -> float:
+            return center - s[split - 1 - i]
+
+        def right(j: int) -> float:
+            return s[split + j] - center
+
+        h = m // 2
+        if m % 2:
+            return _kth_of_two(left, split, right, m - split, h)
+        return (_kth_of_two(left, split, right, m - split, h - 1) + _kth_of_two(left, split, right, m - split, h)) / 2
+
+
+class AnomalyStream:
+    """한 (채널 범위, 판매처) 최저가 시계열의 스트리밍 판정기. push() 는 시각 오름차순으로만 받는다."""
+
+    def __init__(self, window_days: int = ANOMALY_INGEST_WINDOW_DAYS):
+        self.window_days = window_days
+        self._window = timedelta(days=window_days)
+        self.ts: deque = deque()
+        self.prices: deque = deque()
+        self.residuals: deque = deque()  # 창 기준 잔차 (기준선이 없으면 None)
+        self._params: Tuple[int, int] = (0, 0)
+        self._price_window = _OrderedWindow()  # 마지막 roll_baseline 개 가격
+        self._resid_window = _OrderedWindow()  # 유효 잔차
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple[datetime, int]], window_days: int = ANOMALY_INGEST_WINDOW_DAYS) -> "AnomalyStream":
+        """저장된 창 점으로 복원. 잔차는 현재 창 기준으로 다시 계산하므로 계속 push 한 것과 같은 상태가 된다."""
+        stream = cls(window_days)
+        for ts, price in points:
+            stream.ts.append(ts)
+            stream.prices.append(int(price))
+            stream.residuals.append(None)
+        stream._reset_params(_adaptive_rolling_params(len(stream.ts)))
+        return stream
+
+    @property
+    def last_ts(self) -> Optional[datetime]:
+        return self.ts[-1] if self.ts else None
+
+    def points(self) -> List[Tuple[datetime, int]]:
+        return list(zip(self.ts, self.prices))
+
+    def _set_residual(self, i: int, value: Optional[float]) -> None:
+        old = self.residuals[i]
+        if old == value:
+            return
+        if old is not None:
+            self._resid_window.remove(old)
+        if value is not None:
+            self._resid_window.add(value)
+        self.residuals[i] = value
+
+    def _recompute(self, count: int) -> None:
+        """앞 count 개 점의 잔차를 현재 창·파라미터로 다시 계산 (pandas rolling(rb, min_periods=rmin) 규칙)."""
+        rb, rmin = self._params
+        prices = list(self.prices)
+        for i in range(count):
+            value = None
+            lo = max(0, i - rb)
+            if rb and i - lo >= rmin:
+                value = prices[i] - _median_sorted(sorted(prices[lo:i]))
+            self._set_residual(i, value)
+
+    def _reset_params(self, params: Tuple[int, int]) -> None:
+        self._params = params
+        rb = params[0]
+        self._price_window = _OrderedWindow(list(self.prices)[-rb:] if rb else ())
+        self._recompute(len(self.ts))
+
+    def _evict(self, cutoff: datetime) -> int:
+        evicted = 0
+        rb = self._params[0]
+        while self.ts and self.ts[0] < cutoff:
+            if rb and len(self.ts) <= rb:
+                self._price_window.remove(self.prices[0])
+            if self.residuals[0] is not None:
+                self._resid_window.remove(self.residuals[0])
+            self.ts.popleft()
+            self.prices.popleft()
+            self.residuals.popleft()
+            evicted += 1
+        return evicted
+
+    def push(self, ts: datetime, price: int) -> Optional[Dict[str, Any]]:
+        """관측 하나를 넣고, 창 기준 배치 판정에서 플래그되면 이상치 dict 를 돌려준다."""
+        if self.ts and ts <= self.ts[-1]:
+            raise ValueError(f"out-of-order point {ts} <= {self.ts[-1]}")
+        price = int(price)
+        evicted = self._evict(ts - self._window)
+        params = _adaptive_rolling_params(len(self.ts) + 1)
+        if params != self._params:
+            self._reset_params(params)
+        elif evicted:
+            self._recompute(min(params[0], len(self.ts)))
+
+        rb, rmin = self._params
+        baseline = self._price_window.median() if rb and len(self._price_window) >= rmin else None
+        residual = price - baseline if baseline is not None else None
+        self.ts.append(ts)
+        self.prices.append(price)
+        self.residuals.append(None)
+        self._set_residual(len(self.residuals) - 1, residual)
+        if rb:
+            self._price_window.add(price)
+            if len(self._price_window) > rb:
+                self._price_window.remove(self.prices[-rb - 1])
+
+        if residual is None:
+            return None
+        if len(self._resid_window) < min(5, max(3, len(self.ts) // 3)):
+            return None
+        z = self._modified_z(residual)
+        if abs(z) <= MODIFIED_Z_THRESHOLD:
+            return None
+        return {
+            "ts": ts,
+            "min_price": price,
+            "baseline": baseline,
+            "residual": residual,
+            "modified_z": z,
+            "kind": "sharp_drop" if z < 0 else "sharp_rise",
+        }
+
+    def _modified_z(self, residual: float) -> float:
+        """price_analytics._modified_z_scores 와 같은 스케일 폴백 (MAD → 평균 절대편차 → 표준편차)."""
+        med = self._resid_window.median()
+        mad = self._resid_window.mad(med)
+        if mad < 1e-6:
+            # 드문 경로: 시간 순서 배열로 numpy 와 같은 합산 순서를 맞춘다.
+            import numpy as np
+
+            values = np.array([r for r in self.residuals if r is not None], dtype=float)
+            mad = float(np.mean(np.abs(values - med)))
+            if mad < 1e-6:
+                mad = max(float(np.std(values)), 1.0)
+        return 0.6745 * (residual - med) / mad
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"window_days": self.window_days, "points": [[ts.isoformat(), p] for ts, p in self.points()]},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "AnomalyStream":
+        data = json.loads(raw)
+        return cls.from_points(
+            ((datetime.fromisoformat(ts), p) for ts, p in data["points"]), data["window_days"]
+        )
+
+
+def replay_series(
+    points: Iterable[Tuple[datetime, int]],
+    *,
+    window_days: int = ANOMALY_INGEST_WINDOW_DAYS,
+    flag_since: Optional[datetime] = None,
+) -> Tuple[AnomalyStream, List[Dict[str, Any]]]:
+    """시각 오름차순 점을 처음부터 흘려 (최종 상태, flag_since 이후 플래그) 를 돌려준다."""
+    stream = AnomalyStream(window_days)
+    flags = []
+    for ts, price in points:
+        found = stream.push(ts, price)
+        if found and (flag_since is None or ts >= flag_since):
+            flags.append(found)
+    return stream, flags
+
+
+# ── DB ─────────────────────────────────────────────────────────────────────
+def _fetch_points(cursor, table: str, where: str, params: Dict[str, Any]) -> Dict[SeriesKey, Dict[datetime, int]]:
+    """{(범위, 판매처 공개명): {시각: 최저 단가}}. 배치 API 의 판매처 × 스냅샷 시각 최저가와 같은 묶음."""
+    cursor.execute(
+        f"""
+        SELECT mall_name, channel, observed_at, MIN(unit_price)
+        FROM {table}
+        WHERE {where}
+          AND mall_name IS NOT NULL AND mall_name <> ''
+          AND unit_price IS NOT NULL AND observed_at IS NOT NULL
+        GROUP BY mall_name, channel, observed_at
+        """,
+        params,
+    )
+    directory = mall_directory()
+    out: Dict[SeriesKey, Dict[datetime, int]] = {}
+    for mall_name, channel, ts, price in cursor.fetchall():
+        key = directory.public_name(mall_name)
+        if not key:
+            continue
+        for scope in PRICE_ANOMALY_CHANNELS:
+            if _in_scope(channel, scope):
+                series = out.setdefault((scope, key), {})
+                series[ts] = min(int(price), series.get(ts, int(price)))
+    return out
+
+
+def _load_states(cursor, keys: Iterable[SeriesKey]) -> Dict[SeriesKey, Tuple[str, Optional[AnomalyStream]]]:
+    by_scope: Dict[str, List[str]] = {}
+    for scope, mall in keys:
+        by_scope.setdefault(scope, []).append(mall)
+    out: Dict[SeriesKey, Tuple[str, Optional[AnomalyStream]]] = {}
+    for scope, malls in by_scope.items():
+        placeholders = ", ".join(f"%(m{i})s" for i in range(len(malls)))
+        cursor.execute(
+            f"""
+            SELECT mall_key, status, window_days, points
+            FROM price_anomaly_state
+            WHERE channel = %(channel)s AND mall_key IN ({placeholders})
+            """,
+            {"channel": scope, **{f"m{i}": m for i, m in enumerate(malls)}},
+        )
+        for mall, status, window_days, raw in cursor.fetchall():
+            if status != STATUS_READY or int(window_days) != ANOMALY_INGEST_WINDOW_DAYS:
+                out[(scope, mall)] = (STATUS_STALE, None)
+            else:
+                out[(scope, mall)] = (STATUS_READY, AnomalyStream.from_json(raw))
+    return out
+
+
+def _save_states(cursor, rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    cursor.executemany(
+        """
+        INSERT INTO price_anomaly_state (mall_key, channel, status, window_days, last_snapshot_id, last_ts, points)
+        VALUES (%(mall)s, %(channel)s, %(status)s, %(window_days)s, %(sid)s, %(last_ts)s, %(points)s)
+        ON DUPLICATE KEY UPDATE
+            status = VALUES(status),
+            window_days = VALUES(window_days),
+            last_snapshot_id = VALUES(last_snapshot_id),
+            last_ts = VALUES(last_ts),
+            points = VALUES(points)
+        """,
+        rows,
+    )
+
+
+def _state_row(key: SeriesKey, stream: AnomalyStream, *, status: str, snapshot_id: Optional[str]) -> Dict[str, Any]:
+    return {
+        "channel": key[0],
+        "mall": key[1],
+        "status": status,
+        "window_days": stream.window_days,
+        "sid": snapshot_id,
+        "last_ts": stream.last_ts,
+        "points": stream.to_json(),
+    }
+
+
+def _insert_anomalies(cursor, key: SeriesKey, flags: List[Dict[str, Any]], snapshot_id: Optional[str]) -> None:
+    if not flags:
+        return
+    cursor.executemany(
+        """
+        INSERT INTO price_anomalies
+            (mall_key, channel, ts, min_price, baseline, residual, modified_z, kind, snapshot_id)
+        VALUES (%(mall)s, %(channel)s, %(ts)s, %(min_price)s, %(baseline)s, %(residual)s,
+                %(modified_z)s, %(kind)s, %(sid)s)
+        ON DUPLICATE KEY UPDATE
+            min_price = VALUES(min_price),
+            baseline = VALUES(baseline),
+            residual = VALUES(residual),
+            modified_z = VALUES(modified_z),
+            kind = VALUES(kind),
+            snapshot_id = VALUES(snapshot_id)
+        """,
+        [{"channel": key[0], "mall": key[1], "sid": snapshot_id, **f} for f in flags],
+    )
+
+
+def _delete_anomalies(cursor, key: SeriesKey, *, since: datetime, until: Optional[datetime] = None) -> None:
+    cursor.execute(
+        f"""
+        DELETE FROM price_anomalies
+        WHERE mall_key = %(mall)s AND channel = %(channel)s AND ts >= %(since)s
+        {"AND ts <= %(until)s" if until is not None else ""}
+        """,
+        {"mall": key[1], "channel": key[0], "since": since, "until": until},
+    )
+
+
+def score_snapshot_anomalies(cursor, snapshot_id: str, *, table: str = config.PRODUCTS_SOURCE) -> Dict[str, int]:
+    """
+    커밋된 스냅샷 하나를 모든 (범위, 판매처) 상태에 흘려 넣고 플래그를 기록한다. 커밋은 호출부.
+    반환: {"series", "flagged", "rebuilt", "stale"}.
+    """
+    current = _fetch_points(cursor, table, "snapshot_id = %(sid)s", {"sid": snapshot_id})
+    stats = {"series": len(current), "flagged": 0, "rebuilt": 0, "stale": 0}
+    if not current:
+        return stats
+
+    loaded = _load_states(cursor, current)
+    streams: Dict[SeriesKey, AnomalyStream] = {
+        key: stream for key, (status, stream) in loaded.items() if stream is not None
+    }
+    missing = [key for key in current if key not in streams]
+    if missing:
+        # 상태가 없는(첫 적재 / stale / 창 변경) 범위는 최근 이력을 재생해 상태와 플래그를 다시 만든다.
+        until = min(min(current[key]) for key in missing)
+        flag_since = until - timedelta(days=PRICE_ANOMALY_REBUILD_DAYS)
+        history = _fetch_points(
+            cursor,
+            table,
+            "observed_at >= %(since)s AND observed_at < %(until)s",
+            {"since": flag_since - timedelta(days=ANOMALY_INGEST_WINDOW_DAYS), "until": until},
+        )
+        for key in missing:
+            stream, flags = replay_series(sorted(history.get(key, {}).items()), flag_since=flag_since)
+            _delete_anomalies(cursor, key, since=flag_since)
+            _insert_anomalies(cursor, key, flags, None)
+            streams[key] = stream
+        stats["rebuilt"] = len(missing)
+
+    states = []
+    for key, series in current.items():
+        stream = streams[key]
+        status = STATUS_READY
+        for ts, price in sorted(series.items()):
+            last = stream.last_ts
+            if last is not None and ts < last:
+                # 늦게 도착한 관측: 스트림에 끼워 넣을 수 없으니 다음 적재 때 재구축한다.
+                status = STATUS_STALE
+                stats["stale"] += 1
+                break
+            if last == ts:
+                # 같은 시각 다른 스냅샷: 더 싼 값이면 마지막 점을 바꿔 다시 판정한다.
+                if price >= stream.prices[-1]:
+                    continue
+                stream = AnomalyStream.from_points(stream.points()[:-1])
+                _delete_anomalies(cursor, key, since=ts, until=ts)
+            found = stream.push(ts, price)
+            if found:
+                _insert_anomalies(cursor, key, [found], snapshot_id)
+                stats["flagged"] += 1
+        states.append(_state_row(key, stream, status=status, snapshot_id=snapshot_id))
+    _save_states(cursor, states)
+    return stats
+
+
+def rebuild_all_anomalies(
+    cursor,
+    *,
+    table: str = config.PRODUCTS_SOURCE,
+    since: Optional[datetime] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """products 전체(또는 since 이후) 이력을 재생해 두 테이블을 다시 만든다. 커밋은 호출부."""
+    cursor.execute("DELETE FROM price_anomalies")
+    cursor.execute("DELETE FROM price_anomaly_state")
+    where, params = ("observed_at >= %(since)s", {"since": since}) if since else ("1 = 1", {})
+    history = _fetch_points(cursor, table, where, params)
+    stats = {"series": len(history), "flagged": 0}
+    states = []
+    for key in sorted(history):
+        stream, flags = replay_series(sorted(history[key].items()))
+        _insert_anomalies(cursor, key, flags, None)
+        states.append(_state_row(key, stream, status=STATUS_READY, snapshot_id=None))
+        stats["flagged"] += len(flags)
+    _save_states(cursor, states)
+    log(f"price_anomalies rebuilt: series={stats['series']} flagged={stats['flagged']}")
+    return stats
+
+
+def mark_price_anomalies_stale(db: Session, mall_names: Iterable[Optional[str]]) -> None:
+    """과거 행이 수정/삭제된 판매처: 재구축 전까지 저장 판정을 쓰지 않는다 (API 는 배치 계산)."""
+    directory = mall_directory()
+    keys = tuple(sorted({directory.public_name(n) for n in mall_names if n} - {""}))
+    if not keys:
+        return
+    db.execute(
+        text("UPDATE price_anomaly_state SET status = :status WHERE mall_key IN :keys"),
+        {"status": STATUS_STALE, "keys": keys},
+    )
+
+
+def fetch_stored_anomalies(
+    db: Session,
+    *,
+    mall_keys: List[str],
+    channel: Optional[str],
+    days: int,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    {판매처 공개명: 저장된 이상치 목록(시각 오름차순)}. 상태가 ready 인 판매처만 키로 들어간다.
+    빠진 판매처(상태 없음 / stale / 유지하지 않는 채널)는 호출부가 배치로 계산한다.
+    """
+    scope = anomaly_scope(channel)
+    if scope is None or not mall_keys:
+        return {}
+    keys = tuple(dict.fromkeys(k for k in mall_keys if k))
+    try:
+        ready = db.execute(
+            text("""
+                SELECT mall_key FROM price_anomaly_state
+                WHERE channel = :channel AND status = :ready AND window_days = :window_days
+                  AND mall_key IN :keys
+            """),
+            {"channel": scope, "ready": STATUS_READY, "window_days": ANOMALY_INGEST_WINDOW_DAYS, "keys": keys},
+        ).fetchall()
+        out: Dict[str, List[Dict[str, Any]]] = {r[0]: [] for r in ready}
+        if not out:
+            return {}
+        rows = db.execute(
+            text("""
+                SELECT mall_key, ts, min_price, baseline, modified_z, kind
+                FROM price_anomalies
+                WHERE channel = :channel AND mall_key IN :keys
+                  AND ts >= DATE_SUB(NOW(), INTERVAL :days DAY)
+                ORDER BY mall_key, ts
+            """),
+            {"channel": scope, "keys": tuple(out), "days": days},
+        ).fetchall()
+    except Exception as e:
+        print(f"⚠️ price_anomalies read failed (falling back to batch detection): {e}")
+        return {}
+    for mall, ts, min_price, baseline, modified_z, kind in rows:
+        out[mall].append(
+            {
+                "ts": ts,
+                "min_price": int(min_price),
+                "baseline": float(baseline) if baseline is not None else None,
+                "modified_z": float(modified_z) if modified_z is not None else None,
+                "kind": kind,
+            }
+        )
+    return out
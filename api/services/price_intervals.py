@@ -0,0 +1,482 @@
+"""
+변경분만 저장하는 가격 구간 저장소 (PRODUCTS_STORAGE_MODE=intervals).
+
+products 는 실행마다 리스팅 한 건당 한 행(상품명 / 링크 / 이미지 URL TEXT 포함)을 새로 넣는다.
+가격이 그대로여도 하루 4회 × 마켓 수만큼 같은 내용이 쌓인다. intervals 모드는 products INSERT 대신
+같은 내용을 두 테이블로 나눠 쓴다.
+
+- price_listings: 리스팅(채널 + 마켓 + 정규화 링크, 링크가 없으면 판매처 + 상품명) 한 건당 한 행.
+  상품명 / 링크 / 이미지 / 키워드는 마지막으로 본 값으로 덮어쓴다.
+- price_intervals: 가격 상태(INTERVAL_STATE_COLUMNS)가 같은 연속 관측 구간.
+  같은 스트림(market, channel)의 직전 스냅샷에서도 같은 상태로 보였으면 valid_to / last_seen_snapshot_id
+  만 늘린다. 상태가 바뀌었거나 중간 스냅샷에서 빠졌다 돌아오면 새 구간을 연다.
+  그래서 한 구간 [valid_from, valid_to] 안에 든 같은 스트림의 스냅샷에는 항상 그 리스팅이 있었다.
+  card_image_path 는 구간에 둔다 (카드는 가격 / 수량을 그리므로 같은 구간이면 같은 카드다).
+- products_by_snapshot 뷰: snapshots 레지스트리와 구간을 이어 붙여 스냅샷별 행을 다시 만든다.
+  products 와 같은 컬럼(id / created_at / card_image_path / observed_at …)을 내므로 조회 SQL 은
+  config.PRODUCTS_SOURCE 만 바꿔 그대로 쓴다.
+  · id = 구간 id × 2^24 + snapshots.seq (split_row_id 로 되돌린다). 같은 구간의 스냅샷마다 다르다.
+  · snapshot_at / observed_at = snapshots.started_at, created_at = snapshots.finished_at.
+
+크롤러(scripts/crawl_db.py)는 intervals 모드에서 products 에 쓰지 않고 fold_rows() 로 이번 실행을
+구간에 반영한 뒤 register_snapshot_streams() 로 레지스트리를 같은 커밋에 기록한다. 일별 롤업 / 월간 상태 /
+가격 이상 판정은 뷰에서 이번 스냅샷을 읽는다. 전환 전 products 이력은
+`python -m scripts.backfill_price_intervals` 로 먼저 옮긴다 (뷰는 products 를 읽지 않는다).
+
+한계:
+- 한 스냅샷에서 같은 리스팅이 여러 번 나오면 첫 행만 구간에 반영한다 (rows 모드보다 행이 적을 수 있다).
+- 상품명 / 링크 / 이미지는 리스팅의 마지막 값이라 과거 스냅샷 행에도 지금 값이 보인다.
+- /manual-confirm, /delete 는 행이 속한 구간 전체에 적용된다.
+
+기록 SQL은 pyformat(%(name)s) 파라미터라 pymysql / mysql.connector 커서 모두에서 실행된다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from api.services.snapshots import STATUS_COMPLETED
+from api.services.title_parser import canonical_product_link_key
+
+PRODUCTS_VIEW = "products_by_snapshot"
+
+# 이 값이 하나라도 바뀌면 새 구간을 연다.
+INTERVAL_STATE_COLUMNS = (
+    "unit_price",
+    "quantity",
+    "total_price",
+    "mall_name",
+    "mall_id",
+    "calc_method",
+    "calc_valid",
+)
+# 리스팅 행에 마지막 값으로 덮어쓰는 컬럼.
+LISTING_COLUMNS = ("keyword", "product_name", "link", "image_url")
+
+# 뷰 id = 구간 id << SNAPSHOT_SEQ_BITS | snapshots.seq. 2^53(JS 정수 한계) 안에 구간 id 2^29 개까지 든다.
+SNAPSHOT_SEQ_BITS = 24
+_SEQ_MASK = (1 << SNAPSHOT_SEQ_BITS) - 1
+
+_CHUNK = 500
+
+CREATE_PRODUCTS_BY_SNAPSHOT_VIEW_SQL = f"""
+CREATE OR REPLACE VIEW {PRODUCTS_VIEW} AS
+SELECT
+    i.id * {1 << SNAPSHOT_SEQ_BITS} + s.seq AS id,
+    l.keyword,
+    l.product_name,
+    i.unit_price,
+    i.quantity,
+    i.total_price,
+    i.mall_name,
+    i.mall_id,
+    i.calc_method,
+    l.link,
+    l.image_url,
+    i.card_image_path,
+    l.channel,
+    l.market,
+    s.snapshot_id,
+    s.started_at AS snapshot_at,
+    i.calc_valid,
+    s.finished_at AS created_at,
+    s.started_at AS observed_at,
+    i.id AS interval_id,
+    s.seq AS snapshot_seq,
+    l.id AS listing_id
+FROM price_intervals i
+JOIN price_listings l ON l.id = i.listing_id
+JOIN snapshots s
+  ON s.market = l.market
+ AND s.channel = l.channel
+ AND s.status = '{STATUS_COMPLETED}'
+ AND s.started_at BETWEEN i.valid_from AND i.valid_to
+"""
+
+
+def intervals_storage_enabled() -> bool:
+    return config.PRODUCTS_STORAGE_MODE == "intervals"
+
+
+def split_row_id(row_id: int) -> Tuple[int, int]:
+    """뷰 id -> (구간 id, snapshots.seq)."""
+    return int(row_id) >> SNAPSHOT_SEQ_BITS, int(row_id) & _SEQ_MASK
+
+
+def row_ids_filter_sql(row_ids: Iterable[int]) -> Tuple[str, Dict[str, Any]]:
+    """
+    config.PRODUCTS_SOURCE 에서 id 목록을 찾는 조건 (SQLAlchemy text 용).
+    뷰의 id 는 계산식이라 인덱스를 못 타므로 (interval_id, snapshot_seq) 로 풀어 찾는다.
+    """
+    ids = list(dict.fromkeys(int(x) for x in row_ids))
+    if not ids:
+        return "1 = 0", {}
+    if not intervals_storage_enabled():
+        return "id IN :row_ids", {"row_ids": tuple(ids)}
+    pairs, params = [], {}
+    for j, row_id in enumerate(ids):
+        params[f"iv{j}"], params[f"sq{j}"] = split_row_id(row_id)
+        pairs.append(f"(:iv{j}, :sq{j})")
+    return f"(interval_id, snapshot_seq) IN ({', '.join(pairs)})", params
+
+
+def _std_market(value: Any) -> str:
+    return (str(value).strip() if value is not None else "") or "스마트스토어"
+
+
+def _std_channel(value: Any) -> str:
+    return (str(value).strip() if value is not None else "") or "naver"
+
+
+def listing_stream(row: Dict[str, Any]) -> Tuple[str, str]:
+    """snapshots 레지스트리와 같은 기준의 (market, channel)."""
+    return _std_market(row.get("market")), _std_channel(row.get("channel"))
+
+
+def listing_key(row: Dict[str, Any]) -> str:
+    market, channel = listing_stream(row)
+    link_key = canonical_product_link_key((row.get("link") or "").strip())
+    if link_key:
+        ident = f"link:{link_key}"
+    else:
+        ident = f"name:{(row.get('mall_name') or '').strip()}|{(row.get('product_name') or '').strip()}"
+    return f"{channel}|{market}|{ident}"
+
+
+def listing_key_hash(row: Dict[str, Any]) -> str:
+    return hashlib.sha256(listing_key(row).encode("utf-8")).hexdigest()
+
+
+def interval_state(row: Dict[str, Any]) -> tuple:
+    return tuple(row.get(c) for c in INTERVAL_STATE_COLUMNS)
+
+
+def plan_snapshot(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    snapshot_id: str,
+    snapshot_at: datetime,
+    open_intervals: Dict[str, tuple],
+    prev_snapshot_by_stream: Dict[Tuple[str, str], Optional[str]],
+) -> Dict[str, Any]:
+    """
+    한 스냅샷의 행(저장 순서)을 구간 변경 계획으로 바꾼다. 크롤러 / backfill / 사이징 리포트가 같은 규칙을 쓴다.
+
+    open_intervals: {listing_key_hash: (interval 식별자, interval_state, last_seen_snapshot_id, valid_to)}
+    prev_snapshot_by_stream: {(market, channel): 같은 스트림의 직전 완료 스냅샷 id 또는 None}
+    반환: {"listings": {hash: row}, "extend": [interval 식별자], "open": [(hash, row)],
+           "duplicates": n, "already": n, "out_of_order": n}
+    """
+    listings: Dict[str, Dict[str, Any]] = {}
+    extend: List[Any] = []
+    opened: List[Tuple[str, Dict[str, Any]]] = []
+    duplicates = already = out_of_order = 0
+    for row in rows:
+        key_hash = listing_key_hash(row)
+        if key_hash in listings:
+            duplicates += 1
+            continue
+        listings[key_hash] = row
+        current = open_intervals.get(key_hash)
+        if current is not None:
+            interval_ref, state, last_seen, valid_to = current
+            if last_seen == snapshot_id:
+                already += 1
+                continue
+            if valid_to is not None and valid_to > snapshot_at:
+                out_of_order += 1
+                continue
+            if (
+                state == interval_state(row)
+                and last_seen is not None
+                and last_seen == prev_snapshot_by_stream.get(listing_stream(row))
+            ):
+                extend.append(interval_ref)
+                continue
+        opened.append((key_hash, row))
+    return {
+        "listings": listings,
+        "extend": extend,
+        "open": opened,
+        "duplicates": duplicates,
+        "already": already,
+        "out_of_order": out_of_order,
+    }
+
+
+# ── DB 반영 ──────────────────────────────────────────────────────
+def _rows_as_dicts(cursor) -> List[Dict[str, Any]]:
+    rows = cursor.fetchall()
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, r)) for r in rows]
+
+
+def _in_params(values: List[Any], prefix: str) -> Tuple[str, Dict[str, Any]]:
+    return (
+        ", ".join(f"%({prefix}{j})s" for j in range(len(values))),
+        {f"{prefix}{j}": v for j, v in enumerate(values)},
+    )
+
+
+def _prev_snapshots(cursor, streams: Iterable[Tuple[str, str]], snapshot_at: datetime) -> Dict[Tuple[str, str], Optional[str]]:
+    out: Dict[Tuple[str, str], Optional[str]] = {}
+    for market, channel in streams:
+        cursor.execute(
+            """
+            SELECT snapshot_id FROM snapshots
+            WHERE status = %(status)s AND market = %(market)s AND channel = %(channel)s
+              AND started_at < %(at)s
+            ORDER BY started_at DESC, snapshot_id DESC
+            LIMIT 1
+            """,
+            {"status": STATUS_COMPLETED, "market": market, "channel": channel, "at": snapshot_at},
+        )
+        found = cursor.fetchall()
+        out[(market, channel)] = found[0][0] if found else None
+    return out
+
+
+def _upsert_listings(cursor, listings: Dict[str, Dict[str, Any]], snapshot_at: datetime) -> None:
+    items = list(listings.items())
+    for i in range(0, len(items), _CHUNK):
+        chunk = items[i:i + _CHUNK]
+        values, params = [], {"at": snapshot_at}
+        for j, (key_hash, row) in enumerate(chunk):
+            market, channel = listing_stream(row)
+            values.append(
+                f"(%(h{j})s, %(c{j})s, %(m{j})s, %(k{j})s, %(n{j})s, %(l{j})s, %(img{j})s, %(at)s, %(at)s)"
+            )
+            params.update(
+                {
+                    f"h{j}": key_hash,
+                    f"c{j}": channel,
+                    f"m{j}": market,
+                    f"k{j}": row.get("keyword"),
+                    f"n{j}": row.get("product_name"),
+                    f"l{j}": row.get("link"),
+                    f"img{j}": row.get("image_url"),
+                }
+            )
+        cursor.execute(
+            f"""
+            INSERT INTO price_listings (
+                listing_key_hash, channel, market, keyword, product_name, link, image_url,
+                first_seen_at, last_seen_at
+            ) VALUES {", ".join(values)}
+            ON DUPLICATE KEY UPDATE
+                keyword = VALUES(keyword),
+                product_name = VALUES(product_name),
+                link = VALUES(link),
+                image_url = VALUES(image_url),
+                last_seen_at = GREATEST(last_seen_at, VALUES(last_seen_at))
+            """,
+            params,
+        )
+
+
+def _load_open_intervals(cursor, key_hashes: List[str]) -> Tuple[Dict[str, int], Dict[str, tuple]]:
+    """({hash: listing_id}, {hash: (interval_id, state, last_seen_snapshot_id, valid_to)})"""
+    listing_ids: Dict[str, int] = {}
+    open_intervals: Dict[str, tuple] = {}
+    for i in range(0, len(key_hashes), _CHUNK):
+        placeholders, params = _in_params(key_hashes[i:i + _CHUNK], "h")
+        cursor.execute(
+            f"""
+            SELECT l.listing_key_hash, l.id AS listing_id, i.id AS interval_id,
+                   {", ".join(f"i.{c}" for c in INTERVAL_STATE_COLUMNS)},
+                   i.last_seen_snapshot_id, i.valid_to
+            FROM price_listings l
+            LEFT JOIN price_intervals i ON i.id = l.current_interval_id
+            WHERE l.listing_key_hash IN ({placeholders})
+            """,
+            params,
+        )
+        for r in _rows_as_dicts(cursor):
+            listing_ids[r["listing_key_hash"]] = int(r["listing_id"])
+            if r["interval_id"] is not None:
+                open_intervals[r["listing_key_hash"]] = (
+                    int(r["interval_id"]),
+                    interval_state(r),
+                    r["last_seen_snapshot_id"],
+                    r["valid_to"],
+                )
+    return listing_ids, open_intervals
+
+
+def fold_rows(cursor, rows: List[Dict[str, Any]], *, snapshot_id: str, snapshot_at: datetime) -> Dict[str, Any]:
+    """
+    한 스냅샷의 행을 구간 저장소에 반영한다. snapshots 등록 전에 호출한다(직전 스냅샷을 레지스트리에서 찾는다).
+    행은 products 컬럼 이름의 dict (mall_name 은 정규화, mall_id 는 풀린 값). 같은 스냅샷을 다시 넣으면
+    아무것도 바꾸지 않는다. 커밋은 호출자가 한다.
+    반환: {"listings", "extended", "opened", "duplicates", "out_of_order", "streams": {(market, channel): 리스팅 수}}
+    """
+    empty = {"listings": 0, "extended": 0, "opened": 0, "duplicates": 0, "out_of_order": 0, "streams": {}}
+    if not rows:
+        return empty
+    streams = sorted({listing_stream(r) for r in rows})
+    prev = _prev_snapshots(cursor, streams, snapshot_at)
+
+    key_hashes = sorted({listing_key_hash(r) for r in rows})
+    _, open_intervals = _load_open_intervals(cursor, key_hashes)
+    plan = plan_snapshot(
+        rows,
+        snapshot_id=snapshot_id,
+        snapshot_at=snapshot_at,
+        open_intervals=open_intervals,
+        prev_snapshot_by_stream=prev,
+    )
+
+    _upsert_listings(cursor, plan["listings"], snapshot_at)
+    listing_ids, _ = _load_open_intervals(cursor, key_hashes)
+
+    extend = plan["extend"]
+    for i in range(0, len(extend), _CHUNK):
+        placeholders, params = _in_params(extend[i:i + _CHUNK], "i")
+        params.update({"at": snapshot_at, "sid": snapshot_id})
+        cursor.execute(
+            f"""
+            UPDATE price_intervals
+            SET valid_to = %(at)s, last_seen_snapshot_id = %(sid)s
+            WHERE id IN ({placeholders})
+            """,
+            params,
+        )
+
+    opened = plan["open"]
+    state_and_card = INTERVAL_STATE_COLUMNS + ("card_image_path",)
+    for i in range(0, len(opened), _CHUNK):
+        chunk = opened[i:i + _CHUNK]
+        values, params = [], {"at": snapshot_at, "sid": snapshot_id}
+        for j, (key_hash, row) in enumerate(chunk):
+            cols = [f"%(lid{j})s"] + [f"%({c}{j})s" for c in state_and_card]
+            values.append(f"({', '.join(cols)}, %(at)s, %(at)s, %(sid)s, %(sid)s)")
+            params[f"lid{j}"] = listing_ids[key_hash]
+            params.update({f"{c}{j}": row.get(c) for c in state_and_card})
+        cursor.execute(
+            f"""
+            INSERT INTO price_intervals (
+                listing_id, {", ".join(state_and_card)},
+                valid_from, valid_to, first_snapshot_id, last_seen_snapshot_id
+            ) VALUES {", ".join(values)}
+            """,
+            params,
+        )
+    if opened:
+        cursor.execute(
+            """
+            UPDATE price_listings l
+            JOIN price_intervals i ON i.listing_id = l.id AND i.first_snapshot_id = %(sid)s
+            SET l.current_interval_id = i.id
+            """,
+            {"sid": snapshot_id},
+        )
+
+    stream_counts: Dict[Tuple[str, str], int] = {}
+    for row in plan["listings"].values():
+        stream = listing_stream(row)
+        stream_counts[stream] = stream_counts.get(stream, 0) + 1
+    return {
+        "listings": len(plan["listings"]),
+        "extended": len(extend),
+        "opened": len(opened),
+        "duplicates": plan["duplicates"],
+        "out_of_order": plan["out_of_order"],
+        "streams": stream_counts,
+    }
+
+
+def set_card_image_paths(cursor, rows: Iterable[Dict[str, Any]], *, snapshot_id: str) -> int:
+    """
+    크롤러 카드 후처리: 이번 스냅샷에서 본 리스팅의 현재 구간에 card_image_path 를 쓴다.
+    행은 fold_rows 와 같은 키 컬럼(link / channel / market / 정규화 mall_name / product_name)을 가진다.
+    """
+    staged: Dict[str, str] = {}
+    for r in rows:
+        path = (r.get("card_image_path") or "").strip()
+        if path:
+            staged[listing_key_hash(r)] = path
+    updated = 0
+    for key_hash, path in staged.items():
+        cursor.execute(
+            """
+            UPDATE price_intervals i
+            JOIN price_listings l ON l.current_interval_id = i.id
+            SET i.card_image_path = %(path)s
+            WHERE l.listing_key_hash = %(h)s AND i.last_seen_snapshot_id = %(sid)s
+            """,
+            {"path": path, "h": key_hash, "sid": snapshot_id},
+        )
+        updated += int(cursor.rowcount or 0)
+    return updated
+
+
+def _load_snapshot_rows(cursor, table: str, snapshot_id: str) -> List[Dict[str, Any]]:
+    cursor.execute(
+        f"""
+        SELECT
+            {", ".join(LISTING_COLUMNS)},
+            {", ".join(INTERVAL_STATE_COLUMNS)},
+            card_image_path,
+            COALESCE(NULLIF(TRIM(market), ''), '스마트스토어') AS market,
+            COALESCE(NULLIF(TRIM(channel), ''), 'naver') AS channel,
+            observed_at
+        FROM {table}
+        WHERE snapshot_id = %(snapshot_id)s
+        ORDER BY id
+        """,
+        {"snapshot_id": snapshot_id},
+    )
+    return _rows_as_dicts(cursor)
+
+
+def fold_snapshot_intervals(cursor, snapshot_id: str, table: str = "products") -> Dict[str, Any]:
+    """backfill 용: products 에 저장된 스냅샷 한 건을 구간 저장소에 반영한다. 커밋은 호출자가 한다."""
+    # 레지스트리의 started_at 은 (market, channel) 별 MIN(observed_at) 이라 스트림마다 따로 접는다.
+    by_stream: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in _load_snapshot_rows(cursor, table, snapshot_id):
+        by_stream.setdefault(listing_stream(row), []).append(row)
+    totals = {"listings": 0, "extended": 0, "opened": 0, "duplicates": 0, "out_of_order": 0, "streams": {}}
+    for stream_rows in by_stream.values():
+        snapshot_at = min(r["observed_at"] for r in stream_rows)
+        stats = fold_rows(cursor, stream_rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at)
+        for k in ("listings", "extended", "opened", "duplicates", "out_of_order"):
+            totals[k] += stats[k]
+        totals["streams"].update(stats["streams"])
+    return totals
+
+
+def clear_price_intervals(cursor) -> None:
+    """--rebuild 용. 커밋은 호출자가 한다."""
+    cursor.execute("DELETE FROM price_intervals")
+    cursor.execute("DELETE FROM price_listings")
+
+
+def fold_all_snapshots(cursor, table: str = "products", *, commit=None, log=print) -> Dict[str, int]:
+    """
+    레지스트리의 완료 스냅샷을 시작 시각 순으로 전부 접는다 (이미 접은 스냅샷은 no-op).
+    commit 을 주면 스냅샷마다 호출한다.
+    """
+    cursor.execute(
+        """
+        SELECT snapshot_id FROM snapshots
+        WHERE status = %(status)s
+        GROUP BY snapshot_id
+        ORDER BY MIN(started_at), snapshot_id
+        """,
+        {"status": STATUS_COMPLETED},
+    )
+    snapshot_ids = [r[0] for r in cursor.fetchall()]
+    totals = {"snapshots": 0, "listings": 0, "extended": 0, "opened": 0}
+    for sid in snapshot_ids:
+        stats = fold_snapshot_intervals(cursor, sid, table)
+        if commit is not None:
+            commit()
+        totals["snapshots"] += 1
+        for k in ("listings", "extended", "opened"):
+            totals[k] += stats.get(k, 0)
+        if totals["snapshots"] % 50 == 0:
+            log(f"  ... {totals['snapshots']}/{len(snapshot_ids)} snapshots")
+    return totals
@@ -0,0 +1,233 @@
+"""
+products 월 단위 RANGE 파티션 (opt-in, scripts/partition_products.py).
+
+- 파티션 키는 observed_at (= COALESCE(snapshot_at, created_at), STORED 생성 컬럼).
+  리포트 / 조회 SQL 은 모두 observed_at 범위로 거르므로 MySQL 이 창에 걸친 월 파티션만 읽는다
+  (EXPLAIN 의 partitions 열, scripts/check_query_plans.py 가 검사한다).
+- MySQL 은 PK / UNIQUE 키마다 파티션 키가 들어가야 하므로 PK 를 (id, observed_at) 로 바꾼다.
+  id 는 AUTO_INCREMENT 그대로라 여전히 행마다 유일하다. WHERE id = ... 조회는 파티션마다 PK 를 한 번씩 찾는다.
+- 파티션은 pYYYYMM (그 달 1일 <= observed_at < 다음 달 1일) 이고 마지막은 p_future (MAXVALUE) 다.
+  p_future 가 있으므로 유지보수가 밀려도 INSERT 는 실패하지 않는다. 유지보수는 비어 있는 p_future 를
+  REORGANIZE 해서 다음 달들을 미리 만든다 (빈 파티션이라 메타데이터만 바뀐다).
+- 보존 기간(PRODUCTS_RETENTION_MONTHS)이 지난 달은 DROP PARTITION 으로 바로 지우거나(action=drop),
+  같은 구조의 빈 products_archive_YYYYMM 테이블과 EXCHANGE PARTITION 한 뒤 빈 파티션을 지운다(action=archive).
+  어느 쪽도 대량 DELETE 가 없다.
+- 일별 롤업 / 월간 상태(mall_daily_price, monthly_seller_state, snapshots …)는 지우지 않는다.
+  만료된 달의 대시보드 추이 / 월간 리포트는 롤업과 상태에서 그대로 나온다.
+
+DDL 은 자리표시자를 못 쓰므로 경계 값은 여기서 만든 리터럴만 넣는다.
+조회 SQL 은 pyformat(%(name)s) 파라미터라 pymysql / mysql.connector 커서 모두에서 실행된다.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+PRODUCTS_PARTITION_AHEAD_MONTHS = int(os.getenv("PRODUCTS_PARTITION_AHEAD_MONTHS", "3"))
+# 0 이면 만료 없이 모두 보관한다.
+PRODUCTS_RETENTION_MONTHS = int(os.getenv("PRODUCTS_RETENTION_MONTHS", "0"))
+PRODUCTS_RETENTION_ACTION = (os.getenv("PRODUCTS_RETENTION_ACTION") or "archive").strip().lower()
+RETENTION_ACTIONS = ("archive", "drop")
+
+FUTURE_PARTITION = "p_future"
+ARCHIVE_TABLE_PREFIX = "products_archive_"
+
+_OBSERVED_AT_DEFINITION = "observed_at DATETIME AS (COALESCE(snapshot_at, created_at)) STORED"
+
+
+@dataclass
+class ProductPartition:
+    name: str
+    lower: Optional[datetime]  # None: 첫 파티션 (그 이전 값 전부)
+    upper: Optional[datetime]  # None: MAXVALUE (p_future)
+    rows: int  # information_schema 추정치
+
+    def overlaps(self, start: datetime, end: Optional[datetime]) -> bool:
+        """[start, end) 창과 겹치는지 (end=None 은 끝이 열린 창)."""
+        if self.upper is not None and self.upper <= start:
+            return False
+        if end is not None and self.lower is not None and self.lower >= end:
+            return False
+        return True
+
+
+def month_floor(value: date | datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return month.strftime("p%Y%m")
+
+
+def _partition_defs(months: Sequence[datetime]) -> str:
+    defs = [
+        f"PARTITION {partition_name(m)} VALUES LESS THAN ('{add_months(m, 1):%Y-%m-%d %H:%M:%S}')"
+        for m in months
+    ]
+    defs.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return ",\n    ".join(defs)
+
+
+def _month_span(first: datetime, last: datetime) -> List[datetime]:
+    months, m = [], month_floor(first)
+    while m <= last:
+        months.append(m)
+        m = add_months(m, 1)
+    return months
+
+
+def _parse_bound(description: Any) -> Optional[datetime]:
+    value = str(description).strip().strip("'")
+    if value.upper() == "MAXVALUE":
+        return None
+    return datetime.fromisoformat(value)
+
+
+def partition_layout(cursor) -> List[ProductPartition]:
+    """products 파티션 목록 (경계 순). 파티션이 없으면 []."""
+    cursor.execute(
+        """
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'products'
+          AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """
+    )
+    layout: List[ProductPartition] = []
+    lower: Optional[datetime] = None
+    for name, description, rows in cursor.fetchall():
+        upper = _parse_bound(description)
+        layout.append(ProductPartition(name=name, lower=lower, upper=upper, rows=int(rows or 0)))
+        lower = upper
+    return layout
+
+
+def partitions_for_window(
+    layout: Sequence[ProductPartition], start: datetime, end: Optional[datetime] = None
+) -> List[str]:
+    """observed_at 가 [start, end) 인 행이 있을 수 있는 파티션 (pruning 후 읽어야 하는 최대 집합)."""
+    return [p.name for p in layout if p.overlaps(start, end)]
+
+
+# ── 마이그레이션 ───────────────────────────────────────────────────
+def migration_blockers(cursor) -> List[str]:
+    """파티션으로 바꿀 수 없게 하는 조건 (외래 키, PK 외 UNIQUE 키, observed_at NULL 행)."""
+    problems = []
+    cursor.execute(
+        """
+        SELECT DISTINCT TABLE_NAME, CONSTRAINT_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND REFERENCED_TABLE_NAME IS NOT NULL
+          AND (TABLE_NAME = 'products' OR REFERENCED_TABLE_NAME = 'products')
+        """
+    )
+    for table, constraint in cursor.fetchall():
+        problems.append(f"외래 키 {table}.{constraint} (파티션 테이블은 외래 키를 쓸 수 없다)")
+    cursor.execute(
+        """
+        SELECT DISTINCT INDEX_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'products'
+          AND NON_UNIQUE = 0
+          AND INDEX_NAME <> 'PRIMARY'
+        """
+    )
+    for (index_name,) in cursor.fetchall():
+        problems.append(f"UNIQUE 키 {index_name} 에 observed_at 이 없다")
+    cursor.execute("SELECT COUNT(*) FROM products WHERE observed_at IS NULL")
+    null_rows = int(cursor.fetchone()[0] or 0)
+    if null_rows:
+        problems.append(f"observed_at 이 NULL 인 행 {null_rows}개 (snapshot_at / created_at 을 먼저 채운다)")
+    return problems
+
+
+def migration_sql(first_month: datetime, last_month: datetime) -> str:
+    """
+    PK 를 (id, observed_at) 로 바꾸고 first_month ~ last_month 월 파티션 + p_future 로 나누는 ALTER 한 문장.
+    테이블을 복사하므로 도는 동안 쓰기가 막힌다 (크롤러를 멈추고 돌린다).
+    """
+    return f"""
+ALTER TABLE products
+    MODIFY {_OBSERVED_AT_DEFINITION} NOT NULL,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, observed_at)
+PARTITION BY RANGE COLUMNS (observed_at) (
+    {_partition_defs(_month_span(first_month, last_month))}
+)""".strip()
+
+
+REMOVE_PARTITIONING_SQL = "ALTER TABLE products REMOVE PARTITIONING"
+
+
+# ── 유지보수 (미리 만들기 / 만료) ───────────────────────────────────
+def maintenance_plan(
+    layout: Sequence[ProductPartition],
+    *,
+    today: date | datetime,
+    ahead_months: int = PRODUCTS_PARTITION_AHEAD_MONTHS,
+    retention_months: int = PRODUCTS_RETENTION_MONTHS,
+    action: str = PRODUCTS_RETENTION_ACTION,
+) -> List[Tuple[str, str]]:
+    """
+    [(설명, SQL), ...] 순서대로 실행한다. 할 일이 없으면 [].
+    - 이번 달 + ahead_months 달까지 파티션이 없으면 p_future 를 쪼개 만든다.
+    - retention_months > 0 이면 이번 달 1일 - retention_months 달보다 끝이 이른 월 파티션을 만료한다.
+    """
+    if action not in RETENTION_ACTIONS:
+        raise ValueError(f"action must be one of {RETENTION_ACTIONS}")
+    named = [p for p in layout if p.upper is not None]
+    if not named or layout[-1].name != FUTURE_PARTITION or layout[-1].upper is not None:
+        raise ValueError("products 가 pYYYYMM + p_future 월 파티션이 아니다 (scripts/partition_products.py --migrate)")
+
+    steps: List[Tuple[str, str]] = []
+    current = month_floor(today)
+    new_months = _month_span(named[-1].upper, add_months(current, ahead_months))
+    if new_months:
+        names = ", ".join(partition_name(m) for m in new_months)
+        steps.append(
+            (
+                f"create {names}",
+                f"ALTER TABLE products REORGANIZE PARTITION {FUTURE_PARTITION} INTO (\n"
+                f"    {_partition_defs(new_months)}\n)",
+            )
+        )
+
+    if retention_months > 0:
+        cutoff = add_months(current, -retention_months)
+        expired = [p for p in named if p.upper <= cutoff]
+        if action == "archive":
+            for p in expired:
+                table = archive_table_name(p.name)
+                # IF NOT EXISTS 를 쓰지 않는다: 이미 있는 보관 테이블과 EXCHANGE 하면 그 행이 products 로 돌아온다.
+                steps.append((f"archive {p.name} → {table}", f"CREATE TABLE {table} LIKE products"))
+                steps.append((f"archive {p.name} → {table}", f"ALTER TABLE {table} REMOVE PARTITIONING"))
+                steps.append(
+                    (
+                        f"archive {p.name} → {table}",
+                        f"ALTER TABLE products EXCHANGE PARTITION {p.name} WITH TABLE {table}",
+                    )
+                )
+        if expired:
+            steps.append(
+                (
+                    f"drop {', '.join(p.name for p in expired)} (< {cutoff:%Y-%m-%d})",
+                    f"ALTER TABLE products DROP PARTITION {', '.join(p.name for p in expired)}",
+                )
+            )
+    return steps
+
+
+def archive_table_name(partition: str) -> str:
+    return f"{ARCHIVE_TABLE_PREFIX}{partition[1:]}"
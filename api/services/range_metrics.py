@@ -7,6 +7,11 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+import config
+
+# The columnar engine (metrics_engine) pulls in numpy/pandas, so it is imported inside the
+# compute_* functions below rather than here: importing the API should not load pandas.
+
 
 def _date_range(start_date: str, end_date: str) -> Tuple[str, str]:
     """Return [start, end) timestamps. end_date is inclusive (up to 23:59:59)."""
@@ -26,9 +31,8 @@ def _snapshot_bucket(
     return ts.strftime("%Y-%m-%d %H")
 
 
-def _fetch_products(
-    db: Session, start: str, end: str, channel: str,
-) -> list:
+def _fetch_products_query(start: str, end: str, channel: str) -> Tuple[str, Dict[str, Any]]:
+    """Window SQL; resolved by the (channel, observed_at) / observed_at indexes."""
     if channel == "all":
         channel_filter = ""
         params = {"start": start, "end": end}
@@ -36,37 +40,244 @@ def _fetch_products(
         channel_filter = "AND channel = :channel"
         params = {"start": start, "end": end, "channel": channel}
 
-    return (
-        db.execute(
-            text(
-                f"""
-                SELECT
-                    product_name,
-                    mall_name,
-                    unit_price,
-                    total_price,
-                    quantity,
-                    link,
-                    image_url,
-                    card_image_path,
-                    calc_method,
-                    channel,
-                    COALESCE(snapshot_at, created_at) AS ts,
-                    snapshot_id,
-                    snapshot_at,
-                    created_at,
-                    COALESCE(calc_valid, 1) AS calc_valid
-                FROM products
-                WHERE COALESCE(snapshot_at, created_at) >= :start
-                  AND COALESCE(snapshot_at, created_at) <= :end
-                  {channel_filter}
-                """
-            ),
-            params,
-        )
-        .mappings()
-        .all()
-    )
+    sql = f"""
+        SELECT
+            product_name,
+            mall_name,
+            unit_price,
+            total_price,
+            quantity,
+            link,
+            image_url,
+            card_image_path,
+            calc_method,
+            channel,
+            observed_at AS ts,
+            snapshot_id,
+            snapshot_at,
+            created_at,
+            COALESCE(calc_valid, 1) AS calc_valid
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE observed_at >= :start
+          AND observed_at <= :end
+          {channel_filter}
+    """
+    return sql, params
+
+
+_RANGE_COLUMNS = (
+    "product_name", "mall_name", "unit_price", "total_price", "quantity", "link", "image_url",
+    "card_image_path", "calc_method", "channel", "ts", "snapshot_id", "snapshot_at",
+    "created_at", "calc_valid",
+)
+
+
+def _fetch_products(
+    db: Session, start: str, end: str, channel: str,
+) -> list:
+    """Plain row tuples in _fetch_products_query column order (_RANGE_COLUMNS)."""
+    sql, params = _fetch_products_query(start, end, channel)
+    return db.execute(text(sql), params).fetchall()
+
+
+def _split_ts(ts: Any) -> Tuple[str, str]:
+    if isinstance(ts, datetime):
+        return ts.strftime("%Y-%m-%d"), ts.strftime("%H:%M")
+    return str(ts)[:10], str(ts)[11:16]
+
+
+class _RangeScan:
+    """One pass over the window rows; every report section is derived from the same state.
+
+    - bucket_min: seller -> snapshot bucket -> min-price observation (summary)
+    - items:      seller -> all observations (below-threshold detail)
+    - slot_min:   seller -> chart slot -> min price point (chart)
+    """
+
+    def __init__(self, *, threshold_price: int, channel: str):
+        self.threshold_price = threshold_price
+        self.channel = channel
+        self.bucket_min: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self.items: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.slot_min: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self.below_sellers: set = set()
+
+    def add_rows(self, rows) -> "_RangeScan":
+        threshold = self.threshold_price
+        default_channel = self.channel
+        bucket_min = self.bucket_min
+        items = self.items
+        slot_min = self.slot_min
+        below_sellers = self.below_sellers
+        # rows of one snapshot share observed_at, so date/time strings are formatted once per ts
+        ts_parts: Dict[Any, Tuple[str, str]] = {}
+
+        for (
+            product_name, mall_name, unit_price, total_price, quantity, link, image_url,
+            card_image_path, calc_method, row_channel, ts, snapshot_id, snapshot_at,
+            created_at, calc_valid,
+        ) in rows:
+            if int(calc_valid or 1) != 1:
+                continue
+            seller = (mall_name or "").strip() or "(unknown)"
+            price = int(unit_price)
+            platform = row_channel or default_channel
+
+            # summary: one price per (seller, snapshot bucket)
+            bucket = _snapshot_bucket(snapshot_id, snapshot_at, created_at)
+            cur = bucket_min[seller].get(bucket)
+            if cur is None or unit_price < cur["unit_price"]:
+                bucket_min[seller][bucket] = {
+                    "unit_price": price,
+                    "ts": ts,
+                    "seller": seller,
+                    "platform": platform,
+                }
+
+            # detail: every observation, seller flagged if any is at/below threshold
+            if price <= threshold:
+                below_sellers.add(seller)
+            items[seller].append({
+                "seller_name": seller,
+                "platform": platform,
+                "unit_price": price,
+                "total_price": int(total_price or 0),
+                "quantity": int(quantity or 0),
+                "time": ts,
+                "link": link,
+                "image_url": image_url,
+                "product_name": product_name,
+                "calc_method": calc_method,
+                "card_image_path": card_image_path,
+            })
+
+            # chart: min price per crawl slot
+            parts = ts_parts.get(ts)
+            if parts is None:
+                parts = ts_parts[ts] = _split_ts(ts)
+            date_str, time_str = parts
+            slot_key = f"{date_str}_{snapshot_id}" if snapshot_id else f"{date_str}_{time_str[:2]}"
+            cur = slot_min[seller].get(slot_key)
+            if cur is None or price < cur["min_price"]:
+                slot_min[seller][slot_key] = {
+                    "date": date_str,
+                    "time": time_str,
+                    "min_price": price,
+                }
+        return self
+
+    def seller_metrics(self) -> Dict[str, Any]:
+        threshold_price = self.threshold_price
+        seller_stats: List[Dict[str, Any]] = []
+        for seller, buckets in self.bucket_min.items():
+            bucket_items = list(buckets.values())
+            if not bucket_items:
+                continue
+            below = [x for x in bucket_items if x["unit_price"] <= threshold_price]
+            min_item = min(bucket_items, key=lambda x: (x["unit_price"], x["ts"]))
+            seller_stats.append({
+                "seller_name": seller,
+                "below_count": len(below),
+                "min_unit_price": min_item["unit_price"],
+                "min_time": min_item["ts"],
+                "platform": min_item.get("platform", ""),
+            })
+
+        below_sellers = [s for s in seller_stats if s["below_count"] > 0]
+        below_sellers.sort(key=lambda x: x["min_unit_price"])
+
+        # top 5 lowest-price sellers
+        top5 = below_sellers[:5]
+
+        # global min
+        global_min_seller = None
+        global_min_price = None
+        global_min_time = None
+        if below_sellers:
+            g = below_sellers[0]
+            global_min_seller = g["seller_name"]
+            global_min_price = g["min_unit_price"]
+            global_min_time = g["min_time"]
+
+        return {
+            "below_threshold_seller_count": len(below_sellers),
+            "top5_lowest": [
+                {
+                    "seller_name": s["seller_name"],
+                    "min_unit_price": s["min_unit_price"],
+                    "min_time": s["min_time"],
+                    "platform": s.get("platform", ""),
+                }
+                for s in top5
+            ],
+            "global_min_seller": global_min_seller,
+            "global_min_price": global_min_price,
+            "global_min_time": global_min_time,
+        }
+
+    def below_threshold_detail(self) -> List[Dict[str, Any]]:
+        result: List[Dict[str, Any]] = []
+        for seller, seller_items in self.items.items():
+            # 기준가 이하 기록이 1건이라도 있는 셀러만 포함, 단 전체 스냅샷을 내려줌
+            if seller not in self.below_sellers:
+                continue
+            all_snapshots = sorted(seller_items, key=lambda x: (x["time"], x["unit_price"]))
+            # seller-level min
+            min_item = min(all_snapshots, key=lambda x: (x["unit_price"], x["time"]))
+            result.append({
+                **min_item,
+                "snapshots": all_snapshots,
+            })
+
+        result.sort(key=lambda x: (x["unit_price"], x["time"]))
+        return result
+
+    def seller_chart_data(
+        self, seller_names: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for seller, slot_map in self.slot_min.items():
+            if seller_names and seller not in seller_names:
+                continue
+            result[seller] = sorted(
+                slot_map.values(),
+                key=lambda x: (x["date"], x["time"]),
+            )
+        return result
+
+
+def _window_rows(db: Session, *, start_date: str, end_date: str, channel: str) -> list:
+    start, end = _date_range(start_date, end_date)
+    return _fetch_products(db, start, end, channel)
+
+
+def _scan(rows, *, threshold_price: int, channel: str) -> _RangeScan:
+    return _RangeScan(threshold_price=threshold_price, channel=channel).add_rows(rows)
+
+
+# ── All sections from a single fetch ───────────────────────────────
+def compute_range_sections(
+    db: Session,
+    *,
+    start_date: str,
+    end_date: str,
+    threshold_price: int,
+    channel: str = "naver",
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Return (summary, below_list, chart_data) from one window query and one row pass.
+
+    Same values as calling the three compute_* functions below; chart_data is limited to
+    the below-threshold sellers (all sellers if there are none), as build_range_report asks.
+    """
+    rows = _window_rows(db, start_date=start_date, end_date=end_date, channel=channel)
+    from api.services.metrics_engine import range_sections, use_columnar_engine
+
+    if rows and use_columnar_engine():
+        return range_sections(_RANGE_COLUMNS, rows, threshold_price=threshold_price, channel=channel)
+    scan = _scan(rows, threshold_price=threshold_price, channel=channel)
+    below_list = scan.below_threshold_detail()
+    seller_names = [item["seller_name"] for item in below_list]
+    return scan.seller_metrics(), below_list, scan.seller_chart_data(seller_names or None)
 
 
 # ── 1) Summary-level seller metrics ────────────────────────────────
@@ -79,75 +290,12 @@ def compute_seller_metrics(
     channel: str = "naver",
 ) -> Dict[str, Any]:
     """Return summary dict: below_count, top5 sellers, global min."""
-    start, end = _date_range(start_date, end_date)
-    rows = _fetch_products(db, start, end, channel)
+    rows = _window_rows(db, start_date=start_date, end_date=end_date, channel=channel)
+    from api.services.metrics_engine import RangeFrame, range_summary, use_columnar_engine
 
-    # bucket by seller -> snapshot to keep one price per observation
-    by_seller: Dict[str, Dict[str, Dict]] = defaultdict(dict)
-
-    for r in rows:
-        if int(r.get("calc_valid") or 1) != 1:
-            continue
-        seller = (r["mall_name"] or "").strip() or "(unknown)"
-        bucket = _snapshot_bucket(
-            r.get("snapshot_id"), r.get("snapshot_at"), r.get("created_at"),
-        )
-        cur = by_seller[seller].get(bucket)
-        if cur is None or r["unit_price"] < cur["unit_price"]:
-            by_seller[seller][bucket] = {
-                "unit_price": int(r["unit_price"]),
-                "ts": r["ts"],
-                "seller": seller,
-                "platform": r.get("channel") or channel,
-            }
-
-    # aggregate per seller
-    seller_stats: List[Dict[str, Any]] = []
-    for seller, buckets in by_seller.items():
-        items = list(buckets.values())
-        below = [x for x in items if x["unit_price"] <= threshold_price]
-        if not items:
-            continue
-        min_item = min(items, key=lambda x: (x["unit_price"], x["ts"]))
-        seller_stats.append({
-            "seller_name": seller,
-            "below_count": len(below),
-            "min_unit_price": min_item["unit_price"],
-            "min_time": min_item["ts"],
-            "platform": min_item.get("platform", ""),
-        })
-
-    below_sellers = [s for s in seller_stats if s["below_count"] > 0]
-    below_sellers.sort(key=lambda x: x["min_unit_price"])
-
-    # top 5 lowest-price sellers
-    top5 = below_sellers[:5]
-
-    # global min
-    global_min_seller = None
-    global_min_price = None
-    global_min_time = None
-    if below_sellers:
-        g = below_sellers[0]
-        global_min_seller = g["seller_name"]
-        global_min_price = g["min_unit_price"]
-        global_min_time = g["min_time"]
-
-    return {
-        "below_threshold_seller_count": len(below_sellers),
-        "top5_lowest": [
-            {
-                "seller_name": s["seller_name"],
-                "min_unit_price": s["min_unit_price"],
-                "min_time": s["min_time"],
-                "platform": s.get("platform", ""),
-            }
-            for s in top5
-        ],
-        "global_min_seller": global_min_seller,
-        "global_min_price": global_min_price,
-        "global_min_time": global_min_time,
-    }
+    if rows and use_columnar_engine():
+        return range_summary(RangeFrame(_RANGE_COLUMNS, rows, channel=channel), threshold_price)
+    return _scan(rows, threshold_price=threshold_price, channel=channel).seller_metrics()
 
 
 # ── 2) Below-threshold detail list (grouped by seller) ─────────────
@@ -168,48 +316,14 @@ def compute_below_threshold_detail(
     Top-level fields = seller's overall min (토글 닫힌 상태).
     snapshots = 스냅샷별 전체 목록 (토글 열린 상태).
     """
-    start, end = _date_range(start_date, end_date)
-    rows = _fetch_products(db, start, end, channel)
-
-    # 셀러별 전체 스냅샷 수집 + 기준가 이하 여부 추적
-    by_seller: Dict[str, List[Dict]] = defaultdict(list)
-    below_sellers: set = set()
-    for r in rows:
-        if int(r.get("calc_valid") or 1) != 1:
-            continue
-        price = int(r["unit_price"])
-        seller = (r["mall_name"] or "").strip() or "(unknown)"
-        if price <= threshold_price:
-            below_sellers.add(seller)
-        by_seller[seller].append({
-            "seller_name": seller,
-            "platform": r.get("channel") or channel,
-            "unit_price": price,
-            "total_price": int(r.get("total_price") or 0),
-            "quantity": int(r.get("quantity") or 0),
-            "time": r["ts"],
-            "link": r.get("link"),
-            "image_url": r.get("image_url"),
-            "product_name": r.get("product_name"),
-            "calc_method": r.get("calc_method"),
-            "card_image_path": r.get("card_image_path"),
-        })
-
-    result: List[Dict[str, Any]] = []
-    for seller, items in by_seller.items():
-        # 기준가 이하 기록이 1건이라도 있는 셀러만 포함, 단 전체 스냅샷을 내려줌
-        if seller not in below_sellers:
-            continue
-        all_snapshots = sorted(items, key=lambda x: (x["time"], x["unit_price"]))
-        # seller-level min
-        min_item = min(all_snapshots, key=lambda x: (x["unit_price"], x["time"]))
-        result.append({
-            **min_item,
-            "snapshots": all_snapshots,
-        })
-
-    result.sort(key=lambda x: (x["unit_price"], x["time"]))
-    return result
+    rows = _window_rows(db, start_date=start_date, end_date=end_date, channel=channel)
+    from api.services.metrics_engine import RangeFrame, range_below_detail, use_columnar_engine
+
+    if rows and use_columnar_engine():
+        return range_below_detail(
+            RangeFrame(_RANGE_COLUMNS, rows, channel=channel), threshold_price=threshold_price,
+        )
+    return _scan(rows, threshold_price=threshold_price, channel=channel).below_threshold_detail()
 
 
 # ── 3) Seller chart data (per-snapshot) ─────────────────────────────
@@ -225,46 +339,9 @@ def compute_seller_chart_data(
 
     크롤링 시점(snapshot)별 최저 단가 1건.
     """
-    start, end = _date_range(start_date, end_date)
-    rows = _fetch_products(db, start, end, channel)
-
-    by_seller_slot: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
-
-    for r in rows:
-        if int(r.get("calc_valid") or 1) != 1:
-            continue
-        seller = (r["mall_name"] or "").strip() or "(unknown)"
-        if seller_names and seller not in seller_names:
-            continue
-        price = int(r["unit_price"])
-        ts = r["ts"]
-        if isinstance(ts, datetime):
-            date_str = ts.strftime("%Y-%m-%d")
-            time_str = ts.strftime("%H:%M")
-        else:
-            date_str = str(ts)[:10]
-            time_str = str(ts)[11:16]
-
-        snap = r.get("snapshot_id")
-        if snap:
-            slot_key = f"{date_str}_{snap}"
-        else:
-            slot_key = f"{date_str}_{time_str[:2]}"
-
-        cur = by_seller_slot[seller].get(slot_key)
-        if cur is None or price < cur["min_price"]:
-            by_seller_slot[seller][slot_key] = {
-                "date": date_str,
-                "time": time_str,
-                "min_price": price,
-            }
-
-    result: Dict[str, List[Dict[str, Any]]] = {}
-    for seller, slot_map in by_seller_slot.items():
-        points = sorted(
-            slot_map.values(),
-            key=lambda x: (x["date"], x["time"]),
-        )
-        result[seller] = points
+    rows = _window_rows(db, start_date=start_date, end_date=end_date, channel=channel)
+    from api.services.metrics_engine import RangeFrame, range_chart, use_columnar_engine
 
-    return result
+    if rows and use_columnar_engine():
+        return range_chart(RangeFrame(_RANGE_COLUMNS, rows, channel=channel), seller_names)
+    return _scan(rows, threshold_price=0, channel=channel).seller_chart_data(seller_names)
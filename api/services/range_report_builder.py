@@ -5,11 +5,7 @@ from typing import Any, Dict, List
 
 from sqlalchemy.orm import Session
 
-from api.services.range_metrics import (
-    compute_below_threshold_detail,
-    compute_seller_chart_data,
-    compute_seller_metrics,
-)
+from api.services.range_metrics import compute_range_sections
 
 
 def build_range_report(
@@ -20,17 +16,9 @@ def build_range_report(
     threshold_price: int,
     channel: str = "naver",
 ) -> Dict[str, Any]:
-    # ── Section 1: Summary ──────────────────────────────────────────
-    summary = compute_seller_metrics(
-        db,
-        start_date=start_date,
-        end_date=end_date,
-        threshold_price=threshold_price,
-        channel=channel,
-    )
-
-    # ── Section 2: Below-threshold detail list ──────────────────────
-    below_list = compute_below_threshold_detail(
+    # ── Sections 1-3: Summary / below-threshold list / chart data ───
+    # 기간 데이터는 한 번만 조회하고 한 번 순회해서 세 섹션을 같이 만든다.
+    summary, below_list, chart_data = compute_range_sections(
         db,
         start_date=start_date,
         end_date=end_date,
@@ -38,16 +26,6 @@ def build_range_report(
         channel=channel,
     )
 
-    # ── Section 3: Seller chart data ────────────────────────────────
-    seller_names = [item["seller_name"] for item in below_list]
-    chart_data = compute_seller_chart_data(
-        db,
-        start_date=start_date,
-        end_date=end_date,
-        seller_names=seller_names or None,
-        channel=channel,
-    )
-
     # Assemble seller detail cards
     seller_cards: List[Dict[str, Any]] = []
     for item in below_list:
@@ -0,0 +1,207 @@
+"""
+products 원본 내보내기 (/products/export/raw) 스트리밍 writer.
+
+- DB는 서버 사이드 커서(stream_results)로 chunk_size 행씩 읽는다.
+- csv: chunk마다 바로 바이트로 내보낸다 (Excel 호환 UTF-8 BOM).
+- parquet: chunk마다 row group 하나를 쓰고, 쌓인 바이트를 바로 내보낸다. (pyarrow 필요)
+- xlsx: openpyxl write-only 모드는 시트 XML을 임시 파일로 흘려 쓰고 zip은 마지막에 닫힌다.
+  완성 파일을 디스크 임시 파일에서 조각내 보낸다.
+어느 형식이든 메모리에는 한 chunk만 올라오므로 조회 기간과 무관하게 peak 메모리가 일정하다.
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import tempfile
+from typing import Any, Iterable, Iterator, Sequence
+
+from sqlalchemy import text
+
+# pyarrow 는 import 만으로 numpy 까지 끌어와 API 기동을 늦춘다. 설치 여부만 보고 parquet 내보내기 때 import 한다.
+_pyarrow_import_error = (
+    None if importlib.util.find_spec("pyarrow") is not None else ImportError("No module named 'pyarrow'")
+)
+
+EXPORT_CHUNK_ROWS = 2000
+_FILE_READ_BYTES = 1024 * 1024
+
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+HEADER_MAP_KR = {
+    "id": "ID",
+    "keyword": "키워드",
+    "product_name": "상품명",
+    "unit_price": "단가",
+    "quantity": "수량",
+    "total_price": "판매가",
+    "mall_name": "판매처",
+    "calc_method": "산출방식",
+    "link": "상품링크",
+    "image_url": "원본이미지URL",
+    "card_image_path": "카드이미지경로",
+    "channel": "채널",
+    "market": "마켓",
+    "snapshot_id": "스냅샷ID",
+    "snapshot_at": "스냅샷시각",
+    "calc_valid": "계산유효",
+    "created_at": "생성시각",
+}
+
+
+def is_parquet_available() -> bool:
+    return _pyarrow_import_error is None
+
+
+class RawExportStream:
+    """
+    서버 사이드 커서 결과를 chunk 단위로 내보내는 iterator.
+    생성 시 쿼리를 실행하므로 SQL 오류는 응답 시작 전에 드러난다. 연결은 소진/close 시 반납한다.
+    """
+
+    def __init__(self, engine, sql: str, params: dict[str, Any], *, chunk_size: int = EXPORT_CHUNK_ROWS):
+        self._conn = engine.connect().execution_options(stream_results=True)
+        try:
+            self._result = self._conn.execute(text(sql), params)
+        except Exception:
+            self._conn.close()
+            raise
+        self.columns: list[str] = list(self._result.keys())
+        self._chunk_size = chunk_size
+
+    def chunks(self) -> Iterator[Sequence[Sequence[Any]]]:
+        try:
+            for part in self._result.partitions(self._chunk_size):
+                yield part
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._result.close()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+
+def header_labels(columns: Sequence[str], header_kr: bool) -> list[str]:
+    if not header_kr:
+        return list(columns)
+    return [HEADER_MAP_KR.get(c, c) for c in columns]
+
+
+def iter_csv(headers: Sequence[str], chunks: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")
+    writer.writerow(headers)
+    for part in chunks:
+        writer.writerows(part)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def iter_xlsx(headers: Sequence[str], chunks: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("products")
+    ws.append(list(headers))
+    for part in chunks:
+        for row in part:
+            ws.append(list(row))
+    with tempfile.TemporaryFile() as fp:
+        wb.save(fp)
+        fp.seek(0)
+        while True:
+            block = fp.read(_FILE_READ_BYTES)
+            if not block:
+                break
+            yield block
+
+
+class _DrainSink(io.RawIOBase):
+    """pyarrow가 쓴 바이트를 모아 뒀다가 drain()으로 꺼내 가는 쓰기 전용 스트림."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+_PARQUET_INT_COLUMNS = {"id", "unit_price", "quantity", "total_price", "calc_valid"}
+_PARQUET_TIME_COLUMNS = {"snapshot_at", "created_at"}
+
+
+def _parquet_schema(columns: Sequence[str], headers: Sequence[str]):
+    import pyarrow as pa
+
+    fields = []
+    for col, header in zip(columns, headers):
+        if col in _PARQUET_INT_COLUMNS:
+            fields.append((header, pa.int64()))
+        elif col in _PARQUET_TIME_COLUMNS:
+            fields.append((header, pa.timestamp("s")))
+        else:
+            fields.append((header, pa.string()))
+    return pa.schema(fields)
+
+
+def iter_parquet(
+    columns: Sequence[str],
+    headers: Sequence[str],
+    chunks: Iterable[Sequence[Sequence[Any]]],
+) -> Iterator[bytes]:
+    if _pyarrow_import_error is not None:
+        raise RuntimeError(f"parquet export requires pyarrow: {_pyarrow_import_error}")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # 스키마를 컬럼명으로 고정해 chunk마다 NULL 분포가 달라도 row group 타입이 같게 한다.
+    schema = _parquet_schema(columns, headers)
+    sink = _DrainSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for part in chunks:
+            if not part:
+                continue
+            arrays = [
+                pa.array([row[i] for row in part], type=schema.field(i).type)
+                for i in range(len(headers))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,285 @@
+"""
+요청 단위 SQL 계측 + Prometheus 텍스트 형식 지표 (/metrics).
+
+- SQLAlchemy before/after_cursor_execute 훅(instrument_engine)이 문장마다 시간을 재고,
+  지금 처리 중인 요청(ContextVar)의 RequestSqlStats 에 쿼리 수·반환 행 수·SQL 시간·가장 느린 문장을 쌓는다.
+  동기 엔드포인트는 스레드풀에서 돌지만 컨텍스트가 복사되므로 같은 RequestSqlStats 를 본다.
+- 커넥션 풀 체크아웃 대기(새 연결 생성 포함)는 TimedQueuePool 이 잰다.
+- RequestMetricsMiddleware 가 요청이 끝나면 라우트 템플릿(/products/mall/{mall_name} 처럼 경로 변수 그대로,
+  매칭 안 된 요청은 "unmatched") 기준 히스토그램에 기록한다.
+- REQUEST_METRICS_DEBUG_HEADER=true 면 응답 헤더 X-SQL-Queries / X-SQL-Time-Ms / X-SQL-Slowest / X-DB-Pool-Wait-Ms 를 붙인다
+  (SQL 문이 노출되므로 운영에서는 끈다). StreamingResponse 는 헤더를 먼저 보내므로 본문 생성 중 쿼리는 빠진다.
+- REQUEST_METRICS_QUERY_LOG_THRESHOLD=N(>0) 이면 쿼리를 N번 이상 낸 요청을 로그로 남긴다.
+
+지표는 워커 프로세스마다 따로 쌓인다 (/health/cache 와 같다).
+요청 밖(스케줄러, 백그라운드 작업)에서 낸 쿼리는 라우트 지표에 들어가지 않는다.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Sequence
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true").lower() == "true"
+REQUEST_METRICS_DEBUG_HEADER = os.getenv("REQUEST_METRICS_DEBUG_HEADER", "false").lower() == "true"
+# 0 이면 끈다
+REQUEST_METRICS_QUERY_LOG_THRESHOLD = int(os.getenv("REQUEST_METRICS_QUERY_LOG_THRESHOLD", "0"))
+REQUEST_METRICS_SQL_MAX_CHARS = int(os.getenv("REQUEST_METRICS_SQL_MAX_CHARS", "200"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+ROW_BUCKETS = (0, 10, 100, 1000, 10000, 100000, 1000000)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+UNMATCHED_ROUTE = "unmatched"
+_METRICS_PATH = "/metrics"
+# pymysql SSCursor 등은 rowcount 가 -1 이거나 부호 없는 -1(2**64-1)이다
+_MAX_ROWCOUNT = 2**62
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class RequestSqlStats:
+    queries: int = 0
+    rows: int = 0
+    sql_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str = ""
+
+
+_current: ContextVar[RequestSqlStats | None] = ContextVar("request_sql_stats", default=None)
+
+
+def current_request_stats() -> RequestSqlStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_sql():
+    """요청 밖(스크립트·벤치마크)에서 블록 안 SQL 을 RequestSqlStats 하나로 모은다."""
+    stats = RequestSqlStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class _Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # 라벨 값 튜플 -> [버킷별 개수(비누적)..., +Inf 개수, 합]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, label_values: tuple[str, ...] = ()) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            base = [f'{k}="{_escape_label(v)}"' for k, v in zip(self.labels, label_values)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else format(bound, "g")
+                bucket_labels = ",".join(base + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {int(cumulative)}")
+            suffix = f"{{{','.join(base)}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{suffix} {int(cumulative)}")
+        return lines
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_lock = threading.Lock()
+_request_duration = _Histogram(
+    "api_request_duration_seconds", "HTTP request latency by route template.", LATENCY_BUCKETS,
+    ("method", "route", "status"),
+)
+_request_queries = _Histogram(
+    "api_request_sql_queries", "SQL statements executed per request.", QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+_request_rows = _Histogram(
+    "api_request_sql_rows", "Rows returned by SELECT statements per request.", ROW_BUCKETS, ("method", "route"),
+)
+_request_sql_seconds = _Histogram(
+    "api_request_sql_duration_seconds", "Time spent in SQL statements per request.", LATENCY_BUCKETS,
+    ("method", "route"),
+)
+_pool_wait = _Histogram(
+    "db_pool_checkout_wait_seconds", "Time to check a connection out of the SQLAlchemy pool (all callers).",
+    POOL_WAIT_BUCKETS,
+)
+_engine = None
+
+
+# ── SQLAlchemy 훅 ─────────────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("request_metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("request_metrics_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.sql_seconds += elapsed
+    if cursor.description is not None and 0 <= (cursor.rowcount or 0) < _MAX_ROWCOUNT:
+        stats.rows += cursor.rowcount
+    if elapsed > stats.slowest_seconds:
+        stats.slowest_seconds = elapsed
+        stats.slowest_statement = statement
+
+
+def _handle_error(exception_context):
+    # 실패한 문장은 after_cursor_execute 가 불리지 않으므로 시작 시각만 치운다.
+    conn = exception_context.connection
+    if conn is not None:
+        started = conn.info.get("request_metrics_start")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """engine 에 SQL 계측 훅을 단다 (api.database 에서 한 번)."""
+    global _engine
+    if not REQUEST_METRICS_ENABLED or engine is _engine:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _engine = engine
+
+
+class TimedQueuePool(QueuePool):
+    """체크아웃 대기 시간을 db_pool_checkout_wait_seconds 와 현재 요청 통계에 기록하는 QueuePool."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if REQUEST_METRICS_ENABLED:
+                waited = time.perf_counter() - started
+                with _lock:
+                    _pool_wait.observe(waited)
+                stats = _current.get()
+                if stats is not None:
+                    stats.pool_wait_seconds += waited
+
+
+# ── 요청 기록 ────────────────────────────────────────────────────
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def _one_line_sql(statement: str) -> str:
+    sql = _WHITESPACE.sub(" ", statement or "").strip()
+    if len(sql) > REQUEST_METRICS_SQL_MAX_CHARS:
+        sql = sql[: REQUEST_METRICS_SQL_MAX_CHARS] + "…"
+    return sql
+
+
+def _debug_headers(stats: RequestSqlStats) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (b"x-sql-queries", str(stats.queries).encode("ascii")),
+        (b"x-sql-time-ms", f"{stats.sql_seconds * 1000:.1f}".encode("ascii")),
+        (b"x-db-pool-wait-ms", f"{stats.pool_wait_seconds * 1000:.1f}".encode("ascii")),
+    ]
+    if stats.slowest_statement:
+        slowest = f"{stats.slowest_seconds * 1000:.1f}ms {_one_line_sql(stats.slowest_statement)}"
+        headers.append((b"x-sql-slowest", slowest.encode("ascii", "backslashreplace")))
+    return headers
+
+
+def record_request(method: str, route: str, status: int, elapsed: float, stats: RequestSqlStats) -> None:
+    with _lock:
+        _request_duration.observe(elapsed, (method, route, str(status)))
+        _request_queries.observe(stats.queries, (method, route))
+        _request_rows.observe(stats.rows, (method, route))
+        _request_sql_seconds.observe(stats.sql_seconds, (method, route))
+    if 0 < REQUEST_METRICS_QUERY_LOG_THRESHOLD <= stats.queries:
+        print(
+            f"⚠️ [request-metrics] {method} {route} {status}: SQL {stats.queries}회 "
+            f"{stats.sql_seconds * 1000:.1f}ms / 전체 {elapsed * 1000:.1f}ms, 행 {stats.rows} "
+            f"(최장 {stats.slowest_seconds * 1000:.1f}ms: {_one_line_sql(stats.slowest_statement)})"
+        )
+
+
+class RequestMetricsMiddleware:
+    """라우트별 지연·SQL 지표를 남기는 ASGI 미들웨어."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not REQUEST_METRICS_ENABLED or scope["path"] == _METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSqlStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if REQUEST_METRICS_DEBUG_HEADER:
+                    message = {**message, "headers": list(message.get("headers", [])) + _debug_headers(stats)}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            record_request(scope["method"], _route_template(scope), status, time.perf_counter() - started, stats)
+
+
+# ── /metrics ────────────────────────────────────────────────────
+def render_prometheus() -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        lines = []
+        for histogram in (_request_duration, _request_queries, _request_rows, _request_sql_seconds, _pool_wait):
+            lines.extend(histogram.render())
+    pool = getattr(_engine, "pool", None)
+    if isinstance(pool, QueuePool):
+        for name, help_text, value in (
+            ("db_pool_size", "Configured SQLAlchemy pool size.", pool.size()),
+            ("db_pool_checked_out", "Connections currently checked out.", pool.checkedout()),
+            ("db_pool_overflow", "Connections open beyond pool_size.", max(pool.overflow(), 0)),
+        ):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,234 @@
+"""
+대시보드 조회 API 응답 캐시.
+
+products 는 크롤 실행이 새 스냅샷을 커밋하거나 /manual-confirm, /delete, /card/generate 가 행을 고칠 때만
+바뀐다. 그래서 캐시 키에 "데이터 버전"을 넣는다.
+
+- 데이터 버전 = 완료 스냅샷 레지스트리 전체(행 수 + MAX(finished_at)) + cache_generation.generation
+  늦게 시작한 실행보다 먼저 시작한 실행이 나중에 커밋돼도(쿠팡 URL/브랜드 실행이 네이버 실행과 겹칠 때) 버전이 바뀐다.
+  (변경 API, 크롤러의 card_image_path 후반 업데이트, 파생 테이블을 다시 쓰는 backfill 스크립트가
+   같은 트랜잭션에서 generation 을 올린다 → 워커가 여러 개여도 같이 무효화)
+- 요청마다 버전 조회 1회(PK/인덱스 한 줄)만 하고, 버전이 같으면 저장된 응답을 그대로 돌려준다.
+- 저장소: 프로세스 내 LRU (기본) + RESPONSE_CACHE_REDIS_URL 지정 시 Redis 공유 저장소.
+  키에 버전이 들어가므로 예전 항목은 다시 읽히지 않고 TTL 로 정리된다.
+- TTL(RESPONSE_CACHE_TTL_SEC)은 응답에 담긴 presigned URL(1시간, 45분마다 재서명) 유효시간보다 짧게 둔다.
+
+버전 조회가 실패하면(테이블 없음 등) 캐시를 건너뛰고 바로 계산한다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, TypeVar
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+
+try:
+    import redis
+
+    _redis_import_error = None
+except Exception as e:
+    redis = None
+    _redis_import_error = e
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_TTL_SEC = int(os.getenv("RESPONSE_CACHE_TTL_SEC", "600"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+_REDIS_KEY_PREFIX = "libre2:resp:"
+
+KST = ZoneInfo("Asia/Seoul")
+PRODUCTS_GENERATION = "products"
+
+T = TypeVar("T")
+
+# 완료 스냅샷 행 수 + 마지막 커밋 시각. (status, finished_at) 인덱스만 읽는다.
+# 레지스트리가 비어 있는 구 DB(backfill 전)는 products 최신 수집 시각으로 대신한다.
+_DATA_VERSION_SQL = """
+SELECT
+    COALESCE(
+        (
+            SELECT CONCAT(NULLIF(COUNT(*), 0), '@', COALESCE(MAX(finished_at), '-'))
+            FROM snapshots
+            WHERE status = 'completed'
+        ),
+        (SELECT CAST(MAX(observed_at) AS CHAR) FROM products)
+    ) AS latest_snapshot,
+    (SELECT generation FROM cache_generation WHERE name = :name) AS generation
+"""
+
+_BUMP_GENERATION_SQL = """
+INSERT INTO cache_generation (name, generation) VALUES ({name}, 1)
+ON DUPLICATE KEY UPDATE generation = generation + 1
+"""
+
+
+def bump_generation(db, name: str = PRODUCTS_GENERATION) -> None:
+    """원본 행을 고친 트랜잭션 안에서 호출한다. 커밋은 호출자가 한다."""
+    db.execute(text(_BUMP_GENERATION_SQL.format(name=":name")), {"name": name})
+
+
+def bump_generation_cursor(cursor, name: str = PRODUCTS_GENERATION) -> None:
+    """bump_generation 의 DB-API 커서(pymysql / mysql.connector) 판. 크롤러 / backfill 스크립트용."""
+    cursor.execute(_BUMP_GENERATION_SQL.format(name="%(name)s"), {"name": name})
+
+
+def data_version(db) -> str:
+    row = db.execute(text(_DATA_VERSION_SQL), {"name": PRODUCTS_GENERATION}).first()
+    latest, generation = (row[0], row[1]) if row is not None else (None, None)
+    return f"{latest or '-'}#{int(generation or 0)}"
+
+
+class _ResponseCache:
+    def __init__(self, max_entries: int, ttl_sec: int, redis_url: str):
+        self._max_entries = max(1, max_entries)
+        self._ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._version: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._redis = None
+        self._redis_error: str | None = None
+        if redis_url:
+            if _redis_import_error is not None:
+                self._redis_error = f"redis import failed: {_redis_import_error}"
+            else:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+
+    def _observe_version(self, version: str) -> None:
+        # 버전이 바뀌면 예전 버전 항목은 다시 쓰일 일이 없으므로 로컬 LRU 를 비운다.
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: str, version: str) -> tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._observe_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(_REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                self.errors += 1
+                self._redis_error = str(e)[:200]
+                raw = None
+            if raw is not None:
+                value = pickle.loads(raw)
+                self._store_local(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return True, value
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _store_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: str, value: Any) -> None:
+        self._store_local(key, value)
+        if self._redis is not None:
+            try:
+                self._redis.set(
+                    _REDIS_KEY_PREFIX + key,
+                    pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                    ex=self._ttl_sec,
+                )
+            except Exception as e:
+                self.errors += 1
+                self._redis_error = str(e)[:200]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": RESPONSE_CACHE_ENABLED,
+                "backend": "memory+redis" if self._redis is not None else "memory",
+                "data_version": self._version,
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_sec": self._ttl_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+                "redis_error": self._redis_error,
+            }
+
+
+_cache = _ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SEC, RESPONSE_CACHE_REDIS_URL)
+
+
+def _cache_key(endpoint: str, params: dict[str, Any], version: str) -> str:
+    # 오늘 날짜(KST)를 넣어 /today, 최근 N일 조회가 자정을 넘기면 자연히 새 키가 되게 한다.
+    payload = json.dumps(
+        [endpoint, params, datetime.now(KST).strftime("%Y-%m-%d"), version],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def cached_response(db, endpoint: str, params: dict[str, Any], compute: Callable[[], T]) -> T:
+    """
+    (endpoint, params, 데이터 버전) 키로 compute() 결과를 캐시한다.
+    compute 가 예외를 던지면 저장하지 않는다. 반환값은 여러 요청이 공유하므로 호출자가 고치면 안 된다.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return compute()
+    try:
+        version = data_version(db)
+    except Exception as e:
+        _cache.errors += 1
+        print(f"⚠️ response cache version lookup failed (bypassing cache): {e}")
+        return compute()
+
+    key = _cache_key(endpoint, params, version)
+    hit, value = _cache.get(key, version)
+    if hit:
+        return value
+    value = compute()
+    _cache.put(key, value)
+    return value
+
+
+def clear_response_cache() -> None:
+    _cache.clear()
+
+
+def response_cache_stats() -> dict[str, Any]:
+    return _cache.stats()
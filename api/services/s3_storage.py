@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import importlib.util
 import mimetypes
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from urllib.parse import quote, unquote, urlparse
 
-import boto3
-
 import config
 
+# boto3 는 import 비용이 커서(botocore 데이터 로딩) client 를 처음 만들 때 import 한다.
+# 미설치 여부는 여기서 바로 알린다 (라우터의 가용성 체크가 import 시점 ImportError 에 기대므로).
+if importlib.util.find_spec("boto3") is None:
+    raise ImportError("No module named 'boto3'")
+
 
 def is_s3_enabled() -> bool:
     if not config.ENABLE_S3_UPLOAD:
@@ -28,7 +35,19 @@ def _build_public_url(object_key: str) -> str:
     return f"https://{bucket}.s3.{region}.amazonaws.com/{encoded_key}"
 
 
-def _s3_client():
+# boto3 client는 생성 비용이 크고(세션/엔드포인트 로딩) thread-safe 하므로 프로세스당 하나만 둔다.
+_client = None
+_client_lock = threading.Lock()
+
+# presigned URL 캐시: (object key, expires_in) -> (url, 재발급 시각). 만료 전에 새로 서명한다.
+_PRESIGN_CACHE_MAX = 10000
+_presign_cache: OrderedDict[tuple[str, int], tuple[str, float]] = OrderedDict()
+_presign_lock = threading.Lock()
+
+
+def _new_s3_client():
+    import boto3
+
     client_kwargs = {"region_name": config.AWS_REGION}
     if config.AWS_ACCESS_KEY_ID and config.AWS_SECRET_ACCESS_KEY:
         client_kwargs["aws_access_key_id"] = config.AWS_ACCESS_KEY_ID
@@ -38,6 +57,24 @@ def _s3_client():
     return boto3.client("s3", **client_kwargs)
 
 
+def _s3_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _new_s3_client()
+    return _client
+
+
+def reset_s3_client() -> None:
+    """설정(config) 변경 후 client / presign 캐시를 다시 만들게 한다."""
+    global _client
+    with _client_lock:
+        _client = None
+    with _presign_lock:
+        _presign_cache.clear()
+
+
 def extract_object_key(value: str | None) -> str | None:
     """
     card_image_path 값(객체 키 또는 URL)에서 S3 object key를 추출한다.
@@ -83,6 +120,7 @@ def extract_object_key(value: str | None) -> str | None:
 def generate_presigned_url(value: str, *, expires_in: int = 3600) -> str | None:
     """
     object key 또는 S3 URL을 받아 presigned GET URL을 반환한다.
+    같은 key는 유효기간의 3/4 동안 캐시된 URL을 재사용한다.
     """
     if not is_s3_enabled():
         return None
@@ -91,9 +129,16 @@ def generate_presigned_url(value: str, *, expires_in: int = 3600) -> str | None:
     if not key:
         return None
 
-    client = _s3_client()
+    cache_key = (key, int(expires_in))
+    now = time.monotonic()
+    with _presign_lock:
+        cached = _presign_cache.get(cache_key)
+        if cached is not None and cached[1] > now:
+            _presign_cache.move_to_end(cache_key)
+            return cached[0]
+
     try:
-        return client.generate_presigned_url(
+        url = _s3_client().generate_presigned_url(
             "get_object",
             Params={"Bucket": config.S3_BUCKET, "Key": key},
             ExpiresIn=expires_in,
@@ -101,6 +146,33 @@ def generate_presigned_url(value: str, *, expires_in: int = 3600) -> str | None:
     except Exception:
         return None
 
+    # 남은 유효기간이 1/4 아래로 떨어지기 전에 재서명해, 응답으로 나간 URL이 최소 그만큼은 유효하게 한다.
+    refresh_at = now + expires_in * 0.75
+    with _presign_lock:
+        _presign_cache[cache_key] = (url, refresh_at)
+        _presign_cache.move_to_end(cache_key)
+        while len(_presign_cache) > _PRESIGN_CACHE_MAX:
+            _presign_cache.popitem(last=False)
+    return url
+
+
+def to_display_image_url(value: str | None, *, expires_in: int = 3600) -> str | None:
+    """
+    S3 private 객체는 presigned URL로 바꿔서 내려준다.
+    외부 이미지 URL(네이버 썸네일 등)은 원본 유지. products / memos 라우터 공용.
+    """
+    raw = (value or "").strip()
+    if not raw:
+        return None
+
+    if is_s3_enabled():
+        key = extract_object_key(raw)
+        if key:
+            signed = generate_presigned_url(key, expires_in=expires_in)
+            if signed:
+                return signed
+    return raw
+
 
 def upload_bytes(*, content: bytes, object_key: str, content_type: str | None = None) -> str:
     client = _s3_client()
@@ -0,0 +1,219 @@
+"""
+크롤링 실행(스냅샷) 레지스트리.
+
+- 크롤러(save_to_db)가 products INSERT 와 같은 트랜잭션에서 snapshots 행을 기록한다.
+  (PRODUCTS_STORAGE_MODE=intervals 면 가격 구간 반영과 같은 트랜잭션에서 register_snapshot_streams 로 기록한다.)
+  커밋 전에는 레지스트리에도 보이지 않으므로 API가 반쯤 들어간 실행을 집지 않는다.
+- 한 실행 안에서 (market, channel) 조합마다 한 행을 둔다.
+  (네이버 실행에는 channel=coupang 마켓플레이스 행이 섞여 있어 채널별 "최신"이 달라질 수 있다.)
+- "최신 스냅샷"은 (status, market|channel, started_at) 인덱스 한 번으로 찾는다.
+  레지스트리가 비어 있는 구 DB(backfill 전)는 products 정렬 쿼리로 폴백한다.
+- 레지스트리에서 찾은 스냅샷은 그 실행 전체의 MIN(started_at)(= 행들의 MIN(observed_at))도 돌려준다.
+  snapshot_filter_sql 이 observed_at 하한으로 붙여 products 가 월 파티션이면 지난 달 파티션을 건너뛴다.
+
+기록 SQL은 pyformat(%(name)s) 파라미터라 pymysql / mysql.connector 커서 모두에서 실행된다.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+STATUS_COMPLETED = "completed"
+
+# snapshot_at(= started_at)은 products.observed_at 과 같은 값이라 그대로 비교에 쓴다.
+_UPSERT_FROM_PRODUCTS_SQL = """
+INSERT INTO snapshots (
+    snapshot_id, market, channel, started_at, finished_at, row_count, status
+)
+SELECT
+    snapshot_id,
+    COALESCE(NULLIF(TRIM(market), ''), '스마트스토어') AS market_std,
+    COALESCE(NULLIF(TRIM(channel), ''), 'naver') AS channel_std,
+    MIN(observed_at),
+    MAX(created_at),
+    COUNT(*),
+    %(status)s
+FROM products
+WHERE snapshot_id {snapshot_filter}
+GROUP BY snapshot_id, market_std, channel_std
+ON DUPLICATE KEY UPDATE
+    started_at = VALUES(started_at),
+    finished_at = VALUES(finished_at),
+    row_count = VALUES(row_count),
+    status = VALUES(status)
+"""
+
+
+def register_snapshot(cursor, snapshot_id: str, *, status: str = STATUS_COMPLETED) -> int:
+    """
+    방금 INSERT 한 snapshot_id 행을 (market, channel) 별로 집계해 레지스트리에 기록한다.
+    cursor는 DB-API 커서. 커밋은 호출자가 products INSERT 와 함께 한다.
+    """
+    cursor.execute(
+        _UPSERT_FROM_PRODUCTS_SQL.format(snapshot_filter="= %(snapshot_id)s"),
+        {"snapshot_id": snapshot_id, "status": status},
+    )
+    return int(cursor.rowcount or 0)
+
+
+def register_snapshot_streams(
+    cursor,
+    snapshot_id: str,
+    started_at,
+    row_counts: dict[tuple[str, str], int],
+    *,
+    status: str = STATUS_COMPLETED,
+) -> int:
+    """
+    products 를 거치지 않는 저장 방식(PRODUCTS_STORAGE_MODE=intervals)용 등록.
+    row_counts: {(market, channel): 행 수}. finished_at 은 등록(= 커밋 직전) 시각이다.
+    """
+    registered = 0
+    for (market, channel), row_count in sorted(row_counts.items()):
+        cursor.execute(
+            """
+            INSERT INTO snapshots (
+                snapshot_id, market, channel, started_at, finished_at, row_count, status
+            ) VALUES (
+                %(snapshot_id)s, %(market)s, %(channel)s, %(started_at)s, NOW(), %(row_count)s, %(status)s
+            )
+            ON DUPLICATE KEY UPDATE
+                started_at = VALUES(started_at),
+                finished_at = VALUES(finished_at),
+                row_count = VALUES(row_count),
+                status = VALUES(status)
+            """,
+            {
+                "snapshot_id": snapshot_id,
+                "market": market,
+                "channel": channel,
+                "started_at": started_at,
+                "row_count": int(row_count),
+                "status": status,
+            },
+        )
+        registered += int(cursor.rowcount or 0)
+    return registered
+
+
+def backfill_snapshots(cursor) -> int:
+    """snapshot_id 가 있는 과거 products 전체로 레지스트리를 (재)생성한다."""
+    cursor.execute(
+        _UPSERT_FROM_PRODUCTS_SQL.format(snapshot_filter="IS NOT NULL"),
+        {"status": STATUS_COMPLETED},
+    )
+    return int(cursor.rowcount or 0)
+
+
+def _registry_is_empty(db: Session) -> bool:
+    return db.execute(text("SELECT 1 FROM snapshots LIMIT 1")).first() is None
+
+
+def latest_snapshot(
+    db: Session,
+    *,
+    market: str | None = None,
+    exclude_market: str | None = None,
+    channel: str | None = None,
+) -> dict[str, Any] | None:
+    """
+    조건에 맞는 가장 최근 완료 스냅샷.
+    반환: {"snapshot_id": str | None, "snapshot_time": datetime, "observed_from": datetime | None} 또는 None
+    snapshot_id 가 None 이면 snapshot_id 없는 구 데이터이며 snapshot_time 한 점으로 묶는다.
+    observed_from 은 그 snapshot_id 행들의 observed_at 하한 (레지스트리에서 찾았을 때만).
+    """
+    where = ["status = :status"]
+    params: dict[str, Any] = {"status": STATUS_COMPLETED}
+    if market:
+        where.append("market = :market")
+        params["market"] = market
+    if exclude_market:
+        where.append("market <> :exclude_market")
+        params["exclude_market"] = exclude_market
+    if channel:
+        where.append("channel = :channel")
+        params["channel"] = channel
+
+    row = db.execute(
+        text(
+            f"""
+            SELECT
+                snapshot_id,
+                started_at AS snapshot_time,
+                (
+                    SELECT MIN(s2.started_at) FROM snapshots s2 WHERE s2.snapshot_id = snapshots.snapshot_id
+                ) AS observed_from
+            FROM snapshots
+            WHERE {" AND ".join(where)}
+            ORDER BY started_at DESC, snapshot_id DESC
+            LIMIT 1
+            """
+        ),
+        params,
+    ).mappings().first()
+    if row is not None:
+        return dict(row)
+    if not _registry_is_empty(db):
+        return None
+    return _latest_snapshot_from_products(
+        db, market=market, exclude_market=exclude_market, channel=channel
+    )
+
+
+def _latest_snapshot_from_products(
+    db: Session,
+    *,
+    market: str | None,
+    exclude_market: str | None,
+    channel: str | None,
+) -> dict[str, Any] | None:
+    """레지스트리 backfill 전 폴백: products 를 직접 정렬한다 (기존 방식)."""
+    where = ["1 = 1"]
+    params: dict[str, Any] = {}
+    if market:
+        where.append("market = :market")
+        params["market"] = market
+    if exclude_market:
+        where.append("market != :exclude_market")
+        params["exclude_market"] = exclude_market
+    if channel:
+        where.append(
+            "(channel = :channel "
+            "OR (:channel = 'naver' AND (channel IS NULL OR TRIM(channel) = '')))"
+        )
+        params["channel"] = channel
+
+    row = db.execute(
+        text(
+            f"""
+            SELECT snapshot_id, observed_at AS snapshot_time
+            FROM products
+            WHERE {" AND ".join(where)}
+            ORDER BY observed_at DESC, id DESC
+            LIMIT 1
+            """
+        ),
+        params,
+    ).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def snapshot_filter_sql(latest: dict[str, Any] | None, alias: str = "p") -> tuple[str, dict[str, Any]]:
+    """
+    latest_snapshot() 결과를 products WHERE 조건으로 바꾼다.
+    OR 없이 한 쪽 조건만 만들어 idx_snapshot_id / idx_observed_at 을 그대로 탄다.
+    observed_from 이 있으면 observed_at 하한을 덧붙인다 (결과는 같고, 월 파티션 pruning 용).
+    """
+    if latest is None:
+        return "1 = 0", {}
+    if latest.get("snapshot_id"):
+        params = {"latest_snapshot_id": latest["snapshot_id"]}
+        where = f"{alias}.snapshot_id = :latest_snapshot_id"
+        if latest.get("observed_from"):
+            where += f" AND {alias}.observed_at >= :latest_observed_from"
+            params["latest_observed_from"] = latest["observed_from"]
+        return where, params
+    return f"{alias}.observed_at = :latest_snapshot_time", {"latest_snapshot_time": latest["snapshot_time"]}
@@ -0,0 +1,358 @@
+"""
+상품명 분류 / 센서 수량 파싱 (크롤러 공용).
+
+crawl_naver, crawl_coupang, crawl_coupang_urls, crawl_coupang_brand, cleanup_non_libre_products 가
+각자 들고 있던 리브레2 대상 판별 / 수량 파싱 규칙을 한곳에 모았다.
+
+- 패턴은 import 시 한 번 컴파일한다. "하나라도 맞으면" 판정(대상/제외 모델)은 한 정규식의 alternation 으로
+  합쳐 제목당 search 1회로 끝낸다. 순서가 결과를 바꾸는 규칙(사은품 제거 → 센서 수량 → 일반 수량)은
+  기존 순서를 그대로 유지한다.
+- 결과는 순수 함수라 LRU 로 메모한다 (TITLE_PARSER_CACHE_SIZE, 기본 20000).
+  같은 제목이 매 실행 / 여러 키워드 페이지에 반복되고, 스케줄러가 API 프로세스 안에서 크롤을 돌리면
+  실행 간에도 캐시가 이어진다.
+  - 제목 파싱: (제목, 총가격) 키. 링크와 무관하다.
+  - 링크 규칙(링크별 수량 고정, 정규화 링크 키): 링크 키.
+  - 대시보드 수동확정 수량 맵은 실행마다 바뀌므로 메모하지 않고 호출 시 조회한다.
+
+규칙을 바꾸면 `python scripts/check_title_parser.py` 로 골든 파일(scripts/title_parser_golden.json)과
+비교하고, 의도한 변경이면 --update 로 갱신한다.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import urllib.parse
+from functools import lru_cache
+from typing import Optional, Tuple
+
+TITLE_PARSER_CACHE_SIZE = int(os.getenv("TITLE_PARSER_CACHE_SIZE", "20000"))
+
+LIBRE2_INCLUDE_PATTERNS = [
+    r"프리스타일\s*리브레\s*2",
+    r"리브레\s*2",
+    r"freestyle\s*libre\s*2",
+    r"libre\s*2",
+]
+
+NON_LIBRE_CGM_EXCLUDE_PATTERNS = [
+    r"덱스콤",
+    r"dexcom",
+    r"\bg\s*7\b",
+    r"\bg7\b",
+    r"가디언",
+    r"guardian",
+    r"케어센스\s*에어",
+]
+
+# 수량 파싱 결과 정상 단가 범위 / 기준 단가
+MIN_UNIT_PRICE, MAX_UNIT_PRICE = 65000, 180000
+REFERENCE_UNIT_PRICE = 90000
+
+
+def _any_of(patterns, flags=re.IGNORECASE) -> re.Pattern:
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+_LIBRE2_INCLUDE_RE = _any_of(LIBRE2_INCLUDE_PATTERNS)
+_NON_LIBRE_CGM_RE = _any_of(NON_LIBRE_CGM_EXCLUDE_PATTERNS)
+
+# 1. 사은품/증정품 관련 구문 제거 (앞 규칙이 지운 결과에 다음 규칙을 적용하므로 순서 유지)
+_GIFT_RES = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\+\s*패치\s*\d+\s*(개|매|장|팩|박스)?",
+        r"패치\s*\d+\s*(개|매|장|팩|박스)?\s*(증정|사은품|포함)?",
+        r"\+\s*알콜\s*(솜|스왑|스웹)?\s*\d+\s*(개|매|장|팩|박스)?",
+        r"알콜\s*(솜|스왑|스웹)?\s*\d+\s*(개|매|장|팩|박스)?\s*(증정|사은품|포함)?",
+        r"\+\s*방수\s*(필름|패치)?\s*\d+\s*(개|매|장|팩|박스)?",
+        r"방수\s*(필름|패치)?\s*\d+\s*(개|매|장|팩|박스)?\s*(증정|사은품|포함)?",
+        r"아메리카노\s*\d+\s*(개|잔)?",
+        r"커피\s*\d+\s*(개|잔)?",
+        r"멤버십\s*\d+\s*일",
+        r"\d+\s*일\s*(체험|멤버십)",
+        r"유효기간\s*\d+\s*일",
+        r"사은품[^+]*",
+        r"증정[^+]*",
+    )
+)
+
+# 2. 센서/측정기 수량 (앞 패턴 우선)
+_SENSOR_QTY_RES = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(측정기|센서|리브레\s*2?)\s*(\d+)\s*(개입|세트|팩|박스|개(?!\s*[인용]))",
+        r"(\d+)\s*(개입|세트|팩|박스|개(?!\s*[인용]))\s*(측정기|센서)",
+        r"(측정기|센서|리브레)\s*[xX*]\s*(\d+)",
+    )
+)
+
+# 3. 일반 수량 후보
+_QTY_UNIT_RE = re.compile(r"[\s](\d+)\s*(개입|세트|팩|박스|ea|set|개(?!\s*[인용]))", re.IGNORECASE)
+_QTY_MUL_RE = re.compile(r"[xX*]\s*(\d+)")
+
+# 쿠팡 파트너스 API 상품(crawl_coupang)용 축약 규칙
+_COUPANG_API_GIFT_RES = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"사은품[^+]*",
+        r"증정[^+]*",
+        r"\+\s*패치\s*\d+\s*(개|매|장)?",
+        r"\+\s*알콜\s*(솜|스왑|스웹)?\s*\d+\s*(개|매|장)?",
+    )
+)
+_COUPANG_API_QTY_UNIT_RE = re.compile(r"[\s](\d+)\s*(개|개입|세트|팩|박스|ea|set)", re.IGNORECASE)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_COUPANG_CORE_EN_RE = re.compile(r"freestyle\s*libre\s*2", re.IGNORECASE)
+_COUPANG_QTY_RE = re.compile(r"\b\d+\s*개\b")
+_SENSOR_PACK_RE = re.compile(r"센서\s*\d+\s*(개|팩|세트|박스)")
+
+
+# ── 대상 판별 ──────────────────────────────────────────────────────
+@lru_cache(maxsize=TITLE_PARSER_CACHE_SIZE)
+def _is_target_text(text: str) -> bool:
+    if not text:
+        return False
+    # 덱스콤/가디언 등 타 CGM 모델을 먼저 제외한다.
+    if _NON_LIBRE_CGM_RE.search(text):
+        return False
+    return _LIBRE2_INCLUDE_RE.search(text) is not None
+
+
+def is_target_libre2_product(title: str) -> bool:
+    return _is_target_text((title or "").strip())
+
+
+def is_non_libre_cgm(title: str) -> bool:
+    """덱스콤 / G7 / 가디언 / 케어센스 에어 등 타 CGM 모델명이 들어간 제목."""
+    return _NON_LIBRE_CGM_RE.search(title or "") is not None
+
+
+def is_allowed_coupang_libre2_title(title: str) -> bool:
+    """
+    네이버 OpenAPI 결과 중 쿠팡 채널로 분류된 항목은
+    아래 핵심 타이틀 패턴만 허용한다.
+    - "애보트 프리스타일 리브레2 연속 혈당측정기 FreeStyle Libre 2 n개"
+    """
+    text = _WHITESPACE_RE.sub(" ", (title or "").strip())
+    if not text:
+        return False
+
+    has_core_ko = "애보트 프리스타일 리브레2 연속 혈당측정기" in text
+    has_core_en = _COUPANG_CORE_EN_RE.search(text) is not None
+    has_qty = _COUPANG_QTY_RE.search(text) is not None
+    return has_core_ko and has_core_en and has_qty
+
+
+def has_sensor_pack_quantity(title: str) -> bool:
+    """"센서 N개/팩/세트/박스" 표기 (액세서리 키워드가 있어도 본품으로 본다)."""
+    return _SENSOR_PACK_RE.search(title or "") is not None
+
+
+# ── 링크 규칙 ──────────────────────────────────────────────────────
+@lru_cache(maxsize=TITLE_PARSER_CACHE_SIZE)
+def canonical_product_link_key(link: str) -> str:
+    """동일 상품 URL 매칭용(호스트 소문자·www 제거·쿼리 정렬)."""
+    if not (link or "").strip():
+        return ""
+    raw = urllib.parse.urldefrag(link.strip())[0].strip()
+    try:
+        u = urllib.parse.urlparse(raw)
+        scheme = (u.scheme or "https").lower()
+        netloc = (u.netloc or "").lower()
+        if netloc.startswith("www."):
+            netloc = netloc[4:]
+        path = u.path or ""
+        pairs = urllib.parse.parse_qsl(u.query, keep_blank_values=True)
+        pairs.sort(key=lambda x: (x[0].lower(), x[1]))
+        query = urllib.parse.urlencode(pairs)
+        return urllib.parse.urlunsplit((scheme, netloc, path, query, ""))
+    except Exception:
+        return raw
+
+
+@lru_cache(maxsize=TITLE_PARSER_CACHE_SIZE)
+def fixed_quantity_for_product_link(link: str) -> Optional[int]:
+    """
+    상품명 파싱이 반복 오판하는 특정 URL은 수량을 고정한다.
+    (예: 옥션/지마켓 일부 상품이 사은품 문구 때문에 3개로 잡히는 경우)
+    """
+    if not (link or "").strip():
+        return None
+    try:
+        u = urllib.parse.urlparse(link.strip())
+        host = (u.netloc or "").lower()
+        raw_qs = urllib.parse.parse_qs(u.query, keep_blank_values=True)
+        q = {k.lower(): v for k, v in raw_qs.items()}
+
+        if "auction.co.kr" in host:
+            for v in q.get("itemno") or []:
+                if str(v).strip().upper() == "F208273220":
+                    return 2
+
+        if "gmarket.co.kr" in host:
+            for v in q.get("goodscode") or []:
+                if str(v).strip() == "4407378380":
+                    return 2
+    except Exception:
+        return None
+    return None
+
+
+# ── 수량 파싱 ──────────────────────────────────────────────────────
+def _sensor_qty(clean_title: str) -> Tuple[Optional[int], bool]:
+    """(센서 수량, 텍스트에서 찾았는지). "센서 0개" 처럼 0 이 잡히면 (0, False) 로 남는다."""
+    sensor_qty = None
+    for pattern in _SENSOR_QTY_RES:
+        match = pattern.search(clean_title)
+        if match:
+            for group in match.groups():
+                if group and group.isdigit():
+                    sensor_qty = int(group)
+                    break
+            if sensor_qty:
+                return sensor_qty, True
+    return sensor_qty, False
+
+
+def _extract_qty_candidates(text: str):
+    qty_candidates = [int(m[0]) for m in _QTY_UNIT_RE.findall(text)]
+    qty_candidates.extend(int(m) for m in _QTY_MUL_RE.findall(text))
+    # 지나치게 큰 값/0은 노이즈로 간주
+    return [q for q in qty_candidates if 1 <= q <= 20]
+
+
+def _pick_best_qty(candidates, total_price_value, min_price, max_price):
+    unique = sorted(set(candidates))
+    if not unique:
+        return None
+
+    valid = []
+    for q in unique:
+        unit = total_price_value // q if q > 0 else total_price_value
+        if min_price <= unit <= max_price:
+            valid.append((q, unit))
+
+    if valid:
+        # 정상 단가 범위 중 90,000원에 가장 가까운 수량을 우선
+        valid.sort(key=lambda x: (abs(x[1] - REFERENCE_UNIT_PRICE), x[0]))
+        return valid[0][0]
+
+    # 범위를 만족하는 후보가 없으면 기존처럼 첫 후보 대신 최소 수량 사용
+    return unique[0]
+
+
+@lru_cache(maxsize=TITLE_PARSER_CACHE_SIZE)
+def analyze_title(title: str, total_price: int) -> Tuple[int, int, str]:
+    """
+    상품명에서 센서 수량과 단가를 분석 → (수량, 단가, calc_method)
+
+    핵심: 센서/측정기 수량만 추출, 사은품(패치, 알콜솜 등)은 무시
+    """
+    clean_title = title
+    for pattern in _GIFT_RES:
+        clean_title = pattern.sub(" ", clean_title)
+
+    sensor_qty, qty_from_text = _sensor_qty(clean_title)
+
+    # 센서 수량을 못 찾으면 일반 패턴으로 추출
+    if sensor_qty is None:
+        qty_candidates = _extract_qty_candidates(clean_title)
+        if not qty_candidates:
+            # 사은품 제거 과정에서 메인 수량까지 지워지는 케이스 보정
+            qty_candidates = _extract_qty_candidates(title)
+
+        picked_qty = _pick_best_qty(qty_candidates, total_price, MIN_UNIT_PRICE, MAX_UNIT_PRICE)
+        if picked_qty is not None:
+            sensor_qty = picked_qty
+            qty_from_text = True
+        else:
+            sensor_qty = 1
+            qty_from_text = False
+
+    # 단가 계산 및 검증
+    calc_unit_price = total_price // sensor_qty if sensor_qty > 0 else total_price
+
+    if MIN_UNIT_PRICE <= calc_unit_price <= MAX_UNIT_PRICE:
+        return sensor_qty, calc_unit_price, "텍스트분석"
+
+    if qty_from_text:
+        return sensor_qty, calc_unit_price, "텍스트분석(범위초과)"
+
+    estimated_qty = round(total_price / REFERENCE_UNIT_PRICE) or 1
+    recalc_price = total_price // estimated_qty if estimated_qty > 0 else total_price
+
+    if MIN_UNIT_PRICE <= recalc_price <= MAX_UNIT_PRICE:
+        return estimated_qty, recalc_price, "가격역산(보정)"
+    return sensor_qty, calc_unit_price, "확인필요"
+
+
+def analyze_product(title, total_price, link=None, confirmed_qty_by_link=None) -> Tuple[int, int, str]:
+    """링크별 고정 수량 → 대시보드 수동확정 수량 → 제목 파싱 순으로 (수량, 단가, calc_method) 를 정한다."""
+    fixed_qty = fixed_quantity_for_product_link(link or "")
+    if fixed_qty is not None and fixed_qty > 0:
+        calc_unit_price = total_price // fixed_qty
+        return fixed_qty, calc_unit_price, f"링크별수량고정({fixed_qty}개)"
+
+    if confirmed_qty_by_link:
+        lk = (link or "").strip()
+        if lk:
+            cq = confirmed_qty_by_link.get(canonical_product_link_key(lk))
+            if cq is None:
+                cq = confirmed_qty_by_link.get(lk)
+            if cq is not None:
+                q = int(cq)
+                if q > 0:
+                    calc_unit_price = total_price // q
+                    return q, calc_unit_price, "수동확인(완료·링크재사용)"
+
+    return analyze_title(title, total_price)
+
+
+@lru_cache(maxsize=TITLE_PARSER_CACHE_SIZE)
+def analyze_coupang_api_title(title: str, total_price: int) -> Tuple[int, int, str]:
+    """쿠팡 파트너스 API 상품용: 첫 수량 후보를 쓰고, 없으면 1개로 본다."""
+    clean_title = title or ""
+    for pattern in _COUPANG_API_GIFT_RES:
+        clean_title = pattern.sub(" ", clean_title)
+
+    sensor_qty, qty_from_text = _sensor_qty(clean_title)
+
+    if sensor_qty is None:
+        candidates = [int(x[0]) for x in _COUPANG_API_QTY_UNIT_RE.findall(clean_title)]
+        candidates.extend(int(x) for x in _QTY_MUL_RE.findall(clean_title))
+        if candidates:
+            sensor_qty = candidates[0]
+            qty_from_text = True
+        else:
+            sensor_qty = 1
+            qty_from_text = False
+
+    unit_price = total_price // sensor_qty if sensor_qty > 0 else total_price
+    how = "텍스트분석" if qty_from_text else "기본(1개)"
+    return sensor_qty, unit_price, how
+
+
+def title_parser_cache_info() -> dict:
+    return {
+        name: fn.cache_info()._asdict()
+        for name, fn in (
+            ("analyze_title", analyze_title),
+            ("analyze_coupang_api_title", analyze_coupang_api_title),
+            ("is_target", _is_target_text),
+            ("canonical_link", canonical_product_link_key),
+            ("fixed_quantity", fixed_quantity_for_product_link),
+        )
+    }
+
+
+def clear_title_parser_cache() -> None:
+    for fn in (
+        analyze_title,
+        analyze_coupang_api_title,
+        _is_target_text,
+        canonical_product_link_key,
+        fixed_quantity_for_product_link,
+    ):
+        fn.cache_clear()
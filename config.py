@@ -20,6 +20,16 @@ DB_PASSWORD = os.getenv("MYSQLPASSWORD") or os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("MYSQLDATABASE") or os.getenv("DB_NAME")
 DB_TABLE = os.getenv("DB_TABLE", "products")
 
+# products 저장 방식 (api/services/price_intervals.py)
+# rows: 실행마다 리스팅별 행을 products 에 INSERT (기본)
+# intervals: products INSERT 대신 가격 구간만 저장하고, 조회는 products_by_snapshot 뷰에서 한다.
+#            전환 전 `python -m scripts.backfill_price_intervals` 로 기존 이력을 옮긴다.
+PRODUCTS_STORAGE_MODE = os.getenv("PRODUCTS_STORAGE_MODE", "rows").strip().lower()
+if PRODUCTS_STORAGE_MODE not in ("rows", "intervals"):
+    raise ValueError(f"PRODUCTS_STORAGE_MODE must be rows or intervals: {PRODUCTS_STORAGE_MODE!r}")
+# 조회 SQL 이 읽는 테이블(또는 뷰) 이름
+PRODUCTS_SOURCE = "products_by_snapshot" if PRODUCTS_STORAGE_MODE == "intervals" else DB_TABLE
+
 ENABLE_DB_SAVE = os.getenv("ENABLE_DB_SAVE", "false").lower() == "true"
 ENABLE_CARD_RENDER = os.getenv("ENABLE_CARD_RENDER", "false").lower() == "true"
 ENABLE_S3_UPLOAD = os.getenv("ENABLE_S3_UPLOAD", "false").lower() == "true"
@@ -0,0 +1,43 @@
+"""Migrate manual quantity confirmations in products history into link_quantity_overrides.
+
+Keys that already exist (confirmed on the dashboard after the table was introduced) are kept.
+
+Usage:
+  python scripts/backfill_link_overrides.py
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+from api.database import engine, init_db
+from api.services.link_overrides import backfill_link_overrides
+
+
+def main():
+    init_db()
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        t0 = time.perf_counter()
+        keys, inserted = backfill_link_overrides(cur, config.PRODUCTS_SOURCE)
+        raw.commit()
+        cur.close()
+        print(
+            f"✅ link_quantity_overrides backfill 완료: 이력 키 {keys}개, 신규 {inserted}개 "
+            f"({time.perf_counter() - t0:.1f}s)"
+        )
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Rebuild the mall_daily_price rollup from products.
+
+Usage:
+  python scripts/backfill_mall_daily_price.py                 # 전체 기간
+  python scripts/backfill_mall_daily_price.py --start 2026-01-01 --end 2026-01-31
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.database import engine, init_db
+from api.services.mall_daily_price import refresh_mall_daily_price
+from api.services.response_cache import bump_generation_cursor
+
+
+def _parse_date(value: str) -> date:
+    y, m, d = (int(x) for x in value.split("-"))
+    return date(y, m, d)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", help="YYYY-MM-DD (기본: products 최초 일자)")
+    parser.add_argument("--end", help="YYYY-MM-DD (기본: products 최종 일자)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="한 트랜잭션에서 재집계할 일수")
+    args = parser.parse_args()
+
+    init_db()
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("SELECT MIN(DATE(created_at)), MAX(DATE(created_at)) FROM products")
+        first_day, last_day = cur.fetchone()
+        if first_day is None:
+            print("products 테이블이 비어 있습니다.")
+            return
+
+        start = _parse_date(args.start) if args.start else first_day
+        end = _parse_date(args.end) if args.end else last_day
+        chunk = max(1, args.chunk_days)
+
+        total = 0
+        t0 = time.perf_counter()
+        cursor_day = start
+        while cursor_day <= end:
+            chunk_end = min(cursor_day + timedelta(days=chunk - 1), end)
+            rows = refresh_mall_daily_price(cur, start_date=cursor_day, end_date=chunk_end)
+            bump_generation_cursor(cur)
+            raw.commit()
+            total += rows
+            print(f"  {cursor_day} ~ {chunk_end}: {rows} rows")
+            cursor_day = chunk_end + timedelta(days=1)
+
+        cur.close()
+        print(f"✅ mall_daily_price backfill 완료: {total} rows ({time.perf_counter() - t0:.1f}s)")
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Fill products.mall_id for rows saved before the malls dimension existed.
+
+판매처명을 malls / mall_aliases 에 등록한 뒤 id 구간별로 mall_id 를 채운다.
+완료 후 mall_daily_price 를 다시 만들어야 롤업에도 mall_id 가 반영된다.
+
+Usage:
+  python scripts/backfill_mall_ids.py
+  python scripts/backfill_mall_ids.py --chunk-size 20000
+  python scripts/backfill_mall_daily_price.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.database import engine, init_db
+from api.services.malls import resolve_mall_ids
+from api.services.response_cache import bump_generation_cursor
+
+_UPDATE_CHUNK_SQL = """
+UPDATE products p
+JOIN mall_aliases a ON a.alias = TRIM(p.mall_name)
+SET p.mall_id = a.mall_id
+WHERE p.id >= %(lo)s
+  AND p.id < %(hi)s
+  AND p.mall_id IS NULL
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=10000, help="한 트랜잭션에서 갱신할 id 구간 크기")
+    args = parser.parse_args()
+
+    init_db()
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        t0 = time.perf_counter()
+
+        cur.execute("SELECT DISTINCT TRIM(mall_name) FROM products WHERE mall_id IS NULL")
+        names = [r[0] for r in cur.fetchall()]
+        mall_ids = resolve_mall_ids(cur, names)
+        raw.commit()
+        print(f"  malls resolved: {len(mall_ids)} names")
+
+        cur.execute("SELECT MIN(id), MAX(id) FROM products WHERE mall_id IS NULL")
+        lo, hi = cur.fetchone()
+        if lo is None:
+            print("mall_id 가 비어 있는 행이 없습니다.")
+            return
+
+        chunk = max(1, args.chunk_size)
+        total = 0
+        start = int(lo)
+        while start <= int(hi):
+            cur.execute(_UPDATE_CHUNK_SQL, {"lo": start, "hi": start + chunk})
+            bump_generation_cursor(cur)
+            raw.commit()
+            total += int(cur.rowcount or 0)
+            start += chunk
+
+        cur.close()
+        print(f"✅ products.mall_id backfill 완료: {total} rows ({time.perf_counter() - t0:.1f}s)")
+        print("   다음: python -m scripts.backfill_mall_daily_price")
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Rebuild / verify the ingest-time price anomaly store (price_anomalies / price_anomaly_state).
+
+The crawler scores every new snapshot (api/services/price_anomalies.py) and bootstraps missing or
+stale series on its own, so this script is only needed to rebuild everything (e.g. after changing
+PRICE_ANALYTICS_INGEST_WINDOW_DAYS or the threshold) or to check the store.
+
+Ingest-time semantics: a point at t is flagged iff detect_residual_anomalies over the trailing window
+[t - window days, t] flags that last point. --verify replays products history through both the
+streaming detector and that batch reference, point by point, and compares the flagged sets.
+
+--rebuild:        clear both tables and replay products history (all of it, or --since YYYY-MM-DD).
+--verify:         streaming vs batch on products history (last --days days), plus the stored table.
+--synthetic N:    same comparison on N synthetic series (no DB): drift, spikes, flat runs, gaps.
+
+Usage:
+  python scripts/backfill_price_anomalies.py --rebuild
+  python scripts/backfill_price_anomalies.py --verify --days 60
+  python scripts/backfill_price_anomalies.py --synthetic 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd
+
+from api.services.price_analytics import (
+    ANOMALY_INGEST_WINDOW_DAYS,
+    SNAPSHOTS_PER_DAY,
+    detect_residual_anomalies,
+)
+from api.services.price_anomalies import (
+    PRICE_ANOMALY_CHANNELS,
+    AnomalyStream,
+    _fetch_points,
+)
+
+
+def batch_flags_at_ingest(points: list[tuple[datetime, int]], window_days: int) -> dict[datetime, float]:
+    """Reference: detect_residual_anomalies on each point's trailing window, keep the last point's verdict."""
+    window = timedelta(days=window_days)
+    flags = {}
+    lo = 0
+    for i, (ts, _price) in enumerate(points):
+        while points[lo][0] < ts - window:
+            lo += 1
+        part = points[lo:i + 1]
+        df = pd.DataFrame({"ts": pd.to_datetime([p[0] for p in part]), "min_price": [p[1] for p in part]})
+        flagged = detect_residual_anomalies(df)
+        if len(flagged) and flagged["ts"].iloc[-1] == pd.Timestamp(ts):
+            flags[ts] = float(flagged["modified_z"].iloc[-1])
+    return flags
+
+
+def stream_flags(points: list[tuple[datetime, int]], window_days: int, *, reload_every: int = 0) -> dict[datetime, float]:
+    """Streaming detector. reload_every > 0 round-trips the state through JSON (as between crawler runs)."""
+    stream = AnomalyStream(window_days)
+    flags = {}
+    for i, (ts, price) in enumerate(points):
+        if reload_every and i % reload_every == 0:
+            stream = AnomalyStream.from_json(stream.to_json())
+        found = stream.push(ts, price)
+        if found:
+            flags[ts] = found["modified_z"]
+    return flags
+
+
+def compare(label: str, points, window_days: int, *, reload_every: int = 0) -> bool:
+    expected = batch_flags_at_ingest(points, window_days)
+    actual = stream_flags(points, window_days, reload_every=reload_every)
+    missing = expected.keys() - actual.keys()
+    extra = actual.keys() - expected.keys()
+    z_diff = [ts for ts in expected.keys() & actual.keys() if abs(expected[ts] - actual[ts]) > 1e-9]
+    ok = not (missing or extra or z_diff)
+    if not ok:
+        print(
+            f"  {label}: points={len(points)} batch={len(expected)} stream={len(actual)} "
+            f"missing={len(missing)} extra={len(extra)} z_diff={len(z_diff)} MISMATCH"
+        )
+    return ok
+
+
+def _synthetic_points(rng: random.Random, days: int) -> list[tuple[datetime, int]]:
+    start = datetime(2026, 1, 1)
+    step = timedelta(hours=24 // SNAPSHOTS_PER_DAY)
+    base = 85000 + rng.randint(-8000, 8000)
+    noise = rng.choice((0, 0, 300, 1500))  # 0 = flat price runs (MAD 0 -> fallback scales)
+    points = []
+    ts = start
+    for i in range(days * SNAPSHOTS_PER_DAY):
+        ts += step
+        if rng.random() < 0.03:
+            ts += timedelta(days=rng.choice((1, 3, 12, 40)))  # missed snapshots / long absences
+        if rng.random() < 0.1:
+            continue
+        p = base + 30 * i + (rng.gauss(0, noise) if noise else 0)
+        if rng.random() < 0.03:
+            p += rng.choice((-1, 1)) * rng.choice((5000, 20000))
+        points.append((ts, int(max(p, 1000))))
+    return points
+
+
+def verify_synthetic(n: int, days: int, seed: int) -> bool:
+    rng = random.Random(seed)
+    ok = True
+    total = 0
+    for s in range(n):
+        points = _synthetic_points(rng, days)
+        total += len(points)
+        ok &= compare(f"synthetic#{s}", points, ANOMALY_INGEST_WINDOW_DAYS, reload_every=rng.choice((0, 1, 7)))
+    print(f"synthetic series={n} points={total} window={ANOMALY_INGEST_WINDOW_DAYS}d")
+    return ok
+
+
+def verify_db(cur, days: int) -> bool:
+    since = datetime.now() - timedelta(days=days + ANOMALY_INGEST_WINDOW_DAYS)
+    history = _fetch_points(cur, "products", "observed_at >= %(since)s", {"since": since})
+    flag_since = datetime.now() - timedelta(days=days)
+    ok = True
+    for key in sorted(history):
+        points = sorted(history[key].items())
+        ok &= compare(f"{key[0]}/{key[1]}", points, ANOMALY_INGEST_WINDOW_DAYS)
+
+        # 저장된 판정: 같은 창으로 재생한 결과와 같아야 한다 (stale 상태는 다음 적재 때 재구축되므로 건너뛴다).
+        cur.execute(
+            "SELECT status FROM price_anomaly_state WHERE channel = %(channel)s AND mall_key = %(mall)s",
+            {"channel": key[0], "mall": key[1]},
+        )
+        state = cur.fetchall()
+        if not state or state[0][0] != "ready":
+            continue
+        cur.execute(
+            """
+            SELECT ts FROM price_anomalies
+            WHERE channel = %(channel)s AND mall_key = %(mall)s AND ts >= %(since)s
+            """,
+            {"channel": key[0], "mall": key[1], "since": flag_since},
+        )
+        stored = {r[0] for r in cur.fetchall()}
+        replayed = {ts for ts in stream_flags(points, ANOMALY_INGEST_WINDOW_DAYS) if ts >= flag_since}
+        if stored != replayed:
+            ok = False
+            print(
+                f"  {key[0]}/{key[1]}: stored={len(stored)} replayed={len(replayed)} "
+                f"missing={len(replayed - stored)} extra={len(stored - replayed)} STORE MISMATCH"
+            )
+    print(f"products series={len(history)} scopes={','.join(PRICE_ANOMALY_CHANNELS)} days={days}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true", help="두 테이블을 비우고 products 이력을 재생")
+    parser.add_argument("--since", help="--rebuild 재생 시작일 YYYY-MM-DD (기본: 전체)")
+    parser.add_argument("--verify", action="store_true", help="products 이력으로 스트리밍 vs 배치 비교")
+    parser.add_argument("--days", type=int, default=90, help="--verify 비교 기간(일)")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N", help="합성 시계열 N개로 비교 (DB 불필요)")
+    parser.add_argument("--synthetic-days", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        t0 = time.perf_counter()
+        ok = verify_synthetic(args.synthetic, args.synthetic_days, args.seed)
+        if not ok:
+            print("❌ streaming anomaly flags differ from the batch algorithm")
+            sys.exit(1)
+        print(f"✅ streaming flags match batch detect_residual_anomalies ({time.perf_counter() - t0:.1f}s)")
+        return
+
+    from api.database import engine, init_db
+    from api.services.price_anomalies import rebuild_all_anomalies
+    from api.services.response_cache import bump_generation_cursor
+
+    init_db()
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if args.verify:
+            ok = verify_db(cur, args.days)
+            cur.close()
+            if not ok:
+                print("❌ price anomaly mismatch")
+                sys.exit(1)
+            print("✅ streaming flags match batch detect_residual_anomalies and the stored table")
+            return
+        if not args.rebuild:
+            parser.error("--rebuild, --verify 또는 --synthetic 중 하나를 지정한다")
+
+        t0 = time.perf_counter()
+        since = datetime.fromisoformat(args.since) if args.since else None
+        stats = rebuild_all_anomalies(cur, since=since)
+        bump_generation_cursor(cur)
+        raw.commit()
+        cur.close()
+        print(
+            f"✅ price_anomalies rebuild 완료: 시계열 {stats['series']}개, 플래그 {stats['flagged']}개 "
+            f"({time.perf_counter() - t0:.1f}s)"
+        )
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Fold products snapshots into the change-only price interval store (price_listings / price_intervals).
+
+Run this before switching to PRODUCTS_STORAGE_MODE=intervals: in that mode the API reads only the
+products_by_snapshot view, which is built from the interval tables, not from products.
+Snapshots are folded in registry order (run backfill_snapshots first). Already-folded snapshots
+are no-ops, so running it again right before the switch catches up the last rows-mode crawls.
+
+--rebuild: clear both tables first (after /manual-confirm or /delete edited past products rows).
+--verify N: compare products_by_snapshot against products for the latest N snapshots
+            (one row per listing, same price state). Exit 1 on mismatch.
+
+Usage:
+  python scripts/backfill_price_intervals.py
+  python scripts/backfill_price_intervals.py --rebuild
+  python scripts/backfill_price_intervals.py --verify 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+from api.database import engine, init_db
+from api.services.price_intervals import (
+    INTERVAL_STATE_COLUMNS,
+    clear_price_intervals,
+    fold_all_snapshots,
+    interval_state,
+    listing_key_hash,
+)
+
+
+def _dicts(cur):
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, r)) for r in cur.fetchall()]
+
+
+def verify(cur, limit: int) -> list[str]:
+    cur.execute(
+        """
+        SELECT snapshot_id FROM snapshots
+        WHERE status = 'completed'
+        GROUP BY snapshot_id
+        ORDER BY MAX(started_at) DESC
+        LIMIT %(limit)s
+        """,
+        {"limit": limit},
+    )
+    snapshot_ids = [r[0] for r in cur.fetchall()]
+    cols = ", ".join(("link", "product_name", "market", "channel") + INTERVAL_STATE_COLUMNS)
+    problems = []
+    for sid in snapshot_ids:
+        cur.execute(
+            f"SELECT {cols} FROM {config.DB_TABLE} WHERE snapshot_id = %(sid)s ORDER BY id",
+            {"sid": sid},
+        )
+        expected = {}
+        for r in _dicts(cur):
+            expected.setdefault(listing_key_hash(r), interval_state(r))
+        cur.execute(
+            f"""
+            SELECT l.listing_key_hash, {", ".join(f"v.{c}" for c in INTERVAL_STATE_COLUMNS)}
+            FROM products_by_snapshot v
+            JOIN price_listings l ON l.id = v.listing_id
+            WHERE v.snapshot_id = %(sid)s
+            """,
+            {"sid": sid},
+        )
+        rows = _dicts(cur)
+        actual = {r["listing_key_hash"]: interval_state(r) for r in rows}
+        missing = expected.keys() - actual.keys()
+        extra = actual.keys() - expected.keys()
+        changed = [k for k in expected.keys() & actual.keys() if expected[k] != actual[k]]
+        dup = len(rows) - len(actual)
+        status = "ok" if not (missing or extra or changed or dup) else "MISMATCH"
+        print(
+            f"  {sid}: products={len(expected)} view={len(rows)} "
+            f"missing={len(missing)} extra={len(extra)} changed={len(changed)} dup={dup} {status}"
+        )
+        if status != "ok":
+            problems.append(sid)
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true", help="구간 테이블을 비우고 처음부터 다시 접기")
+    parser.add_argument("--verify", type=int, default=0, help="최근 N개 스냅샷을 products 와 비교")
+    args = parser.parse_args()
+
+    init_db()
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if args.verify:
+            problems = verify(cur, args.verify)
+            cur.close()
+            if problems:
+                print(f"❌ {len(problems)} snapshots differ from products")
+                sys.exit(1)
+            print(f"✅ products_by_snapshot matches products for {args.verify} latest snapshots")
+            return
+
+        t0 = time.perf_counter()
+        if args.rebuild:
+            clear_price_intervals(cur)
+            raw.commit()
+        totals = fold_all_snapshots(cur, config.DB_TABLE, commit=raw.commit)
+        raw.commit()
+        cur.close()
+        print(
+            f"✅ price_intervals backfill 완료: 스냅샷 {totals['snapshots']}개, "
+            f"구간 연장 {totals['extended']} / 신규 {totals['opened']} "
+            f"({time.perf_counter() - t0:.1f}s)"
+        )
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Rebuild the snapshots registry from products.snapshot_id.
+
+Usage:
+  python scripts/backfill_snapshots.py
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.database import engine, init_db
+from api.services.response_cache import bump_generation_cursor
+from api.services.snapshots import backfill_snapshots
+
+
+def main():
+    init_db()
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        t0 = time.perf_counter()
+        rows = backfill_snapshots(cur)
+        bump_generation_cursor(cur)
+        raw.commit()
+        cur.close()
+        print(f"✅ snapshots backfill 완료: {rows} rows ({time.perf_counter() - t0:.1f}s)")
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
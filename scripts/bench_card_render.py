@@ -0,0 +1,88 @@
+"""카드 렌더 처리량 벤치마크 (before: 카드마다 Chromium 기동 / after: 공용 브라우저 + 페이지 풀).
+
+외부 이미지 요청이 섞이지 않도록 image_url 없는 합성 상품으로 측정한다. Playwright Chromium 필요.
+
+Usage:
+  python scripts/bench_card_render.py
+  python scripts/bench_card_render.py --cards 40 --concurrency 4 --skip-before
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.services.card_renderer import (
+    KST,
+    CardRenderer,
+    _build_card_html,
+    _render_card_png_async,
+)
+
+
+def _synthetic_products(n: int) -> list[dict]:
+    return [
+        {
+            "product_name": f"프리스타일 리브레2 센서 {i % 4 + 1}개 세트 (벤치 #{i})",
+            "mall_name": f"bench-mall-{i % 7}",
+            "link": f"https://example.com/products/{i}",
+            "image_url": "",
+            "unit_price": 85000 + i * 10,
+            "total_price": (85000 + i * 10) * (i % 4 + 1),
+            "quantity": i % 4 + 1,
+            "calc_method": "bench",
+        }
+        for i in range(n)
+    ]
+
+
+def _before(products: list[dict], captured_at: datetime) -> None:
+    with tempfile.TemporaryDirectory() as out_dir:
+        for p in products:
+            asyncio.run(_render_card_png_async(html_text=_build_card_html(p, captured_at), out_dir=out_dir))
+
+
+def _report(label: str, n: int, elapsed: float) -> None:
+    print(f"  {label:<38}: {n / elapsed:7.2f} cards/s  ({elapsed * 1000 / n:8.1f} ms/card)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="페이지 풀 크기")
+    parser.add_argument("--skip-before", action="store_true", help="카드별 기동 기준선 측정 생략")
+    args = parser.parse_args()
+
+    products = _synthetic_products(args.cards)
+    captured_at = datetime.now(KST)
+    print(f"cards={args.cards} concurrency={args.concurrency}")
+
+    if not args.skip_before:
+        t0 = time.perf_counter()
+        _before(products, captured_at)
+        _report("before (browser per card)", args.cards, time.perf_counter() - t0)
+
+    renderer = CardRenderer(concurrency=args.concurrency, idle_close_sec=0)
+    try:
+        t0 = time.perf_counter()
+        renderer.render_cards_batch(products[:1], captured_at=captured_at)
+        print(f"  {'after  browser launch + first card':<38}: {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+        t0 = time.perf_counter()
+        pngs = renderer.render_cards_batch(products, captured_at=captured_at)
+        _report("after  (pooled pages, warm browser)", len(pngs), time.perf_counter() - t0)
+    finally:
+        renderer.close()
+
+
+if __name__ == "__main__":
+    main()
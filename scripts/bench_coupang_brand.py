@@ -0,0 +1,284 @@
+"""쿠팡 브랜드 스토어 수집 serial vs network 모드 벽시계 비교 (HAR 재생, 네트워크 불필요).
+
+픽스처 디렉터리(기본 scripts/fixtures/coupang_brand)에는 스토어 목록(stores.json)과 스토어별 HAR 가 있다.
+재생 시 모든 요청을 HAR 에서 돌려주고(없는 요청은 abort) 두 모드를 차례로 돌려 소요 시간과 스토어별 상품을
+비교한다. serial 은 운영과 같은 고정 대기(로드 후 5초, 스크롤 800ms, 스토어 간 --store-gap 초)를 쓰고,
+network 는 --contexts 개 격리 컨텍스트 + 스토어 진입 간격 --min-gap 초로 돈다.
+상품은 정규화 링크(canonical_product_link_key, 수량 확정 / 가격 이력이 상품을 묶는 키)로 맞춰 본다.
+serial 이 찾은 상품을 network 가 못 찾거나, network 에만 있는 상품(추천 / 광고 응답 혼입)이 있거나,
+같은 링크의 상품명 / 가격이 다르면 exit 1.
+
+--make-synthetic N: 합성 스토어 N곳의 HAR 를 만든다. 스토어 HTML 은 스크롤 끝에 닿을 때마다
+  상품 목록 JSON(fetch)을 한 페이지씩 더 불러와 그린다 (XHR 가로채기 / DOM 추출 / 스크롤 정지를 모두 탄다).
+  앵커 href 에는 실제 스토어처럼 응답에 없는 쿼리(sourceType)를 붙여 링크를 응답 값으로 만들면 어긋나게 한다.
+  페이지는 목록에 그리지 않는 추천 상품 JSON(fetch)도 불러온다 (network 모드가 스토어 상품만 남기는지 본다).
+--record N: BRAND_STORES 앞 N곳을 실제로 방문하며 HAR 로 녹화한다 (로컬 브라우저, 프록시 설정은 그대로).
+
+Usage:
+  python scripts/bench_coupang_brand.py
+  python scripts/bench_coupang_brand.py --contexts 3 --min-gap 3
+  python scripts/bench_coupang_brand.py --make-synthetic 3
+  python scripts/bench_coupang_brand.py --record 5 --fixtures /tmp/brand_har
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.services.title_parser import canonical_product_link_key
+from scripts import crawl_coupang_brand as crawler
+
+DEFAULT_FIXTURES = BASE_DIR / "scripts" / "fixtures" / "coupang_brand"
+_PAGE_SIZE = 12
+
+_SYNTHETIC_HTML = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>{seller} - 쿠팡 브랜드 스토어</title>
+<style>body {{ margin: 0; }} a {{ display: block; height: 100px; }}</style></head>
+<body><div id="list"></div>
+<script>
+let page = 0, loading = false, done = false;
+async function load() {{
+  if (loading || done) return;
+  loading = true;
+  const r = await fetch("{api}?page=" + page);
+  const j = await r.json();
+  for (const p of j.data.products) {{
+    const a = document.createElement("a");
+    a.href = "/vp/products/" + p.productId + "?itemId=" + p.itemId + "&vendorItemId=" + p.vendorItemId
+      + "&sourceType=brandstore_sdp";
+    a.innerHTML = "<div>{seller}</div><div>" + p.productName + "</div><div>"
+      + p.salePrice.toLocaleString("ko-KR") + "원</div>";
+    document.getElementById("list").appendChild(a);
+  }}
+  page += 1;
+  done = !j.data.hasNext;
+  loading = false;
+}}
+window.addEventListener("scroll", () => {{
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 500) load();
+}});
+load();
+fetch("{reco}");
+</script></body></html>
+"""
+
+
+def _har_entry(url: str, mime: str, body: str) -> dict:
+    size = len(body.encode("utf-8"))
+    return {
+        "startedDateTime": "2026-01-01T00:00:00.000Z",
+        "time": 0,
+        "request": {
+            "method": "GET",
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "queryString": [],
+            "headersSize": -1,
+            "bodySize": 0,
+        },
+        "response": {
+            "status": 200,
+            "statusText": "OK",
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [{"name": "Content-Type", "value": f"{mime}; charset=utf-8"}],
+            "content": {"size": size, "mimeType": mime, "text": body},
+            "redirectURL": "",
+            "headersSize": -1,
+            "bodySize": size,
+        },
+        "cache": {},
+        "timings": {"send": 0, "wait": 0, "receive": 0},
+    }
+
+
+def make_synthetic(fixtures: Path, n_stores: int, n_products: int) -> list[dict]:
+    fixtures.mkdir(parents=True, exist_ok=True)
+    stores = []
+    for s in range(1, n_stores + 1):
+        slug = f"fixture-store-{s}"
+        seller = f"픽스처셀러{s}"
+        url = f"https://shop.coupang.com/{slug}/?platform=p"
+        api = f"https://shop.coupang.com/api/v1/{slug}/products"
+        reco = f"https://www.coupang.com/next-api/recommendation/{slug}"
+        products = [
+            {
+                "productId": 9000000 + s * 1000 + i,
+                "itemId": 8000000 + s * 1000 + i,
+                "vendorItemId": 7000000 + s * 1000 + i,
+                "productName": f"애보트 프리스타일 리브레2 연속혈당측정기 센서 {1 + i % 4}개입 ({seller} {i})",
+                "salePrice": 90000 * (1 + i % 4) - 1000 * (i % 7),
+            }
+            for i in range(n_products)
+        ]
+        recommended = [
+            {
+                "productId": 6000000 + s * 1000 + i,
+                "itemId": 5000000 + s * 1000 + i,
+                "vendorItemId": 4000000 + s * 1000 + i,
+                "productName": f"애보트 프리스타일 리브레2 센서 {1 + i % 2}개입 (다른판매자 {i})",
+                "salePrice": 95000 * (1 + i % 2),
+            }
+            for i in range(8)
+        ]
+        entries = [
+            _har_entry(url, "text/html", _SYNTHETIC_HTML.format(seller=seller, api=api, reco=reco)),
+            _har_entry(reco, "application/json", json.dumps({"data": {"items": recommended}}, ensure_ascii=False)),
+        ]
+        pages = max(1, (n_products + _PAGE_SIZE - 1) // _PAGE_SIZE)
+        for page in range(pages):
+            chunk = products[page * _PAGE_SIZE:(page + 1) * _PAGE_SIZE]
+            body = json.dumps(
+                {"data": {"products": chunk, "hasNext": page + 1 < pages}}, ensure_ascii=False
+            )
+            entries.append(_har_entry(f"{api}?page={page}", "application/json", body))
+        har = {"log": {"version": "1.2", "creator": {"name": "bench_coupang_brand", "version": "1"}, "entries": entries}}
+        (fixtures / f"{slug}.har").write_text(json.dumps(har, ensure_ascii=False), encoding="utf-8")
+        stores.append({"url": url, "seller": seller, "min_price": 0, "name_filter": None, "har": f"{slug}.har"})
+    _write_stores(fixtures, stores)
+    return stores
+
+
+def _write_stores(fixtures: Path, stores: list[dict]) -> None:
+    (fixtures / "stores.json").write_text(json.dumps(stores, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+
+def _load_stores(fixtures: Path) -> list[dict]:
+    path = fixtures / "stores.json"
+    if not path.exists():
+        sys.exit(f"❌ {path} 없음: --make-synthetic 또는 --record 로 먼저 만든다")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _replay_setup(fixtures: Path, stores: list[dict]):
+    har_by_url = {s["url"]: str(fixtures / s["har"]) for s in stores}
+
+    def setup(context, url):
+        return context.route_from_har(har_by_url[url], not_found="abort")
+
+    return setup
+
+
+def record(fixtures: Path, n_stores: int, contexts: int, min_gap: float) -> None:
+    fixtures.mkdir(parents=True, exist_ok=True)
+    stores = []
+    for s in crawler.BRAND_STORES[:n_stores]:
+        slug = re.sub(r"[^0-9A-Za-z]+", "-", s["url"].split("shop.coupang.com/")[-1]).strip("-")[:60]
+        stores.append({**s, "har": f"{slug}.har"})
+    har_by_url = {s["url"]: str(fixtures / s["har"]) for s in stores}
+
+    def setup(context, url):
+        return context.route_from_har(har_by_url[url], update=True, update_content="embed")
+
+    crawler.BROWSER_WSS = None  # HAR 는 로컬 컨텍스트에서만 녹화된다
+    collected = asyncio.run(
+        crawler.collect_stores_network(stores, contexts=contexts, min_gap_sec=min_gap, setup_context=setup)
+    )
+    _write_stores(fixtures, stores)
+    for store, products in collected:
+        print(f"  recorded {store['seller']}: {len(products)} products -> {store['har']}")
+
+
+def _by_link(products: list[dict]) -> dict[str, tuple[str, int]]:
+    return {canonical_product_link_key(p["link"]): (p["product_name"], p["total_price"]) for p in products}
+
+
+def compare_products(serial: list[dict], network: list[dict]) -> list[str]:
+    """serial 기준 상품별 차이 (network 에 없는 링크, network 에만 있는 링크, 같은 링크의 상품명 / 가격 차이)."""
+    a, b = _by_link(serial), _by_link(network)
+    diffs = [f"extra {link}" for link in b.keys() - a.keys()]
+    for link, (name, price) in a.items():
+        if link not in b:
+            diffs.append(f"missing {link}")
+            continue
+        other_name, other_price = b[link]
+        if other_name != name:
+            diffs.append(f"name {link}: serial={name!r} network={other_name!r}")
+        if other_price != price:
+            diffs.append(f"price {link}: serial={price} network={other_price}")
+    return diffs
+
+
+def _run(fn, verbose: bool):
+    log = None if verbose else StringIO()
+    t0 = time.perf_counter()
+    with redirect_stdout(log or sys.stdout):
+        collected = fn()
+    return time.perf_counter() - t0, {store["url"]: products for store, products in collected}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--make-synthetic", type=int, default=0, metavar="N", help="합성 스토어 N곳 HAR 생성")
+    parser.add_argument("--products", type=int, default=36, help="--make-synthetic 스토어당 상품 수")
+    parser.add_argument("--record", type=int, default=0, metavar="N", help="BRAND_STORES 앞 N곳 실제 녹화")
+    parser.add_argument("--contexts", type=int, default=crawler.COUPANG_BRAND_CONTEXTS)
+    parser.add_argument("--min-gap", type=float, default=crawler.COUPANG_BRAND_MIN_GAP_SEC)
+    parser.add_argument("--store-gap", type=float, default=8.0, help="serial 스토어 간 대기(초, 운영값 8)")
+    parser.add_argument("--verbose", action="store_true", help="크롤러 로그 출력")
+    args = parser.parse_args()
+
+    if args.make_synthetic:
+        stores = make_synthetic(args.fixtures, args.make_synthetic, args.products)
+        print(f"✅ {len(stores)} synthetic stores -> {args.fixtures}")
+        return
+    if args.record:
+        record(args.fixtures, args.record, args.contexts, args.min_gap)
+        return
+
+    stores = _load_stores(args.fixtures)
+    setup = _replay_setup(args.fixtures, stores)
+    crawler.BROWSER_WSS = None
+    crawler.PROXY_SERVER = None  # HAR 재생은 네트워크를 쓰지 않는다
+
+    t_serial, serial = _run(
+        lambda: crawler.collect_stores_serial(stores, setup_context=setup, store_gap_sec=args.store_gap),
+        args.verbose,
+    )
+    t_network, network = _run(
+        lambda: asyncio.run(
+            crawler.collect_stores_network(
+                stores, contexts=args.contexts, min_gap_sec=args.min_gap, setup_context=setup
+            )
+        ),
+        args.verbose,
+    )
+
+    problems = []
+    print(f"stores={len(stores)} contexts={args.contexts} min_gap={args.min_gap}s store_gap(serial)={args.store_gap}s")
+    for store in stores:
+        a, b = serial.get(store["url"], []), network.get(store["url"], [])
+        diffs = compare_products(a, b)
+        extra = len(set(_by_link(b)) - set(_by_link(a)))
+        print(
+            f"  {store['seller']:<12} serial={len(a):>4}  network={len(b):>4}  network_only={extra:>3}  "
+            f"{'ok' if not diffs else f'DIFF({len(diffs)})'}"
+        )
+        problems.extend(f"{store['seller']}: {d}" for d in diffs[:10])
+    print(f"  serial : {t_serial:7.1f}s")
+    print(f"  network: {t_network:7.1f}s  ({t_serial / max(t_network, 1e-9):.1f}x)")
+
+    if problems:
+        for p in problems:
+            print(f"❌ {p}")
+        sys.exit(1)
+    print("✅ network mode finds exactly the products the serial crawl finds, with the same link, name and price")
+
+
+if __name__ == "__main__":
+    main()
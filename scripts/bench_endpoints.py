@@ -0,0 +1,375 @@
+"""엔드포인트·리포트 빌더 벤치마크 (in-process ASGI, 서버 불필요) + JSON 기준선 비교.
+
+scripts/test_api.py 는 떠 있는 서버를 한 번씩 찔러 보는 스모크 테스트라 성능 비교에는 못 쓴다.
+여기서는 api.main.app 을 ASGI 로 직접 부르고(미들웨어·의존성·직렬화까지 운영과 같은 경로), 리포트 빌더는 함수로 부른다.
+
+- 대상: OpenAPI 에 있는 모든 GET 엔드포인트. 필수 파라미터는 CASES 가 DB 에서 고른 값(최근 월/기간, 행이 많은 판매처)으로
+  채운다. 필수 파라미터가 있는데 CASES 에 없는 새 엔드포인트는 실패로 알린다 (벤치 대상에서 빠지지 않도록).
+  POST/PUT/DELETE 는 데이터를 바꾸므로 건너뛴다.
+- 리포트 빌더: build_range_report, build_monthly_report(use_llm=False), compute_monthly_seller_metrics(full / state).
+- 케이스마다 워밍업 1회 뒤 --repeat 회 재서 p50/p95, 한 번 더 tracemalloc 으로 Python 힙 최대 사용량(MB),
+  요청당 SQL 수(요청 계측 X-SQL-Queries / track_sql)를 남긴다.
+- 응답 캐시는 기본으로 끈다(계산 비용을 잰다). --cache 면 켠 채로 잰다.
+
+기준선: --save-baseline PATH 로 저장하고, --baseline PATH 로 비교한다. 다음이면 exit 1:
+  p95 > 기준 × (1 + --latency-tolerance) 이고 차이 > --min-delta-ms,
+  힙 최대 > 기준 × (1 + --memory-tolerance) 이고 차이 > 1MB,
+  SQL 수 증가, 기준선에 있던 케이스 누락, 2xx 가 아닌 응답.
+기준선은 같은 기계·같은 합성 데이터(generate_synthetic_products.py 같은 인자)에서 만든 것과 비교한다.
+
+Usage:
+  python scripts/generate_synthetic_products.py --months 3 --malls 40 --truncate
+  python scripts/bench_endpoints.py --save-baseline bench_endpoints_baseline.json
+  python scripts/bench_endpoints.py --baseline bench_endpoints_baseline.json
+  python scripts/bench_endpoints.py --only /products/ --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+MUTATING_METHODS = {"post", "put", "patch", "delete"}
+
+
+def _configure_env(*, cache: bool) -> None:
+    """api 를 import 하기 전에 정한다 (모듈 로드 시 읽는 설정)."""
+    os.environ["DASHBOARD_AUTH_ENABLED"] = "false"
+    os.environ["REQUEST_METRICS_DEBUG_HEADER"] = "true"
+    os.environ["ENABLE_SCHEDULER"] = "false"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "true" if cache else "false"
+
+
+# ── 데이터셋에서 케이스 파라미터 고르기 ─────────────────────────────
+def dataset_context(db) -> dict[str, Any]:
+    from sqlalchemy import text
+
+    import config
+    from api.services.malls import mall_directory
+
+    latest = db.execute(text(f"SELECT MAX(observed_at) FROM {config.PRODUCTS_SOURCE}")).scalar()
+    if latest is None:
+        print("❌ products 가 비어 있다. scripts/generate_synthetic_products.py 로 먼저 채운다")
+        sys.exit(1)
+    first = db.execute(text(f"SELECT MIN(observed_at) FROM {config.PRODUCTS_SOURCE}")).scalar()
+    month_start = latest.replace(day=1)
+    # 지난 달 전체가 있으면 그 달(월간 리포트가 보통 보는 완결 월), 아니면 이번 달
+    month = (month_start - timedelta(days=1)).strftime("%Y-%m") if first < month_start else latest.strftime("%Y-%m")
+
+    def top_mall(channel: str) -> str | None:
+        name = db.execute(
+            text(
+                f"""
+                SELECT mall_name FROM {config.PRODUCTS_SOURCE}
+                WHERE channel = :channel AND observed_at >= :since
+                GROUP BY mall_name ORDER BY COUNT(*) DESC LIMIT 1
+                """
+            ),
+            {"channel": channel, "since": latest - timedelta(days=30)},
+        ).scalar()
+        return mall_directory().public_name(name) if name else None
+
+    return {
+        "latest_date": latest.strftime("%Y-%m-%d"),
+        "week_start": (latest - timedelta(days=6)).strftime("%Y-%m-%d"),
+        "month": month,
+        "threshold": config.TARGET_PRICE,
+        "naver_mall": top_mall("naver"),
+        "coupang_mall": top_mall("coupang"),
+        "rows": int(db.execute(text(f"SELECT COUNT(*) FROM {config.PRODUCTS_SOURCE}")).scalar() or 0),
+        "first_observed": first.strftime("%Y-%m-%d %H:%M:%S"),
+        "latest_observed": latest.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def cases_for(ctx: dict[str, Any]) -> dict[str, list[dict[str, Any]]]:
+    """경로 템플릿 -> 호출 파라미터 목록 (경로 변수 포함). 없는 경로는 기본값으로 한 번 부른다."""
+    monthly = {"month": ctx["month"], "threshold_price": ctx["threshold"], "use_llm": "false"}
+    week = {"start_date": ctx["week_start"], "end_date": ctx["latest_date"], "threshold_price": ctx["threshold"]}
+    cases: dict[str, list[dict[str, Any]]] = {
+        "/products/export/raw": [{"date": ctx["latest_date"], "format": "csv"}],
+        "/products/tracked-malls/summary": [{"channel": "naver"}, {"channel": "coupang"}],
+        "/products/tracked-malls/trends": [{"channel": "naver", "days": 30}],
+        "/products/price-insights/batch": [{"channel": "naver", "days": 30}],
+        "/reports/monthly/{month}": [monthly, {**monthly, "channel": "coupang"}],
+        "/reports/monthly/{month}/markdown": [monthly],
+        "/reports/range": [week, {**week, "channel": "coupang"}],
+        "/reports/range/markdown": [week],
+    }
+    mall_cases = []
+    for channel in ("naver", "coupang"):
+        if ctx[f"{channel}_mall"]:
+            mall_cases.append({"mall_name": ctx[f"{channel}_mall"], "days": 30, "channel": channel})
+    cases["/products/mall/timeline"] = mall_cases
+    cases["/products/mall/price-insights"] = mall_cases
+    cases["/memos/vendor"] = [
+        {"channel": c["channel"], "vendor_label": c["mall_name"]} for c in mall_cases
+    ]
+    return cases
+
+
+def builder_cases(ctx: dict[str, Any]) -> dict[str, Callable[[Any], Any]]:
+    from api.services.monthly_metrics import compute_monthly_seller_metrics
+    from api.services.monthly_report_builder import build_monthly_report
+    from api.services.range_report_builder import build_range_report
+
+    threshold = ctx["threshold"]
+    return {
+        "build_range_report naver 7d": lambda db: build_range_report(
+            db, start_date=ctx["week_start"], end_date=ctx["latest_date"], threshold_price=threshold
+        ),
+        "build_monthly_report naver": lambda db: build_monthly_report(
+            db, month=ctx["month"], threshold_price=threshold, use_llm=False
+        ),
+        "compute_monthly_seller_metrics full": lambda db: compute_monthly_seller_metrics(
+            db, month=ctx["month"], threshold_price=threshold, mode="full"
+        ),
+        "compute_monthly_seller_metrics state": lambda db: compute_monthly_seller_metrics(
+            db, month=ctx["month"], threshold_price=threshold, mode="auto"
+        ),
+    }
+
+
+# ── in-process ASGI 호출 ──────────────────────────────────────────
+async def asgi_get(app, path: str, params: dict[str, Any]) -> tuple[int, dict[str, str], int]:
+    """(status, 헤더, 본문 바이트 수)."""
+    query = urlencode(params, doseq=True).encode("ascii")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "root_path": "",
+        "query_string": query,
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 0),
+    }
+    request_sent = False
+    done = asyncio.Event()
+    status, headers, size = 0, {}, 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, headers, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body"):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status, headers, size
+
+
+def _fill_path(template: str, params: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    path, query = template, dict(params)
+    for key in list(query):
+        token = "{" + key + "}"
+        if token in path:
+            path = path.replace(token, str(query.pop(key)))
+    return path, query
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+
+def _summary(times: list[float], peak_bytes: int, queries: int, status: int) -> dict[str, Any]:
+    return {
+        "p50_ms": round(statistics.median(times) * 1000, 2),
+        "p95_ms": round(_percentile(times, 0.95) * 1000, 2),
+        "peak_mb": round(peak_bytes / 1e6, 2),
+        "queries": queries,
+        "status": status,
+    }
+
+
+async def run_http_cases(app, cases, repeat: int, only: str | None) -> tuple[dict[str, Any], list[str]]:
+    results, problems = {}, []
+    spec = app.openapi()
+    for template, ops in spec["paths"].items():
+        for method, op in ops.items():
+            if method in MUTATING_METHODS:
+                continue
+            required = [p["name"] for p in op.get("parameters", []) if p.get("required")]
+            variants = cases.get(template)
+            if variants is None:
+                if required:
+                    problems.append(f"GET {template}: 필수 파라미터 {required} 를 채울 CASES 항목이 없다")
+                    continue
+                variants = [{}]
+            for params in variants:
+                path, query = _fill_path(template, params)
+                label = f"GET {template}" + (f" ?{urlencode(query)}" if query else "")
+                if only and only not in label:
+                    continue
+                status, headers, _size = await asgi_get(app, path, query)  # 워밍업
+                if not 200 <= status < 300:
+                    problems.append(f"{label}: HTTP {status}")
+                    continue
+                times = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    await asgi_get(app, path, query)
+                    times.append(time.perf_counter() - t0)
+                tracemalloc.start()
+                tracemalloc.reset_peak()
+                status, headers, _size = await asgi_get(app, path, query)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results[label] = _summary(times, peak, int(headers.get("x-sql-queries", 0)), status)
+                print(_line(label, results[label]))
+    return results, problems
+
+
+def run_builder_cases(builders, repeat: int, only: str | None) -> dict[str, Any]:
+    from api.database import SessionLocal
+    from api.services.request_metrics import track_sql
+
+    results = {}
+    for label, fn in builders.items():
+        if only and only not in label:
+            continue
+        db = SessionLocal()
+        try:
+            fn(db)  # 워밍업
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn(db)
+                times.append(time.perf_counter() - t0)
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            with track_sql() as stats:
+                fn(db)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            db.close()
+        results[label] = _summary(times, peak, stats.queries, 200)
+        print(_line(label, results[label]))
+    return results
+
+
+def _line(label: str, r: dict[str, Any]) -> str:
+    return (
+        f"  {label[:78]:<78} p50 {r['p50_ms']:8.1f}ms  p95 {r['p95_ms']:8.1f}ms  "
+        f"heap {r['peak_mb']:7.2f}MB  sql {r['queries']:>4}"
+    )
+
+
+# ── 기준선 비교 ───────────────────────────────────────────────────
+def compare(current: dict[str, Any], baseline: dict[str, Any], args) -> list[str]:
+    problems = []
+    if current["meta"]["dataset"].get("rows") != baseline["meta"]["dataset"].get("rows"):
+        print(
+            f"⚠️ 데이터셋이 기준선과 다르다 (rows {baseline['meta']['dataset'].get('rows')} → "
+            f"{current['meta']['dataset'].get('rows')}); 같은 생성 인자로 만든 DB 에서 비교한다"
+        )
+    for label, base in baseline["cases"].items():
+        cur = current["cases"].get(label)
+        if cur is None:
+            if not args.only or args.only in label:
+                problems.append(f"{label}: 기준선에 있던 케이스가 이번 실행에 없다")
+            continue
+        if cur["p95_ms"] > base["p95_ms"] * (1 + args.latency_tolerance) and (
+            cur["p95_ms"] - base["p95_ms"] > args.min_delta_ms
+        ):
+            problems.append(f"{label}: p95 {base['p95_ms']:.1f}ms → {cur['p95_ms']:.1f}ms")
+        if cur["peak_mb"] > base["peak_mb"] * (1 + args.memory_tolerance) and cur["peak_mb"] - base["peak_mb"] > 1.0:
+            problems.append(f"{label}: heap {base['peak_mb']:.2f}MB → {cur['peak_mb']:.2f}MB")
+        if cur["queries"] > base["queries"]:
+            problems.append(f"{label}: SQL {base['queries']} → {cur['queries']}")
+    new = sorted(current["cases"].keys() - baseline["cases"].keys())
+    if new:
+        print(f"ℹ️ 기준선에 없는 새 케이스 {len(new)}개 (--save-baseline 으로 갱신): {', '.join(new[:5])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", help="라벨에 이 문자열이 들어간 케이스만")
+    parser.add_argument("--cache", action="store_true", help="응답 캐시를 켠 채로 잰다")
+    parser.add_argument("--output", help="이번 결과 JSON 저장 경로")
+    parser.add_argument("--save-baseline", metavar="PATH", help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--baseline", metavar="PATH", help="기준선과 비교해 회귀면 exit 1")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    _configure_env(cache=args.cache)
+    from api.database import SessionLocal, init_db
+    from api.main import app
+
+    init_db()
+    db = SessionLocal()
+    try:
+        ctx = dataset_context(db)
+    finally:
+        db.close()
+    print(
+        f"dataset rows={ctx['rows']} {ctx['first_observed']} ~ {ctx['latest_observed']} "
+        f"month={ctx['month']} malls naver={ctx['naver_mall']} coupang={ctx['coupang_mall']} repeat={args.repeat}"
+    )
+
+    http_results, problems = asyncio.run(run_http_cases(app, cases_for(ctx), args.repeat, args.only))
+    builder_results = run_builder_cases(builder_cases(ctx), args.repeat, args.only)
+    current = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "repeat": args.repeat,
+            "cache": args.cache,
+            "dataset": {k: ctx[k] for k in ("rows", "first_observed", "latest_observed", "month")},
+        },
+        "cases": {**http_results, **builder_results},
+    }
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"saved {path}")
+    if args.baseline:
+        problems += compare(current, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args)
+
+    if problems:
+        for p in problems:
+            print(f"❌ {p}")
+        sys.exit(1)
+    print(f"✅ {len(current['cases'])} cases" + (" within baseline tolerance" if args.baseline else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Holt 예측 엔진 벤치마크: statsmodels(시계열마다 적합) vs numpy(api/services/holt_forecast.py, 한 번에 적합).
+
+판매처 N곳(기본 50) 합성 최저가 시계열을 만든다. 길이는 ETS 적합 구간(ETS_MIN_LEN~ETS_MAX_LEN)에서 고르고,
+모양은 잡음만 / 선형 추세 / 랜덤워크 / 급락이 섞인 계단 / 주기적 할인 다섯 가지를 돌려 쓴다.
+statsmodels ExponentialSmoothing(trend="add").fit() 을 시계열마다 돌린 시간과 fit_holt_batch 한 번의 시간을 잰다.
+
+허용 오차 (모든 시계열에 같은 기준, 하나라도 어기면 exit 1):
+- 재현: numpy 가 찾은 (alpha, beta, l0, b0) 를 statsmodels 에 그대로 넣어(optimized=False) 다시 계산한
+  1스텝 예측 / RMSE 와의 차이 ≤ 1e-6. 같은 모형을 같은 식으로 계산하는지 본다.
+- RMSE: numpy ≤ statsmodels 자체 적합 × (1 + 1e-3).
+- 예측: statsmodels 자체 적합의 1스텝 예측과의 차이 ≤ 0.5%. numpy 의 RMSE 가 더 낮은(다른 해를 찾은)
+  시계열도 예외 없이 센다. API 기본 엔진(PRICE_FORECAST_ENGINE=statsmodels)을 numpy 로 바꾸려면 이 기준을
+  통과해야 한다.
+
+Usage:
+  python scripts/bench_holt_forecast.py
+  python scripts/bench_holt_forecast.py --malls 200 --seed 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+
+from api.services.holt_forecast import _coarse_free_responses, fit_holt_batch
+from api.services.price_analytics import ETS_MAX_LEN, ETS_MIN_LEN
+
+REFIT_TOLERANCE = 1e-6
+RMSE_TOLERANCE = 1e-3
+FORECAST_TOLERANCE = 5e-3
+
+
+def synthetic_series(malls: int, seed: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(malls):
+        n = int(rng.integers(ETS_MIN_LEN, ETS_MAX_LEN + 1))
+        t = np.arange(n)
+        base = 85000 + rng.normal(0, 6000)
+        kind = i % 5
+        if kind == 0:
+            y = base + rng.normal(0, 800, n)
+        elif kind == 1:
+            y = base + rng.normal(0, 60) * t + rng.normal(0, 500, n)
+        elif kind == 2:
+            y = base + np.cumsum(rng.normal(0, 400, n))
+        elif kind == 3:
+            y = base + np.where(rng.random(n) < 0.08, -15000, 0) + rng.normal(0, 100, n)
+        else:
+            y = base - 3000 * ((t // 8) % 4 == 3) + rng.normal(0, 300, n)
+        out.append(np.round(y))
+    return out
+
+
+def statsmodels_fit(y: np.ndarray) -> tuple[float, float]:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit = ExponentialSmoothing(y, trend="add", seasonal=None).fit(optimized=True)
+    fitted = np.asarray(fit.fittedvalues, dtype=float)
+    return float(np.asarray(fit.forecast(1))[0]), float(np.sqrt(np.mean((y - fitted) ** 2)))
+
+
+def statsmodels_refit(y: np.ndarray, params: dict) -> tuple[float, float]:
+    """numpy 가 찾은 모수를 고정해 statsmodels 로 다시 계산한 (1스텝 예측, RMSE)."""
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit = ExponentialSmoothing(
+            y,
+            trend="add",
+            seasonal=None,
+            initialization_method="known",
+            initial_level=params["initial_level"],
+            initial_trend=params["initial_trend"],
+        ).fit(smoothing_level=params["alpha"], smoothing_trend=params["beta"], optimized=False)
+    fitted = np.asarray(fit.fittedvalues, dtype=float)
+    return float(np.asarray(fit.forecast(1))[0]), float(np.sqrt(np.mean((y - fitted) ** 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--malls", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    series = synthetic_series(args.malls, args.seed)
+    statsmodels_fit(series[0])  # import 를 측정에서 뺀다
+
+    t0 = time.perf_counter()
+    reference = [statsmodels_fit(y) for y in series]
+    t_sm = time.perf_counter() - t0
+
+    _coarse_free_responses.cache_clear()
+    t0 = time.perf_counter()
+    fits = fit_holt_batch(series)
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fit_holt_batch(series)
+    t_warm = time.perf_counter() - t0
+
+    lower, problems = 0, []
+    worst_refit, worst_fc, worst_lower_fc = 0.0, 0.0, 0.0
+    for i, (y, fit, (sm_fc, sm_rmse)) in enumerate(zip(series, fits, reference)):
+        label = f"series {i} (n={len(y)})"
+        refit_fc, refit_rmse = statsmodels_refit(y, fit)
+        refit_diff = max(
+            abs(fit["forecast"] - refit_fc) / max(abs(refit_fc), 1.0),
+            abs(fit["rmse"] - refit_rmse) / max(refit_rmse, 1e-9),
+        )
+        worst_refit = max(worst_refit, refit_diff)
+        if refit_diff > REFIT_TOLERANCE:
+            problems.append(f"{label}: statsmodels at numpy's parameters differs by {refit_diff:.2e}")
+
+        ratio = fit["rmse"] / max(sm_rmse, 1e-9)
+        if ratio > 1 + RMSE_TOLERANCE:
+            problems.append(f"{label}: rmse {fit['rmse']:.1f} > statsmodels {sm_rmse:.1f}")
+
+        fc_diff = abs(fit["forecast"] - sm_fc) / max(abs(sm_fc), 1.0)
+        worst_fc = max(worst_fc, fc_diff)
+        if ratio < 1 - RMSE_TOLERANCE:
+            lower += 1
+            worst_lower_fc = max(worst_lower_fc, fc_diff)
+        if fc_diff > FORECAST_TOLERANCE:
+            problems.append(
+                f"{label}: forecast differs from statsmodels by {100 * fc_diff:.2f}% "
+                f"(rmse numpy/statsmodels {ratio:.4f})"
+            )
+
+    lengths = [len(y) for y in series]
+    print(f"series={len(series)} length={min(lengths)}..{max(lengths)}")
+    print(f"  statsmodels (per series) : {t_sm:6.3f}s")
+    print(f"  numpy (one call)         : cold {t_cold:6.3f}s  warm {t_warm:6.3f}s  ({t_sm / t_warm:.1f}x)")
+    print(f"  refit at numpy params    : max diff {worst_refit:.2e} (tolerance {REFIT_TOLERANCE:.0e})")
+    print(
+        f"  forecast vs statsmodels  : max diff {100 * worst_fc:.3f}% (tolerance {100 * FORECAST_TOLERANCE:.1f}%, "
+        f"all series)"
+    )
+    print(
+        f"  numpy rmse lower (>{100 * RMSE_TOLERANCE:.1f}%) : {lower}  "
+        f"max forecast diff among them {100 * worst_lower_fc:.3f}%"
+    )
+    if problems:
+        for p in problems:
+            print(f"❌ {p}")
+        sys.exit(1)
+    print("✅ numpy Holt matches statsmodels within tolerance")
+
+
+if __name__ == "__main__":
+    main()
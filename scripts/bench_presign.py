@@ -0,0 +1,82 @@
+"""presigned URL 행당 서명 비용 벤치마크 (before: 호출마다 client 생성 / after: 공용 client + URL 캐시).
+
+presign 은 로컬 서명 연산이라 네트워크/실제 버킷 없이 더미 자격증명으로 측정한다.
+
+Usage:
+  python scripts/bench_presign.py
+  python scripts/bench_presign.py --rows 500 --distinct 120 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+from api.services import s3_storage
+
+
+def _configure_dummy_s3():
+    config.ENABLE_S3_UPLOAD = True
+    config.S3_BUCKET = config.S3_BUCKET or "bench-bucket"
+    config.AWS_ACCESS_KEY_ID = config.AWS_ACCESS_KEY_ID or "AKIABENCHMARK000000"
+    config.AWS_SECRET_ACCESS_KEY = config.AWS_SECRET_ACCESS_KEY or "bench-secret-key"
+    s3_storage.reset_s3_client()
+
+
+def _before(keys: list[str]) -> None:
+    # 변경 전 경로: 행마다 새 boto3 client 를 만들고 서명한다.
+    for key in keys:
+        client = s3_storage._new_s3_client()
+        client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": config.S3_BUCKET, "Key": key},
+            ExpiresIn=3600,
+        )
+
+
+def _after(keys: list[str]) -> None:
+    for key in keys:
+        s3_storage.to_display_image_url(key)
+
+
+def _measure(fn, keys: list[str], repeat: int, *, reset_cache: bool) -> list[float]:
+    per_row_ms = []
+    for _ in range(repeat):
+        if reset_cache:
+            s3_storage.reset_s3_client()
+        t0 = time.perf_counter()
+        fn(keys)
+        per_row_ms.append((time.perf_counter() - t0) * 1000 / len(keys))
+    return per_row_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500, help="응답 한 번의 행 수")
+    parser.add_argument("--distinct", type=int, default=120, help="서로 다른 카드 이미지 key 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    _configure_dummy_s3()
+    keys = [f"{config.S3_PREFIX}/cards/bench-{i % max(1, args.distinct)}.png" for i in range(args.rows)]
+
+    before = _measure(_before, keys, args.repeat, reset_cache=True)
+    cold = _measure(_after, keys, args.repeat, reset_cache=True)
+    warm = _measure(_after, keys, args.repeat, reset_cache=False)
+
+    print(f"rows={args.rows} distinct_keys={args.distinct} repeat={args.repeat}")
+    print(f"  before (client per row)      : {statistics.median(before):8.3f} ms/row")
+    print(f"  after  (shared client, cold) : {statistics.median(cold):8.3f} ms/row")
+    print(f"  after  (shared client, warm) : {statistics.median(warm):8.3f} ms/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""판매처 가격 인사이트 배치 벤치마크 (판매처별 순차 계산 vs 프로세스 풀 vs numpy 예측 엔진).
+
+판매처 N곳 × days일 × 하루 4회 합성 최저가 시계열(일부 급락/급등 포함)을 만들고
+statsmodels 예측 엔진으로 build_price_insights_batch 를 workers=1(요청 스레드에서 순서대로, 단건 API 를
+N번 부르던 것과 같은 계산량)과 workers=K(프로세스 풀)로 돌린다. 풀은 첫 호출에 뜨므로 cold / warm 을 따로 잰다.
+두 결과가 다르면 exit 1. 마지막 줄은 numpy 엔진(전 판매처 Holt 한 번에 적합, 풀 없음) 시간이다
+(적합 방법이 달라 결과 비교는 scripts/bench_holt_forecast.py 가 한다). DB 는 쓰지 않는다.
+
+Usage:
+  python scripts/bench_price_insights.py
+  python scripts/bench_price_insights.py --malls 40 --days 30 --workers 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# 풀 워커는 spawn 으로 모듈을 다시 import 하므로 엔진은 환경 변수로 정한다.
+os.environ["PRICE_FORECAST_ENGINE"] = "statsmodels"
+
+import pandas as pd
+
+from api.services import price_analytics
+from api.services.price_analytics import SNAPSHOTS_PER_DAY, build_price_insights_batch
+
+
+def _synthetic_series(*, malls: int, days: int, seed: int) -> dict[str, pd.DataFrame]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    n = days * SNAPSHOTS_PER_DAY
+    series = {}
+    for m in range(malls):
+        base = 85000 + rng.randint(-8000, 8000)
+        drift = rng.uniform(-40, 40)
+        prices = []
+        for i in range(n):
+            p = base + drift * i + rng.gauss(0, 1500)
+            if rng.random() < 0.02:
+                p += rng.choice((-1, 1)) * 15000
+            prices.append(int(max(p, 10000)))
+        series[f"판매처{m:03d}"] = pd.DataFrame(
+            {
+                "ts": pd.to_datetime([start + timedelta(hours=24 // SNAPSHOTS_PER_DAY * i) for i in range(n)]),
+                "min_price": prices,
+            }
+        )
+    return series
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--malls", type=int, default=24)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    series = _synthetic_series(malls=args.malls, days=args.days, seed=args.seed)
+    build_price_insights_batch(dict(list(series.items())[:1]), workers=1)  # statsmodels import 를 측정에서 뺀다
+
+    t0 = time.perf_counter()
+    baseline = build_price_insights_batch(series, workers=1)
+    t_seq = time.perf_counter() - t0
+    print(f"malls={args.malls} days={args.days} points/mall={args.days * SNAPSHOTS_PER_DAY}")
+    print(f"  sequential        : {t_seq:6.2f}s")
+
+    failed = False
+    for workers in args.workers:
+        price_analytics.PRICE_INSIGHTS_WORKERS = workers
+        price_analytics._reset_pool(wait=True)
+        t0 = time.perf_counter()
+        cold = build_price_insights_batch(series, workers=workers)
+        t_cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        warm = build_price_insights_batch(series, workers=workers)
+        t_warm = time.perf_counter() - t0
+        ok = cold == baseline and warm == baseline
+        failed = failed or not ok
+        print(
+            f"  pool workers={workers:<2} : cold {t_cold:6.2f}s  warm {t_warm:6.2f}s  ({t_seq / t_warm:.1f}x)"
+            + ("" if ok else "  ❌ results differ from sequential")
+        )
+    # 워커가 다 내려간 뒤에 잰다 (wait=False 면 종료 중인 워커가 numpy 측정과 CPU 를 나눠 쓴다).
+    price_analytics._reset_pool(wait=True)
+
+    price_analytics.PRICE_FORECAST_ENGINE = "numpy"
+    build_price_insights_batch(dict(list(series.items())[:1]))
+    t0 = time.perf_counter()
+    build_price_insights_batch(series)
+    print(f"  numpy engine      : {time.perf_counter() - t0:6.2f}s  (one vectorized Holt fit, no pool)")
+
+    if failed:
+        sys.exit(1)
+    print("✅ process-pool insights match sequential results")
+
+
+if __name__ == "__main__":
+    main()
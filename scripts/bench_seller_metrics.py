@@ -0,0 +1,144 @@
+"""셀러 지표 엔진 벤치마크 (python 루프 엔진 vs NumPy 컬럼 엔진).
+
+하루 4회 스냅샷으로 1년치 합성 products 행을 만들고, 기간(행 수)을 늘려 가며
+월간 지표 상태(seller_month_states)와 기간 리포트 섹션(compute_range_sections)을 두 엔진으로 계산한다.
+두 엔진 결과가 다르면 exit 1. DB 는 쓰지 않는다.
+
+Usage:
+  python scripts/bench_seller_metrics.py
+  python scripts/bench_seller_metrics.py --sellers 120 --per-seller 3 --days 30 90 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.services.metrics_engine import RangeFrame, monthly_states, range_below_detail, range_chart, range_summary
+from api.services.monthly_metrics import seller_month_states
+from api.services.range_metrics import _RANGE_COLUMNS, _RangeScan
+
+MONTHLY_COLUMNS = [
+    "id", "mall_name", "unit_price", "link", "calc_method", "channel", "ts",
+    "snapshot_id", "snapshot_at", "created_at", "calc_valid",
+]
+SNAPSHOT_HOURS = (0, 6, 12, 18)
+
+
+def _synthetic_rows(*, days: int, sellers: int, per_seller: int, threshold: int, seed: int) -> list[dict]:
+    """days × 4 snapshots; every seller lists per_seller products around the threshold."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    base_price = {f"셀러{i:03d}": threshold + rng.randint(-6000, 12000) for i in range(sellers)}
+    rows, row_id = [], 0
+    for day in range(days):
+        for hour in SNAPSHOT_HOURS:
+            ts = start + timedelta(days=day, hours=hour, minutes=rng.randint(0, 9))
+            snapshot_id = f"{ts:%Y%m%d%H%M}-bench"
+            for seller, base in base_price.items():
+                for k in range(per_seller):
+                    row_id += 1
+                    quantity = k % 4 + 1
+                    unit_price = base + rng.randint(-3, 3) * 1000
+                    rows.append({
+                        "id": row_id,
+                        "product_name": f"프리스타일 리브레2 {quantity}개",
+                        "mall_name": seller if k else f" {seller} ",
+                        "unit_price": unit_price,
+                        "total_price": unit_price * quantity,
+                        "quantity": quantity,
+                        "link": f"https://example.com/{row_id}",
+                        "image_url": None,
+                        "card_image_path": None,
+                        "calc_method": rng.choice(["title", "title", "option", "fallback "]),
+                        "channel": "naver",
+                        "ts": ts,
+                        "snapshot_id": snapshot_id,
+                        "snapshot_at": ts,
+                        "created_at": ts,
+                        "calc_valid": 0 if rng.random() < 0.03 else 1,
+                    })
+    return rows
+
+
+def _best_of(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _states_json(states) -> dict:
+    return {seller: json.loads(st.to_json()) for seller, st in states.items()}
+
+
+def _range_python(rows, threshold: int):
+    scan = _RangeScan(threshold_price=threshold, channel="naver").add_rows(rows)
+    below = scan.below_threshold_detail()
+    return scan.seller_metrics(), below, scan.seller_chart_data([b["seller_name"] for b in below] or None)
+
+
+def _range_columnar(rows, threshold: int):
+    f = RangeFrame(_RANGE_COLUMNS, rows, channel="naver")
+    below = range_below_detail(f, threshold_price=threshold)
+    return range_summary(f, threshold), below, range_chart(f, [b["seller_name"] for b in below] or None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 90, 180, 365], help="기간(일) 목록")
+    parser.add_argument("--sellers", type=int, default=60)
+    parser.add_argument("--per-seller", type=int, default=2, help="스냅샷당 셀러별 상품 수")
+    parser.add_argument("--threshold", type=int, default=90000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"sellers={args.sellers} per_seller={args.per_seller} snapshots/day={len(SNAPSHOT_HOURS)}")
+    print(f"{'days':>5} {'rows':>9} | {'monthly py':>10} {'numpy':>8} {'x':>5} | {'range py':>9} {'numpy':>8} {'x':>5}")
+    failed = False
+    for days in args.days:
+        rows = _synthetic_rows(
+            days=days, sellers=args.sellers, per_seller=args.per_seller, threshold=args.threshold, seed=args.seed
+        )
+        monthly_tuples = [tuple(r[c] for c in MONTHLY_COLUMNS) for r in rows]
+        range_tuples = [tuple(r[c] for c in _RANGE_COLUMNS) for r in rows]
+
+        t_mpy, m_py = _best_of(lambda: seller_month_states(rows, threshold_price=args.threshold), args.repeat)
+        t_mnp, m_np = _best_of(
+            lambda: monthly_states(MONTHLY_COLUMNS, monthly_tuples, threshold_price=args.threshold), args.repeat
+        )
+        t_rpy, r_py = _best_of(lambda: _range_python(range_tuples, args.threshold), args.repeat)
+        t_rnp, r_np = _best_of(lambda: _range_columnar(range_tuples, args.threshold), args.repeat)
+
+        mismatch = []
+        if _states_json(m_py) != _states_json(m_np):
+            mismatch.append("monthly")
+        if r_py != r_np:
+            mismatch.append("range")
+        failed = failed or bool(mismatch)
+        print(
+            f"{days:>5} {len(rows):>9,} | {t_mpy * 1000:>8.1f}ms {t_mnp * 1000:>6.1f}ms {t_mpy / t_mnp:>4.1f}x"
+            f" | {t_rpy * 1000:>7.1f}ms {t_rnp * 1000:>6.1f}ms {t_rpy / t_rnp:>4.1f}x"
+            + (f"  ❌ mismatch: {', '.join(mismatch)}" if mismatch else "")
+        )
+
+    if failed:
+        sys.exit(1)
+    print("✅ python / numpy engines agree")
+
+
+if __name__ == "__main__":
+    main()
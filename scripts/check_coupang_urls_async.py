@@ -0,0 +1,227 @@
+"""쿠팡 URL 크롤러 async 모드 점검 (로컬 스텁 서버, 네트워크 / ZenRows 크레딧 불필요).
+
+127.0.0.1 에 ZenRows 흉내 HTTP 서버를 띄우고 crawl_coupang_urls 의 ZENROWS_ENDPOINT 를 그쪽으로 돌려
+가짜 상품 URL N개를 sequential / async 로 크롤한다. 스텁은 요청마다 --latency 초 걸리고,
+--block-every 번째 요청마다 Akamai 차단 페이지를 돌려준다. 확인 항목:
+
+- 동시에 처리 중인 요청 수가 --concurrency 를 넘지 않는다.
+- 호스트당 요청 속도가 토큰 버킷 상한(--max-rps, 버스트 1)을 넘지 않는다.
+- 차단 페이지 뒤에는 버킷 속도가 내려가고(적응형 감속), 같은 작업자가 새 session_id 로 재시도한다.
+- 차단이 없을 때 작업자는 자기 session_id 를 유지한다 (세션 고정).
+- 모든 URL 이 sequential 과 같은 row 로 성공한다.
+
+하나라도 어긋나면 exit 1. DB 는 쓰지 않는다.
+
+Usage:
+  python scripts/check_coupang_urls_async.py
+  python scripts/check_coupang_urls_async.py --urls 40 --concurrency 8 --max-rps 20 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from scripts import crawl_coupang_urls as crawler
+
+_PRODUCT_HTML = """<html><head><title>쿠팡</title></head><body>
+<h1 class="product-title">애보트 프리스타일 리브레2 연속혈당측정기 {n}</h1>
+<div class="final-price-amount">{price:,}원</div>
+<table class="prod-delivery-return-policy-table"><tr><th>판매자</th><td>스텁셀러{n}</td></tr></table>
+<img class="prod-image__detail" src="https://example.com/{n}.png">
+</body></html>"""
+_BLOCKED_HTML = "<html><body>Access Denied - powered and protected by Privacy (akamai)</body></html>"
+
+
+class _StubState:
+    def __init__(self, *, latency: float, block_every: int):
+        self.latency = latency
+        self.block_every = block_every
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []  # (started_monotonic, session_id, target_url, blocked)
+
+    def reset(self):
+        with self.lock:
+            self.in_flight = self.max_in_flight = 0
+            self.requests = []
+
+
+def _make_handler(state: _StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            qs = parse_qs(urlparse(self.path).query)
+            target = qs.get("url", [""])[0]
+            sid = qs.get("session_id", [""])[0]
+            with state.lock:
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                n_req = len(state.requests) + 1
+                blocked = state.block_every > 0 and n_req % state.block_every == 0
+                state.requests.append((time.monotonic(), sid, target, blocked))
+            try:
+                time.sleep(state.latency)
+                n = int(parse_qs(urlparse(target).query).get("itemId", ["0"])[0])
+                body = _BLOCKED_HTML if blocked else _PRODUCT_HTML.format(n=n, price=80000 + n * 100)
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _targets(n: int):
+    return [
+        {"keyword": "리브레2", "expected_name": "", "url": f"https://www.coupang.com/vp/products/{i}?itemId={i}"}
+        for i in range(1, n + 1)
+    ]
+
+
+def _max_rate_violation(starts, max_rps: float) -> float:
+    """버스트 1 토큰 버킷이면 k 번째 뒤 요청까지 최소 k/max_rps 초가 지나야 한다. 가장 큰 초과분(초)."""
+    worst = 0.0
+    for i in range(len(starts)):
+        for j in range(i + 1, len(starts)):
+            need = (j - i) / max_rps
+            worst = max(worst, need - (starts[j] - starts[i]))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--max-rps", type=float, default=15.0)
+    parser.add_argument("--min-rps", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.3, help="스텁 응답 지연(초)")
+    parser.add_argument("--block-every", type=int, default=7, help="N 번째 요청마다 차단 페이지 (0=없음)")
+    parser.add_argument("--verbose", action="store_true", help="크롤러 로그 출력")
+    args = parser.parse_args()
+
+    state = _StubState(latency=args.latency, block_every=0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    crawler.ZENROWS_ENDPOINT = f"http://127.0.0.1:{server.server_address[1]}/v1/"
+    crawler.ZENROWS_API_KEY = crawler.ZENROWS_API_KEY or "stub"
+    crawler.MIN_SLEEP_SEC = crawler.MAX_SLEEP_SEC = 0.0
+
+    targets = _targets(args.urls)
+    problems = []
+    log = None if args.verbose else StringIO()
+
+    try:
+        # 기준: sequential (차단 없음)
+        t0 = time.perf_counter()
+        with redirect_stdout(log or sys.stdout):
+            seq_rows, seq_failures = crawler._crawl_sequential(targets)
+        t_seq = time.perf_counter() - t0
+
+        # async, 차단 없음: 동시성 / 속도 상한 / 세션 고정
+        state.reset()
+        t0 = time.perf_counter()
+        with redirect_stdout(log or sys.stdout):
+            results = asyncio.run(
+                crawler.crawl_urls_async(
+                    targets, concurrency=args.concurrency, max_rps=args.max_rps, min_rps=args.min_rps
+                )
+            )
+        t_async = time.perf_counter() - t0
+        async_rows = [r["row"] for r in results if r and r["ok"]]
+        starts = sorted(r[0] for r in state.requests)
+        sessions = {r[1] for r in state.requests}
+        over = _max_rate_violation(starts, args.max_rps)
+
+        print(f"urls={args.urls} latency={args.latency}s concurrency={args.concurrency} max_rps={args.max_rps}")
+        print(f"  sequential : {t_seq:6.2f}s  ok={len(seq_rows)} fail={len(seq_failures)}")
+        print(
+            f"  async      : {t_async:6.2f}s  ok={len(async_rows)}  max_in_flight={state.max_in_flight}"
+            f"  sessions={len(sessions)}  rate_overrun={over * 1000:.1f}ms  ({t_seq / t_async:.1f}x)"
+        )
+        if seq_failures or len(seq_rows) != args.urls:
+            problems.append(f"sequential failures: {len(seq_failures)}")
+        if async_rows != seq_rows:
+            problems.append("async rows differ from sequential rows")
+        if state.max_in_flight > args.concurrency:
+            problems.append(f"in-flight {state.max_in_flight} > concurrency {args.concurrency}")
+        if over > 0.05:  # 스텁이 요청을 받은 시각 기준이라 로컬 소켓 지연만큼은 허용
+            problems.append(f"token bucket exceeded by {over * 1000:.0f}ms")
+        if len(sessions) != min(args.concurrency, args.urls):
+            problems.append(f"expected one session_id per worker, saw {len(sessions)}")
+
+        # async, 차단 페이지 섞임: 적응형 감속 + 새 session_id 재시도
+        if args.block_every > 0:
+            state.reset()
+            state.block_every = args.block_every
+            rates = []
+            original_slow_down = crawler._HostTokenBucket.slow_down
+
+            def _recording_slow_down(self, host):
+                rate = original_slow_down(self, host)
+                rates.append(rate)
+                return rate
+
+            crawler._HostTokenBucket.slow_down = _recording_slow_down
+            try:
+                t0 = time.perf_counter()
+                with redirect_stdout(log or sys.stdout):
+                    results = asyncio.run(
+                        crawler.crawl_urls_async(
+                            targets, concurrency=args.concurrency, max_rps=args.max_rps, min_rps=args.min_rps
+                        )
+                    )
+                t_blocked = time.perf_counter() - t0
+            finally:
+                crawler._HostTokenBucket.slow_down = original_slow_down
+            state.block_every = 0
+
+            blocked_reqs = [r for r in state.requests if r[3]]
+            retried_new_sid = 0
+            for started, sid, target, _ in blocked_reqs:
+                later = [r for r in state.requests if r[2] == target and r[0] > started]
+                if later and later[0][1] != sid:
+                    retried_new_sid += 1
+            ok = sum(1 for r in results if r and r["ok"])
+            print(
+                f"  async+block: {t_blocked:6.2f}s  ok={ok}  blocked={len(blocked_reqs)}"
+                f"  retried_with_new_sid={retried_new_sid}  slowed_to={min(rates) if rates else 0:.2f} req/s"
+            )
+            if not rates or min(rates) >= args.max_rps:
+                problems.append("bucket rate did not drop after bot block")
+            if retried_new_sid != len(blocked_reqs):
+                problems.append(f"{len(blocked_reqs) - retried_new_sid} blocked requests not retried with a new session_id")
+            if ok != args.urls:
+                problems.append(f"async with blocks: {args.urls - ok} urls failed")
+    finally:
+        server.shutdown()
+
+    if problems:
+        for p in problems:
+            print(f"❌ {p}")
+        sys.exit(1)
+    print("✅ async crawl respects concurrency / rate limits and backs off on bot blocks")
+
+
+if __name__ == "__main__":
+    main()
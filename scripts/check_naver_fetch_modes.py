@@ -0,0 +1,73 @@
+"""네이버 쇼핑 API 수집 모드(sequential / concurrent) 결과 비교.
+
+두 모드로 페이지를 받아 같은 처리 단계(build_rows_from_pages)를 돌리고 행이 같은지 확인한다.
+쿠팡 판매자 보강은 외부 페이지 조회라 호출마다 달라질 수 있으므로 비교 중에는 끈다.
+검색 순위는 수 초 사이에도 바뀔 수 있어, 불일치 시 원인이 페이지(원본)인지 처리인지 나눠 보여준다.
+
+Usage:
+  python scripts/check_naver_fetch_modes.py
+  python scripts/check_naver_fetch_modes.py --query "리브레2"
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+import scripts.crawl_naver as crawl_naver
+
+
+def _item_keys(pages):
+    return [(start, item.get("productId") or item.get("link")) for start, items in pages for item in items]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", default=config.SEARCH_KEYWORD)
+    args = parser.parse_args()
+
+    crawl_naver.COUPANG_SELLER_ENRICH_ENABLED = False
+    confirmed = crawl_naver.load_confirmed_qty_by_link_map()
+
+    timings = {}
+    pages = {}
+    for mode in ("sequential", "concurrent"):
+        t0 = time.perf_counter()
+        pages[mode] = crawl_naver.fetch_naver_pages(args.query, mode=mode)
+        timings[mode] = time.perf_counter() - t0
+
+    rows = {
+        mode: crawl_naver.build_rows_from_pages(args.query, pages[mode], confirmed)
+        for mode in pages
+    }
+    # 같은 원본 페이지로 처리 단계를 다시 돌려 처리 결과가 모드와 무관한지도 본다.
+    rows_from_seq_pages = crawl_naver.build_rows_from_pages(args.query, pages["sequential"], confirmed)
+
+    for mode in ("sequential", "concurrent"):
+        print(f"{mode:>10}: pages={len(pages[mode])} rows={len(rows[mode])} fetch={timings[mode]:.2f}s")
+
+    same_pages = _item_keys(pages["sequential"]) == _item_keys(pages["concurrent"])
+    same_rows = rows["sequential"] == rows["concurrent"]
+    print(f"same raw pages: {same_pages}")
+    print(f"same rows     : {same_rows}")
+    if rows_from_seq_pages != rows["sequential"]:
+        print("❌ 처리 단계가 같은 입력에서 다른 결과를 냈습니다.")
+        sys.exit(1)
+    if same_pages and not same_rows:
+        print("❌ 같은 원본 페이지인데 행이 다릅니다.")
+        sys.exit(1)
+    if not same_pages:
+        print("⚠️ 원본 검색 결과가 두 호출 사이에 바뀌었습니다. 다시 실행해 보세요.")
+        sys.exit(2)
+    print("✅ 두 모드의 결과가 같습니다.")
+
+
+if __name__ == "__main__":
+    main()
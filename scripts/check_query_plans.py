@@ -0,0 +1,131 @@
+"""Hot path 조회 SQL의 실행 계획을 점검한다.
+
+API / 리포트가 실제로 실행하는 SQL 빌더를 그대로 가져와 EXPLAIN 하고,
+products 테이블이 풀스캔(type=ALL) 또는 인덱스 풀스캔(type=index)으로 풀리면
+실패(exit 1)한다. 배포 전 또는 인덱스 변경 후에 실행한다.
+
+products 가 월 파티션(scripts/partition_products.py --migrate)이면 EXPLAIN 의 partitions 열도 본다.
+조회 창(observed_at 범위)과 겹치지 않는 파티션을 하나라도 읽으면 pruning 실패로 exit 1.
+(MySQL 8 에서 EXPLAIN PARTITIONS 는 없어졌고 기본 EXPLAIN 이 partitions 열을 준다.)
+
+Usage:
+  python scripts/check_query_plans.py
+  python scripts/check_query_plans.py --mall 랜식 --days 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import text
+
+from api.database import SessionLocal, engine, init_db
+from api.routers.products import _export_raw_query, _mall_timeline_query, _to_std_mall_name
+from api.services.malls import mall_id_filter_sql
+from api.services.monthly_metrics import _monthly_rows_query
+from api.services.price_analytics import _all_mall_min_price_series_query, _mall_min_price_series_query
+from api.services.product_partitions import partition_layout, partitions_for_window
+from api.services.range_metrics import _fetch_products_query
+from api.services.snapshots import latest_snapshot, snapshot_filter_sql
+
+_BAD_ACCESS_TYPES = {"ALL", "index"}
+
+
+def _plan_cases(mall: str, days: int, channel: str):
+    """(라벨, (sql, params), observed_at 창 [start, end)). end=None 은 끝이 열린 창."""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    day_start = today - timedelta(days=days)
+    day_end = today + timedelta(days=1)
+    start_str = day_start.strftime("%Y-%m-%d %H:%M:%S")
+    end_str = day_end.strftime("%Y-%m-%d %H:%M:%S")
+    month_start = today.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    # DATE_SUB(NOW(), ...) 창: DB 시간대 차이만큼 하루 여유를 둔다
+    recent = (day_start - timedelta(days=1), None)
+    db = SessionLocal()
+    try:
+        mall_filter = mall_id_filter_sql(db, [_to_std_mall_name(mall)], column="p.mall_id")
+        latest = latest_snapshot(db)
+    finally:
+        db.close()
+
+    yield "export/raw (all)", _export_raw_query(day_start, day_end, "all"), (day_start, day_end)
+    yield f"export/raw ({channel})", _export_raw_query(day_start, day_end, channel), (day_start, day_end)
+    yield "mall/timeline", _mall_timeline_query(mall_filter, days, channel), recent
+    yield "range report", _fetch_products_query(start_str, end_str, channel), (day_start, day_end)
+    yield "monthly metrics", _monthly_rows_query(
+        month_start.strftime("%Y-%m-%d %H:%M:%S"),
+        month_end.strftime("%Y-%m-%d %H:%M:%S"),
+        channel,
+    ), (month_start, month_end)
+    yield "price insights series", _mall_min_price_series_query(
+        mall_filter=mall_filter, days=days, channel=channel
+    ), recent
+    yield "price insights batch series", _all_mall_min_price_series_query(days=days, channel=channel), recent
+    yield "price insights batch series (malls)", _all_mall_min_price_series_query(
+        days=days, channel=channel, mall_filter=mall_filter
+    ), recent
+    if latest and latest.get("observed_from"):
+        where, params = snapshot_filter_sql(latest)
+        yield "latest snapshot rows", (f"SELECT p.id, p.unit_price FROM products p WHERE {where}", params), (
+            latest["observed_from"],
+            None,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mall", default="랜식", help="타임라인/인사이트 점검용 판매처명")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--channel", default="naver")
+    parser.add_argument("--skip-init", action="store_true", help="init_db() 마이그레이션 생략")
+    args = parser.parse_args()
+
+    if not args.skip_init:
+        init_db()
+
+    failures = []
+    with engine.connect() as conn:
+        cur = conn.connection.cursor()
+        layout = partition_layout(cur)
+        cur.close()
+        if layout:
+            print(f"products 파티션 {len(layout)}개: {layout[0].name} … {layout[-1].name}")
+        else:
+            print("products 는 파티션이 없다 (partitions 검사 생략)")
+
+        for label, (sql, params), (win_start, win_end) in _plan_cases(args.mall, args.days, args.channel):
+            plan = conn.execute(text("EXPLAIN " + sql), params).mappings().all()
+            print(f"── {label}")
+            for row in plan:
+                table = row.get("table")
+                access = row.get("type")
+                key = row.get("key")
+                partitions = row.get("partitions")
+                print(f"   table={table} type={access} key={key} rows={row.get('rows')} partitions={partitions}")
+                if table not in ("p", "products"):
+                    continue
+                if access in _BAD_ACCESS_TYPES:
+                    failures.append(f"{label}: products {access} scan (key={key})")
+                if layout and partitions:
+                    extra = set(partitions.split(",")) - set(partitions_for_window(layout, win_start, win_end))
+                    if extra:
+                        failures.append(f"{label}: 창 밖 파티션을 읽는다 ({', '.join(sorted(extra))})")
+
+    if failures:
+        print("\n❌ 풀스캔 / pruning 안 되는 경로:")
+        for f in failures:
+            print(f"   - {f}")
+        sys.exit(1)
+    print("\n✅ 모든 경로가 인덱스 범위 스캔으로 풀립니다." + (" (조회 창의 파티션만 읽음)" if layout else ""))
+
+
+if __name__ == "__main__":
+    main()
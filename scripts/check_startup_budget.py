@@ -0,0 +1,94 @@
+"""API cold start 시간 예산 검사 (import api.main + lifespan 시작).
+
+gunicorn 워커 부팅/Railway 재배포 때 걸리는 시간과 같은 구간을 새 인터프리터에서 잰다:
+`import api.main` → lifespan 시작(init_db, 스케줄러, 풀 워밍업 스레드 기동)까지.
+--runs 번 돌려 중앙값이 예산(API_STARTUP_BUDGET_SEC, 기본 2.0초)을 넘으면 exit 1.
+import 직후 numpy/pandas/pyarrow/statsmodels/playwright/boto3/Pillow 가 올라와 있어도 exit 1
+(모두 첫 사용 때 import 해야 한다; 어디서 끌어오는지는 scripts/profile_import_time.py).
+
+DB 에 붙을 수 없으면 init_db 는 경고만 찍고 넘어가므로 시간은 import 위주로 잡힌다.
+DB 가 있으면 스키마 지문이 같을 때(init_db 건너뜀)의 기동 시간이다. 배포 직후 첫 기동처럼
+DDL 까지 포함해 재려면 INIT_DB_FORCE=true 로 돌린다.
+
+Usage:
+  python scripts/check_startup_budget.py
+  API_STARTUP_BUDGET_SEC=1.5 python scripts/check_startup_budget.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from scripts.profile_import_time import HEAVY_MODULES
+
+API_STARTUP_BUDGET_SEC = float(os.getenv("API_STARTUP_BUDGET_SEC", "2.0"))
+_RESULT_PREFIX = "STARTUP_RESULT "
+
+_CHILD = f"""
+import asyncio, json, sys, time
+
+t0 = time.perf_counter()
+import api.main
+t_import = time.perf_counter() - t0
+heavy = sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)
+
+
+async def _startup():
+    async with api.main.app.router.lifespan_context(api.main.app):
+        return time.perf_counter() - t0
+
+
+t_total = asyncio.run(_startup())
+print({_RESULT_PREFIX!r} + json.dumps({{"import": t_import, "total": t_total, "heavy": heavy}}))
+"""
+
+
+def measure_once() -> dict:
+    proc = subprocess.run([sys.executable, "-c", _CHILD], cwd=BASE_DIR, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith(_RESULT_PREFIX):
+            return json.loads(line[len(_RESULT_PREFIX):])
+    sys.stderr.write(proc.stdout + proc.stderr)
+    print("❌ API 기동 실패")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=API_STARTUP_BUDGET_SEC, help="초 (기본 API_STARTUP_BUDGET_SEC)")
+    args = parser.parse_args()
+
+    results = [measure_once() for _ in range(max(1, args.runs))]
+    imports = [r["import"] for r in results]
+    totals = [r["total"] for r in results]
+    median_total = statistics.median(totals)
+    print(f"runs={len(results)} budget={args.budget:.2f}s")
+    print(f"  import api.main : median {statistics.median(imports):.3f}s  (min {min(imports):.3f}s)")
+    print(f"  import+lifespan : median {median_total:.3f}s  (min {min(totals):.3f}s, max {max(totals):.3f}s)")
+
+    failed = False
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    if heavy:
+        failed = True
+        print(f"❌ 기동 때 무거운 의존성이 import 된다: {', '.join(heavy)}")
+    if median_total > args.budget:
+        failed = True
+        print(f"❌ cold start {median_total:.3f}s > budget {args.budget:.2f}s")
+    if failed:
+        sys.exit(1)
+    print("✅ cold start within budget")
+
+
+if __name__ == "__main__":
+    main()
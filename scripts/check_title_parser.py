@@ -0,0 +1,210 @@
+"""상품명 분류 / 수량 파싱(api/services/title_parser.py) 골든 파일 검증 + 처리량 측정.
+
+scripts/title_parser_golden.json 에는 과거 수집 상품명(스케줄러 로그 / products 테이블)과 경계 사례,
+그리고 규칙 모듈화 이전 구현으로 뽑은 기대 결과가 들어 있다. 기본 실행은 현재 구현과 비교해
+하나라도 다르면 exit 1.
+
+--update: 현재 구현 결과로 기대값을 다시 쓴다 (의도한 규칙 변경일 때만).
+--from-db N: --update 시 products 최근 상품명 N개(중복 제외)를 입력에 추가한다.
+--bench: 제목/초 처리량. cold(메모 비움, 매 호출 파싱) / warm(메모 적중)을 따로 잰다.
+
+Usage:
+  python scripts/check_title_parser.py
+  python scripts/check_title_parser.py --bench --repeat 20
+  python scripts/check_title_parser.py --update --from-db 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.services.title_parser import (
+    analyze_coupang_api_title,
+    analyze_product,
+    clear_title_parser_cache,
+    has_sensor_pack_quantity,
+    is_allowed_coupang_libre2_title,
+    is_non_libre_cgm,
+    is_target_libre2_product,
+    title_parser_cache_info,
+)
+
+GOLDEN_PATH = BASE_DIR / "scripts" / "title_parser_golden.json"
+
+
+def title_record(title: str) -> dict:
+    return {
+        "title": title,
+        "is_target": is_target_libre2_product(title),
+        "non_libre_cgm": is_non_libre_cgm(title),
+        "coupang_allowed": is_allowed_coupang_libre2_title(title),
+        "sensor_pack": has_sensor_pack_quantity(title),
+    }
+
+
+def product_record(title: str, total_price: int, link: str, confirmed_qty_by_link: dict) -> dict:
+    return {
+        "title": title,
+        "total_price": total_price,
+        "link": link,
+        "naver": list(analyze_product(title, total_price, link, confirmed_qty_by_link)),
+        "coupang_api": list(analyze_coupang_api_title(title, total_price)),
+    }
+
+
+def _load_golden() -> dict:
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _db_products(limit: int) -> list[tuple[str, int, str]]:
+    import mysql.connector
+
+    import config
+
+    conn = mysql.connector.connect(
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        database=config.DB_NAME,
+    )
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT product_name, MAX(total_price), MAX(link)
+            FROM {config.PRODUCTS_SOURCE}
+            WHERE product_name IS NOT NULL AND total_price IS NOT NULL
+            GROUP BY product_name
+            ORDER BY MAX(id) DESC
+            LIMIT %(limit)s
+            """,
+            {"limit": limit},
+        )
+        return [(name, int(price), link or "") for name, price, link in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def _dump(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _write_golden(golden: dict) -> None:
+    """레코드당 한 줄 (규칙 변경 시 diff 가 바뀐 사례만 보이도록)."""
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f' "confirmed_qty_by_link": {_dump(golden.get("confirmed_qty_by_link") or {})},\n')
+        for key in ("titles", "products"):
+            f.write(f' "{key}": [\n')
+            f.write(",\n".join(f"  {_dump(r)}" for r in golden[key]))
+            f.write("\n ]" + (",\n" if key == "titles" else "\n"))
+        f.write("}\n")
+
+
+def update(golden: dict, from_db: int) -> None:
+    confirmed = golden.get("confirmed_qty_by_link") or {}
+    titles = [r["title"] for r in golden["titles"]]
+    products = [(r["title"], r["total_price"], r["link"]) for r in golden["products"]]
+    if from_db:
+        seen_titles, seen_products = set(titles), set(products)
+        for name, price, link in _db_products(from_db):
+            if name not in seen_titles:
+                seen_titles.add(name)
+                titles.append(name)
+            if (name, price, link) not in seen_products:
+                seen_products.add((name, price, link))
+                products.append((name, price, link))
+
+    golden["titles"] = [title_record(t) for t in titles]
+    golden["products"] = [product_record(t, p, lk, confirmed) for t, p, lk in products]
+    _write_golden(golden)
+    print(f"✅ updated {GOLDEN_PATH.name}: {len(titles)} titles, {len(products)} products")
+
+
+def check(golden: dict) -> list[str]:
+    confirmed = golden.get("confirmed_qty_by_link") or {}
+    problems = []
+    for expected in golden["titles"]:
+        actual = title_record(expected["title"])
+        if actual != expected:
+            problems.append(f"title {expected['title']!r}: expected={expected} actual={actual}")
+    for expected in golden["products"]:
+        actual = product_record(expected["title"], expected["total_price"], expected["link"], confirmed)
+        if actual != expected:
+            problems.append(
+                f"product {expected['title']!r} / {expected['total_price']} / {expected['link']!r}: "
+                f"naver {expected['naver']} -> {actual['naver']}, "
+                f"coupang_api {expected['coupang_api']} -> {actual['coupang_api']}"
+            )
+    return problems
+
+
+def _parse_all(products: list[tuple[str, int, str]], confirmed: dict) -> None:
+    for title, price, link in products:
+        is_target_libre2_product(title)
+        analyze_product(title, price, link, confirmed)
+
+
+def bench(golden: dict, repeat: int) -> None:
+    confirmed = golden.get("confirmed_qty_by_link") or {}
+    products = [(r["title"], r["total_price"], r["link"]) for r in golden["products"]]
+    n = len(products)
+
+    cold = []
+    for _ in range(repeat):
+        clear_title_parser_cache()
+        t0 = time.perf_counter()
+        _parse_all(products, confirmed)
+        cold.append(time.perf_counter() - t0)
+
+    warm = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _parse_all(products, confirmed)
+        warm.append(time.perf_counter() - t0)
+
+    hits = title_parser_cache_info()["analyze_title"]
+    print(f"products={n} (target check + analyze_product) repeat={repeat}")
+    print(f"  cold (memo cleared): {n / min(cold):>12,.0f} titles/s")
+    print(f"  warm (memo hits)   : {n / min(warm):>12,.0f} titles/s")
+    print(f"  analyze_title memo : hits={hits['hits']:,} misses={hits['misses']:,} currsize={hits['currsize']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--update", action="store_true", help="현재 구현 결과로 골든 파일 갱신")
+    mode.add_argument("--bench", action="store_true", help="titles/s 처리량 측정")
+    parser.add_argument("--from-db", type=int, default=0, help="--update 시 products 최근 상품명 N개 추가")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    golden = _load_golden()
+    if args.update:
+        update(golden, args.from_db)
+        return
+    if args.bench:
+        bench(golden, args.repeat)
+        return
+
+    problems = check(golden)
+    if problems:
+        print(f"❌ {len(problems)} mismatches")
+        for p in problems[:50]:
+            print(f"   - {p}")
+        sys.exit(1)
+    print(f"✅ {len(golden['titles'])} titles / {len(golden['products'])} products match {GOLDEN_PATH.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import argparse
-import re
 import sys
 from pathlib import Path
 from typing import List, Tuple
@@ -11,37 +10,13 @@ if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
 import config
-
-LIBRE2_INCLUDE_PATTERNS = [
-    r"프리스타일\s*리브레\s*2",
-    r"리브레\s*2",
-    r"freestyle\s*libre\s*2",
-    r"libre\s*2",
-]
-
-NON_LIBRE_CGM_EXCLUDE_PATTERNS = [
-    r"덱스콤",
-    r"dexcom",
-    r"\bg\s*7\b",
-    r"\bg7\b",
-    r"가디언",
-    r"guardian",
-    r"케어센스\s*에어",
-]
-
-
-def is_target_libre2_product(title: str) -> bool:
-    text = (title or "").strip()
-    if not text:
-        return False
-
-    if any(re.search(pattern, text, re.IGNORECASE) for pattern in NON_LIBRE_CGM_EXCLUDE_PATTERNS):
-        return False
-
-    return any(re.search(pattern, text, re.IGNORECASE) for pattern in LIBRE2_INCLUDE_PATTERNS)
+from api.services.price_intervals import intervals_storage_enabled
+from api.services.response_cache import bump_generation_cursor
+from api.services.title_parser import is_target_libre2_product
 
 
 def collect_non_target_rows() -> List[Tuple[int, str]]:
+    """비대상 (id, 상품명). PRODUCTS_STORAGE_MODE=intervals 면 id 는 price_listings.id 다."""
     conn = mysql.connector.connect(
         host=config.DB_HOST,
         port=config.DB_PORT,
@@ -52,7 +27,10 @@ def collect_non_target_rows() -> List[Tuple[int, str]]:
     )
     try:
         with conn.cursor() as cur:
-            cur.execute(f"SELECT id, product_name FROM {config.DB_TABLE}")
+            if intervals_storage_enabled():
+                cur.execute("SELECT id, product_name FROM price_listings")
+            else:
+                cur.execute(f"SELECT id, product_name FROM {config.DB_TABLE}")
             rows = cur.fetchall()
         return [(int(row[0]), row[1] or "") for row in rows if not is_target_libre2_product(row[1] or "")]
     finally:
@@ -73,10 +51,15 @@ def delete_rows(row_ids: List[int]) -> int:
     )
     try:
         placeholders = ",".join(["%s"] * len(row_ids))
-        query = f"DELETE FROM {config.DB_TABLE} WHERE id IN ({placeholders})"
         with conn.cursor() as cur:
-            cur.execute(query, tuple(row_ids))
+            if intervals_storage_enabled():
+                # 리스팅과 그 가격 구간을 함께 지운다. 반환은 지운 리스팅 수.
+                cur.execute(f"DELETE FROM price_intervals WHERE listing_id IN ({placeholders})", tuple(row_ids))
+                cur.execute(f"DELETE FROM price_listings WHERE id IN ({placeholders})", tuple(row_ids))
+            else:
+                cur.execute(f"DELETE FROM {config.DB_TABLE} WHERE id IN ({placeholders})", tuple(row_ids))
             deleted = cur.rowcount
+            bump_generation_cursor(cur)
         conn.commit()
         return int(deleted or 0)
     finally:
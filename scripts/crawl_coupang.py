@@ -10,6 +10,10 @@ from urllib.parse import quote
 
 import requests
 import config
+from api.services.title_parser import (
+    analyze_coupang_api_title as analyze_product,
+    is_target_libre2_product as _is_target_libre2_product,
+)
 
 DOMAIN = "https://api-gateway.coupang.com"
 PATH = "/v2/providers/affiliate_open_api/apis/openapi/products/search"
@@ -48,22 +52,18 @@ KEYWORDS = (
 SLEEP_SEC = float(os.getenv("COUPANG_SLEEP_SEC", "1.3"))
 
 
-LIBRE2_INCLUDE_PATTERNS = [
-    r"프리스타일\s*리브레\s*2",
-    r"리브레\s*2",
-    r"freestyle\s*libre\s*2",
-    r"libre\s*2",
-]
-
-NON_LIBRE_CGM_EXCLUDE_PATTERNS = [
-    r"덱스콤",
-    r"dexcom",
-    r"\bg\s*7\b",
-    r"\bg7\b",
-    r"가디언",
-    r"guardian",
-    r"케어센스\s*에어",
+# 악세서리 단어 (하나라도 있으면 악세서리 후보) - 제목당 search 1회로 판정
+ACCESSORY_PATTERNS = [
+    r"패치", r"오버\s*패치", r"오버패치", r"\bpatch\b", r"\boverpatch\b",
+    r"커버", r"\bcover\b", r"케이스", r"\bcase\b",
+    r"보호\s*필름", r"보호필름", r"필름", r"\bfilm\b",
+    r"프로텍터", r"\bprotector\b", r"\bscreen\b",
+    r"스트랩", r"\bstrap\b", r"밴드", r"\bband\b",
+    r"홀더", r"\bholder\b", r"클립", r"\bclip\b",
+    r"스티커", r"\bsticker\b", r"테이프", r"\btape\b",
+    r"접착", r"\badhesive\b",
 ]
+_ACCESSORY_RE = re.compile("|".join(f"(?:{p})" for p in ACCESSORY_PATTERNS), re.IGNORECASE)
 
 
 def _auth_header(method: str, url_path_with_query: str) -> str:
@@ -90,18 +90,7 @@ def _is_accessory(title: str) -> bool:
     """
     t = (title or "").lower()
 
-    accessory_patterns = [
-        r"패치", r"오버\s*패치", r"오버패치", r"\bpatch\b", r"\boverpatch\b",
-        r"커버", r"\bcover\b", r"케이스", r"\bcase\b",
-        r"보호\s*필름", r"보호필름", r"필름", r"\bfilm\b",
-        r"프로텍터", r"\bprotector\b", r"\bscreen\b",
-        r"스트랩", r"\bstrap\b", r"밴드", r"\bband\b",
-        r"홀더", r"\bholder\b", r"클립", r"\bclip\b",
-        r"스티커", r"\bsticker\b", r"테이프", r"\btape\b",
-        r"접착", r"\badhesive\b",
-    ]
-
-    has_accessory = any(re.search(p, t, re.IGNORECASE) for p in accessory_patterns)
+    has_accessory = _ACCESSORY_RE.search(t) is not None
     if not has_accessory:
         return False  # 악세서리 단어 없으면 통과
 
@@ -113,69 +102,6 @@ def _is_accessory(title: str) -> bool:
     return True
 
 
-def _is_target_libre2_product(title: str) -> bool:
-    text = (title or "").strip()
-    if not text:
-        return False
-
-    if any(re.search(pattern, text, re.IGNORECASE) for pattern in NON_LIBRE_CGM_EXCLUDE_PATTERNS):
-        return False
-
-    return any(re.search(pattern, text, re.IGNORECASE) for pattern in LIBRE2_INCLUDE_PATTERNS)
-
-
-def analyze_product(title: str, total_price: int):
-    clean_title = title or ""
-
-    gift_patterns = [
-        r"사은품[^+]*", r"증정[^+]*",
-        r"\+\s*패치\s*\d+\s*(개|매|장)?",
-        r"\+\s*알콜\s*(솜|스왑|스웹)?\s*\d+\s*(개|매|장)?",
-    ]
-    for p in gift_patterns:
-        clean_title = re.sub(p, " ", clean_title, flags=re.IGNORECASE)
-
-    sensor_qty_patterns = [
-        r"(측정기|센서|리브레\s*2?)\s*(\d+)\s*(개입|세트|팩|박스|개(?!\s*[인용]))",
-        r"(\d+)\s*(개입|세트|팩|박스|개(?!\s*[인용]))\s*(측정기|센서)",
-        r"(측정기|센서|리브레)\s*[xX*]\s*(\d+)",
-    ]
-
-    sensor_qty = None
-    qty_from_text = False
-
-    for pattern in sensor_qty_patterns:
-        m = re.search(pattern, clean_title, re.IGNORECASE)
-        if m:
-            for g in m.groups():
-                if g and str(g).isdigit():
-                    sensor_qty = int(g)
-                    break
-            if sensor_qty:
-                qty_from_text = True
-                break
-
-    if sensor_qty is None:
-        candidates = []
-        matches = re.findall(r"[\s](\d+)\s*(개|개입|세트|팩|박스|ea|set)", clean_title, re.IGNORECASE)
-        for x in matches:
-            candidates.append(int(x[0]))
-        matches_mul = re.findall(r"[xX*]\s*(\d+)", clean_title)
-        for x in matches_mul:
-            candidates.append(int(x))
-
-        if candidates:
-            sensor_qty = candidates[0]
-            qty_from_text = True
-        else:
-            sensor_qty = 1
-            qty_from_text = False
-
-    unit_price = total_price // sensor_qty if sensor_qty > 0 else total_price
-    how = "텍스트분석" if qty_from_text else "기본(1개)"
-    return sensor_qty, unit_price, how
-
-
 def fetch_coupang_products(keyword: str, limit: int):
     if not config.COUPANG_ACCESS_KEY or not config.COUPANG_SECRET_KEY:
         raise RuntimeError("COUPANG_ACCESS_KEY / COUPANG_SECRET_KEY 환경변수가 필요합니다.")
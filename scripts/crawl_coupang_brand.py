@@ -3,27 +3,39 @@
 쿠팡 브랜드 스토어 페이지에서 상품을 크롤링한다.
 Playwright로 JS 렌더링 후 DOM에서 상품 정보를 추출.
 
+COUPANG_BRAND_CRAWL_MODE:
+- serial(기본): 스토어를 하나씩, 고정 대기(로드 후 5초, 스크롤 800ms, 스토어 간 8초)로 수집한다.
+- network: 스토어마다 격리된 브라우저 컨텍스트를 열어 COUPANG_BRAND_CONTEXTS 개씩 동시에 수집한다.
+  상품 목록 XHR/JSON 응답을 가로채 상품을 읽고(못 잡으면 JS_EXTRACT DOM 추출), 상품 수가
+  COUPANG_BRAND_SCROLL_STABLE_ROUNDS 번 연속 그대로면 스크롤을 멈춘다. 스토어 진입(goto)은 모든 컨텍스트를
+  합쳐 COUPANG_BRAND_MIN_GAP_SEC 초 간격 이상으로 벌린다 (예의 예산).
+  오프라인 벽시계 비교: python -m scripts.bench_coupang_brand
+
 사용법:
     python -m scripts.crawl_coupang_brand
+    COUPANG_BRAND_CRAWL_MODE=network python -m scripts.crawl_coupang_brand
 """
+import asyncio
+import inspect
 import os
 import re
 import time
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright
 
 load_dotenv()           # .env (DB 설정 등)
 load_dotenv("proxy.env")  # Bright Data 크리덴셜
 
 import config
+from api.services.title_parser import analyze_product, is_non_libre_cgm
+from scripts.crawl_db import CrawlerDB
 from scripts.crawl_naver import (
     save_to_db,
-    analyze_product,
-    NON_LIBRE_CGM_EXCLUDE_PATTERNS,
     load_confirmed_qty_by_link_map,
 )
 
@@ -169,6 +181,32 @@ PROXY_PASSWORD = os.getenv("BRIGHT_DATA_PASSWORD")
 # Bright Data Scraping Browser (원격 브라우저)
 BROWSER_WSS = os.getenv("BRIGHT_DATA_BROWSER_WSS")  # e.g. "wss://...@brd.superproxy.io:9222"
 
+# 수집 방식 (serial | network) 과 network 모드 예산
+COUPANG_BRAND_CRAWL_MODE = os.getenv("COUPANG_BRAND_CRAWL_MODE", "serial").strip().lower()
+COUPANG_BRAND_CONTEXTS = max(1, int(os.getenv("COUPANG_BRAND_CONTEXTS", "3")))
+COUPANG_BRAND_MIN_GAP_SEC = max(0.0, float(os.getenv("COUPANG_BRAND_MIN_GAP_SEC", "3.0")))
+COUPANG_BRAND_SCROLL_STABLE_ROUNDS = max(1, int(os.getenv("COUPANG_BRAND_SCROLL_STABLE_ROUNDS", "2")))
+COUPANG_BRAND_SCROLL_WAIT_MS = max(100, int(os.getenv("COUPANG_BRAND_SCROLL_WAIT_MS", "500")))
+MAX_SCROLL_STEPS = 30
+FIRST_PRODUCT_TIMEOUT_MS = 10000
+_PRODUCT_ANCHOR_SELECTOR = 'a[href*="/products/"]'
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+_CONTEXT_OPTIONS = {
+    "user_agent": _USER_AGENT,
+    "viewport": {"width": 1920, "height": 1080},
+    "locale": "ko-KR",
+    "java_script_enabled": True,
+    "ignore_https_errors": True,
+}
+_STEALTH_SCRIPT = """
+        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    """
+
 # 브라우저 내에서 실행할 JS: 상품 링크에서 정보 추출
 JS_EXTRACT = """() => {
     const links = document.querySelectorAll('a[href*="/products/"]');
@@ -262,6 +300,10 @@ def _open_browser(p):
         raise RuntimeError(f"WSS 연결 최종 실패: {last_err}")
 
     # 로컬 브라우저
+    return p.chromium.launch(**_local_launch_options()), "local"
+
+
+def _local_launch_options() -> Dict[str, Any]:
     launch_opts = {
         "headless": True,
         "args": [
@@ -276,34 +318,71 @@ def _open_browser(p):
             "password": PROXY_PASSWORD,
         }
         print(f"[BRAND] 프록시 사용: {PROXY_SERVER}")
-    return p.chromium.launch(**launch_opts), "local"
+    return launch_opts
 
 
-def _new_page(browser, mode: str):
-    """브라우저에서 새 페이지를 연다 (로컬은 stealth context 적용)."""
+def _new_page(browser, mode: str, setup_context: Optional[Callable] = None, url: str = ""):
+    """
+    브라우저에서 새 페이지를 연다 (로컬은 stealth context 적용).
+    setup_context(context, url): 페이지를 열기 전 컨텍스트 훅 (벤치의 HAR 재생 등).
+    """
     if mode == "remote":
-        return browser.new_page()
-    context = browser.new_context(
-        user_agent=(
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/131.0.0.0 Safari/537.36"
-        ),
-        viewport={"width": 1920, "height": 1080},
-        locale="ko-KR",
-        java_script_enabled=True,
-        ignore_https_errors=True,
-    )
-    context.add_init_script("""
-        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-    """)
+        page = browser.new_page()
+        if setup_context:
+            setup_context(page.context, url)
+        return page
+    context = browser.new_context(**_CONTEXT_OPTIONS)
+    context.add_init_script(_STEALTH_SCRIPT)
+    if setup_context:
+        setup_context(context, url)
     return context.new_page()
 
 
-def crawl_brand_store(browser, mode: str, url: str) -> List[Dict[str, Any]]:
+def _dom_href(item: dict) -> str:
+    href = item["href"]
+    return href if href.startswith("http") else f"https://www.coupang.com{href}"
+
+
+def _dom_links(data: list) -> Dict[str, str]:
+    """
+    JS_EXTRACT 결과 → {"pid_itemId": 링크}. 링크는 _products_from_dom 과 같다.
+    itemId 없는 "pid_" 키는 그 pid 의 링크가 하나뿐일 때만 채운다.
+    """
+    links = {f"{item['pid']}_{item['itemId']}": _dom_href(item) for item in data}
+    by_pid: Dict[str, set] = {}
+    for item in data:
+        by_pid.setdefault(str(item["pid"]), set()).add(_dom_href(item))
+    for pid, hrefs in by_pid.items():
+        if len(hrefs) == 1:
+            links.setdefault(f"{pid}_", next(iter(hrefs)))
+    return links
+
+
+def _products_from_dom(data: list) -> List[Dict[str, Any]]:
+    """JS_EXTRACT 결과 → 상품 dict 목록."""
+    products = []
+    for item in data:
+        name = _extract_product_name(item["lines"])
+        full_text = "\n".join(item["lines"])
+        price = _pick_sale_price(item["prices"], full_text)
+        href = _dom_href(item)
+
+        if not name or price <= 0:
+            continue
+
+        products.append({
+            "product_name": name,
+            "total_price": price,
+            "link": href,
+            "image_url": item["imgSrc"] or "",
+        })
+    return products
+
+
+def crawl_brand_store(browser, mode: str, url: str, *, setup_context: Optional[Callable] = None) -> List[Dict[str, Any]]:
     """브랜드 스토어 페이지를 크롤링한다 (브라우저는 호출자가 관리)."""
     print(f"[BRAND] 크롤링: {url}")
-    page = _new_page(browser, mode)
+    page = _new_page(browser, mode, setup_context, url)
 
     try:
         page.goto(url, wait_until="domcontentloaded", timeout=30000)
@@ -343,26 +422,7 @@ def crawl_brand_store(browser, mode: str, url: str) -> List[Dict[str, Any]]:
             print(f"  스크린샷: {ss}")
             return []
 
-        products = []
-        for item in data:
-            name = _extract_product_name(item["lines"])
-            full_text = "\n".join(item["lines"])
-            price = _pick_sale_price(item["prices"], full_text)
-            href = item["href"]
-            if not href.startswith("http"):
-                href = f"https://www.coupang.com{href}"
-
-            if not name or price <= 0:
-                continue
-
-            products.append({
-                "product_name": name,
-                "total_price": price,
-                "link": href,
-                "image_url": item["imgSrc"] or "",
-            })
-
-        return products
+        return _products_from_dom(data)
 
     except Exception as e:
         print(f"  [ERROR] 크롤링 실패: {e}")
@@ -381,121 +441,473 @@ def crawl_brand_store(browser, mode: str, url: str) -> List[Dict[str, Any]]:
             pass
 
 
-def run_crawling():
-    """메인 실행 함수."""
-    print(f"START COUPANG BRAND STORE: {datetime.now().isoformat(timespec='seconds')}")
+# ── network 모드: XHR/JSON 가로채기 + 격리 컨텍스트 동시 수집 ─────────────────
+_JSON_PRODUCT_ID_KEYS = ("productId", "productID", "product_id")
+_JSON_ITEM_ID_KEYS = ("itemId", "item_id")
+_JSON_VENDOR_ITEM_ID_KEYS = ("vendorItemId", "vendor_item_id")
+_JSON_NAME_KEYS = ("productName", "itemName", "title", "name")
+# 판매가(실제 결제 금액)에 가까운 것부터
+_JSON_PRICE_KEYS = ("salePrice", "finalPrice", "discountedPrice", "couponPrice", "price", "originalPrice")
+_JSON_IMAGE_KEYS = ("imageUrl", "thumbnailUrl", "thumbnail", "image", "imagePath")
 
-    confirmed_map = load_confirmed_qty_by_link_map()
-    if confirmed_map:
-        print(f"  수동확정 수량 재사용 맵: {len(confirmed_map)}개 링크")
 
-    all_rows = []
-    batch_size = 10
+def _first_value(obj: dict, keys: tuple):
+    for k in keys:
+        v = obj.get(k)
+        if v not in (None, "", 0):
+            return v
+    return None
+
+
+def _json_price(value) -> int:
+    """숫자 / "12,300" / "12,300원" / {"finalPrice": ...} 형태의 가격 → 정수(원). 못 읽으면 0."""
+    if isinstance(value, dict):
+        value = _first_value(value, _JSON_PRICE_KEYS + ("amount", "value"))
+    if isinstance(value, bool) or value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        price = int(value)
+    else:
+        digits = re.sub(r"[^\d]", "", str(value))
+        price = int(digits) if digits else 0
+    return price if 1000 <= price <= 2000000 else 0
+
+
+def _json_product(obj: dict) -> Optional[Dict[str, Any]]:
+    pid = _first_value(obj, _JSON_PRODUCT_ID_KEYS)
+    name = _first_value(obj, _JSON_NAME_KEYS)
+    if pid is None or not isinstance(name, str) or not str(pid).isdigit():
+        return None
+    price = _json_price(_first_value(obj, _JSON_PRICE_KEYS))
+    if price <= 0:
+        return None
+    item_id = _first_value(obj, _JSON_ITEM_ID_KEYS)
+    vendor_item_id = _first_value(obj, _JSON_VENDOR_ITEM_ID_KEYS)
+    query = "&".join(
+        f"{k}={v}" for k, v in (("itemId", item_id), ("vendorItemId", vendor_item_id)) if v not in (None, "")
+    )
+    image = _first_value(obj, _JSON_IMAGE_KEYS)
+    image = image if isinstance(image, str) else ""
+    if image.startswith("//"):
+        image = f"https:{image}"
+    # 링크는 같은 상품의 DOM 링크로 바꾼다 (crawl_brand_store_network). 여기 값은 DOM 에 앵커가 없을 때만 남는다.
+    return {
+        "product_name": name.strip(),
+        "total_price": price,
+        "link": f"https://www.coupang.com/vp/products/{pid}" + (f"?{query}" if query else ""),
+        "image_url": image,
+        "_key": f"{pid}_{item_id or ''}",
+    }
+
+
+def products_from_json(payload) -> List[Dict[str, Any]]:
+    """
+    상품 목록 XHR/JSON 응답에서 상품을 찾는다. 응답 구조에 기대지 않고 상품 id + 이름 + 가격을 함께 가진
+    객체를 재귀로 모은다. (productId, itemId) 중복은 처음 것만 남긴다.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            prod = _json_product(node)
+            if prod is not None:
+                found.setdefault(prod["_key"], prod)
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return list(found.values())
+
+
+def _is_product_list_response(response) -> bool:
+    try:
+        if response.status != 200 or "coupang" not in response.url:
+            return False
+        content_type = (response.headers or {}).get("content-type", "")
+        return "json" in content_type and response.request.resource_type in ("xhr", "fetch")
+    except Exception:
+        return False
+
+
+class _PolitenessBudget:
+    """모든 컨텍스트를 합쳐 스토어 진입(goto) 시작 간격을 min_gap_sec 이상으로 벌린다."""
+
+    def __init__(self, min_gap_sec: float):
+        self._min_gap = min_gap_sec
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = loop.time() + self._min_gap
+
+
+async def _maybe_await(value) -> None:
+    if inspect.isawaitable(value):
+        await value
+
+
+async def _open_store_page_async(browser, mode: str, setup_context: Optional[Callable], url: str):
+    """스토어 하나용 격리 페이지. 로컬은 새 컨텍스트, 원격은 작업자 전용 세션의 새 페이지."""
+    if mode == "remote":
+        page = await browser.new_page()
+        if setup_context:
+            await _maybe_await(setup_context(page.context, url))
+        return page, None
+    context = await browser.new_context(**_CONTEXT_OPTIONS)
+    await context.add_init_script(_STEALTH_SCRIPT)
+    if setup_context:
+        await _maybe_await(setup_context(context, url))
+    return await context.new_page(), context
+
+
+async def _goto_store(page, url: str, budget: _PolitenessBudget) -> None:
+    await budget.wait()
+    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    title = await page.title()
+    if "Access Denied" in title or "denied" in title.lower():
+        print(f"  [RETRY] Access Denied 감지, 재시도: {url}")
+        await page.wait_for_timeout(3000)
+        await budget.wait()
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+
+
+async def crawl_brand_store_network(
+    browser,
+    mode: str,
+    url: str,
+    budget: _PolitenessBudget,
+    *,
+    setup_context: Optional[Callable] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    스토어 한 곳을 상품 목록 응답 가로채기로 수집한다.
+    쿠팡 JSON 응답에는 추천 / 광고 / 다른 판매자 상품도 섞여 오므로, XHR 상품은 스토어 상품 목록 DOM 앵커에
+    같은 productId 가 있는 것만 쓴다 (나머지는 xhr_dropped 로 센다).
+    XHR 상품의 링크는 serial 모드와 같은 DOM 앵커 href 를 쓴다 (link_quantity_overrides / 수량 고정 / 가격 이력이
+    링크로 상품을 묶으므로 모드를 바꿔도 같은 키여야 한다). 같은 productId 의 앵커가 여럿이라 itemId 로도 못 고르면
+    응답 값으로 만든 링크를 쓴다 (link_fallback).
+    반환: (상품 목록, {"source": "xhr" | "dom" | "error", "scrolls": n, "xhr": n, "xhr_dropped": n, "dom": n,
+    "link_fallback": n})
+    """
+    captured: Dict[str, Dict[str, Any]] = {}
+    pending: List[asyncio.Future] = []
+    stats: Dict[str, Any] = {
+        "source": "error", "scrolls": 0, "xhr": 0, "xhr_dropped": 0, "dom": 0, "link_fallback": 0,
+    }
+
+    async def _capture(response):
+        try:
+            for prod in products_from_json(await response.json()):
+                captured.setdefault(prod["_key"], prod)
+        except Exception:
+            pass
 
+    def _on_response(response):
+        if _is_product_list_response(response):
+            pending.append(asyncio.ensure_future(_capture(response)))
+
+    async def _drain():
+        while pending:
+            batch = pending[:]
+            del pending[:len(batch)]
+            await asyncio.gather(*batch, return_exceptions=True)
+
+    page, context = await _open_store_page_async(browser, mode, setup_context, url)
+    page.on("response", _on_response)
+    try:
+        await _goto_store(page, url, budget)
+        try:
+            await page.wait_for_selector(_PRODUCT_ANCHOR_SELECTOR, timeout=FIRST_PRODUCT_TIMEOUT_MS)
+        except Exception:
+            pass  # 상품 없는 스토어 / 차단: 아래 DOM 추출 결과로 판단
+
+        # 상품 수(응답 / DOM 중 큰 쪽)가 연속으로 그대로면 lazy-load 가 끝난 것으로 본다.
+        prev_count, stable = -1, 0
+        for scroll_i in range(MAX_SCROLL_STEPS):
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await page.wait_for_timeout(COUPANG_BRAND_SCROLL_WAIT_MS)
+            await _drain()
+            dom_count = await page.evaluate(
+                f"document.querySelectorAll('{_PRODUCT_ANCHOR_SELECTOR}').length"
+            )
+            count = max(dom_count, len(captured))
+            stats["scrolls"] = scroll_i + 1
+            if count == prev_count:
+                stable += 1
+                if stable >= COUPANG_BRAND_SCROLL_STABLE_ROUNDS:
+                    break
+            else:
+                prev_count, stable = count, 0
+        await _drain()
+
+        dom_data = await page.evaluate(JS_EXTRACT)
+        dom_products = _products_from_dom(dom_data)
+        dom_links = _dom_links(dom_data)
+        dom_pids = {str(item["pid"]) for item in dom_data}
+        xhr_products = []
+        for key, captured_prod in captured.items():
+            if key.split("_", 1)[0] not in dom_pids:
+                stats["xhr_dropped"] += 1
+                continue
+            prod = {k: v for k, v in captured_prod.items() if k != "_key"}
+            if key in dom_links:
+                prod["link"] = dom_links[key]
+            else:
+                stats["link_fallback"] += 1
+            xhr_products.append(prod)
+        stats["xhr"], stats["dom"] = len(xhr_products), len(dom_products)
+        # 응답이 일부 페이지만 담았으면(서버 렌더 + XHR 혼합) DOM 쪽이 더 많다.
+        # XHR 쪽은 DOM 에 있는 상품만 남겼으므로 목록 밖 상품이 많다고 XHR 로 기울지 않는다.
+        if xhr_products and len(xhr_products) >= len(dom_products):
+            stats["source"] = "xhr"
+            return xhr_products, stats
+        stats["source"] = "dom"
+        if not dom_products:
+            print(f"  [WARN] 상품을 찾지 못했습니다: {url}")
+        return dom_products, stats
+    except Exception as e:
+        print(f"  [ERROR] 크롤링 실패: {url}: {e}")
+        return [], stats
+    finally:
+        try:
+            await (context.close() if context is not None else page.close())
+        except Exception:
+            pass
+
+
+async def _open_browser_async(p):
+    if BROWSER_WSS:
+        last_err = None
+        for attempt in range(1, 4):
+            try:
+                return await p.chromium.connect_over_cdp(BROWSER_WSS, timeout=300000), "remote"
+            except Exception as e:
+                last_err = e
+                wait = 10 * attempt
+                print(f"  [RETRY {attempt}/3] WSS 연결 실패, {wait}s 대기 후 재시도: {e}")
+                await asyncio.sleep(wait)
+        raise RuntimeError(f"WSS 연결 최종 실패: {last_err}")
+    return await p.chromium.launch(**_local_launch_options()), "local"
+
+
+async def collect_stores_network(
+    stores: List[Dict[str, Any]],
+    *,
+    contexts: int = COUPANG_BRAND_CONTEXTS,
+    min_gap_sec: float = COUPANG_BRAND_MIN_GAP_SEC,
+    setup_context: Optional[Callable] = None,
+) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    스토어를 contexts 개 작업자로 동시에 수집한다. 결과는 stores 순서.
+    로컬 브라우저는 하나를 띄워 스토어마다 새 컨텍스트(쿠키/캐시 격리)를 쓰고,
+    원격(Scraping Browser)은 작업자마다 CDP 세션을 따로 연다.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for idx, store in enumerate(stores):
+        queue.put_nowait((idx, store))
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(stores)
+    budget = _PolitenessBudget(min_gap_sec)
+    n_workers = max(1, min(contexts, len(stores)))
+
+    async with async_playwright() as p:
+        shared = None
+        if not BROWSER_WSS:
+            shared = await _open_browser_async(p)
+
+        async def _worker(worker_id: int):
+            browser, mode = shared if shared else await _open_browser_async(p)
+            try:
+                while True:
+                    try:
+                        idx, store = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    t0 = time.perf_counter()
+                    products, stats = await crawl_brand_store_network(
+                        browser, mode, store["url"], budget, setup_context=setup_context
+                    )
+                    results[idx] = products
+                    print(
+                        f"[BRAND][w{worker_id}] {store['seller']}: {len(products)}개 "
+                        f"(source={stats['source']} xhr={stats['xhr']} xhr_dropped={stats['xhr_dropped']} "
+                        f"dom={stats['dom']} link_fallback={stats['link_fallback']} scrolls={stats['scrolls']}, "
+                        f"{time.perf_counter() - t0:.1f}s)"
+                    )
+            finally:
+                if not shared:
+                    try:
+                        await browser.close()
+                    except Exception:
+                        pass
+
+        try:
+            await asyncio.gather(*(_worker(w + 1) for w in range(n_workers)))
+        finally:
+            if shared:
+                try:
+                    await shared[0].close()
+                except Exception:
+                    pass
+
+    return [(store, results[i] or []) for i, store in enumerate(stores)]
+
+
+def collect_stores_serial(
+    stores: List[Dict[str, Any]],
+    *,
+    setup_context: Optional[Callable] = None,
+    batch_size: int = 10,
+    store_gap_sec: float = 8,
+    batch_gap_sec: float = 15,
+) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """기존 방식: 10개 배치마다 브라우저를 다시 열고(IP 변경) 스토어를 하나씩 고정 대기로 수집한다."""
+    collected = []
     with sync_playwright() as p:
-        for batch_start in range(0, len(BRAND_STORES), batch_size):
-            batch = BRAND_STORES[batch_start:batch_start + batch_size]
+        for batch_start in range(0, len(stores), batch_size):
+            batch = stores[batch_start:batch_start + batch_size]
             batch_num = batch_start // batch_size + 1
-            total_batches = (len(BRAND_STORES) + batch_size - 1) // batch_size
+            total_batches = (len(stores) + batch_size - 1) // batch_size
 
             if batch_start > 0:
-                print(f"\n[BRAND] 브라우저 재연결 (IP 변경)... 15초 대기")
-                time.sleep(15)
+                print(f"\n[BRAND] 브라우저 재연결 (IP 변경)... {batch_gap_sec:.0f}초 대기")
+                time.sleep(batch_gap_sec)
 
             print(f"\n[BATCH {batch_num}/{total_batches}] {len(batch)}개 스토어")
             browser, mode = _open_browser(p)
 
             try:
                 for i, store in enumerate(batch):
-                    url = store["url"]
-                    seller = store["seller"]
-                    min_price = store["min_price"]
-                    name_filter = store.get("name_filter")
-
                     if i > 0:
-                        time.sleep(8)
-
-                    raw_products = crawl_brand_store(browser, mode, url)
-
-                    if not raw_products:
-                        print(f"  [{seller}] 크롤링된 상품 없음")
-                        continue
-
-                    kept = 0
-                    skipped = 0
-                    for prod in raw_products:
-                        product_name = prod["product_name"]
-                        total_price = prod["total_price"]
-
-                        if name_filter and not re.search(name_filter, product_name, re.IGNORECASE):
-                            skipped += 1
-                            continue
-
-                        if any(re.search(pat, product_name, re.IGNORECASE) for pat in NON_LIBRE_CGM_EXCLUDE_PATTERNS):
-                            skipped += 1
-                            print(f"  [SKIP] 비대상 CGM 제외: {product_name[:40]}")
-                            continue
-
-                        if re.search(r"바로잰", product_name, re.IGNORECASE):
-                            skipped += 1
-                            print(f"  [SKIP] 바로잰 제외: {product_name[:40]}")
-                            continue
-
-                        if min_price and total_price < min_price:
-                            skipped += 1
-                            print(f"  [SKIP] {product_name[:40]}  ({total_price:,} < {min_price:,})")
-                            continue
-
-                        qty, unit_price, how = analyze_product(
-                            product_name,
-                            total_price,
-                            prod.get("link") or "",
-                            confirmed_map,
-                        )
-
-                        row = {
-                            "keyword": BRAND_KEYWORD,
-                            "product_name": product_name,
-                            "unit_price": unit_price,
-                            "quantity": qty,
-                            "total_price": total_price,
-                            "mall_name": seller,
-                            "calc_method": how,
-                            "link": prod["link"],
-                            "image_url": prod["image_url"],
-                            "card_image_path": None,
-                            "channel": "coupang",
-                            "market": "쿠팡",
-                        }
-                        all_rows.append(row)
-                        kept += 1
-
-                        print(f"  [OK] {product_name[:50]}")
-                        print(f"       total={total_price:,} qty={qty} unit={unit_price:,} ({how})")
-
-                    filter_desc = []
-                    if name_filter:
-                        filter_desc.append(f"name='{name_filter}'")
-                    if min_price:
-                        filter_desc.append(f"min_price={min_price:,}")
-                    filter_str = ", ".join(filter_desc) if filter_desc else "none"
-                    print(f"  [{seller}] kept={kept}, skipped={skipped} (filter: {filter_str})")
-                    print()
+                        time.sleep(store_gap_sec)
+                    collected.append(
+                        (store, crawl_brand_store(browser, mode, store["url"], setup_context=setup_context))
+                    )
             finally:
                 try:
                     browser.close()
                 except Exception:
                     pass
+    return collected
+
+
+def _store_rows(db: CrawlerDB, store: Dict[str, Any], raw_products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """스토어 필터(name_filter / 비대상 CGM / min_price) → 수량 분석 → products 행."""
+    seller = store["seller"]
+    min_price = store["min_price"]
+    name_filter = store.get("name_filter")
+
+    if not raw_products:
+        print(f"  [{seller}] 크롤링된 상품 없음")
+        return []
+
+    confirmed_map = load_confirmed_qty_by_link_map(
+        db, [prod.get("link") or "" for prod in raw_products]
+    )
+    if confirmed_map:
+        print(f"  [{seller}] 수동확정 수량 재사용: {len(confirmed_map)}개 링크")
+
+    rows = []
+    skipped = 0
+    for prod in raw_products:
+        product_name = prod["product_name"]
+        total_price = prod["total_price"]
+
+        if name_filter and not re.search(name_filter, product_name, re.IGNORECASE):
+            skipped += 1
+            continue
+
+        if is_non_libre_cgm(product_name):
+            skipped += 1
+            print(f"  [SKIP] 비대상 CGM 제외: {product_name[:40]}")
+            continue
+
+        if re.search(r"바로잰", product_name, re.IGNORECASE):
+            skipped += 1
+            print(f"  [SKIP] 바로잰 제외: {product_name[:40]}")
+            continue
+
+        if min_price and total_price < min_price:
+            skipped += 1
+            print(f"  [SKIP] {product_name[:40]}  ({total_price:,} < {min_price:,})")
+            continue
+
+        qty, unit_price, how = analyze_product(
+            product_name,
+            total_price,
+            prod.get("link") or "",
+            confirmed_map,
+        )
+
+        rows.append({
+            "keyword": BRAND_KEYWORD,
+            "product_name": product_name,
+            "unit_price": unit_price,
+            "quantity": qty,
+            "total_price": total_price,
+            "mall_name": seller,
+            "calc_method": how,
+            "link": prod["link"],
+            "image_url": prod["image_url"],
+            "card_image_path": None,
+            "channel": "coupang",
+            "market": "쿠팡",
+        })
+
+        print(f"  [OK] {product_name[:50]}")
+        print(f"       total={total_price:,} qty={qty} unit={unit_price:,} ({how})")
+
+    filter_desc = []
+    if name_filter:
+        filter_desc.append(f"name='{name_filter}'")
+    if min_price:
+        filter_desc.append(f"min_price={min_price:,}")
+    filter_str = ", ".join(filter_desc) if filter_desc else "none"
+    print(f"  [{seller}] kept={len(rows)}, skipped={skipped} (filter: {filter_str})")
+    print()
+    return rows
+
+
+def run_crawling():
+    """메인 실행 함수."""
+    print(f"START COUPANG BRAND STORE: {datetime.now().isoformat(timespec='seconds')}")
+
+    # 수동확정 수량 조회와 저장이 연결 하나를 같이 쓴다 (브라우저 수집 동안 끊기면 ping 으로 재연결).
+    # 수량은 스토어마다 수집한 링크의 키만 조회한다.
+    db = CrawlerDB()
+
+    t0 = time.perf_counter()
+    if COUPANG_BRAND_CRAWL_MODE == "network":
+        print(
+            f"[BRAND] network 모드: contexts={COUPANG_BRAND_CONTEXTS}, "
+            f"min_gap={COUPANG_BRAND_MIN_GAP_SEC}s, stable_rounds={COUPANG_BRAND_SCROLL_STABLE_ROUNDS}"
+        )
+        collected = asyncio.run(collect_stores_network(BRAND_STORES))
+    else:
+        collected = collect_stores_serial(BRAND_STORES)
+    print(f"[BRAND] 수집 {len(collected)}개 스토어 ({COUPANG_BRAND_CRAWL_MODE}, {time.perf_counter() - t0:.1f}s)")
+
+    all_rows = []
+    for store, raw_products in collected:
+        all_rows.extend(_store_rows(db, store, raw_products))
 
     if not all_rows:
         print("[ERROR] 저장할 상품이 없습니다.")
+        db.close()
         return
 
     # DB 저장 (전체 스토어 하나의 snapshot)
     snapshot_at = datetime.now().replace(microsecond=0)
     snapshot_id = f"{snapshot_at.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
 
-    inserted = save_to_db(all_rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at)
+    inserted = save_to_db(all_rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at, db=db)
+    db.log_timings()
+    db.close()
     print(f"DB inserted: {inserted}")
     print(f"총 크롤링: {len(all_rows)}개, DB 저장: {inserted}개")
     print(f"END: {datetime.now().isoformat(timespec='seconds')}")
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import re
@@ -5,6 +6,7 @@ import sys
 import time
 import uuid
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -18,6 +20,8 @@ import requests
 from bs4 import BeautifulSoup
 
 import config
+from api.services.title_parser import is_target_libre2_product as _is_target_libre2_product
+from scripts.crawl_db import CrawlerDB
 from scripts.crawl_naver import save_to_db
 
 
@@ -36,22 +40,13 @@ ZENROWS_ENDPOINT = "https://api.zenrows.com/v1/"
 MAX_RETRY = 3
 CONSECUTIVE_FAIL_LIMIT = 3
 
-LIBRE2_INCLUDE_PATTERNS = [
-    r"프리스타일\s*리브레\s*2",
-    r"리브레\s*2",
-    r"freestyle\s*libre\s*2",
-    r"libre\s*2",
-]
-
-NON_LIBRE_CGM_EXCLUDE_PATTERNS = [
-    r"덱스콤",
-    r"dexcom",
-    r"\bg\s*7\b",
-    r"\bg7\b",
-    r"가디언",
-    r"guardian",
-    r"케어센스\s*에어",
-]
+# sequential(기본): URL 하나씩 + 요청 사이 랜덤 대기 / async: 동시 COUPANG_URL_CONCURRENCY 개,
+# 대상 호스트별 토큰 버킷(COUPANG_URL_MAX_RPS)으로 속도 제한. 봇차단이 보이면 버킷 속도를 절반으로 낮추고
+# 성공할 때마다 조금씩(10%) 되돌린다 (하한 COUPANG_URL_MIN_RPS).
+COUPANG_URL_CRAWL_MODE = os.getenv("COUPANG_URL_CRAWL_MODE", "sequential")
+COUPANG_URL_CONCURRENCY = max(1, int(os.getenv("COUPANG_URL_CONCURRENCY", "4")))
+COUPANG_URL_MAX_RPS = float(os.getenv("COUPANG_URL_MAX_RPS", "1.0"))
+COUPANG_URL_MIN_RPS = float(os.getenv("COUPANG_URL_MIN_RPS", "0.1"))
 
 
 # ──────────────────────────────────────────────
@@ -69,36 +64,41 @@ def _is_bot_blocked(resp: requests.Response) -> bool:
     return "akamai" in text_lower or "powered and protected by privacy" in text_lower
 
 
-def _fetch_via_zenrows(
-    session: requests.Session, url: str, session_id: Optional[str] = None
-) -> requests.Response:
-    """
-    Zenrows를 통해 URL을 가져옴. Akamai 우회에 특화.
-    - session_id: 동일 세션 유지 → Akamai behavioral 분석 우회 핵심
-    - 봇차단 감지 시 새 session_id로 1회 재시도
-    """
+def _new_session_id() -> str:
+    return str(random.randint(10000, 99999))
+
+
+def _zenrows_get(session: requests.Session, url: str, session_id: str) -> requests.Response:
     if not ZENROWS_API_KEY:
         raise RuntimeError("ZENROWS_API_KEY 환경변수가 설정되지 않았습니다.")
 
-    sid = session_id or _ZENROWS_SESSION_ID
-
     params = {
         "apikey": ZENROWS_API_KEY,
         "url": url,
         "js_render": "true",
         "antibot": "true",
         "premium_proxy": "true",
-        "session_id": sid,
+        "session_id": session_id,
     }
+    return session.get(ZENROWS_ENDPOINT, params=params, timeout=REQUEST_TIMEOUT)
+
 
-    resp = session.get(ZENROWS_ENDPOINT, params=params, timeout=REQUEST_TIMEOUT)
+def _fetch_via_zenrows(
+    session: requests.Session, url: str, session_id: Optional[str] = None
+) -> requests.Response:
+    """
+    Zenrows를 통해 URL을 가져옴. Akamai 우회에 특화.
+    - session_id: 동일 세션 유지 → Akamai behavioral 분석 우회 핵심
+    - 봇차단 감지 시 새 session_id로 1회 재시도
+    """
+    sid = session_id or _ZENROWS_SESSION_ID
+    resp = _zenrows_get(session, url, sid)
 
     # 봇차단 페이지 감지 → 새 session_id로 1회 재시도
     if _is_bot_blocked(resp):
-        new_sid = str(random.randint(10000, 99999))
+        new_sid = _new_session_id()
         print(f"  ⚠️ 봇차단 감지 (sid={sid}), 새 세션으로 재시도 (sid={new_sid})")
-        params["session_id"] = new_sid
-        resp = session.get(ZENROWS_ENDPOINT, params=params, timeout=REQUEST_TIMEOUT)
+        resp = _zenrows_get(session, url, new_sid)
 
     return resp
 
@@ -233,17 +233,6 @@ def _clean_text(value: Optional[str]) -> str:
     return re.sub(r"\s+", " ", value).strip()
 
 
-def _is_target_libre2_product(title: str) -> bool:
-    text = (title or "").strip()
-    if not text:
-        return False
-
-    if any(re.search(pattern, text, re.IGNORECASE) for pattern in NON_LIBRE_CGM_EXCLUDE_PATTERNS):
-        return False
-
-    return any(re.search(pattern, text, re.IGNORECASE) for pattern in LIBRE2_INCLUDE_PATTERNS)
-
-
 def _extract_meta_content(soup: BeautifulSoup, attrs: Dict[str, str]) -> str:
     tag = soup.find("meta", attrs=attrs)
     if not tag:
@@ -429,9 +418,67 @@ def _normalize_row(
 # 크롤링 코어
 # ──────────────────────────────────────────────
 
-def crawl_one_url(session: requests.Session, item: Dict[str, Any]) -> Dict[str, Any]:
+def _page_result(html: str, item: Dict[str, Any], status_code: int) -> Dict[str, Any]:
+    """200 응답 HTML → 크롤 결과 (ok=True 면 row 포함). CPU 작업이라 async 모드에서는 스레드에서 돈다."""
     url = item["url"]
     keyword = item.get("keyword") or config.SEARCH_KEYWORD
+    soup = BeautifulSoup(html, "lxml")
+
+    product_name = _extract_product_name(soup)
+    seller_name = _extract_seller_name(soup)
+    image_url = _extract_image_url(soup)
+    stock_status = _extract_stock_status(soup)
+    price = _extract_price(soup)
+
+    if not _is_target_libre2_product(product_name):
+        return {
+            "ok": False,
+            "url": url,
+            "final_url": url,
+            "status_code": status_code,
+            "error": "non_target_product",
+            "product_name": product_name,
+            "seller_name": seller_name,
+        }
+
+    row = _normalize_row(
+        keyword=keyword,
+        url=url,
+        final_url=url,
+        product_name=product_name,
+        seller_name=seller_name,
+        price=price,
+        stock_status=stock_status,
+        image_url=image_url,
+    )
+
+    if not row:
+        return {
+            "ok": False,
+            "url": url,
+            "final_url": url,
+            "status_code": status_code,
+            "error": "parse_failed",
+            "product_name": product_name,
+            "seller_name": seller_name,
+            "price": price,
+            "stock_status": stock_status,
+        }
+
+    row["stock_status"] = stock_status
+    row["final_url"] = url
+
+    return {
+        "ok": True,
+        "url": url,
+        "final_url": url,
+        "status_code": status_code,
+        "row": row,
+    }
+
+
+def crawl_one_url(session: requests.Session, item: Dict[str, Any]) -> Dict[str, Any]:
+    url = item["url"]
 
     for attempt in range(1, MAX_RETRY + 1):
         try:
@@ -460,72 +507,202 @@ def crawl_one_url(session: requests.Session, item: Dict[str, Any]) -> Dict[str,
                     "error": f"http_{status_code}",
                 }
 
-            soup = BeautifulSoup(resp.text, "lxml")
+            return _page_result(resp.text, item, status_code)
+
+        except RuntimeError:
+            raise
+        except requests.RequestException as e:
+            if attempt == MAX_RETRY:
+                return {"ok": False, "url": url, "final_url": url, "status_code": None, "error": f"request_error: {e}"}
+            time.sleep(5 * attempt)
+        except Exception as e:
+            return {"ok": False, "url": url, "final_url": url, "status_code": None, "error": f"unexpected_error: {e}"}
 
-            product_name = _extract_product_name(soup)
-            seller_name = _extract_seller_name(soup)
-            image_url = _extract_image_url(soup)
-            stock_status = _extract_stock_status(soup)
-            price = _extract_price(soup)
+    return {"ok": False, "url": url, "final_url": url, "status_code": None, "error": "max_retry_exceeded"}
 
-            if not _is_target_libre2_product(product_name):
-                return {
-                    "ok": False,
-                    "url": url,
-                    "final_url": url,
-                    "status_code": status_code,
-                    "error": "non_target_product",
-                    "product_name": product_name,
-                    "seller_name": seller_name,
-                }
 
-            row = _normalize_row(
-                keyword=keyword,
-                url=url,
-                final_url=url,
-                product_name=product_name,
-                seller_name=seller_name,
-                price=price,
-                stock_status=stock_status,
-                image_url=image_url,
-            )
+# ──────────────────────────────────────────────
+# 비동기 크롤링 (COUPANG_URL_CRAWL_MODE=async)
+# ──────────────────────────────────────────────
 
-            if not row:
+class _HostTokenBucket:
+    """
+    대상 호스트별 토큰 버킷 (이벤트 루프 하나에서만 사용).
+    slow_down(): 봇차단/429 시 속도 절반 (min_rps 하한), recover(): 성공 시 10%씩 max_rps 까지 복구.
+    """
+
+    def __init__(self, max_rps: float, *, min_rps: float, burst: float = 1.0):
+        self.max_rps = max(max_rps, 0.0)
+        self.min_rps = max(min(min_rps, self.max_rps), 0.0)
+        self.burst = max(burst, 1.0)
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+
+    def _state(self, host: str) -> Dict[str, Any]:
+        st = self._hosts.get(host)
+        if st is None:
+            st = {"rate": self.max_rps, "tokens": self.burst, "at": time.monotonic(), "lock": asyncio.Lock()}
+            self._hosts[host] = st
+        return st
+
+    def rate(self, host: str) -> float:
+        return self._state(host)["rate"]
+
+    async def acquire(self, host: str) -> None:
+        if self.max_rps <= 0:
+            return
+        st = self._state(host)
+        async with st["lock"]:
+            while True:
+                now = time.monotonic()
+                st["tokens"] = min(self.burst, st["tokens"] + (now - st["at"]) * st["rate"])
+                st["at"] = now
+                if st["tokens"] >= 1.0:
+                    st["tokens"] -= 1.0
+                    return
+                await asyncio.sleep((1.0 - st["tokens"]) / st["rate"])
+
+    def slow_down(self, host: str) -> float:
+        st = self._state(host)
+        st["rate"] = max(self.min_rps, st["rate"] * 0.5)
+        return st["rate"]
+
+    def recover(self, host: str) -> None:
+        st = self._state(host)
+        st["rate"] = min(self.max_rps, st["rate"] * 1.1)
+
+
+class _ZenrowsSlot:
+    """동시 작업자 하나: 자기 HTTP 세션과 ZenRows session_id 를 계속 쓴다 (봇차단 시에만 새 id)."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session_id = _new_session_id()
+
+    def rotate(self) -> str:
+        self.session_id = _new_session_id()
+        return self.session_id
+
+
+async def _crawl_one_url_async(
+    slot: _ZenrowsSlot, item: Dict[str, Any], bucket: _HostTokenBucket, executor: ThreadPoolExecutor
+) -> Dict[str, Any]:
+    """crawl_one_url 과 같은 재시도 규칙. 요청 / HTML 파싱은 executor 스레드에서, 대기는 이벤트 루프에서 한다."""
+    url = item["url"]
+    host = urlparse(url).netloc
+    loop = asyncio.get_running_loop()
+
+    for attempt in range(1, MAX_RETRY + 1):
+        try:
+            await bucket.acquire(host)
+            resp = await loop.run_in_executor(executor, _zenrows_get, slot.session, url, slot.session_id)
+
+            # 봇차단 페이지 감지 → 호스트 속도를 낮추고 이 작업자만 새 session_id로 1회 재시도
+            if _is_bot_blocked(resp):
+                old_sid, new_sid = slot.session_id, slot.rotate()
+                rate = bucket.slow_down(host)
+                print(f"  ⚠️ 봇차단 감지 (sid={old_sid}), 새 세션으로 재시도 (sid={new_sid}, {rate:.2f} req/s)")
+                await bucket.acquire(host)
+                resp = await loop.run_in_executor(executor, _zenrows_get, slot.session, url, slot.session_id)
+
+            status_code = resp.status_code
+            if status_code == 401:
+                raise RuntimeError("Scrapingbee API 키가 올바르지 않습니다.")
+            if status_code == 429:
+                wait = 10 * attempt
+                bucket.slow_down(host)
+                print(f"  ⏳ 요청 한도 초과, {wait}초 대기 후 재시도 ({attempt}/{MAX_RETRY}) {url}")
+                await asyncio.sleep(wait)
+                continue
+            if status_code != 200:
+                if attempt < MAX_RETRY:
+                    wait = 5 * attempt
+                    print(f"  ⏳ HTTP {status_code} 재시도 {attempt}/{MAX_RETRY}, {wait}초 대기 {url}")
+                    await asyncio.sleep(wait)
+                    continue
                 return {
                     "ok": False,
                     "url": url,
                     "final_url": url,
                     "status_code": status_code,
-                    "error": "parse_failed",
-                    "product_name": product_name,
-                    "seller_name": seller_name,
-                    "price": price,
-                    "stock_status": stock_status,
+                    "error": f"http_{status_code}",
                 }
 
-            row["stock_status"] = stock_status
-            row["final_url"] = url
-
-            return {
-                "ok": True,
-                "url": url,
-                "final_url": url,
-                "status_code": status_code,
-                "row": row,
-            }
+            if not _is_bot_blocked(resp):
+                bucket.recover(host)
+            return await loop.run_in_executor(executor, _page_result, resp.text, item, status_code)
 
         except RuntimeError:
             raise
         except requests.RequestException as e:
             if attempt == MAX_RETRY:
                 return {"ok": False, "url": url, "final_url": url, "status_code": None, "error": f"request_error: {e}"}
-            time.sleep(5 * attempt)
+            await asyncio.sleep(5 * attempt)
         except Exception as e:
             return {"ok": False, "url": url, "final_url": url, "status_code": None, "error": f"unexpected_error: {e}"}
 
     return {"ok": False, "url": url, "final_url": url, "status_code": None, "error": "max_retry_exceeded"}
 
 
+async def crawl_urls_async(
+    target_urls: List[Dict[str, Any]],
+    *,
+    concurrency: int = COUPANG_URL_CONCURRENCY,
+    max_rps: float = COUPANG_URL_MAX_RPS,
+    min_rps: float = COUPANG_URL_MIN_RPS,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    target_urls 순서대로의 결과 리스트. 연속 실패가 CONSECUTIVE_FAIL_LIMIT 에 닿으면(완료 순서 기준)
+    아직 시작하지 않은 URL 은 건너뛰고 None 으로 둔다.
+    """
+    bucket = _HostTokenBucket(max_rps, min_rps=min_rps)
+    queue: asyncio.Queue = asyncio.Queue()
+    for idx, item in enumerate(target_urls):
+        queue.put_nowait((idx, item))
+    results: List[Optional[Dict[str, Any]]] = [None] * len(target_urls)
+    state = {"consecutive_fail": 0, "stopped": False, "done": 0}
+    total = len(target_urls)
+
+    async def worker():
+        slot = _ZenrowsSlot()
+        try:
+            while not state["stopped"]:
+                try:
+                    idx, item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await _crawl_one_url_async(slot, item, bucket, executor)
+                results[idx] = result
+                state["done"] += 1
+                print(f"[{state['done']}/{total}] {item['url']}")
+                if result["ok"]:
+                    state["consecutive_fail"] = 0
+                    row = result["row"]
+                    print(
+                        f"  ✅ success | 상품명={row['product_name'][:40]} | "
+                        f"판매자={row['mall_name']} | 가격={row['unit_price']:,}원"
+                    )
+                else:
+                    state["consecutive_fail"] += 1
+                    print(f"  ❌ fail | error={result.get('error')} | status={result.get('status_code')}")
+                    if state["consecutive_fail"] >= CONSECUTIVE_FAIL_LIMIT and not state["stopped"]:
+                        state["stopped"] = True
+                        print(f"연속 {CONSECUTIVE_FAIL_LIMIT}회 실패하여 실행을 중단합니다.")
+        finally:
+            slot.session.close()
+
+    n_workers = max(1, min(concurrency, total))
+    # 기본 executor 는 CPU 수에 묶여 있어 동시 요청 수를 작업자 수만큼 보장하도록 전용 풀을 쓴다.
+    with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="coupang-url") as executor:
+        workers = [asyncio.create_task(worker()) for _ in range(n_workers)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for w in workers:
+                w.cancel()
+            raise
+    return results
+
+
 def debug_one_url(url: str):
     session = requests.Session()
     resp = _fetch_via_zenrows(session, url)
@@ -542,17 +719,7 @@ def debug_one_url(url: str):
 # 메인
 # ──────────────────────────────────────────────
 
-def run_crawling():
-    print(f"START COUPANG URL SNAPSHOT: {datetime.now().isoformat(timespec='seconds')}")
-
-    if not ZENROWS_API_KEY:
-        print("❌ ZENROWS_API_KEY 환경변수를 설정해주세요.")
-        return
-
-    target_urls = _load_target_urls()
-    print(f"활성 URL 수(정규화/중복제거 후): {len(target_urls)}")
-    print(f"예상 크레딧 소모: 최소 {len(target_urls)}개 (render_js=false 기준)")
-
+def _crawl_sequential(target_urls: List[Dict[str, Any]]):
     session = requests.Session()
     success_rows: List[Dict[str, Any]] = []
     failures: List[Dict[str, Any]] = []
@@ -582,6 +749,41 @@ def run_crawling():
         if idx < len(target_urls):
             _sleep_between_requests(idx)
 
+    return success_rows, failures
+
+
+def run_crawling():
+    print(f"START COUPANG URL SNAPSHOT: {datetime.now().isoformat(timespec='seconds')}")
+
+    if not ZENROWS_API_KEY:
+        print("❌ ZENROWS_API_KEY 환경변수를 설정해주세요.")
+        return
+
+    target_urls = _load_target_urls()
+    print(f"활성 URL 수(정규화/중복제거 후): {len(target_urls)}")
+    print(f"예상 크레딧 소모: 최소 {len(target_urls)}개 (render_js=false 기준)")
+
+    success_rows: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    mode = (COUPANG_URL_CRAWL_MODE or "sequential").strip().lower()
+    started = time.perf_counter()
+
+    if mode == "async":
+        print(
+            f"async 모드: 동시 {COUPANG_URL_CONCURRENCY}개, 호스트당 최대 {COUPANG_URL_MAX_RPS} req/s "
+            f"(차단 시 최소 {COUPANG_URL_MIN_RPS} req/s)"
+        )
+        for result in asyncio.run(crawl_urls_async(target_urls)):
+            if result is None:
+                continue
+            if result["ok"]:
+                success_rows.append(result["row"])
+            else:
+                failures.append(result)
+    else:
+        success_rows, failures = _crawl_sequential(target_urls)
+    print(f"크롤링 소요: {time.perf_counter() - started:.1f}s ({mode})")
+
     fetched_count = len(success_rows)
     success_rows = _dedupe_rows(success_rows)
     print(f"성공 row 수: {fetched_count}")
@@ -592,7 +794,9 @@ def run_crawling():
 
     inserted = 0
     if success_rows:
-        inserted = save_to_db(success_rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at)
+        with CrawlerDB() as db:
+            inserted = save_to_db(success_rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at, db=db)
+            db.log_timings()
 
     print(f"DB inserted: {inserted}")
     print(f"실패 건수: {len(failures)}")
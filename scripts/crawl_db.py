@@ -0,0 +1,512 @@
+"""
+크롤러 공용 DB writer (mysql.connector).
+
+crawl_naver / crawl_coupang_urls / crawl_coupang_brand 가 수동확정 수량 조회, products 저장,
+card_image_path 후반 업데이트마다 따로 연결을 열고 재시도하던 것을 한 실행에 연결 하나로 묶는다.
+Railway 프록시 경유 시 연결 수립 / 왕복 한 번이 수백 ms 라 연결 수와 문장 수를 줄이는 데 목적이 있다.
+
+- 연결은 첫 사용 시 한 번 열고(재시도 포함) 실행이 끝날 때 close() 한다. 카드 렌더처럼 오래 쉬는 단계
+  뒤에는 ping(reconnect=True) 으로 끊긴 연결만 다시 맺는다.
+- INSERT 는 여러 행 VALUES 한 문장(CRAWL_DB_INSERT_BATCH 행 단위)으로 보낸다.
+- card_image_path 는 임시 테이블에 (링크/판매처 키, 경로)를 한 번에 올린 뒤 UPDATE ... JOIN 한 문장으로
+  반영한다. (예전: 행마다 UPDATE ... ORDER BY id DESC LIMIT 1)
+- 단계별 소요 시간을 모아 실행 끝에 log_timings() 로 한 줄 출력한다.
+- PRODUCTS_STORAGE_MODE=intervals 면 products 에 쓰지 않고 가격 구간(api/services/price_intervals.py)에
+  반영한다. 일별 롤업 / 월간 상태 / 가격 이상은 products_by_snapshot 뷰에서 이번 스냅샷을 읽는다.
+
+사용:
+    with CrawlerDB(log=_log) as db:
+        confirmed = db.load_confirmed_qty_by_link_map(links)
+        ...
+        db.save_rows(rows, snapshot_id=sid, snapshot_at=at)
+        db.update_card_image_paths(rows, snapshot_id=sid)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import mysql.connector
+
+import config
+from api.services.mall_daily_price import refresh_mall_daily_price_for_snapshot
+from api.services.link_overrides import confirmed_qty_from_history, fetch_link_overrides, overrides_backfilled
+from api.services.malls import normalize_mall_name, resolve_mall_ids
+from api.services.monthly_state import fold_snapshot
+from api.services.price_anomalies import score_snapshot_anomalies
+from api.services.price_intervals import fold_rows, intervals_storage_enabled, set_card_image_paths
+from api.services.response_cache import bump_generation_cursor
+from api.services.snapshots import register_snapshot, register_snapshot_streams
+
+CRAWL_DB_INSERT_BATCH = max(1, int(os.getenv("CRAWL_DB_INSERT_BATCH", "500")))
+CRAWL_DB_CONNECT_RETRIES = max(1, int(os.getenv("CRAWL_DB_CONNECT_RETRIES", "3")))
+
+# 대시보드에서 수량확정(수동) 대상과 동일. DB에는 넣지 않으며 save_rows 시 기존 동일 행도 삭제한다.
+MANUAL_QUANTITY_PENDING_METHODS = frozenset(
+    ("확인필요", "가격역산(보정)", "텍스트분석(범위초과)"),
+)
+_MANUAL_QUANTITY_PENDING_METHODS_SQL = (
+    "확인필요",
+    "가격역산(보정)",
+    "텍스트분석(범위초과)",
+)
+
+_INSERT_COLUMNS = """
+      keyword, product_name, unit_price, quantity, total_price,
+      mall_name, mall_id, calc_method, link, image_url, card_image_path,
+      channel, market,
+      snapshot_id, snapshot_at, calc_valid,
+      created_at"""
+_INSERT_ROW_PLACEHOLDER = "(%s,%s,%s,%s,%s, %s,%s,%s,%s,%s,%s, %s,%s, %s,%s,%s, NOW())"
+# save_rows 의 행 튜플 순서 (intervals 모드에서 fold_rows 에 dict 로 넘길 때)
+_ROW_KEYS = tuple(c.strip() for c in _INSERT_COLUMNS.split(","))[:-1]
+
+
+def calc_valid(calc_method: str) -> int:
+    cm = (calc_method or "").strip()
+    if cm.startswith("수동확인(완료"):
+        return 1
+    if "확인" in cm or "범위초과" in cm:
+        return 0
+    return 1
+
+
+def _norm_text(value) -> str:
+    return (value or "").strip()
+
+
+def db_settings() -> Optional[Dict[str, Any]]:
+    """Railway MYSQL* 변수 우선, 없으면 config.DB_*. 둘 다 없으면 None."""
+    if os.getenv("MYSQLHOST"):
+        return {
+            "host": os.getenv("MYSQLHOST"),
+            "user": os.getenv("MYSQLUSER"),
+            "password": os.getenv("MYSQLPASSWORD"),
+            "database": os.getenv("MYSQLDATABASE"),
+            "port": int(os.getenv("MYSQLPORT", 3306)),
+        }
+    if config.DB_HOST:
+        return {
+            "host": config.DB_HOST,
+            "user": config.DB_USER,
+            "password": config.DB_PASSWORD,
+            "database": config.DB_NAME,
+            "port": config.DB_PORT,
+        }
+    return None
+
+
+class CrawlerDB:
+    """한 크롤 실행 동안 연결 하나를 재사용하는 writer. 스레드 간 공유하지 않는다."""
+
+    def __init__(self, *, log: Callable[[str], None] = print):
+        self._log = log
+        self._conn = None
+        self._connect_failed = False
+        self.timings: Dict[str, float] = {}
+
+    def __enter__(self) -> "CrawlerDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - t0
+
+    def log_timings(self) -> None:
+        if self.timings:
+            total = sum(self.timings.values())
+            parts = ", ".join(f"{name} {sec:.2f}s" for name, sec in self.timings.items())
+            self._log(f"⏱️ DB stages: {parts} (total {total:.2f}s)")
+
+    # ── 연결 ──────────────────────────────────────────────────────
+    def connection(self):
+        """열린 연결 (없으면 재시도하며 연결). 연결 정보가 없거나 최종 실패면 None."""
+        if self._conn is not None:
+            try:
+                with self.stage("ping"):
+                    self._conn.ping(reconnect=True, attempts=2, delay=1)
+                return self._conn
+            except mysql.connector.Error as e:
+                self._log(f"⚠️ DB 연결 끊김, 다시 연결합니다: {e}")
+                self._conn = None
+
+        if self._connect_failed:
+            return None
+
+        settings = db_settings()
+        if settings is None:
+            self._log("❌ DB 연결 정보가 없습니다.")
+            self._log("   Railway 환경에서는 Cron Job 서비스의 Variables에 다음을 추가하세요:")
+            self._log("   MYSQLHOST = ${{ MySQL.MYSQLHOST }}")
+            self._log("   MYSQLUSER = ${{ MySQL.MYSQLUSER }}")
+            self._log("   MYSQLPASSWORD = ${{ MySQL.MYSQLPASSWORD }}")
+            self._log("   MYSQLDATABASE = ${{ MySQL.MYSQLDATABASE }}")
+            self._log("   MYSQLPORT = ${{ MySQL.MYSQLPORT }}")
+            self._connect_failed = True
+            return None
+
+        with self.stage("connect"):
+            for attempt in range(1, CRAWL_DB_CONNECT_RETRIES + 1):
+                try:
+                    self._conn = mysql.connector.connect(
+                        **settings,
+                        charset="utf8mb4",
+                        connection_timeout=10,
+                    )
+                    break
+                except mysql.connector.Error as e:
+                    self._log(f"⚠️ DB 연결 실패 (시도 {attempt}/{CRAWL_DB_CONNECT_RETRIES}): {e}")
+                    if attempt < CRAWL_DB_CONNECT_RETRIES:
+                        wait = attempt * 5  # 5초, 10초, ...
+                        self._log(f"   {wait}초 후 재시도...")
+                        time.sleep(wait)
+                    else:
+                        self._log("❌ DB 연결 최종 실패. 모든 재시도 소진.")
+                        self._connect_failed = True
+        if self._conn is not None:
+            self._log(f"✅ DB 연결: {settings['host']}:{settings['port']}")
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    # ── 조회 ──────────────────────────────────────────────────────
+    def load_confirmed_qty_by_link_map(self, links: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        대시보드에서 수량확정(수동)한 링크 → quantity (link_quantity_overrides).
+        links 를 주면 그 링크들의 키만 조회한다. 테이블이 아직 없거나(init_db 전) 도입 전 이력을 아직 옮기지
+        않았으면(schema_meta 에 backfill 기록 없음) products 이력을 읽는다.
+        """
+        conn = self.connection()
+        if conn is None:
+            return {}
+
+        cur = conn.cursor()
+        try:
+            with self.stage("confirmed_qty_map"):
+                try:
+                    if overrides_backfilled(cur):
+                        return fetch_link_overrides(cur, None if links is None else list(links))
+                    self._log(
+                        "⚠️ link_quantity_overrides backfill 기록이 없어 products 이력으로 조회한다 "
+                        "(python -m scripts.backfill_link_overrides)"
+                    )
+                    return confirmed_qty_from_history(cur, config.PRODUCTS_SOURCE)
+                except mysql.connector.errors.ProgrammingError as e:
+                    self._log(f"⚠️ link_quantity_overrides 조회 실패, products 이력으로 대체: {e}")
+                    return confirmed_qty_from_history(cur, config.PRODUCTS_SOURCE)
+        except Exception as e:
+            self._log(f"⚠️ 수동확정 수량 맵 조회 실패(무시): {e}")
+            return {}
+        finally:
+            cur.close()
+
+    # ── 저장 ──────────────────────────────────────────────────────
+    def _insert_rows(self, cur, data: List[tuple]) -> int:
+        inserted = 0
+        for i in range(0, len(data), CRAWL_DB_INSERT_BATCH):
+            chunk = data[i:i + CRAWL_DB_INSERT_BATCH]
+            cur.execute(
+                f"INSERT INTO {config.DB_TABLE} ({_INSERT_COLUMNS}\n) VALUES "
+                + ",\n".join([_INSERT_ROW_PLACEHOLDER] * len(chunk)),
+                [v for row in chunk for v in row],
+            )
+            inserted += cur.rowcount
+        return inserted
+
+    def save_rows(self, rows, *, snapshot_id: str, snapshot_at: datetime) -> int:
+        """
+        수량 미확정 행 정리 → products INSERT + snapshots 등록(한 커밋) → 일별 롤업 / 월간 상태 / 가격 이상 갱신.
+        intervals 모드는 products INSERT 대신 가격 구간에 반영한다 (미확정 행은 애초에 저장되지 않아 정리도 없다).
+        반환: 저장 행 수 (intervals 모드는 이번 스냅샷의 리스팅 수).
+        """
+        conn = self.connection()
+        if conn is None:
+            return 0
+        intervals = intervals_storage_enabled()
+        cur = conn.cursor()
+        try:
+            if not intervals:
+                try:
+                    with self.stage("purge_pending"):
+                        cur.execute(
+                            f"DELETE FROM {config.DB_TABLE} WHERE calc_method IN (%s, %s, %s)",
+                            _MANUAL_QUANTITY_PENDING_METHODS_SQL,
+                        )
+                        purged = cur.rowcount
+                        conn.commit()
+                    if purged:
+                        self._log(f"🗑️ 수량 미확정(calc_method) 행 DB 삭제: {purged}건")
+                except Exception as e:
+                    self._log(f"⚠️ 수량 미확정 행 삭제 실패(이번 저장은 중단): {e}")
+                    conn.rollback()
+                    return 0
+
+            if not rows:
+                self._log("No rows to insert.")
+                return 0
+
+            # 판매처 별칭은 저장 시 한 번만 풀어 정수 mall_id 로 넣는다. (malls / mall_aliases)
+            try:
+                with self.stage("resolve_mall_ids"):
+                    mall_ids = resolve_mall_ids(cur, (normalize_mall_name(r.get("mall_name")) for r in rows))
+            except Exception as e:
+                self._log(f"⚠️ mall_id 매핑 실패(mall_id 없이 저장, backfill_mall_ids로 복구 가능): {e}")
+                mall_ids = {}
+
+            data = []
+            skipped_pending = 0
+            snapshot_at_text = snapshot_at.strftime("%Y-%m-%d %H:%M:%S")
+            for r in rows:
+                cm = (r.get("calc_method") or "").strip()
+                if cm in MANUAL_QUANTITY_PENDING_METHODS:
+                    skipped_pending += 1
+                    continue
+                mall_name = normalize_mall_name(r["mall_name"])
+                data.append(
+                    (
+                        r["keyword"],
+                        r["product_name"],
+                        r["unit_price"],
+                        r["quantity"],
+                        r["total_price"],
+                        mall_name,
+                        mall_ids.get(mall_name),
+                        r["calc_method"],
+                        r["link"],
+                        r["image_url"],
+                        r["card_image_path"],
+                        r.get("channel", "naver"),
+                        r.get("market", "스마트스토어"),
+                        snapshot_id,
+                        snapshot_at_text,
+                        calc_valid(r.get("calc_method")),
+                    )
+                )
+            if skipped_pending:
+                self._log(f"⏭️ INSERT 생략(수량 미확정 calc_method): {skipped_pending}건")
+
+            if not data:
+                self._log("No rows to insert after excluding 수량 미확정.")
+                return 0
+
+            # 스냅샷 레지스트리는 products INSERT 와 같은 커밋으로 기록해 반쯤 들어간 실행이 보이지 않게 한다.
+            # 레지스트리가 비어 있지 않으면 API 는 레지스트리만 보고 "최신"을 고르므로, 등록 없이 행만 커밋하면
+            # 이번 실행은 영영 최신이 되지 못한다 → 등록이 실패하면 INSERT 도 롤백하고 실행을 실패시킨다.
+            # intervals 모드도 같다: 구간 반영(직전 스냅샷을 레지스트리에서 찾으므로 등록보다 먼저)과 등록을 한 커밋으로.
+            try:
+                if intervals:
+                    with self.stage("fold_intervals"):
+                        folded_rows = fold_rows(
+                            cur,
+                            [dict(zip(_ROW_KEYS, row)) for row in data],
+                            snapshot_id=snapshot_id,
+                            snapshot_at=snapshot_at.replace(microsecond=0),
+                        )
+                        inserted = folded_rows["listings"]
+                    with self.stage("register_snapshot"):
+                        registered = register_snapshot_streams(
+                            cur, snapshot_id, snapshot_at_text, folded_rows["streams"]
+                        )
+                else:
+                    with self.stage("insert"):
+                        inserted = self._insert_rows(cur, data)
+                    with self.stage("register_snapshot"):
+                        registered = register_snapshot(cur, snapshot_id)
+                with self.stage("commit"):
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self._log(f"❌ {'가격 구간' if intervals else 'products'} 저장 / snapshots 등록 실패(둘 다 롤백): {e}")
+                raise
+            if intervals:
+                self._log(
+                    f"price_intervals folded: listings={folded_rows['listings']} "
+                    f"extended={folded_rows['extended']} opened={folded_rows['opened']} "
+                    f"duplicates={folded_rows['duplicates']}"
+                )
+            self._log(f"snapshots registered: {snapshot_id} ({registered} market/channel rows)")
+
+            # 대시보드 판매처 카드/추이용 일별 롤업을 이번 스냅샷 일자만 갱신한다.
+            try:
+                with self.stage("mall_daily_price"):
+                    rollup_rows = refresh_mall_daily_price_for_snapshot(cur, snapshot_id)
+                    conn.commit()
+                self._log(f"mall_daily_price refreshed: {rollup_rows} rows")
+            except Exception as e:
+                conn.rollback()
+                self._log(f"⚠️ mall_daily_price 갱신 실패(무시, backfill로 복구 가능): {e}")
+
+            # 월간 리포트용 셀러 상태에 이번 스냅샷을 누적한다 (월 전체 재스캔 없이 month-to-date 최신화).
+            try:
+                with self.stage("monthly_state"):
+                    folded = fold_snapshot(cur, snapshot_id)
+                    conn.commit()
+                self._log(f"monthly_seller_state updated: {folded}")
+            except Exception as e:
+                conn.rollback()
+                self._log(f"⚠️ monthly_seller_state 갱신 실패(무시, 리포트는 전체 재계산으로 동작): {e}")
+
+            # 판매처 최저가 이상 판정을 이번 스냅샷 관측 하나씩만 흘려 넣는다 (API 는 price_anomalies 를 읽는다).
+            try:
+                with self.stage("price_anomalies"):
+                    scored = score_snapshot_anomalies(cur, snapshot_id, table=config.PRODUCTS_SOURCE)
+                    conn.commit()
+                self._log(
+                    f"price_anomalies scored: series={scored['series']} flagged={scored['flagged']} "
+                    f"rebuilt={scored['rebuilt']} stale={scored['stale']}"
+                )
+            except Exception as e:
+                conn.rollback()
+                self._log(f"⚠️ price_anomalies 갱신 실패(무시, API 는 배치 계산으로 동작): {e}")
+
+            return inserted
+        finally:
+            cur.close()
+
+    def update_card_image_paths(self, rows, *, snapshot_id: str) -> int:
+        """
+        이미 저장된 동일 snapshot 행에 card_image_path만 후반 업데이트한다.
+        (DB 저장 선행 -> 카드 렌더/S3 후처리용)
+
+        키(링크, 링크가 없으면 channel/market/mall_name/product_name)마다 그 스냅샷의 가장 최근 id 한 행을
+        갱신한다. 같은 키가 여러 번 오면 마지막 경로를 쓴다.
+        intervals 모드는 이번 스냅샷에서 본 리스팅의 현재 구간에 쓴다.
+        """
+        if intervals_storage_enabled():
+            return self._update_interval_card_paths(rows, snapshot_id=snapshot_id)
+        staged: Dict[tuple, tuple] = {}
+        for r in rows:
+            card_image_path = _norm_text(r.get("card_image_path"))
+            if not card_image_path:
+                continue
+            link = _norm_text(r.get("link"))
+            if link:
+                key = (link, "", "", "", "")
+            else:
+                key = (
+                    "",
+                    _norm_text(r.get("channel")) or "naver",
+                    _norm_text(r.get("market")) or "스마트스토어",
+                    _norm_text(r.get("mall_name")),
+                    _norm_text(r.get("product_name")),
+                )
+            staged[key] = key + (card_image_path,)
+        if not staged:
+            return 0
+
+        conn = self.connection()
+        if conn is None:
+            self._log("⚠️ DB 연결이 없어 card_image_path 후반 업데이트를 건너뜁니다.")
+            return 0
+
+        cur = conn.cursor()
+        try:
+            with self.stage("card_paths"):
+                cur.execute("DROP TEMPORARY TABLE IF EXISTS tmp_card_image_paths")
+                cur.execute(
+                    """
+                    CREATE TEMPORARY TABLE tmp_card_image_paths (
+                        seq INT NOT NULL PRIMARY KEY,
+                        link TEXT NOT NULL,
+                        channel VARCHAR(50) NOT NULL,
+                        market VARCHAR(100) NOT NULL,
+                        mall_name VARCHAR(255) NOT NULL,
+                        product_name TEXT NOT NULL,
+                        card_image_path TEXT NOT NULL
+                    ) DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                    """
+                )
+                values = list(staged.values())
+                for i in range(0, len(values), CRAWL_DB_INSERT_BATCH):
+                    chunk = values[i:i + CRAWL_DB_INSERT_BATCH]
+                    cur.execute(
+                        "INSERT INTO tmp_card_image_paths "
+                        "(seq, link, channel, market, mall_name, product_name, card_image_path) VALUES "
+                        + ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(chunk)),
+                        [v for seq, row in enumerate(chunk, start=i) for v in (seq,) + row],
+                    )
+                # 키별 최신 id 는 GROUP BY 파생 테이블로 먼저 구체화되므로 같은 products 를 UPDATE 할 수 있다.
+                # (임시 테이블은 한 문장에서 두 번 열 수 없어 경로도 파생 테이블로 함께 넘긴다.)
+                cur.execute(
+                    f"""
+                    UPDATE {config.DB_TABLE} p
+                    JOIN (
+                        SELECT s.seq, s.card_image_path, MAX(t.id) AS id
+                        FROM tmp_card_image_paths s
+                        JOIN {config.DB_TABLE} t
+                          ON t.snapshot_id = %(sid)s
+                         AND (
+                              (s.link <> '' AND t.link = s.link)
+                              OR (
+                                  s.link = ''
+                                  AND t.channel = s.channel
+                                  AND t.market = s.market
+                                  AND t.mall_name = s.mall_name
+                                  AND t.product_name = s.product_name
+                              )
+                         )
+                        GROUP BY s.seq
+                    ) latest ON latest.id = p.id
+                    SET p.card_image_path = latest.card_image_path
+                    """,
+                    {"sid": snapshot_id},
+                )
+                updated = cur.rowcount
+                cur.execute("DROP TEMPORARY TABLE IF EXISTS tmp_card_image_paths")
+                if updated:
+                    # 스냅샷 커밋 때 캐시된 /latest 등은 카드가 없다 → 같은 커밋에서 응답 캐시 무효화
+                    bump_generation_cursor(cur)
+                conn.commit()
+            return updated
+        except Exception as e:
+            conn.rollback()
+            self._log(f"⚠️ card_image_path 업데이트 실패: {e}")
+            return 0
+        finally:
+            cur.close()
+
+    def _update_interval_card_paths(self, rows, *, snapshot_id: str) -> int:
+        keyed = [
+            {**r, "mall_name": normalize_mall_name(r.get("mall_name"))}
+            for r in rows
+            if _norm_text(r.get("card_image_path"))
+        ]
+        if not keyed:
+            return 0
+
+        conn = self.connection()
+        if conn is None:
+            self._log("⚠️ DB 연결이 없어 card_image_path 후반 업데이트를 건너뜁니다.")
+            return 0
+
+        cur = conn.cursor()
+        try:
+            with self.stage("card_paths"):
+                updated = set_card_image_paths(cur, keyed, snapshot_id=snapshot_id)
+                if updated:
+                    bump_generation_cursor(cur)
+                conn.commit()
+            return updated
+        except Exception as e:
+            conn.rollback()
+            self._log(f"⚠️ card_image_path 업데이트 실패: {e}")
+            return 0
+        finally:
+            cur.close()
@@ -3,25 +3,39 @@ import urllib.request
 import urllib.parse
 import urllib.error
 import json
+import random
 import re
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from html import unescape
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import mysql.connector
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
 
 import config
 
 try:
-    from api.services.card_renderer import render_card_png
+    from api.services.card_renderer import CARD_RENDER_CONCURRENCY, render_cards_batch
     _card_renderer_import_error = None
 except Exception as e:
-    render_card_png = None
+    CARD_RENDER_CONCURRENCY = 1
+    render_cards_batch = None
     _card_renderer_import_error = e
 
+from api.services.malls import normalize_mall_name
+from scripts.crawl_db import MANUAL_QUANTITY_PENDING_METHODS, CrawlerDB
+from api.services.title_parser import (
+    analyze_product,
+    has_sensor_pack_quantity,
+    is_allowed_coupang_libre2_title as _is_allowed_coupang_libre2_title,
+    is_target_libre2_product as _is_target_libre2_product,
+)
+
 try:
     from api.services.s3_storage import is_s3_enabled, upload_bytes
     _s3_storage_import_error = None
@@ -41,38 +55,6 @@ COUPANG_SELLER_TIMEOUT_SEC = int(os.getenv("COUPANG_SELLER_TIMEOUT_SEC", "8"))
 # 쿠팡 상품 페이지 추가 조회는 런타임/트래픽 보호를 위해 상한을 둔다.
 COUPANG_SELLER_MAX_FETCH_PER_RUN = int(os.getenv("COUPANG_SELLER_MAX_FETCH_PER_RUN", "30"))
 
-MALL_NAME_NORMALIZE_MAP = {
-    "글루어트": "글루코핏",
-    "무화당": "닥다몰",
-}
-
-LIBRE2_INCLUDE_PATTERNS = [
-    r"프리스타일\s*리브레\s*2",
-    r"리브레\s*2",
-    r"freestyle\s*libre\s*2",
-    r"libre\s*2",
-]
-
-NON_LIBRE_CGM_EXCLUDE_PATTERNS = [
-    r"덱스콤",
-    r"dexcom",
-    r"\bg\s*7\b",
-    r"\bg7\b",
-    r"가디언",
-    r"guardian",
-    r"케어센스\s*에어",
-]
-
-# 대시보드에서 수량확정(수동) 대상과 동일. DB에는 넣지 않으며 save_to_db 시 기존 동일 행도 삭제한다.
-MANUAL_QUANTITY_PENDING_METHODS = frozenset(
-    ("확인필요", "가격역산(보정)", "텍스트분석(범위초과)"),
-)
-_MANUAL_QUANTITY_PENDING_METHODS_SQL = (
-    "확인필요",
-    "가격역산(보정)",
-    "텍스트분석(범위초과)",
-)
-
 
 def _log(message: str):
     # Cron 환경에서 출력 버퍼링으로 로그가 늦게 보이는 문제를 줄인다.
@@ -80,22 +62,7 @@ def _log(message: str):
 
 
 def _normalize_mall_name(value: str) -> str:
-    raw = (value or "").strip()
-    if not raw:
-        return raw
-    return MALL_NAME_NORMALIZE_MAP.get(raw, raw)
-
-
-def _is_target_libre2_product(title: str) -> bool:
-    text = (title or "").strip()
-    if not text:
-        return False
-
-    # 덱스콤/가디언 등 타 CGM 모델을 먼저 제외한다.
-    if any(re.search(pattern, text, re.IGNORECASE) for pattern in NON_LIBRE_CGM_EXCLUDE_PATTERNS):
-        return False
-
-    return any(re.search(pattern, text, re.IGNORECASE) for pattern in LIBRE2_INCLUDE_PATTERNS)
+    return normalize_mall_name(value)
 
 
 def _upload_product_images_to_s3(rows, *, snapshot_id: str):
@@ -110,7 +77,7 @@ def _upload_product_images_to_s3(rows, *, snapshot_id: str):
         _log("S3 card upload skipped: ENABLE_CARD_RENDER is false")
         return 0
 
-    if _card_renderer_import_error is not None or render_card_png is None:
+    if _card_renderer_import_error is not None or render_cards_batch is None:
         _log(f"S3 card upload skipped: card renderer import failed: {_card_renderer_import_error}")
         return 0
 
@@ -137,311 +104,68 @@ def _upload_product_images_to_s3(rows, *, snapshot_id: str):
     if max_upload <= 0:
         max_upload = len(candidates)
 
-    for idx, row in enumerate(candidates, start=1):
-        if uploaded >= max_upload:
-            break
-
+    # 공용 브라우저의 페이지 풀로 한 번에 여러 장을 그린다. 실패분은 다음 후보로 채우므로
+    # 남은 업로드 수만큼씩(최대 풀 크기의 2배) 잘라 렌더한다.
+    batch_cap = max(1, CARD_RENDER_CONCURRENCY * 2)
+    pos = 0
+    stop = False
+    while not stop and uploaded < max_upload and pos < len(candidates):
+        take = min(batch_cap, max_upload - uploaded)
+        batch = list(enumerate(candidates[pos:pos + take], start=pos + 1))
+        pos += take
+        captured_at = datetime.now(KST)
         try:
-            captured_at = datetime.now(KST)
-            local_png_path = render_card_png(
-                product=row,
-                out_dir=os.path.join("product_cards", snapshot_id),
-                captured_at=captured_at,
-            )
-            with open(local_png_path, "rb") as f:
-                content = f.read()
-            content_type = "image/png"
-            ext = ".png"
-
-            key = (
-                f"{config.S3_PREFIX.strip('/')}/products/{snapshot_id}/"
-                f"{uploaded + 1:04d}_{idx:04d}{ext}"
+            pngs = render_cards_batch(
+                [row for _, row in batch], captured_at=captured_at, return_exceptions=True
             )
-            s3_url = upload_bytes(content=content, object_key=key, content_type=content_type)
-            row["card_image_path"] = s3_url
-            uploaded += 1
-            consecutive_failures = 0
         except Exception as e:
-            consecutive_failures += 1
-            _log(f"⚠️ 카드 렌더/S3 업로드 실패 (row #{idx}): {e}")
-            # 카드 렌더가 불가능한 런타임이면 연속 실패하므로 불필요한 반복을 중단
-            error_text = str(e)
-            if "libglib-2.0.so.0" in error_text or "BrowserType.launch" in error_text:
-                _log("Playwright runtime dependency missing. Stop card upload loop.")
-                break
-            if (
-                "can't start new thread" in error_text
-                or "Resource temporarily unavailable" in error_text
-                or "Cannot allocate memory" in error_text
-                or "pthread_create failed" in error_text
-            ):
-                _log("Runtime resource limit reached during card rendering. Stop card upload loop.")
-                break
-            if consecutive_failures >= 5:
-                _log("Too many consecutive card upload failures. Stop card upload loop.")
-                break
+            # 브라우저 기동 실패 등 배치 전체 실패
+            pngs = [e] * len(batch)
+
+        for (idx, row), png in zip(batch, pngs):
+            try:
+                if isinstance(png, BaseException):
+                    raise png
+                key = (
+                    f"{config.S3_PREFIX.strip('/')}/products/{snapshot_id}/"
+                    f"{uploaded + 1:04d}_{idx:04d}.png"
+                )
+                s3_url = upload_bytes(content=png, object_key=key, content_type="image/png")
+                row["card_image_path"] = s3_url
+                uploaded += 1
+                consecutive_failures = 0
+            except Exception as e:
+                consecutive_failures += 1
+                _log(f"⚠️ 카드 렌더/S3 업로드 실패 (row #{idx}): {e}")
+                # 카드 렌더가 불가능한 런타임이면 연속 실패하므로 불필요한 반복을 중단
+                error_text = str(e)
+                if "libglib-2.0.so.0" in error_text or "BrowserType.launch" in error_text:
+                    _log("Playwright runtime dependency missing. Stop card upload loop.")
+                    stop = True
+                    break
+                if (
+                    "can't start new thread" in error_text
+                    or "Resource temporarily unavailable" in error_text
+                    or "Cannot allocate memory" in error_text
+                    or "pthread_create failed" in error_text
+                ):
+                    _log("Runtime resource limit reached during card rendering. Stop card upload loop.")
+                    stop = True
+                    break
+                if consecutive_failures >= 5:
+                    _log("Too many consecutive card upload failures. Stop card upload loop.")
+                    stop = True
+                    break
 
     return uploaded
 
 
-def _fixed_quantity_for_product_link(link: str):
-    """
-    상품명 파싱이 반복 오판하는 특정 URL은 수량을 고정한다.
-    (예: 옥션/지마켓 일부 상품이 사은품 문구 때문에 3개로 잡히는 경우)
-    """
-    if not (link or "").strip():
-        return None
-    try:
-        u = urllib.parse.urlparse(link.strip())
-        host = (u.netloc or "").lower()
-        raw_qs = urllib.parse.parse_qs(u.query, keep_blank_values=True)
-        q = {k.lower(): v for k, v in raw_qs.items()}
-
-        if "auction.co.kr" in host:
-            for v in q.get("itemno") or []:
-                if str(v).strip().upper() == "F208273220":
-                    return 2
-
-        if "gmarket.co.kr" in host:
-            for v in q.get("goodscode") or []:
-                if str(v).strip() == "4407378380":
-                    return 2
-    except Exception:
-        return None
-    return None
-
-
-def _canonical_product_link_key(link: str) -> str:
-    """동일 상품 URL 매칭용(호스트 소문자·www 제거·쿼리 정렬)."""
-    if not (link or "").strip():
-        return ""
-    raw = urllib.parse.urldefrag(link.strip())[0].strip()
-    try:
-        u = urllib.parse.urlparse(raw)
-        scheme = (u.scheme or "https").lower()
-        netloc = (u.netloc or "").lower()
-        if netloc.startswith("www."):
-            netloc = netloc[4:]
-        path = u.path or ""
-        pairs = urllib.parse.parse_qsl(u.query, keep_blank_values=True)
-        pairs.sort(key=lambda x: (x[0].lower(), x[1]))
-        query = urllib.parse.urlencode(pairs)
-        return urllib.parse.urlunsplit((scheme, netloc, path, query, ""))
-    except Exception:
-        return raw
-
-
-def load_confirmed_qty_by_link_map():
-    """
-    대시보드에서 수량확정(수동)한 이력이 있는 link → quantity.
-    가장 최근 id 기준. 다음 크롤에서 동일 링크면 제목 파싱 대신 이 수량을 쓴다.
-    """
-    import os
-    import time
-
-    if os.getenv("MYSQLHOST"):
-        db_host = os.getenv("MYSQLHOST")
-        db_user = os.getenv("MYSQLUSER")
-        db_password = os.getenv("MYSQLPASSWORD")
-        db_name = os.getenv("MYSQLDATABASE")
-        db_port = int(os.getenv("MYSQLPORT", 3306))
-    elif config.DB_HOST:
-        db_host = config.DB_HOST
-        db_user = config.DB_USER
-        db_password = config.DB_PASSWORD
-        db_name = config.DB_NAME
-        db_port = config.DB_PORT
-    else:
-        return {}
-
-    conn = None
-    for attempt in range(1, 4):
-        try:
-            conn = mysql.connector.connect(
-                host=db_host,
-                port=db_port,
-                user=db_user,
-                password=db_password,
-                database=db_name,
-                charset="utf8mb4",
-                connection_timeout=10,
-            )
-            break
-        except Exception as e:
-            if attempt >= 3:
-                _log(f"⚠️ 수동확정 수량 맵 로드용 DB 연결 실패: {e}")
-            else:
-                time.sleep(attempt)
-
-    if not conn:
-        return {}
-
-    out = {}
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            f"""
-            SELECT link, quantity FROM {config.DB_TABLE}
-            WHERE calc_method LIKE %s
-              AND link IS NOT NULL AND TRIM(link) <> ''
-            ORDER BY id DESC
-            """,
-            ("수동확인(완료)%",),
-        )
-        for link, qty in cur.fetchall():
-            if not link:
-                continue
-            key = _canonical_product_link_key(link)
-            if not key or key in out:
-                continue
-            q = int(qty or 0)
-            if q > 0:
-                out[key] = q
-        cur.close()
-    except Exception as e:
-        _log(f"⚠️ 수동확정 수량 맵 조회 실패(무시): {e}")
-        out = {}
-    finally:
-        conn.close()
-
-    return out
-
-
-def analyze_product(title, total_price, link=None, confirmed_qty_by_link=None):
-    """
-    상품명에서 센서 수량과 단가를 분석
-
-    핵심: 센서/측정기 수량만 추출, 사은품(패치, 알콜솜 등)은 무시
-    """
-    fixed_qty = _fixed_quantity_for_product_link(link or "")
-    if fixed_qty is not None and fixed_qty > 0:
-        calc_unit_price = total_price // fixed_qty
-        return fixed_qty, calc_unit_price, f"링크별수량고정({fixed_qty}개)"
-
-    if confirmed_qty_by_link:
-        lk = (link or "").strip()
-        if lk:
-            cq = confirmed_qty_by_link.get(_canonical_product_link_key(lk))
-            if cq is None:
-                cq = confirmed_qty_by_link.get(lk)
-            if cq is not None:
-                q = int(cq)
-                if q > 0:
-                    calc_unit_price = total_price // q
-                    return q, calc_unit_price, "수동확인(완료·링크재사용)"
-
-    clean_title = title
-
-    # 1. 사은품/증정품 관련 구문 전체 제거
-    gift_patterns = [
-        r"\+\s*패치\s*\d+\s*(개|매|장|팩|박스)?",
-        r"패치\s*\d+\s*(개|매|장|팩|박스)?\s*(증정|사은품|포함)?",
-        r"\+\s*알콜\s*(솜|스왑|스웹)?\s*\d+\s*(개|매|장|팩|박스)?",
-        r"알콜\s*(솜|스왑|스웹)?\s*\d+\s*(개|매|장|팩|박스)?\s*(증정|사은품|포함)?",
-        r"\+\s*방수\s*(필름|패치)?\s*\d+\s*(개|매|장|팩|박스)?",
-        r"방수\s*(필름|패치)?\s*\d+\s*(개|매|장|팩|박스)?\s*(증정|사은품|포함)?",
-        r"아메리카노\s*\d+\s*(개|잔)?",
-        r"커피\s*\d+\s*(개|잔)?",
-        r"멤버십\s*\d+\s*일",
-        r"\d+\s*일\s*(체험|멤버십)",
-        r"유효기간\s*\d+\s*일",
-        r"사은품[^+]*",
-        r"증정[^+]*",
-    ]
-
-    for pattern in gift_patterns:
-        clean_title = re.sub(pattern, " ", clean_title, flags=re.IGNORECASE)
-
-    # 2. 센서/측정기 관련 수량 우선 추출
-    sensor_qty_patterns = [
-        r"(측정기|센서|리브레\s*2?)\s*(\d+)\s*(개입|세트|팩|박스|개(?!\s*[인용]))",
-        r"(\d+)\s*(개입|세트|팩|박스|개(?!\s*[인용]))\s*(측정기|센서)",
-        r"(측정기|센서|리브레)\s*[xX*]\s*(\d+)",
-    ]
-
-    sensor_qty = None
-    qty_from_text = False
-
-    for pattern in sensor_qty_patterns:
-        match = re.search(pattern, clean_title, re.IGNORECASE)
-        if match:
-            for group in match.groups():
-                if group and group.isdigit():
-                    sensor_qty = int(group)
-                    break
-            if sensor_qty:
-                qty_from_text = True
-                break
-
-    def _extract_qty_candidates(text: str):
-        qty_candidates = []
-
-        matches = re.findall(
-            r"[\s](\d+)\s*(개입|세트|팩|박스|ea|set|개(?!\s*[인용]))",
-            text,
-            re.IGNORECASE,
-        )
-        for m in matches:
-            qty_candidates.append(int(m[0]))
-
-        matches_mul = re.findall(r"[xX*]\s*(\d+)", text)
-        for m in matches_mul:
-            qty_candidates.append(int(m))
-
-        # 지나치게 큰 값/0은 노이즈로 간주
-        return [q for q in qty_candidates if 1 <= q <= 20]
-
-    def _pick_best_qty(candidates, total_price_value, min_price, max_price):
-        unique = sorted(set(candidates))
-        if not unique:
-            return None
-
-        valid = []
-        for q in unique:
-            unit = total_price_value // q if q > 0 else total_price_value
-            if min_price <= unit <= max_price:
-                valid.append((q, unit))
-
-        if valid:
-            # 정상 단가 범위 중 90,000원에 가장 가까운 수량을 우선
-            valid.sort(key=lambda x: (abs(x[1] - 90000), x[0]))
-            return valid[0][0]
-
-        # 범위를 만족하는 후보가 없으면 기존처럼 첫 후보 대신 최소 수량 사용
-        return unique[0]
-
-    # 3. 센서 수량을 못 찾으면 일반 패턴으로 추출
-    if sensor_qty is None:
-        qty_candidates = _extract_qty_candidates(clean_title)
-        if not qty_candidates:
-            # 사은품 제거 과정에서 메인 수량까지 지워지는 케이스 보정
-            qty_candidates = _extract_qty_candidates(title)
-
-        picked_qty = _pick_best_qty(qty_candidates, total_price, 65000, 180000)
-        if picked_qty is not None:
-            sensor_qty = picked_qty
-            qty_from_text = True
-        else:
-            sensor_qty = 1
-            qty_from_text = False
-
-    # 4. 단가 계산 및 검증
-    MIN_PRICE, MAX_PRICE = 65000, 180000
-    calc_unit_price = total_price // sensor_qty if sensor_qty > 0 else total_price
-
-    if MIN_PRICE <= calc_unit_price <= MAX_PRICE:
-        return sensor_qty, calc_unit_price, "텍스트분석"
-
-    if qty_from_text:
-        return sensor_qty, calc_unit_price, "텍스트분석(범위초과)"
-
-    estimated_qty = round(total_price / 90000) or 1
-    recalc_price = total_price // estimated_qty if estimated_qty > 0 else total_price
-
-    if MIN_PRICE <= recalc_price <= MAX_PRICE:
-        return estimated_qty, recalc_price, "가격역산(보정)"
-    else:
-        return sensor_qty, calc_unit_price, "확인필요"
+def load_confirmed_qty_by_link_map(db: CrawlerDB | None = None, links=None):
+    """대시보드에서 수량확정(수동)한 link → quantity. links 를 주면 그 링크들만 조회한다."""
+    if db is not None:
+        return db.load_confirmed_qty_by_link_map(links)
+    with CrawlerDB(log=_log) as db:
+        return db.load_confirmed_qty_by_link_map(links)
 
 
 def _is_coupang_item(link: str, mall_name: str) -> bool:
@@ -450,22 +174,6 @@ def _is_coupang_item(link: str, mall_name: str) -> bool:
     return ("coupang.com" in link_text) or (mall_text == "쿠팡")
 
 
-def _is_allowed_coupang_libre2_title(title: str) -> bool:
-    """
-    네이버 OpenAPI 결과 중 쿠팡 채널로 분류된 항목은
-    아래 핵심 타이틀 패턴만 허용한다.
-    - "애보트 프리스타일 리브레2 연속 혈당측정기 FreeStyle Libre 2 n개"
-    """
-    text = re.sub(r"\s+", " ", (title or "").strip())
-    if not text:
-        return False
-
-    has_core_ko = "애보트 프리스타일 리브레2 연속 혈당측정기" in text
-    has_core_en = re.search(r"freestyle\s*libre\s*2", text, re.IGNORECASE) is not None
-    has_qty = re.search(r"\b\d+\s*개\b", text) is not None
-    return has_core_ko and has_core_en and has_qty
-
-
 def _decode_json_escaped_text(value: str) -> str:
     raw = (value or "").strip()
     if not raw:
@@ -553,50 +261,124 @@ def _can_fetch_coupang_seller(fetch_count: int) -> bool:
     return fetch_count < COUPANG_SELLER_MAX_FETCH_PER_RUN
 
 
-def get_naver_data_all(query, confirmed_qty_by_link=None):
-    enc = urllib.parse.quote(query)
-    all_results = []
-    start = 1
-    display = 100
-    coupang_seller_cache = {}
-    coupang_seller_fetch_count = 0
-    coupang_seller_hit_count = 0
-    coupang_seller_limit_skipped = 0
+NAVER_SHOP_API_URL = "https://openapi.naver.com/v1/search/shop.json"
+NAVER_SHOP_PAGE_SIZE = 100
+NAVER_SHOP_MAX_START = 1000
+# sequential: 페이지를 차례로 받고 빈 페이지에서 멈춘다 (기존 방식)
+# concurrent: 10개 페이지를 공유 커넥션 풀로 동시에 받는다. 결과 행은 sequential 과 같다.
+NAVER_FETCH_MODE = os.getenv("NAVER_FETCH_MODE", "concurrent").strip().lower()
+NAVER_API_CONCURRENCY = int(os.getenv("NAVER_API_CONCURRENCY", "4"))
+NAVER_API_MAX_RPS = float(os.getenv("NAVER_API_MAX_RPS", "5"))
+
+
+class _RateLimiter:
+    """초당 요청 수 상한. 스레드 간 공유하며, 각 호출은 자기 차례 시각까지 기다린다."""
+
+    def __init__(self, max_per_sec: float):
+        self._interval = 1.0 / max_per_sec if max_per_sec > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self._interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self._interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _naver_http_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.headers.update({
+        "X-Naver-Client-Id": CLIENT_ID or "",
+        "X-Naver-Client-Secret": CLIENT_SECRET or "",
+    })
+    return session
+
+
+def _fetch_naver_page(session, query, start, limiter):
+    """
+    검색 결과 한 페이지(items 리스트). 재시도(지수 백오프)까지 실패하면 None.
+    429 / 5xx 는 재시도하고, 그 밖의 비정상 상태 코드는 바로 None.
+    """
+    params = {"query": query, "display": NAVER_SHOP_PAGE_SIZE, "start": start, "sort": "sim"}
+    for attempt in range(1, NAVER_API_MAX_RETRIES + 1):
+        limiter.wait()
+        try:
+            resp = session.get(NAVER_SHOP_API_URL, params=params, timeout=NAVER_API_TIMEOUT_SEC)
+            if resp.status_code == 200:
+                return resp.json().get("items", [])
+            if resp.status_code != 429 and resp.status_code < 500:
+                _log(f"API status: {resp.status_code} (start={start})")
+                return None
+            _log(
+                f"API status {resp.status_code} (start={start}, "
+                f"attempt {attempt}/{NAVER_API_MAX_RETRIES})"
+            )
+        except Exception as api_req_error:
+            _log(
+                f"API request failed (start={start}, attempt {attempt}/{NAVER_API_MAX_RETRIES}): "
+                f"{api_req_error}"
+            )
+        if attempt < NAVER_API_MAX_RETRIES:
+            time.sleep(min(8.0, 0.5 * (2 ** (attempt - 1))) + random.uniform(0, 0.25))
+    return None
 
-    while True:
-        if start > 1000:
-            break
 
-        url = f"https://openapi.naver.com/v1/search/shop.json?query={enc}&display={display}&start={start}&sort=sim"
-        request = urllib.request.Request(url)
-        request.add_header("X-Naver-Client-Id", CLIENT_ID)
-        request.add_header("X-Naver-Client-Secret", CLIENT_SECRET)
+def _naver_page_starts():
+    return list(range(1, NAVER_SHOP_MAX_START + 1, NAVER_SHOP_PAGE_SIZE))
 
-        try:
-            response = None
-            for attempt in range(1, NAVER_API_MAX_RETRIES + 1):
-                try:
-                    response = urllib.request.urlopen(request, timeout=NAVER_API_TIMEOUT_SEC)
-                    break
-                except Exception as api_req_error:
-                    _log(
-                        f"API request failed (attempt {attempt}/{NAVER_API_MAX_RETRIES}): "
-                        f"{api_req_error}"
-                    )
-                    if attempt < NAVER_API_MAX_RETRIES:
-                        time.sleep(attempt)
-            if response is None:
-                _log("API request failed after retries; stop this crawl run.")
-                break
-            if response.getcode() != 200:
-                _log(f"API status: {response.getcode()}")
+
+def fetch_naver_pages(query, *, mode=None):
+    """
+    검색 결과 페이지들을 [(start, items), ...] 로 받는다.
+    어느 모드든 첫 실패/빈 페이지 앞까지만 돌려주므로 이후 처리 결과가 같다.
+    """
+    mode = (mode or NAVER_FETCH_MODE or "sequential").strip().lower()
+    starts = _naver_page_starts()
+    limiter = _RateLimiter(NAVER_API_MAX_RPS)
+    pages = []
+
+    if mode == "concurrent":
+        workers = max(1, min(NAVER_API_CONCURRENCY, len(starts)))
+        with _naver_http_session(workers) as session:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda st: _fetch_naver_page(session, query, st, limiter), starts))
+        for start, items in zip(starts, results):
+            if not items:
+                if items is None:
+                    _log(f"API request failed after retries (start={start}); later pages dropped.")
                 break
+            pages.append((start, items))
+        return pages
 
-            data = json.loads(response.read().decode("utf-8"))
-            items = data.get("items", [])
+    with _naver_http_session(1) as session:
+        for start in starts:
+            items = _fetch_naver_page(session, query, start, limiter)
             if not items:
+                if items is None:
+                    _log("API request failed after retries; stop this crawl run.")
                 break
+            pages.append((start, items))
+    return pages
+
 
+def build_rows_from_pages(query, pages, confirmed_qty_by_link=None):
+    """수집한 페이지 items 에 필터 / 쿠팡 판매자 보강 / analyze_product 를 페이지 순서대로 적용한다."""
+    all_results = []
+    coupang_seller_cache = {}
+    coupang_seller_fetch_count = 0
+    coupang_seller_hit_count = 0
+    coupang_seller_limit_skipped = 0
+
+    for start, items in pages:
+        try:
             kept_before = len(all_results)
             excluded_by_category = 0
             excluded_by_accessory = 0
@@ -683,7 +465,7 @@ def get_naver_data_all(query, confirmed_qty_by_link=None):
                 title_lower = title.lower()
                 if any(kw.lower() in title_lower for kw in accessory_keywords):
                     # 단, "센서"가 메인 상품명에 포함된 경우는 제외하지 않음
-                    if not re.search(r"센서\s*\d+\s*(개|팩|세트|박스)", title):
+                    if not has_sensor_pack_quantity(title):
                         excluded_by_accessory += 1
                         if VERBOSE_EXCLUDE_LOG:
                             _log(f"  ⛔ 제외 (액세서리): {title[:50]}...")
@@ -731,9 +513,6 @@ def get_naver_data_all(query, confirmed_qty_by_link=None):
                 f"kept_total={kept_now}"
             )
 
-            start += display
-            time.sleep(0.2)
-
         except Exception as e:
             _log(f"API error: {e}")
             break
@@ -750,276 +529,28 @@ def get_naver_data_all(query, confirmed_qty_by_link=None):
     return all_results
 
 
-# ✅ (1) calc_valid 함수 추가
-def _calc_valid(calc_method: str) -> int:
-    cm = (calc_method or "").strip()
-    if cm.startswith("수동확인(완료"):
-        return 1
-    if "확인" in cm or "범위초과" in cm:
-        return 0
-    return 1
-
-
-def _norm_text(value) -> str:
-    return (value or "").strip()
-
-
-# ✅ (2) save_to_db 시그니처 변경 + INSERT 컬럼 추가
-def save_to_db(rows, *, snapshot_id: str, snapshot_at: datetime):
-    import os
-
-    _log(f"🔍 환경 변수 확인:")
-    _log(f"   MYSQLHOST: {os.getenv('MYSQLHOST')}")
-    _log(f"   MYSQLUSER: {os.getenv('MYSQLUSER')}")
-    _log(f"   MYSQLDATABASE: {os.getenv('MYSQLDATABASE')}")
-    _log(f"   DB_HOST: {config.DB_HOST}")
-
-    if os.getenv("MYSQLHOST"):
-        db_host = os.getenv("MYSQLHOST")
-        db_user = os.getenv("MYSQLUSER")
-        db_password = os.getenv("MYSQLPASSWORD")
-        db_name = os.getenv("MYSQLDATABASE")
-        db_port = int(os.getenv("MYSQLPORT", 3306))
-        _log(f"✅ Railway MySQL 환경 변수 사용: {db_host}:{db_port}")
-    elif config.DB_HOST:
-        db_host = config.DB_HOST
-        db_user = config.DB_USER
-        db_password = config.DB_PASSWORD
-        db_name = config.DB_NAME
-        db_port = config.DB_PORT
-    else:
-        _log("❌ DB 연결 정보가 없습니다.")
-        _log("   Railway 환경에서는 Cron Job 서비스의 Variables에 다음을 추가하세요:")
-        _log("   MYSQLHOST = ${{ MySQL.MYSQLHOST }}")
-        _log("   MYSQLUSER = ${{ MySQL.MYSQLUSER }}")
-        _log("   MYSQLPASSWORD = ${{ MySQL.MYSQLPASSWORD }}")
-        _log("   MYSQLDATABASE = ${{ MySQL.MYSQLDATABASE }}")
-        _log("   MYSQLPORT = ${{ MySQL.MYSQLPORT }}")
-        return 0
-
-    import time
-    
-    max_retries = 3
-    conn = None
-    for attempt in range(1, max_retries + 1):
-        try:
-            conn = mysql.connector.connect(
-                host=db_host,
-                port=db_port,
-                user=db_user,
-                password=db_password,
-                database=db_name,
-                charset="utf8mb4",
-                connection_timeout=10,
-            )
-            break
-        except mysql.connector.errors.OperationalError as e:
-            _log(f"⚠️ DB 연결 실패 (시도 {attempt}/{max_retries}): {e}")
-            if attempt < max_retries:
-                wait = attempt * 5  # 5초, 10초, 15초
-                _log(f"   {wait}초 후 재시도...")
-                time.sleep(wait)
-            else:
-                _log("❌ DB 연결 최종 실패. 모든 재시도 소진.")
-                return 0
-    
-    if conn is None:
-        return 0
-    cur = conn.cursor()
-
-    try:
-        cur.execute(
-            f"DELETE FROM {config.DB_TABLE} WHERE calc_method IN (%s, %s, %s)",
-            _MANUAL_QUANTITY_PENDING_METHODS_SQL,
-        )
-        purged = cur.rowcount
-        conn.commit()
-        if purged:
-            _log(f"🗑️ 수량 미확정(calc_method) 행 DB 삭제: {purged}건")
-    except Exception as e:
-        _log(f"⚠️ 수량 미확정 행 삭제 실패(이번 저장은 중단): {e}")
-        conn.rollback()
-        cur.close()
-        conn.close()
-        return 0
-
-    sql = f"""
-    INSERT INTO {config.DB_TABLE} (
-      keyword, product_name, unit_price, quantity, total_price,
-      mall_name, calc_method, link, image_url, card_image_path,
-      channel, market,
-      snapshot_id, snapshot_at, calc_valid,
-      created_at
-    ) VALUES (
-      %s,%s,%s,%s,%s,
-      %s,%s,%s,%s,%s,
-      %s,%s,
-      %s,%s,%s,
-      NOW()
-    )
-    """
+def get_naver_data_all(query, confirmed_qty_by_link=None, *, mode=None):
+    pages = fetch_naver_pages(query, mode=mode)
+    return build_rows_from_pages(query, pages, confirmed_qty_by_link)
 
-    if not rows:
-        _log("No rows to insert.")
-        cur.close()
-        conn.close()
-        return 0
 
-    data = []
-    skipped_pending = 0
-    for r in rows:
-        cm = (r.get("calc_method") or "").strip()
-        if cm in MANUAL_QUANTITY_PENDING_METHODS:
-            skipped_pending += 1
-            continue
-        data.append(
-            (
-                r["keyword"],
-                r["product_name"],
-                r["unit_price"],
-                r["quantity"],
-                r["total_price"],
-                _normalize_mall_name(r["mall_name"]),
-                r["calc_method"],
-                r["link"],
-                r["image_url"],
-                r["card_image_path"],
-                r.get("channel", "naver"),
-                r.get("market", "스마트스토어"),
-                snapshot_id,
-                snapshot_at.strftime("%Y-%m-%d %H:%M:%S"),
-                _calc_valid(r.get("calc_method")),
-            )
-        )
-    if skipped_pending:
-        _log(f"⏭️ INSERT 생략(수량 미확정 calc_method): {skipped_pending}건")
-
-    if not data:
-        _log("No rows to insert after excluding 수량 미확정.")
-        cur.close()
-        conn.close()
-        return 0
+def save_to_db(rows, *, snapshot_id: str, snapshot_at: datetime, db: CrawlerDB | None = None):
+    """products 저장 (CrawlerDB.save_rows). db 를 넘기면 그 실행의 연결을 재사용한다."""
+    if db is not None:
+        return db.save_rows(rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at)
+    with CrawlerDB(log=_log) as db:
+        return db.save_rows(rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at)
 
-    cur.executemany(sql, data)
-    inserted = cur.rowcount
-
-    # 과거 데이터도 표준 판매처명으로 일괄 치환한다.
-    updated_total = 0
-    for old_name, new_name in MALL_NAME_NORMALIZE_MAP.items():
-        cur.execute(
-            f"UPDATE {config.DB_TABLE} SET mall_name = %s WHERE mall_name = %s",
-            (new_name, old_name),
-        )
-        updated_total += cur.rowcount
-    conn.commit()
-    if updated_total > 0:
-        _log(f"Mall names normalized in DB: {updated_total}")
 
-    cur.close()
-    conn.close()
-    return inserted
-
-
-def update_card_image_paths(rows, *, snapshot_id: str):
+def update_card_image_paths(rows, *, snapshot_id: str, db: CrawlerDB | None = None):
     """
     이미 저장된 동일 snapshot 행에 card_image_path만 후반 업데이트한다.
-    (DB 저장 선행 -> 카드 렌더/S3 후처리용)
+    (DB 저장 선행 -> 카드 렌더/S3 후처리용, CrawlerDB.update_card_image_paths)
     """
-    rows_with_cards = [r for r in rows if _norm_text(r.get("card_image_path"))]
-    if not rows_with_cards:
-        return 0
-
-    import os
-    import time
-
-    if os.getenv("MYSQLHOST"):
-        db_host = os.getenv("MYSQLHOST")
-        db_user = os.getenv("MYSQLUSER")
-        db_password = os.getenv("MYSQLPASSWORD")
-        db_name = os.getenv("MYSQLDATABASE")
-        db_port = int(os.getenv("MYSQLPORT", 3306))
-    elif config.DB_HOST:
-        db_host = config.DB_HOST
-        db_user = config.DB_USER
-        db_password = config.DB_PASSWORD
-        db_name = config.DB_NAME
-        db_port = config.DB_PORT
-    else:
-        _log("⚠️ DB 연결 정보가 없어 card_image_path 후반 업데이트를 건너뜁니다.")
-        return 0
-
-    max_retries = 3
-    conn = None
-    for attempt in range(1, max_retries + 1):
-        try:
-            conn = mysql.connector.connect(
-                host=db_host,
-                port=db_port,
-                user=db_user,
-                password=db_password,
-                database=db_name,
-                charset="utf8mb4",
-                connection_timeout=10,
-            )
-            break
-        except mysql.connector.errors.OperationalError as e:
-            _log(f"⚠️ DB 재연결 실패(카드 경로 업데이트, 시도 {attempt}/{max_retries}): {e}")
-            if attempt < max_retries:
-                time.sleep(attempt * 2)
-            else:
-                _log("⚠️ card_image_path 업데이트를 포기하고 종료합니다.")
-                return 0
-
-    if conn is None:
-        return 0
-
-    cur = conn.cursor()
-    updated = 0
-
-    for r in rows_with_cards:
-        card_image_path = _norm_text(r.get("card_image_path"))
-        link = _norm_text(r.get("link"))
-
-        if link:
-            cur.execute(
-                f"""
-                UPDATE {config.DB_TABLE}
-                SET card_image_path = %s
-                WHERE snapshot_id = %s
-                  AND link = %s
-                ORDER BY id DESC
-                LIMIT 1
-                """,
-                (card_image_path, snapshot_id, link),
-            )
-        else:
-            cur.execute(
-                f"""
-                UPDATE {config.DB_TABLE}
-                SET card_image_path = %s
-                WHERE snapshot_id = %s
-                  AND channel = %s
-                  AND market = %s
-                  AND mall_name = %s
-                  AND product_name = %s
-                ORDER BY id DESC
-                LIMIT 1
-                """,
-                (
-                    card_image_path,
-                    snapshot_id,
-                    _norm_text(r.get("channel")) or "naver",
-                    _norm_text(r.get("market")) or "스마트스토어",
-                    _norm_text(r.get("mall_name")),
-                    _norm_text(r.get("product_name")),
-                ),
-            )
-        updated += cur.rowcount
-
-    conn.commit()
-    cur.close()
-    conn.close()
-    return updated
+    if db is not None:
+        return db.update_card_image_paths(rows, snapshot_id=snapshot_id)
+    with CrawlerDB(log=_log) as db:
+        return db.update_card_image_paths(rows, snapshot_id=snapshot_id)
 
 
 def run_crawling():
@@ -1027,11 +558,25 @@ def run_crawling():
     _log(f"START: {crawl_started_at.isoformat(timespec='seconds')}")
     keyword = config.SEARCH_KEYWORD
 
-    confirmed_map = load_confirmed_qty_by_link_map()
+    # 수동확정 수량 조회 / 저장 / 카드 경로 갱신이 연결 하나를 같이 쓴다.
+    with CrawlerDB(log=_log) as db:
+        try:
+            _run_crawling(db, crawl_started_at, keyword)
+        finally:
+            db.log_timings()
+
+    _log(f"END: {datetime.now(KST).isoformat(timespec='seconds')}")
+
+
+def _run_crawling(db: CrawlerDB, crawl_started_at: datetime, keyword: str):
+    pages = fetch_naver_pages(keyword)
+    # 수동확정 수량은 이번에 수집한 링크의 키만 조회한다 (link_quantity_overrides PK).
+    links = [item.get("link", "") for _, items in pages for item in items]
+    confirmed_map = load_confirmed_qty_by_link_map(db, links)
     if confirmed_map:
         _log(f"수동확정 수량 재사용 맵: {len(confirmed_map)}개 링크")
 
-    rows = get_naver_data_all(keyword, confirmed_qty_by_link=confirmed_map)
+    rows = build_rows_from_pages(keyword, pages, confirmed_map)
     _log(f"Fetched: {len(rows)} rows")
 
     # 실행 단위 snapshot_id/snapshot_at (초 단위 + UUID)로 고정해 run 간 혼합 방지
@@ -1039,7 +584,7 @@ def run_crawling():
     snapshot_at = crawl_started_at
     snapshot_id = f"{snapshot_at.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
 
-    inserted = save_to_db(rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at)
+    inserted = save_to_db(rows, snapshot_id=snapshot_id, snapshot_at=snapshot_at, db=db)
     _log(f"DB inserted: {inserted}")
 
     if not config.ENABLE_AUTO_CARD_RENDER:
@@ -1055,13 +600,11 @@ def run_crawling():
 
     if s3_uploaded:
         _log(f"S3 uploaded: {s3_uploaded}")
-        db_updated_cards = update_card_image_paths(rows, snapshot_id=snapshot_id)
+        db_updated_cards = update_card_image_paths(rows, snapshot_id=snapshot_id, db=db)
         _log(f"DB card_image_path updated: {db_updated_cards}")
     elif config.ENABLE_S3_UPLOAD:
         _log("S3 upload enabled but 0 files uploaded")
 
-    _log(f"END: {datetime.now(KST).isoformat(timespec='seconds')}")
-
 
 if __name__ == "__main__":
     run_crawling()
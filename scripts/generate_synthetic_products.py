@@ -0,0 +1,229 @@
+"""합성 products 이력 생성기 (로컬 MySQL 에서 성능을 재현 가능하게 재기 위한 데이터).
+
+- 기간: 오늘 0시 기준 최근 --months 개월, 하루 SNAPSHOTS_PER_DAY 회(기본 4회: 00/06/12/18시) 스냅샷.
+- 판매처 --malls 곳을 naver / coupang 에 나눈다 (--coupang-share, coupang 은 market=쿠팡).
+  판매처마다 상품 링크 1~4개, 기본가 + 완만한 추세 + 잡음 + 가끔 급락 프로모션.
+  스냅샷마다 일부 판매처는 빠진다(품절/미노출).
+- 별칭: 시드 별칭 묶음(SEED_MALL_ALIASES: 랜식/글핏몰/글루코핏, 닥다몰/닥터다이어리 …)의 원본명을 섞어 쓴다.
+- 레거시: 가장 오래된 --legacy-days 일은 스냅샷 레지스트리 도입 전처럼 snapshot_id NULL, mall_id NULL 행이고
+  판매처명도 정정 전 구명칭(글루어트/무화당)이 섞인다. 이 구간은 products 에 직접 INSERT 한다.
+- 나머지 스냅샷은 크롤러 writer(CrawlerDB.save_rows)로 저장한다. snapshots / monthly_seller_state /
+  price_anomalies 가 운영과 같은 경로로 채워진다.
+  writer 는 created_at 을 NOW() 로 넣으므로 저장 직후 스냅샷 시각 + 몇 분으로 되돌리고,
+  created_at 기준인 일별 롤업(mall_daily_price)은 마지막에 전체 기간을 refresh_mall_daily_price 로 다시 만든다.
+- 같은 --seed / --months / --malls 면 같은 가격·판매처가 나온다 (snapshot_id 의 임의 접미사만 다르다).
+
+운영 DB 보호: Railway 환경 변수가 있으면 거부한다. products 에 행이 있으면 --truncate(products 와 파생 테이블 비움)나
+--append 를 지정해야 한다.
+
+Usage:
+  python scripts/generate_synthetic_products.py --months 3 --malls 40 --truncate
+  python scripts/generate_synthetic_products.py --months 12 --malls 80 --legacy-days 30 --truncate
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+from api.database import IS_RAILWAY, engine, init_db
+from api.services.mall_daily_price import refresh_mall_daily_price
+from api.services.malls import MALL_NAME_RENAMES, SEED_MALL_ALIASES
+from api.services.price_analytics import SNAPSHOTS_PER_DAY
+from api.services.response_cache import bump_generation_cursor
+from scripts.crawl_db import CrawlerDB
+
+# --truncate 로 비우는 테이블 (products 에서 파생되는 것만; 메모/알림 설정/수동확정 수량은 그대로 둔다)
+DERIVED_TABLES = (
+    "snapshots",
+    "mall_daily_price",
+    "monthly_seller_state",
+    "monthly_state_meta",
+    "price_anomalies",
+    "price_anomaly_state",
+)
+
+_OLD_NAMES = {new: old for old, new in MALL_NAME_RENAMES.items()}
+_TITLES = (
+    "프리스타일 리브레2 연속혈당측정기 센서 {q}개",
+    "[정품] 애보트 프리스타일 리브레 2 센서 {q}개입",
+    "FreeStyle Libre2 리브레2 센서 {q}팩 무료배송",
+    "리브레2 센서 {q}개 세트 (14일 사용)",
+)
+
+
+class SyntheticMall:
+    def __init__(self, rng: random.Random, index: int, names: tuple[str, ...], channel: str):
+        self.names = names
+        self.channel = channel
+        self.market = "쿠팡" if channel == "coupang" else "스마트스토어"
+        self.base = rng.randint(76000, 98000)
+        self.drift_per_day = rng.uniform(-25, 25)
+        self.noise = rng.choice((0, 300, 800, 1500))
+        self.presence = rng.uniform(0.75, 0.98)
+        self.links = [
+            (
+                f"https://example.com/{channel}/{index:03d}/{n}",
+                rng.choice((1, 1, 2, 3)),
+                rng.choice(_TITLES),
+            )
+            for n in range(rng.randint(1, 4))
+        ]
+
+    def name_at(self, rng: random.Random, legacy: bool) -> str:
+        name = rng.choice(self.names)
+        if legacy and name in _OLD_NAMES:
+            return _OLD_NAMES[name]
+        return name
+
+    def rows(self, rng: random.Random, ts: datetime, day_index: int, *, legacy: bool) -> list[dict]:
+        if rng.random() > self.presence:
+            return []
+        promo = rng.random() < 0.02
+        out = []
+        for link, qty, title in self.links:
+            unit = self.base + self.drift_per_day * day_index + (rng.gauss(0, self.noise) if self.noise else 0)
+            if promo:
+                unit -= rng.choice((8000, 15000))
+            unit = int(max(unit, 65000)) // 10 * 10
+            method = "텍스트분석" if rng.random() < 0.9 else "수동확인(완료·링크재사용)"
+            out.append(
+                {
+                    "keyword": config.SEARCH_KEYWORD,
+                    "product_name": title.format(q=qty),
+                    "unit_price": unit,
+                    "quantity": qty,
+                    "total_price": unit * qty,
+                    "mall_name": self.name_at(rng, legacy),
+                    "calc_method": method,
+                    "link": link,
+                    "image_url": None,
+                    "card_image_path": None,
+                    "channel": self.channel,
+                    "market": self.market,
+                }
+            )
+        return out
+
+
+def build_malls(rng: random.Random, count: int, coupang_share: float) -> list[SyntheticMall]:
+    """시드 별칭 묶음(네이버)부터 채우고 나머지는 coupang_share 비율로 coupang 에 둔다."""
+    malls = [
+        SyntheticMall(rng, i, aliases, "naver")
+        for i, aliases in enumerate(list(SEED_MALL_ALIASES.values())[:count])
+    ]
+    for i in range(len(malls), count):
+        if rng.random() < coupang_share:
+            malls.append(SyntheticMall(rng, i, (f"쿠팡셀러{i:03d}",), "coupang"))
+        else:
+            malls.append(SyntheticMall(rng, i, (f"리브레몰{i:03d}",), "naver"))
+    return malls
+
+
+def _insert_legacy(cur, rows: list[dict], ts: datetime) -> int:
+    cur.executemany(
+        f"""
+        INSERT INTO {config.DB_TABLE}
+            (keyword, product_name, unit_price, quantity, total_price, mall_name, calc_method,
+             link, image_url, card_image_path, channel, market, created_at, calc_valid)
+        VALUES
+            (%(keyword)s, %(product_name)s, %(unit_price)s, %(quantity)s, %(total_price)s, %(mall_name)s,
+             %(calc_method)s, %(link)s, %(image_url)s, %(card_image_path)s, %(channel)s, %(market)s,
+             %(created_at)s, 1)
+        """,
+        [{**r, "created_at": ts} for r in rows],
+    )
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--malls", type=int, default=40)
+    parser.add_argument("--coupang-share", type=float, default=0.3, help="coupang 판매처 비율")
+    parser.add_argument("--legacy-days", type=int, default=7, help="snapshot_id NULL 레거시 구간(가장 오래된 N일)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--truncate", action="store_true", help="products 와 파생 테이블을 비우고 만든다")
+    parser.add_argument("--append", action="store_true", help="기존 products 에 이어 넣는다")
+    parser.add_argument("--verbose", action="store_true", help="writer 로그 출력")
+    args = parser.parse_args()
+
+    if IS_RAILWAY:
+        print("❌ Railway 환경에서는 합성 데이터를 만들지 않는다 (로컬 MySQL 전용)")
+        sys.exit(1)
+
+    init_db()
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute(f"SELECT COUNT(*) FROM {config.DB_TABLE}")
+        existing = cur.fetchone()[0]
+        if existing and args.truncate:
+            for table in (config.DB_TABLE,) + DERIVED_TABLES:
+                cur.execute(f"DELETE FROM {table}")
+            raw.commit()
+            print(f"🗑️ products {existing}행과 파생 테이블을 비웠다")
+        elif existing and not args.append:
+            parser.error(f"products 에 {existing}행이 있다. --truncate 또는 --append 를 지정한다")
+
+        rng = random.Random(args.seed)
+        malls = build_malls(rng, args.malls, args.coupang_share)
+        end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=30 * args.months)
+        step = timedelta(hours=24 // SNAPSHOTS_PER_DAY)
+        legacy_end = start + timedelta(days=args.legacy_days)
+        total_slots = int((end - start) / step)
+
+        t0 = time.perf_counter()
+        legacy_rows = snapshot_rows = snapshots = 0
+        log = print if args.verbose else (lambda _msg: None)
+        with CrawlerDB(log=log) as db:
+            ts = start
+            for slot in range(total_slots):
+                day_index = (ts - start).days
+                legacy = ts < legacy_end
+                rows = [r for m in malls for r in m.rows(rng, ts, day_index, legacy=legacy)]
+                if legacy:
+                    legacy_rows += _insert_legacy(cur, rows, ts)
+                    raw.commit()
+                else:
+                    snapshot_id = f"{ts.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+                    snapshot_rows += db.save_rows(rows, snapshot_id=snapshot_id, snapshot_at=ts)
+                    snapshots += 1
+                    cur.execute(
+                        f"UPDATE {config.DB_TABLE} SET created_at = %(created_at)s WHERE snapshot_id = %(sid)s",
+                        {"created_at": ts + timedelta(minutes=rng.randint(2, 9)), "sid": snapshot_id},
+                    )
+                    raw.commit()
+                if (slot + 1) % (SNAPSHOTS_PER_DAY * 10) == 0:
+                    print(f"  … {ts:%Y-%m-%d} ({slot + 1}/{total_slots} snapshots, {time.perf_counter() - t0:.0f}s)")
+                ts += step
+            if args.verbose:
+                db.log_timings()
+
+        refreshed = refresh_mall_daily_price(cur, start_date=start.date(), end_date=end.date())
+        bump_generation_cursor(cur)
+        raw.commit()
+        print(f"mall_daily_price refreshed: {refreshed} rows")
+        cur.close()
+    finally:
+        raw.close()
+
+    print(
+        f"✅ {start:%Y-%m-%d} ~ {end:%Y-%m-%d}: malls={len(malls)} snapshots={snapshots} "
+        f"rows={snapshot_rows} legacy_rows(snapshot_id NULL)={legacy_rows} ({time.perf_counter() - t0:.0f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
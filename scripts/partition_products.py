@@ -0,0 +1,162 @@
+"""products 월 단위 RANGE 파티션: 상태 / 마이그레이션(opt-in) / 유지보수(미리 만들기 + 만료).
+
+기본은 실행할 SQL 만 출력한다(dry-run). --apply 를 붙여야 실제로 바꾼다.
+
+- --status (기본): 파티션 여부, 파티션별 범위와 행 수(information_schema 추정치).
+- --migrate: observed_at 을 NOT NULL 로, PK 를 (id, observed_at) 로 바꾸고 가장 오래된 달 ~ 이번 달 + --ahead 달의
+  pYYYYMM 파티션과 p_future(MAXVALUE) 로 나눈다. 테이블을 복사하는 ALTER 한 문장이라 도는 동안 쓰기가 막힌다
+  (크롤러를 멈추고 돌린다). 외래 키 / PK 외 UNIQUE 키 / observed_at NULL 행이 있으면 거부한다.
+- --maintain: 이번 달 + --ahead 달까지 빈 파티션을 미리 만들고, --retention-months 가 0 보다 크면
+  그보다 오래된 달을 --action archive(products_archive_YYYYMM 테이블로 EXCHANGE 후 파티션 삭제) 또는
+  drop(파티션 삭제) 으로 만료한다. 둘 다 메타데이터 작업이라 대량 DELETE 가 없다. 매일 한 번 cron 으로 돌린다.
+- --remove: 파티션을 없앤다 (PK (id, observed_at) 는 그대로 둔다).
+
+만료는 products 원본 행만 없앤다. mall_daily_price / monthly_seller_state / snapshots 등은 그대로라
+대시보드 추이와 월간 리포트는 남는다. 만료 뒤에는 응답 캐시 세대를 올린다.
+
+Usage:
+  python scripts/partition_products.py
+  python scripts/partition_products.py --migrate
+  python scripts/partition_products.py --migrate --apply
+  python scripts/partition_products.py --maintain --apply
+  PRODUCTS_RETENTION_MONTHS=24 python scripts/partition_products.py --maintain --action drop --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.database import engine, init_db
+from api.services.product_partitions import (
+    PRODUCTS_PARTITION_AHEAD_MONTHS,
+    PRODUCTS_RETENTION_ACTION,
+    PRODUCTS_RETENTION_MONTHS,
+    REMOVE_PARTITIONING_SQL,
+    RETENTION_ACTIONS,
+    add_months,
+    maintenance_plan,
+    migration_blockers,
+    migration_sql,
+    month_floor,
+    partition_layout,
+)
+from api.services.response_cache import bump_generation
+
+
+def print_status(layout) -> None:
+    if not layout:
+        print("products 는 파티션이 없다 (--migrate 로 월 파티션으로 바꾼다)")
+        return
+    print(f"products 파티션 {len(layout)}개 (행 수는 information_schema 추정치)")
+    for p in layout:
+        lower = f"{p.lower:%Y-%m-%d}" if p.lower else "…"
+        upper = f"{p.upper:%Y-%m-%d}" if p.upper else "MAXVALUE"
+        print(f"  {p.name:<10} [{lower} ~ {upper})  rows≈{p.rows}")
+
+
+def run_steps(raw, steps, *, apply: bool) -> None:
+    for label, sql in steps:
+        print(f"── {label}\n{sql};")
+        if not apply:
+            continue
+        cur = raw.cursor()
+        t0 = time.perf_counter()
+        cur.execute(sql)
+        cur.close()
+        print(f"   ({time.perf_counter() - t0:.1f}s)")
+    if steps and not apply:
+        print("\ndry-run 이다. 실행하려면 --apply 를 붙인다.")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--status", action="store_true", help="파티션 상태 (기본)")
+    mode.add_argument("--migrate", action="store_true", help="월 RANGE 파티션으로 바꾼다")
+    mode.add_argument("--maintain", action="store_true", help="다음 달 파티션 미리 만들기 + 만료")
+    mode.add_argument("--remove", action="store_true", help="파티션을 없앤다")
+    parser.add_argument("--apply", action="store_true", help="SQL 을 실제로 실행한다 (없으면 dry-run)")
+    parser.add_argument("--ahead", type=int, default=PRODUCTS_PARTITION_AHEAD_MONTHS, help="미리 만들 달 수")
+    parser.add_argument(
+        "--retention-months", type=int, default=PRODUCTS_RETENTION_MONTHS, help="보존 개월 (0: 만료 안 함)"
+    )
+    parser.add_argument("--action", choices=RETENTION_ACTIONS, default=PRODUCTS_RETENTION_ACTION)
+    args = parser.parse_args()
+
+    init_db()
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        layout = partition_layout(cur)
+        today = datetime.now()
+
+        if args.migrate:
+            if layout:
+                print_status(layout)
+                print("이미 파티션이 있다. --maintain 을 쓴다")
+                sys.exit(1)
+            problems = migration_blockers(cur)
+            if problems:
+                for p in problems:
+                    print(f"❌ {p}")
+                sys.exit(1)
+            cur.execute("SELECT MIN(observed_at), COUNT(*) FROM products")
+            first, rows = cur.fetchone()
+            cur.close()
+            first_month = month_floor(first or today)
+            last_month = add_months(month_floor(today), args.ahead)
+            print(f"products {rows}행 → {first_month:%Y-%m} ~ {last_month:%Y-%m} 월 파티션 + p_future")
+            print("⚠️ 테이블을 복사하므로 도는 동안 products 쓰기가 막힌다 (크롤러를 멈추고 돌린다)")
+            run_steps(raw, [("migrate", migration_sql(first_month, last_month))], apply=args.apply)
+        elif args.maintain:
+            cur.close()
+            try:
+                steps = maintenance_plan(
+                    layout,
+                    today=today,
+                    ahead_months=args.ahead,
+                    retention_months=args.retention_months,
+                    action=args.action,
+                )
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            if layout[-1].rows:
+                print(f"⚠️ p_future 에 행이 약 {layout[-1].rows}개 있다 (유지보수가 밀렸다). 새 파티션으로 옮기느라 느려진다")
+            if not steps:
+                print("✅ 할 일 없음 (미리 만든 파티션 충분, 만료 대상 없음)")
+                return
+            run_steps(raw, steps, apply=args.apply)
+            expired = any(sql.startswith("ALTER TABLE products DROP PARTITION") for _label, sql in steps)
+            if args.apply and expired:
+                with engine.begin() as conn:
+                    bump_generation(conn)
+        elif args.remove:
+            cur.close()
+            if not layout:
+                print("products 는 파티션이 없다")
+                return
+            run_steps(raw, [("remove partitioning", REMOVE_PARTITIONING_SQL)], apply=args.apply)
+        else:
+            cur.close()
+            print_status(layout)
+            return
+
+        if args.apply:
+            cur = raw.cursor()
+            print_status(partition_layout(cur))
+            cur.close()
+    finally:
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
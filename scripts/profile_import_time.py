@@ -0,0 +1,82 @@
+"""API 프로세스 import 시간 프로파일 (`python -X importtime` 결과 요약).
+
+새 인터프리터에서 `import api.main`(또는 --module)을 -X importtime 으로 돌리고
+누적 시간이 큰 모듈, 자체 시간이 큰 모듈, 기동 때 올라오면 안 되는 무거운 의존성
+(numpy/pandas/pyarrow/statsmodels/playwright/boto3/Pillow — 모두 첫 사용 때 import 한다)을 출력한다.
+무거운 의존성이 기동 경로에 들어와 있으면 exit 1.
+
+Usage:
+  python scripts/profile_import_time.py
+  python scripts/profile_import_time.py --top 30 --module api.routers.products
+  python scripts/profile_import_time.py --raw > importtime.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# 기동 경로에서 빠져 있어야 하는 패키지 (top-level 이름)
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "statsmodels", "playwright", "boto3", "botocore", "PIL")
+
+
+def run_importtime(module: str) -> tuple[str, list[tuple[int, int, int, str]]]:
+    """(stderr 원문, [(self_us, cumulative_us, depth, name), ...])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        sys.exit(proc.returncode)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip(" ")
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, stripped.rstrip()))
+    return proc.stderr, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="api.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--raw", action="store_true", help="-X importtime 원문만 출력")
+    args = parser.parse_args()
+
+    raw, rows = run_importtime(args.module)
+    if args.raw:
+        sys.stdout.write(raw)
+        return
+
+    total = next((cum for _s, cum, depth, name in rows if depth == 0 and name == args.module), 0)
+    print(f"import {args.module}: {total / 1e6:.3f}s ({len(rows)} modules)")
+
+    print(f"\n누적 시간 상위 {args.top} (직접 import 한 모듈 기준, 하위 모듈 포함)")
+    direct = [r for r in rows if r[2] == 1 or (r[2] == 0 and r[3] != args.module)]
+    for self_us, cum, _depth, name in sorted(direct, key=lambda r: -r[1])[: args.top]:
+        print(f"  {cum / 1e3:9.1f} ms  {name}")
+
+    print(f"\n자체 시간 상위 {args.top}")
+    for self_us, _cum, _depth, name in sorted(rows, key=lambda r: -r[0])[: args.top]:
+        print(f"  {self_us / 1e3:9.1f} ms  {name}")
+
+    heavy = sorted({name for _s, _c, _d, name in rows if name.split(".")[0] in HEAVY_MODULES and "." not in name})
+    if heavy:
+        print(f"\n❌ 기동 경로에 무거운 의존성이 있다: {', '.join(heavy)}")
+        print("   (python -X importtime -c 'import api.main' 원문에서 어느 모듈이 끌어오는지 확인: --raw)")
+        sys.exit(1)
+    print(f"\n✅ 무거운 의존성({', '.join(HEAVY_MODULES)})은 기동 때 import 되지 않는다")
+
+
+if __name__ == "__main__":
+    main()
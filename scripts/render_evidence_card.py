@@ -1,11 +1,19 @@
 import os
+import sys
 import uuid
-import asyncio
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List
 
 import requests
-from playwright.async_api import async_playwright
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from api.services.card_renderer import get_card_renderer
+
+DEMO_VIEWPORT = {"width": 800, "height": 450}
 
 # ==========================================
 # 1. API 키 설정 (crawl_naver.py와 동일하게 사용)
@@ -219,34 +227,32 @@ def build_product_card_html(product: Product) -> str:
 """
 
 # ==========================================
-# 5. Playwright로 HTML을 열어 스크린샷 찍기
+# 5. 공용 렌더러(브라우저 1개 + 페이지 풀)로 한 번에 스크린샷
 # ==========================================
-async def render_card_to_png(product: Product, out_dir: str) -> str:
+def render_cards_to_png(products: List[Product], out_dir: str) -> list:
+    """상품 순서대로 PNG 경로 또는 예외 객체를 돌려준다."""
     os.makedirs(out_dir, exist_ok=True)
-
-    # 1) HTML 저장
-    html = build_product_card_html(product)
-    html_filename = f"{uuid.uuid4()}.html"
-    html_path = os.path.join(out_dir, html_filename)
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html)
-
-    # 2) 스크린샷
-    png_filename = f"{uuid.uuid4()}.png"
-    png_path = os.path.join(out_dir, png_filename)
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page(viewport={"width": 800, "height": 450})
-        await page.goto(f"file:///{os.path.abspath(html_path)}")
-        await page.wait_for_timeout(1000)
-        await page.screenshot(path=png_path, full_page=False)
-        await browser.close()
-    return png_path
+    pngs = get_card_renderer().render_html_batch(
+        [build_product_card_html(p) for p in products],
+        viewport=DEMO_VIEWPORT,
+        settle_ms=1000,
+        return_exceptions=True,
+    )
+    results = []
+    for png in pngs:
+        if isinstance(png, BaseException):
+            results.append(png)
+            continue
+        png_path = os.path.join(out_dir, f"{uuid.uuid4()}.png")
+        with open(png_path, "wb") as f:
+            f.write(png)
+        results.append(png_path)
+    return results
 
 # ==========================================
 # 6. 단독 실행시: API 데이터로 카드 생성 데모
 # ==========================================
-async def main():
+def main():
     print("[NAVER] 공식 API 데이터 기반 카드 이미지 생성 시작…")
     products = fetch_products_via_naver_api()
     if not products:
@@ -255,16 +261,15 @@ async def main():
 
     output_dir = "product_cards"
     results = []
-    for p in products:
-        try:
-            png_path = await render_card_to_png(p, output_dir)
-            results.append({"name": p.name, "price": p.price, "url": p.url, "card_image_path": png_path})
-            print(f"[OK] {p.name} -> {png_path}")
-        except Exception as e:
-            print(f"[ERROR] {p.name}: {e}")
+    for p, png_path in zip(products, render_cards_to_png(products, output_dir)):
+        if isinstance(png_path, BaseException):
+            print(f"[ERROR] {p.name}: {png_path}")
+            continue
+        results.append({"name": p.name, "price": p.price, "url": p.url, "card_image_path": png_path})
+        print(f"[OK] {p.name} -> {png_path}")
 
     print(f"\n총 {len(results)}개 상품 카드 이미지를 생성했습니다.")
     return results
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
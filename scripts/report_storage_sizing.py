@@ -0,0 +1,300 @@
+"""products 행 저장 vs 변경분만 저장하는 가격 구간 저장 월별 사이징 리포트.
+
+구간 저장(PRODUCTS_STORAGE_MODE=intervals, api/services/price_intervals.py)은 products 를
+price_listings / price_intervals 두 테이블로 나눈다. 전환 전에 얼마나 줄어드는지 보는 리포트다.
+- 리스팅: 채널 + 마켓 + 정규화 링크(링크가 없으면 판매처 + 상품명) 한 건당 한 행.
+  상품명 / 링크 / 이미지 / 키워드는 마지막 값으로 덮어쓴다.
+- 구간: 가격 상태(INTERVAL_STATE_COLUMNS)가 같은 연속 관측. 같은 스트림(market, channel)의 직전 스냅샷에서도
+  같은 상태로 보였으면 valid_to 만 늘리고, 상태가 바뀌었거나 중간 스냅샷에서 빠졌다 돌아오면 새 구간을 연다.
+
+products 를 스냅샷 순서대로 읽으며 크롤러와 같은 규칙(price_intervals.plan_snapshot)을 메모리에서 재생한다.
+DB 에 쓰지 않는다.
+한 스냅샷에서 같은 리스팅이 여러 번 나오면 첫 행(id 순)만 센다.
+
+월별로 다음을 비교한다.
+- rows 모드: products 행 수, 추정 바이트(데이터 + 보조 인덱스)
+- intervals 모드: 새 리스팅 수 + 새 구간 수, 추정 바이트. 가격이 그대로인 관측은 valid_to 만
+  늘리므로(제자리 UPDATE) 행도 바이트도 늘지 않는다.
+
+바이트는 InnoDB compact 행 형식 기준 추정치다 (행 헤더 + 트랜잭션 필드 18B, 가변 길이 컬럼 길이 2B,
+보조 인덱스 항목 = 키 + PK + 레코드 헤더). 페이지 여유 공간 / 단편화는 빼므로 절대값보다 두 모드의
+비율을 본다. 맨 아래에 information_schema 의 products 실측 평균 행 크기를 함께 출력한다.
+
+--since 보다 앞선 구간 상태는 모르므로 첫 달은 모든 리스팅이 새 구간으로 잡힌다(웜업).
+웜업 달은 표에 '*' 로 표시하고 합계에서 뺀다.
+
+Usage:
+  python scripts/report_storage_sizing.py                 # 최근 3개월 (+ 웜업 1개월)
+  python scripts/report_storage_sizing.py --since 2026-01
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+from api.database import engine
+from api.services.price_intervals import (
+    INTERVAL_STATE_COLUMNS,
+    interval_state,
+    listing_stream,
+    plan_snapshot,
+)
+
+_ROW_OVERHEAD = 18  # 레코드 헤더 5B + DB_TRX_ID 6B + DB_ROLL_PTR 7B
+_VAR_LEN = 2  # 가변 길이 컬럼 길이 바이트
+_INDEX_ENTRY_OVERHEAD = 6 + 4  # 레코드 헤더 + PK(INT)
+_DATETIME, _TIMESTAMP, _INT, _TINYINT = 5, 4, 4, 1
+
+_PRODUCT_COLUMNS = (
+    "keyword", "product_name", "unit_price", "quantity", "total_price",
+    "mall_name", "mall_id", "calc_method", "link", "image_url", "card_image_path",
+    "channel", "market", "snapshot_id", "calc_valid", "observed_at",
+)
+
+
+def _blen(value) -> int:
+    return len(str(value).encode("utf-8")) if value is not None else 0
+
+
+def _var(*values) -> int:
+    return sum(_blen(v) + _VAR_LEN for v in values)
+
+
+def products_row_bytes(r: dict) -> tuple[int, int]:
+    """(데이터, 보조 인덱스) 추정 바이트. 스키마는 api/database.py products."""
+    data = (
+        _ROW_OVERHEAD
+        + _INT  # id
+        + 3 * _INT  # unit_price, quantity, total_price
+        + _INT + _TINYINT  # mall_id, calc_valid
+        + 2 * _DATETIME + _TIMESTAMP  # snapshot_at, observed_at, created_at
+        + _var(
+            r["keyword"], r["product_name"], r["mall_name"], r["calc_method"], r["link"],
+            r["image_url"], r["card_image_path"], r["channel"], r["market"], r["snapshot_id"],
+        )
+    )
+    index_keys = (
+        _INT,  # idx_unit_price
+        _TIMESTAMP,  # idx_created_at
+        _blen(r["channel"]),  # idx_channel
+        _DATETIME,  # idx_snapshot_at
+        _blen(r["snapshot_id"]),  # idx_snapshot_id
+        _DATETIME,  # idx_observed_at
+        _blen(r["channel"]) + _DATETIME,  # idx_channel_observed
+        _blen(r["mall_name"]) + _DATETIME,  # idx_mall_observed
+        _INT + _DATETIME,  # idx_mall_id_observed
+    )
+    return data, sum(k + _INDEX_ENTRY_OVERHEAD for k in index_keys)
+
+
+def listing_bytes(r: dict) -> tuple[int, int]:
+    """리스팅 행: id, listing_key_hash CHAR(64) UNIQUE, (channel, market) / current_interval_id 인덱스."""
+    market, channel = listing_stream(r)
+    data = (
+        _ROW_OVERHEAD
+        + _INT + 64  # id, listing_key_hash CHAR(64)
+        + _INT + 2 * _DATETIME  # current_interval_id, first/last_seen_at
+        + _var(channel, market, r["keyword"], r["product_name"], r["link"], r["image_url"])
+    )
+    index = (
+        (64 + _INDEX_ENTRY_OVERHEAD)
+        + (_blen(channel) + _blen(market) + _INDEX_ENTRY_OVERHEAD)
+        + (_INT + _INDEX_ENTRY_OVERHEAD)
+    )
+    return data, index
+
+
+def interval_bytes(r: dict, snapshot_id: str) -> tuple[int, int]:
+    """구간 행: 상태 컬럼 + 카드 경로 + valid_from / valid_to + 처음 / 마지막 스냅샷 id, 보조 인덱스 5개."""
+    data = (
+        _ROW_OVERHEAD
+        + 2 * _INT  # id, listing_id
+        + 3 * _INT + _INT + _TINYINT  # prices, mall_id, calc_valid
+        + 2 * _DATETIME  # valid_from, valid_to
+        + _var(r["mall_name"], r["calc_method"], r["card_image_path"], snapshot_id, snapshot_id)
+    )
+    index = (
+        (_INT + _DATETIME + _INDEX_ENTRY_OVERHEAD)  # idx_listing_valid
+        + (2 * _DATETIME + _INDEX_ENTRY_OVERHEAD)  # idx_valid_range
+        + (_INT + _DATETIME + _INDEX_ENTRY_OVERHEAD)  # idx_mall_id_valid
+        + (_blen(r["mall_name"]) + _INDEX_ENTRY_OVERHEAD)  # idx_mall_name
+        + (_blen(snapshot_id) + _INDEX_ENTRY_OVERHEAD)  # idx_first_snapshot
+    )
+    return data, index
+
+
+def _month_start(month: str) -> date:
+    y, m = (int(x) for x in month.split("-"))
+    return date(y, m, 1)
+
+
+def _shift_month(d: date, delta: int) -> date:
+    idx = d.year * 12 + d.month - 1 + delta
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def _dicts(cur):
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, r)) for r in cur.fetchall()]
+
+
+def replay(cur, since: date) -> dict:
+    cur.execute(
+        """
+        SELECT snapshot_id, MIN(started_at) AS started_at FROM snapshots
+        WHERE status = 'completed' AND started_at >= %(since)s
+        GROUP BY snapshot_id
+        ORDER BY MIN(started_at), snapshot_id
+        """,
+        {"since": since},
+    )
+    snapshots = cur.fetchall()
+
+    months: dict = defaultdict(lambda: defaultdict(int))
+    open_intervals: dict = {}
+    seen_listings: set = set()
+    last_snapshot_by_stream: dict = {}
+    for sid, _started_at in snapshots:
+        cur.execute(
+            f"SELECT {', '.join(_PRODUCT_COLUMNS)} FROM {config.DB_TABLE} WHERE snapshot_id = %(sid)s ORDER BY id",
+            {"sid": sid},
+        )
+        rows = _dicts(cur)
+        if not rows:
+            continue
+        std_rows = []
+        for r in rows:
+            market, channel = listing_stream(r)
+            std_rows.append({**r, "market": market, "channel": channel})
+        snapshot_at = min(r["observed_at"] for r in std_rows)
+        m = months[snapshot_at.strftime("%Y-%m")]
+        m["snapshots"] += 1
+
+        for r in rows:
+            data, index = products_row_bytes(r)
+            m["rows"] += 1
+            m["rows_data"] += data
+            m["rows_index"] += index
+
+        plan = plan_snapshot(
+            std_rows,
+            snapshot_id=sid,
+            snapshot_at=snapshot_at,
+            open_intervals=open_intervals,
+            prev_snapshot_by_stream=dict(last_snapshot_by_stream),
+        )
+        for key_hash, r in plan["listings"].items():
+            if key_hash not in seen_listings:
+                seen_listings.add(key_hash)
+                data, index = listing_bytes(r)
+                m["listings"] += 1
+                m["iv_data"] += data
+                m["iv_index"] += index
+        # 연장은 valid_to / last_seen_snapshot_id 제자리 갱신이라 행도 바이트도 늘지 않는다.
+        m["extended"] += len(plan["extend"])
+        # 메모리 재생이라 구간 식별자로 리스팅 해시를 쓰고 valid_to 는 보지 않는다 (스냅샷은 시각 순).
+        for key_hash in plan["extend"]:
+            open_intervals[key_hash] = (key_hash, open_intervals[key_hash][1], sid, None)
+        for key_hash, r in plan["open"]:
+            open_intervals[key_hash] = (key_hash, interval_state(r), sid, None)
+            data, index = interval_bytes(r, sid)
+            m["intervals"] += 1
+            m["iv_data"] += data
+            m["iv_index"] += index
+        for stream in {listing_stream(r) for r in std_rows}:
+            last_snapshot_by_stream[stream] = sid
+    return months
+
+
+def _measured_products(cur) -> dict | None:
+    cur.execute(
+        """
+        SELECT table_rows, data_length, index_length FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %(table)s
+        """,
+        {"table": config.DB_TABLE},
+    )
+    found = cur.fetchall()
+    if not found or not found[0][0]:
+        return None
+    rows, data, index = (int(x or 0) for x in found[0])
+    return {"rows": rows, "avg_data": data / rows, "avg_index": index / rows}
+
+
+def _mb(n: float) -> str:
+    return f"{n / 1024 / 1024:8.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--since", help="YYYY-MM (기본: 3개월 전). 이 달 앞 한 달을 웜업으로 재생한다")
+    args = parser.parse_args()
+
+    first = _month_start(args.since) if args.since else _shift_month(date.today().replace(day=1), -2)
+    warmup = _shift_month(first, -1)
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        t0 = time.perf_counter()
+        months = replay(cur, warmup)
+        measured = _measured_products(cur)
+        cur.close()
+    finally:
+        raw.close()
+
+    print(f"state columns: {', '.join(INTERVAL_STATE_COLUMNS)}  (replayed in {time.perf_counter() - t0:.1f}s)")
+    print(
+        f"{'month':8} {'snaps':>5} | {'rows':>9} {'data MB':>8} {'idx MB':>8} | "
+        f"{'listings':>8} {'intervals':>9} {'extended':>9} {'data MB':>8} {'idx MB':>8} | {'rows%':>6} {'bytes%':>6}"
+    )
+    total = defaultdict(int)
+    for month in sorted(months):
+        m = months[month]
+        is_warmup = month < first.strftime("%Y-%m")
+        iv_rows = m["listings"] + m["intervals"]
+        rows_bytes = m["rows_data"] + m["rows_index"]
+        iv_bytes = m["iv_data"] + m["iv_index"]
+        print(
+            f"{month + ('*' if is_warmup else ''):8} {m['snapshots']:>5} | "
+            f"{m['rows']:>9,} {_mb(m['rows_data'])} {_mb(m['rows_index'])} | "
+            f"{m['listings']:>8,} {m['intervals']:>9,} {m['extended']:>9,} {_mb(m['iv_data'])} {_mb(m['iv_index'])} | "
+            f"{100 * iv_rows / max(m['rows'], 1):5.1f}% {100 * iv_bytes / max(rows_bytes, 1):5.1f}%"
+        )
+        if not is_warmup:
+            for k, v in m.items():
+                total[k] += v
+
+    if total["rows"]:
+        n_months = sum(1 for month in months if month >= first.strftime("%Y-%m"))
+        rows_bytes = total["rows_data"] + total["rows_index"]
+        iv_bytes = total["iv_data"] + total["iv_index"]
+        print(
+            f"\nper month (avg of {n_months}): rows mode {total['rows'] / n_months:,.0f} rows / "
+            f"{_mb(rows_bytes / n_months).strip()} MB, intervals mode "
+            f"{(total['listings'] + total['intervals']) / n_months:,.0f} rows / {_mb(iv_bytes / n_months).strip()} MB "
+            f"({100 * iv_bytes / rows_bytes:.1f}% of bytes)"
+        )
+        est_avg = total["rows_data"] / total["rows"]
+        if measured:
+            print(
+                f"products measured (information_schema): {measured['rows']:,} rows, "
+                f"avg data {measured['avg_data']:.0f}B / index {measured['avg_index']:.0f}B per row "
+                f"(estimate here: data {est_avg:.0f}B / index {total['rows_index'] / total['rows']:.0f}B)"
+            )
+    else:
+        print("\n(no snapshots in range)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""monthly_seller_state(증분 상태)가 월 전체 재계산과 같은 결과를 내는지 검증한다.
+
+기본: 저장된 상태로 만든 지표 vs products 월 전체 재스캔 지표를 비교한다.
+--replay: 한 트랜잭션 안에서 상태를 비우고 그 달 스냅샷을 시간순으로 하나씩 fold 한 뒤 비교하고
+          롤백한다 (운영 상태는 건드리지 않음). snapshot_id 없는 구 행은 fold 대상이 아니므로 제외된다.
+--rebuild: 상태를 products 로 다시 만들고 커밋한다 (stale 복구용).
+
+불일치가 있으면 exit 1.
+
+Usage:
+  python scripts/verify_monthly_state.py
+  python scripts/verify_monthly_state.py --month 2026-09 --channel naver --replay
+  python scripts/verify_monthly_state.py --month 2026-09 --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import config
+from api.database import engine, init_db
+from api.services.monthly_metrics import metrics_from_states, seller_month_states
+from api.services.monthly_state import (
+    MONTHLY_STATE_CHANNELS,
+    fold_snapshot,
+    month_rows,
+    read_month_states,
+    rebuild_month_state,
+    reset_month_state,
+)
+from api.services.response_cache import bump_generation_cursor
+
+
+def _normalize(metrics):
+    return [json.loads(json.dumps(m, sort_keys=True, default=str)) for m in metrics]
+
+
+def _diff(full, incremental) -> list[str]:
+    problems = []
+    full_by_seller = {m["seller_name_std"]: m for m in full}
+    inc_by_seller = {m["seller_name_std"]: m for m in incremental}
+    for seller in sorted(set(full_by_seller) | set(inc_by_seller)):
+        a, b = full_by_seller.get(seller), inc_by_seller.get(seller)
+        if a is None or b is None:
+            problems.append(f"{seller}: only in {'state' if a is None else 'full'}")
+            continue
+        for k in sorted(set(a) | set(b)):
+            if a.get(k) != b.get(k):
+                problems.append(f"{seller}.{k}: full={a.get(k)!r} state={b.get(k)!r}")
+    if not problems and [m["seller_name_std"] for m in full] != [m["seller_name_std"] for m in incremental]:
+        problems.append("seller order differs")
+    return problems
+
+
+def _replay(cur, month: str, channel: str, threshold: int) -> int:
+    reset_month_state(cur, month=month, channel=channel, threshold_price=threshold)
+    cur.execute(
+        f"""
+        SELECT snapshot_id
+        FROM {config.PRODUCTS_SOURCE}
+        WHERE snapshot_id IS NOT NULL
+          AND observed_at >= %(start)s AND observed_at < %(end)s
+        GROUP BY snapshot_id
+        ORDER BY MIN(observed_at), snapshot_id
+        """,
+        {"start": f"{month}-01 00:00:00", "end": _next_month_start(month)},
+    )
+    snapshot_ids = [r[0] for r in cur.fetchall()]
+    for sid in snapshot_ids:
+        fold_snapshot(cur, sid, threshold_price=threshold, channels=[channel])
+    return len(snapshot_ids)
+
+
+def _next_month_start(month: str) -> str:
+    y, m = (int(x) for x in month.split("-"))
+    y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return f"{y:04d}-{m:02d}-01 00:00:00"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--month", default=datetime.now().strftime("%Y-%m"), help="YYYY-MM")
+    parser.add_argument("--channel", action="append", help="기본: MONTHLY_STATE_CHANNELS 전체")
+    parser.add_argument("--threshold", type=int, default=config.TARGET_PRICE)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--replay", action="store_true", help="스냅샷 단위 fold 재현 후 비교 (롤백)")
+    mode.add_argument("--rebuild", action="store_true", help="상태를 전체 재계산으로 다시 만들고 커밋")
+    args = parser.parse_args()
+
+    init_db()
+    channels = args.channel or list(MONTHLY_STATE_CHANNELS)
+    failed = False
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        for channel in channels:
+            label = f"{args.month} / {channel} / {args.threshold:,}"
+            if args.rebuild:
+                n = rebuild_month_state(cur, month=args.month, channel=channel, threshold_price=args.threshold)
+                bump_generation_cursor(cur)
+                raw.commit()
+                print(f"── {label}: rebuilt {n} sellers")
+                continue
+
+            full_states = seller_month_states(
+                month_rows(cur, month=args.month, channel=channel), threshold_price=args.threshold
+            )
+            full = metrics_from_states(full_states, month=args.month, threshold_price=args.threshold, channel=channel)
+            if args.replay:
+                folded = _replay(cur, args.month, channel, args.threshold)
+                print(f"── {label}: replayed {folded} snapshots")
+            states = read_month_states(cur, month=args.month, channel=channel, threshold_price=args.threshold)
+            if args.replay:
+                raw.rollback()
+            if states is None:
+                print(f"── {label}: state not ready (stale or never built) — skip")
+                continue
+
+            incremental = metrics_from_states(states, month=args.month, threshold_price=args.threshold, channel=channel)
+            problems = _diff(_normalize(full), _normalize(incremental))
+            if problems:
+                failed = True
+                print(f"❌ {label}: {len(problems)} mismatches")
+                for p in problems[:50]:
+                    print(f"   - {p}")
+            else:
+                print(f"✅ {label}: {len(full)} sellers match the full recompute")
+    finally:
+        raw.close()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()